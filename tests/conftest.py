@@ -0,0 +1,15 @@
+import pytest
+
+from verbose_c.engine.engine import compile_module
+
+
+@pytest.fixture
+def compile_machine_program(tmp_path):
+    """返回一个编译函数：把源码写入 tmp_path 并编译到 Machine IR。"""
+
+    def compile_source(source, name="program.vbc"):
+        source_path = tmp_path / name
+        source_path.write_text(source, encoding="utf-8")
+        return compile_module(str(source_path), require_machine=True).machine_program
+
+    return compile_source
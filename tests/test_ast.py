@@ -0,0 +1,112 @@
+import pytest
+
+from verbose_c.compiler.compiler import Compiler
+from verbose_c.engine.engine import _load_parser_module, ensure_parser
+from verbose_c.fs.source_manager import SourceManager
+from verbose_c.parser.lexer.enum import Operator
+from verbose_c.parser.lexer.tokenizer import Tokenizer
+from verbose_c.parser.parser.ast.node import (
+    BinaryOpNode,
+    NameNode,
+    NumberNode,
+    iter_child_nodes,
+    walk,
+)
+from verbose_c.utils.visitor import VisitorBase
+
+
+def _parse(tmp_path, source: str):
+    source_path = tmp_path / "main.vbc"
+    source_path.write_text(source, encoding="utf-8")
+    ensure_parser()
+    return str(source_path), _load_parser_module().GeneratedParser(Tokenizer(str(source_path), SourceManager())).start()
+
+
+def test_ast_nodes_use_slots_and_keep_repr():
+    node = BinaryOpNode(Operator.ADD, NameNode("a", start_line=1), NumberNode(2, start_line=1), start_line=1)
+
+    assert BinaryOpNode.__slots__ == ("left", "op", "right")
+    assert node._fields[4:] == ("left", "op", "right")
+    assert node.__dict__ == {}
+    assert repr(NameNode("a", start_line=1)) == (
+        "NameNode({'_type': 'NameNode', 'start_line': 1, 'start_column': None, "
+        "'end_line': None, 'end_column': None, 'name': 'a'})"
+    )
+
+    # 各编译阶段附加的内部标注仍写入按需创建的 __dict__，并出现在 repr 中
+    node._pointer_arithmetic = True
+    assert node.__dict__ == {"_pointer_arithmetic": True}
+    assert repr(node).endswith("'_pointer_arithmetic': True})")
+
+
+def test_visitor_dispatch_table_is_built_once_per_class():
+    class CountingVisitor(VisitorBase):
+        def __init__(self):
+            self.names = []
+
+        def visit_NameNode(self, node):
+            self.names.append(node.name)
+
+    class OtherVisitor(VisitorBase):
+        pass
+
+    visitor = CountingVisitor()
+    visitor.visit(NameNode("a"))
+    visitor.visit(NameNode("b"))
+
+    assert visitor.names == ["a", "b"]
+    assert CountingVisitor._dispatch_table == {NameNode: CountingVisitor.visit_NameNode}
+    assert OtherVisitor._dispatch_table == {}
+    with pytest.raises(NotImplementedError):
+        OtherVisitor().visit(NameNode("a"))
+
+
+def test_walk_is_preorder_and_iterative():
+    node = BinaryOpNode(Operator.ADD, NameNode("a"), NumberNode(1))
+    assert [type(child) for child in walk(node)] == [BinaryOpNode, NameNode, NumberNode]
+    assert len(list(iter_child_nodes(node))) == 2
+
+    deep = NameNode("x")
+    for _ in range(20_000):
+        deep = BinaryOpNode(Operator.ADD, deep, NumberNode(1))
+    assert sum(1 for _ in walk(deep)) == 40_001
+
+
+@pytest.mark.parametrize("operator,operand,count", [
+    ("+", "a", 3000),
+    ("+", "1", 3000),
+    ("+", "a * 2", 2000),
+    ("&&", "a", 600),
+    ("||", "a", 600),
+])
+@pytest.mark.parametrize("optimize_level", [0, 1])
+def test_deep_expression_chains_compile_without_recursion_error(tmp_path, operator, operand, count, optimize_level):
+    expression = f" {operator} ".join([operand] * count)
+    source_path, ast_node = _parse(
+        tmp_path,
+        f"int main() {{\n    int a = 1;\n    int b = {expression};\n    return b;\n}}\n",
+    )
+
+    compiler = Compiler(ast_node, source_path=source_path, optimize_level=optimize_level)
+    compiler.compile()
+
+    assert "main" in compiler.opcode_generator.function_compilation_results
+
+
+def test_front_end_compiles_many_functions(tmp_path):
+    functions = "\n".join(
+        f"int f{index}(int x) {{\n"
+        f"    int y = x * {index} + (x - 1) * 2;\n"
+        f"    if (y > {index} && x != 0) {{ y = y - x; }}\n"
+        f"    while (y > 100) {{ y = y / 2; }}\n"
+        f"    return y;\n"
+        f"}}"
+        for index in range(200)
+    )
+    source_path, ast_node = _parse(tmp_path, functions + "\nint main() {\n    return f1(3);\n}\n")
+
+    compiler = Compiler(ast_node, source_path=source_path)
+    compiler.compile()
+
+    results = compiler.opcode_generator.function_compilation_results
+    assert {f"f{index}" for index in range(200)} | {"main"} <= set(results)
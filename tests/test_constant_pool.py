@@ -0,0 +1,76 @@
+from verbose_c.compiler.compiler import Compiler
+from verbose_c.compiler.constant_pool import constant_key
+from verbose_c.compiler.enum import ScopeType
+from verbose_c.compiler.opcode_generator_visitor import OpcodeGenerator
+from verbose_c.compiler.symbol import SymbolTable
+from verbose_c.engine.engine import _load_parser_module, ensure_parser
+from verbose_c.fs.artifact_store import ArtifactStore, _ArtifactGraph
+from verbose_c.fs.source_manager import SourceManager
+from verbose_c.object.enum import VBCObjectType
+from verbose_c.object.function import VBCFunction
+from verbose_c.object.t_float import VBCFloat
+from verbose_c.object.t_integer import VBCInteger
+from verbose_c.object.t_string import VBCString
+from verbose_c.parser.lexer.tokenizer import Tokenizer
+from verbose_c.parser.parser.ast.node import NumberNode
+
+
+def test_constant_key_distinguishes_type_signed_zero_and_merges_nan():
+    assert constant_key(VBCInteger(1, VBCObjectType.INT)) == constant_key(VBCInteger(1, VBCObjectType.INT))
+    assert constant_key(VBCInteger(1, VBCObjectType.INT)) != constant_key(VBCInteger(1, VBCObjectType.CHAR))
+    assert constant_key(VBCInteger(1, VBCObjectType.INT)) != constant_key(VBCFloat(1.0))
+    assert constant_key(VBCFloat(0.0)) != constant_key(VBCFloat(-0.0))
+    nan = float("nan")
+    assert constant_key(VBCFloat(nan, VBCObjectType.NLFLOAT)) == constant_key(VBCFloat(-nan, VBCObjectType.NLFLOAT))
+    assert constant_key(VBCString("a")) == constant_key(VBCString("a"))
+    assert constant_key(VBCFunction(name="f")) != constant_key(VBCFunction(name="f"))
+
+
+def test_opcode_generator_interns_constants_by_key():
+    generator = OpcodeGenerator(SymbolTable(ScopeType.GLOBAL))
+
+    zero = generator._add_constant(VBCFloat(0.0))
+    negative_zero = generator._add_constant(VBCFloat(-0.0))
+    assert zero != negative_zero
+    assert generator._add_constant(VBCFloat(-0.0)) == negative_zero
+    assert generator._add_constant(VBCString("x")) == generator._add_constant(VBCString("x"))
+    assert generator.constant_pool[negative_zero].value == -0.0
+    assert len(generator.constant_pool) == 3
+
+
+def test_artifact_graph_shares_equal_constants_across_functions():
+    function = VBCFunction(name="f")
+    function.bytecode = []
+    function.constants = [VBCInteger(7, VBCObjectType.INT), VBCString("s"), VBCFloat(-0.0)]
+    module_constants = [VBCInteger(7, VBCObjectType.INT), VBCString("s"), VBCFloat(0.0), function]
+
+    graph = _ArtifactGraph(ArtifactStore(), [], {"constant_pool": module_constants})
+
+    module_pool = graph.constant_pool_blocks[graph.module_constant_pool_id]
+    function_pool = graph.constant_pool_blocks[graph.functions[0]["constants"]]
+    assert function_pool[:2] == module_pool[:2]
+    assert function_pool[2] != module_pool[2]
+    # 7, "s", 0.0, -0.0 与函数本身
+    assert len(graph.constant_entries) == 5
+
+
+def test_constant_interning_with_50k_literals(tmp_path):
+    literal_count = 50_000
+    source_path = tmp_path / "literals.vbc"
+    source_path.write_text(
+        f"int main() {{\n    int table[{literal_count}] = {{0}};\n    return table[1];\n}}\n",
+        encoding="utf-8",
+    )
+    ensure_parser()
+    ast_node = _load_parser_module().GeneratedParser(Tokenizer(str(source_path), SourceManager())).start()
+
+    # 直接展开初始化列表，避免测试时间被 50k 个字面量的语法解析占满
+    init_list = ast_node.modules[0].body[0].body.statements[0].init_exp
+    init_list.elements = [NumberNode(index % 5000, start_line=2) for index in range(literal_count)]
+
+    compiler = Compiler(ast_node)
+    compiler.compile()
+
+    constants = compiler.opcode_generator.function_compilation_results["main"]["constants"]
+    # 下标 0..49999 与元素值 0..4999 去重后共 50000 个整数常量
+    assert len(constants) == literal_count
@@ -1,3 +1,4 @@
+import os
 from types import SimpleNamespace
 from unittest.mock import Mock, call
 
@@ -11,8 +12,8 @@ def test_source_and_bytecode_native_errors_use_embedded_source_path(tmp_path, ca
     bytecode_path = tmp_path / "native_unsupported_array.vbb"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -214,3 +215,145 @@ def test_recorder_receives_compiled_output_once_for_each_input(tmp_path, monkeyp
     )
     assert bytecode_result.success
     assert on_compiled.call_count == 1
+
+
+def test_run_build_compiles_in_parallel_and_reuses_up_to_date_artifacts(tmp_path):
+    from verbose_c.engine.build import collect_build_sources, run_build
+
+    project = tmp_path / "project"
+    (project / "nested").mkdir(parents=True)
+    (project / "shared.inc").write_text("#define BASE 40\n", encoding="utf-8")
+    (project / "first.vbc").write_text(
+        '#include "shared.inc"\nint main() {\n    return BASE + 2;\n}\n',
+        encoding="utf-8",
+    )
+    (project / "nested" / "second.vbc").write_text(
+        "int main() {\n    return 7;\n}\n",
+        encoding="utf-8",
+    )
+    (project / "broken.vbc").write_text("int main( {\n", encoding="utf-8")
+
+    sources = collect_build_sources([str(project)])
+    assert [os.path.basename(path) for path in sources] == ["broken.vbc", "first.vbc", "second.vbc"]
+
+    first_report = run_build(sources, jobs=2)
+    by_name = {os.path.basename(result.source_path): result for result in first_report.results}
+    assert not first_report.success
+    assert first_report.compiled_count == 2
+    assert first_report.failed_count == 1
+    assert not by_name["broken.vbc"].success
+    assert "解析失败" in by_name["broken.vbc"].error
+    assert os.path.exists(by_name["first.vbc"].artifact_path)
+    assert os.path.exists(by_name["second.vbc"].artifact_path)
+
+    second_report = run_build(sources[1:], jobs=1)
+    assert second_report.success
+    assert second_report.cache_hit_count == 2
+
+    (project / "shared.inc").write_text("#define BASE 41\n", encoding="utf-8")
+    third_report = run_build(sources[1:], jobs=2)
+    assert [result.cache_hit for result in third_report.results] == [False, True]
+
+
+def test_compile_server_reuses_warm_state_and_invalidates_changed_files(tmp_path):
+    import tempfile
+    import threading
+
+    from verbose_c.engine.server import CompileServer, send_server_request
+
+    header = tmp_path / "values.inc"
+    source = tmp_path / "served.vbc"
+    header.write_text("#define VALUE 5\n", encoding="utf-8")
+    source.write_text('#include "values.inc"\nint main() {\n    return VALUE;\n}\n', encoding="utf-8")
+
+    socket_dir = tempfile.mkdtemp(prefix="vbc")
+    server = CompileServer(os.path.join(socket_dir, "s.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        for _ in range(100):
+            if os.path.exists(server.socket_path):
+                break
+            threading.Event().wait(0.05)
+        request = {"command": "compile", "filename": str(source)}
+
+        first = send_server_request(server.socket_path, request, timeout=30)
+        assert first["success"], first
+        assert first["status"] == "compiled"
+        second = send_server_request(server.socket_path, request, timeout=30)
+        assert second["status"] == "memory"
+
+        header.write_text("#define VALUE 6\n", encoding="utf-8")
+        os.utime(header, ns=(0, 0))
+        third = send_server_request(server.socket_path, request, timeout=30)
+        assert third["status"] == "compiled"
+        result = run_bytecode_file(third["artifact_path"], log_modules=set(), dump_modules=set())
+        assert result.exit_code == 6
+
+        source.write_text("int main( {\n", encoding="utf-8")
+        failed = send_server_request(server.socket_path, request, timeout=30)
+        assert not failed["success"]
+        assert "解析失败" in failed["error"]
+
+        stats = send_server_request(server.socket_path, {"command": "stats"}, timeout=30)["stats"]
+        assert stats["compiled"] == 2
+        assert stats["memory_hits"] == 1
+    finally:
+        send_server_request(server.socket_path, {"command": "shutdown"}, timeout=30)
+        thread.join(timeout=30)
+    assert not os.path.exists(server.socket_path)
+
+
+def _imported_modules_with_importtime(module_name):
+    import subprocess
+    import sys
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_cli_startup_does_not_import_compiler_or_native_backends():
+    timings = _imported_modules_with_importtime("verbose_c.cli")
+
+    assert "verbose_c.engine.engine" in timings
+    lazy_modules = [
+        "verbose_c.compiler.compiler",
+        "verbose_c.compiler.ir",
+        "verbose_c.compiler.native",
+        "verbose_c.compiler.native.codegen",
+        "verbose_c.compiler.native.runner",
+        "verbose_c.preprocessor",
+        "verbose_c.parser.ppg",
+        "verbose_c.parser.lexer.tokenizer",
+    ]
+    eagerly_imported = [name for name in lazy_modules if name in timings]
+    assert eagerly_imported == [], f"CLI 启动时提前导入了: {eagerly_imported}"
+    # 宽松的启动预算（微秒），只用于捕获重新引入重量级依赖的回归。
+    assert timings["verbose_c.cli"] < 1_500_000
+
+
+def test_generated_parser_module_is_loaded_once_and_reused():
+    import sys
+
+    from verbose_c.engine.engine import _PARSER_MODULE_NAME, _load_parser_module, ensure_parser
+
+    ensure_parser()
+    first = _load_parser_module()
+    second = _load_parser_module()
+
+    assert first is second
+    assert sys.modules[_PARSER_MODULE_NAME] is first
+    assert hasattr(first, "GeneratedParser")
@@ -0,0 +1,95 @@
+from verbose_c.engine.engine import compile_module
+from verbose_c.vm.builtins_functions.system_runtime import BUFFER_SIZE, SystemRuntime
+from verbose_c.vm.core import VBCVirtualMachine
+
+
+def _open(runtime: SystemRuntime, path, flags: str) -> int:
+    constants = runtime.constants()
+    mode = 0
+    for name in flags.split("|"):
+        mode |= constants[name]
+    return runtime.open(str(path), mode, 0o644)
+
+
+def test_buffered_reads_readline_and_lseek_stay_coherent(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"first\nsecond\n" + b"x" * (BUFFER_SIZE + 10) + b"\nlast")
+    runtime = SystemRuntime()
+    fd = _open(runtime, path, "O_RDONLY")
+
+    assert runtime.readline(fd) == b"first\n"
+    assert runtime.buffered_read(fd, 3) == b"sec"
+    # SEEK_CUR 相对于程序看到的位置，而不是内核已预读到的位置
+    assert runtime.buffered_lseek(fd, 0, 1) == 9
+    assert runtime.readline(fd) == b"ond\n"
+    assert runtime.readline(fd) == b"x" * (BUFFER_SIZE + 10) + b"\n"
+    assert runtime.readline(fd) == b"last"
+    assert runtime.readline(fd) == b""
+
+    runtime.buffered_lseek(fd, 0, 0)
+    assert runtime.read_all(fd) == path.read_bytes()
+    runtime.buffered_close(fd)
+
+
+def test_buffered_writes_flush_on_close_and_before_reads(tmp_path):
+    path = tmp_path / "out.txt"
+    runtime = SystemRuntime()
+    fd = _open(runtime, path, "O_RDWR|O_CREAT|O_TRUNC")
+
+    assert runtime.buffered_write(fd, b"hello ") == 6
+    assert path.read_bytes() == b""
+    runtime.buffered_write(fd, b"world\n")
+    runtime.buffered_lseek(fd, 0, 0)
+    assert runtime.readline(fd) == b"hello world\n"
+
+    # 读写切换：写入从程序实际读到的位置开始，而不是预读结束的位置
+    runtime.buffered_lseek(fd, 0, 0)
+    assert runtime.buffered_read(fd, 5) == b"hello"
+    runtime.buffered_write(fd, b"!")
+    runtime.buffered_close(fd)
+    assert path.read_bytes() == b"hello!world\n"
+
+
+def test_io_builtins_in_vm(tmp_path, capfd, monkeypatch):
+    data_path = tmp_path / "data.txt"
+    data_path.write_text("".join(f"line {index}\n" for index in range(2000)), encoding="utf-8")
+    source_path = tmp_path / "lines.vbc"
+    source_path.write_text(
+        "int main() {\n"
+        f"    int fd = open(\"{data_path.as_posix()}\", O_RDONLY, 0);\n"
+        "    int count = 0;\n"
+        "    string line = readline(fd);\n"
+        "    while (line != \"\") {\n"
+        "        count = count + 1;\n"
+        "        line = readline(fd);\n"
+        "    }\n"
+        "    lseek(fd, 0, SEEK_SET);\n"
+        "    bytes head = read_bytes(fd, 7);\n"
+        "    string rest = read_all(fd);\n"
+        "    close(fd);\n"
+        "    write(STDOUT, head);\n"
+        "    string total = (string)count;\n"
+        "    write_all(STDOUT, total + \"\\n\");\n"
+        "    write(STDOUT, (bytes)\"done\\n\");\n"
+        "    return 0;\n"
+        "}\n",
+        encoding="utf-8",
+    )
+    output = compile_module(str(source_path))
+    reads = []
+    raw_read = SystemRuntime.read
+
+    def counting_read(self, fd, count):
+        reads.append(count)
+        return raw_read(self, fd, count)
+
+    monkeypatch.setattr(SystemRuntime, "read", counting_read)
+
+    exit_code = VBCVirtualMachine().excute(output.bytecode, output.constant_pool, source_path=str(source_path), lineno_table=output.lineno_table)
+
+    assert exit_code == 0
+    assert capfd.readouterr().out == "line 0\n2000\ndone\n"
+    # 2000 次 readline 与 lseek 后的读取都经缓冲区，底层按块读取，每遍文件不超过 块数 + 2 次
+    blocks = data_path.stat().st_size // BUFFER_SIZE
+    assert set(reads) == {BUFFER_SIZE}
+    assert len(reads) <= 2 * (blocks + 2)
@@ -0,0 +1,91 @@
+from verbose_c.parser.lexer.enum import TokenType
+from verbose_c.parser.lexer.lexer import Lexer
+
+
+def _positions(source, **kwargs):
+    return [
+        (token.type, token.value, token.line, token.column)
+        for token in Lexer("<test>", source, **kwargs).tokenize()
+    ]
+
+
+def test_lexer_reuses_compiled_pattern_per_variant():
+    assert Lexer("a", "").master_pattern is Lexer("b", "").master_pattern
+    assert Lexer("a", "", macro_body=True).master_pattern is Lexer("b", "", macro_body=True).master_pattern
+    assert Lexer("a", "").master_pattern is not Lexer("a", "", macro_body=True).master_pattern
+
+
+def test_lexer_tracks_lines_and_columns_across_multiline_tokens():
+    source = "int a;\r\n/* x\ny */ b\n\n  return"
+    tokens = _positions(source)
+
+    assert tokens[0] == (TokenType.NAME, "int", 1, 0)
+    assert (TokenType.NEWLINE, "\r\n", 1, 6) in tokens
+    assert (TokenType.COMMENT, "/* x\ny */", 2, 0) in tokens
+    assert (TokenType.NAME, "b", 3, 5) in tokens
+    assert (TokenType.NAME, "return", 5, 2) in tokens
+    assert tokens[-1] == (TokenType.END, TokenType.END.literal, 5, 8)
+
+
+def test_lexer_reports_unknown_character_position():
+    try:
+        Lexer("<test>", "int a;\n  $").tokenize()
+    except SyntaxError as error:
+        assert "行 2, 列 2" in str(error)
+    else:
+        raise AssertionError("未知字符应触发 SyntaxError")
+
+
+def test_lexer_tokenizes_large_generated_source():
+    unit = (
+        "int add_{0}(int a, int b) {{\n"
+        "    // 累加 {0}\n"
+        "    float scale = 1.5e3;\n"
+        "    return a + b * {0} - (a << 2) >= 0x1F ? a : b;\n"
+        "}}\n"
+    )
+    source = "".join(unit.format(index) for index in range(3000))
+
+    tokens = Lexer("<large>", source).tokenize()
+    single = Lexer("<unit>", unit.format(0)).tokenize()
+
+    assert tokens[-1].line == source.count("\n") + 1
+    # 每个单元的词法单元数一致，END 只出现一次
+    assert len(tokens) - 1 == 3000 * (len(single) - 1)
+    assert (tokens[-2].type, tokens[-2].line) == (single[-2].type, source.count("\n"))
+
+
+def test_tokenizer_keeps_trivia_in_side_array(tmp_path):
+    from verbose_c.fs.source_manager import SourceManager
+    from verbose_c.parser.lexer.tokenizer import Tokenizer
+
+    source_path = tmp_path / "trivia.vbc"
+    source = "int main() {\n    // 注释\n    return 1; /* 尾部 */\n}\n"
+    source_path.write_text(source, encoding="utf-8")
+    tokenizer = Tokenizer(str(source_path), SourceManager())
+
+    significant = tokenizer.significant_tokens
+    assert [token.value for token in significant[:5]] == ["int", "main", "(", ")", "{"]
+    assert significant[-1].type == TokenType.END
+    assert "".join(str(token.value) for token in tokenizer.tokens[:-1]) == source
+
+    return_index = [token.value for token in significant].index("return")
+    leading = tokenizer.leading_trivia(return_index)
+    assert [token.type for token in leading] == [
+        TokenType.NEWLINE,
+        TokenType.WHITESPACE,
+        TokenType.COMMENT,
+        TokenType.NEWLINE,
+        TokenType.WHITESPACE,
+    ]
+    assert (leading[2].line, leading[2].column) == (2, 4)
+
+    tokenizer.reset(return_index)
+    assert tokenizer.peek() is significant[return_index]
+    assert tokenizer.getnext().value == "return"
+    assert tokenizer.get_last_non_whitespace_token().value == "return"
+
+    tokenizer.reset(len(significant) - 1)
+    assert tokenizer.getnext().type == TokenType.END
+    assert tokenizer.getnext().type == TokenType.END
+    assert tokenizer.get_last_non_whitespace_token().type == TokenType.END
@@ -381,7 +381,7 @@ def test_native_codegen_supports_integer_locals_and_arithmetic():
     assert "- 帧指针 / 栈指针: `RBP` / `RSP`" in listing
     assert "- Shadow space: `32` bytes" in listing
     assert "- 栈对齐: `16` bytes" in listing
-    assert "- 支持值类型: `int64, bool64, void`" in listing
+    assert "- 支持值类型: `int64, bool64, float64, void`" in listing
     assert "寄存器分配" in listing
     assert "保守栈槽分配" in listing
     assert "临时寄存器: `RAX`, `R10`" in listing
@@ -799,7 +799,7 @@ def test_native_codegen_supports_multiple_stack_argument_call(tmp_path):
             stack_arg_bytes=16,
             aligned_size=48,
             stack_alignment=16,
-            source_pc=7,
+            source_pc=6,
             source_line=6,
             call_offset=main_call_frames[0].call_offset,
             call_end_offset=main_call_frames[0].call_end_offset,
@@ -854,7 +854,7 @@ def test_native_codegen_supports_multiple_stack_argument_call(tmp_path):
         f"`0x{main_call_va:016X}-0x{main_call_end_va:016X}` | "
         f"`0x{main_add_rva:08X}-0x{main_add_end_rva:08X}` | "
         f"`0x{main_add_va:016X}-0x{main_add_end_va:016X}` | "
-        "`pick6 (pc 7, line 6)` | `6` | "
+        "`pick6 (pc 6, line 6)` | `6` | "
         "`int64, int64, int64, int64, int64, int64` | "
         "`int64, int64, int64, int64, int64, int64` | "
         "`4` | `2` | `32` | `16` | `48` | `16` |"
@@ -1073,8 +1073,8 @@ def test_machine_dump_records_machine_lowering_failure(tmp_path):
     source_path = tmp_path / "native_codegen_dump_machine_unsupported.vbc"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -1093,7 +1093,7 @@ def test_machine_dump_records_machine_lowering_failure(tmp_path):
     dump_text = dump_path.read_text(encoding="utf-8")
     assert "IR" in dump_text
     assert "Machine IR 生成跳过/失败原因" in dump_text
-    assert "native MVP 暂不支持特性 'array'" in dump_text
+    assert "native MVP 暂不支持类型 'STRING'" in dump_text
 
 
 def test_native_codegen_uses_module_entry_for_source_program(tmp_path):
@@ -1243,7 +1243,7 @@ def test_native_codegen_rejects_unsupported_helper_return_type():
     helper = MachineFunction(
         name="helper",
         params=[],
-        return_type="float64",
+        return_type="float32",
         frame=StackFrameLayout(),
         blocks=[
             MachineBlock(
@@ -1263,7 +1263,7 @@ def test_native_codegen_rejects_unsupported_helper_return_type():
     with pytest.raises(NativeCodegenError) as exc_info:
         generate_native_code(program)
 
-    assert "函数 helper 暂不支持返回类型 float64" in str(exc_info.value)
+    assert "函数 helper 暂不支持返回类型 float32" in str(exc_info.value)
 
 
 def test_native_codegen_rejects_unsupported_parameter_type():
@@ -1813,13 +1813,13 @@ def test_native_codegen_rejects_unsupported_vreg_type():
                 instructions=[
                     MachineInstruction(
                         "load_imm",
-                        result=MachineOperand.vreg(VirtualRegister("v0", "float64")),
+                        result=MachineOperand.vreg(VirtualRegister("v0", "float32")),
                         args=[MachineOperand.imm(1)],
                         source_pc=15,
                         source_line=9,
                     ),
                 ],
-                terminator=MachineTerminator("ret", args=[MachineOperand.vreg(VirtualRegister("v0", "float64"))]),
+                terminator=MachineTerminator("ret", args=[MachineOperand.vreg(VirtualRegister("v0", "float32"))]),
             )
         ],
     )
@@ -1834,7 +1834,7 @@ def test_native_codegen_rejects_unsupported_vreg_type():
         generate_native_code(program)
 
     message = str(exc_info.value)
-    assert "虚拟寄存器 %v0 类型暂不支持 float64" in message
+    assert "虚拟寄存器 %v0 类型暂不支持 float32" in message
     assert "Machine IR 指令 load_imm" in message
     assert "行 9" in message
     assert "PC 15" in message
@@ -1853,7 +1853,7 @@ def test_native_codegen_rejects_unsupported_immediate_operand_type():
                     MachineInstruction(
                         "load_imm",
                         result=MachineOperand.vreg(VirtualRegister("v0")),
-                        args=[MachineOperand("imm", 1, "float64")],
+                        args=[MachineOperand("imm", 1, "float32")],
                         source_pc=16,
                         source_line=10,
                     ),
@@ -1873,7 +1873,7 @@ def test_native_codegen_rejects_unsupported_immediate_operand_type():
         generate_native_code(program)
 
     message = str(exc_info.value)
-    assert "imm 操作数类型暂不支持 float64" in message
+    assert "imm 操作数类型暂不支持 float32" in message
     assert "Machine IR 指令 load_imm" in message
     assert "行 10" in message
     assert "PC 16" in message
@@ -1891,7 +1891,7 @@ def test_native_codegen_rejects_unsupported_slot_operand_type():
                 instructions=[
                     MachineInstruction(
                         "store_stack",
-                        args=[MachineOperand("slot", StackSlot("local", 0), "float64"), MachineOperand.imm(1)],
+                        args=[MachineOperand("slot", StackSlot("local", 0), "float32"), MachineOperand.imm(1)],
                         source_pc=17,
                         source_line=11,
                     ),
@@ -1911,7 +1911,7 @@ def test_native_codegen_rejects_unsupported_slot_operand_type():
         generate_native_code(program)
 
     message = str(exc_info.value)
-    assert "slot 操作数类型暂不支持 float64" in message
+    assert "slot 操作数类型暂不支持 float32" in message
     assert "Machine IR 指令 store_stack" in message
     assert "行 11" in message
     assert "PC 17" in message
@@ -4682,12 +4682,12 @@ def test_native_codegen_error_includes_function_op_and_source_location():
     assert "暂不支持特性 'br_table'" in message
 
 
-def test_native_codegen_rejects_array_runtime_objects(tmp_path):
+def test_native_codegen_rejects_string_array_elements(tmp_path):
     source_path = tmp_path / "native_unsupported_array.vbc"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -4698,13 +4698,14 @@ def test_native_codegen_rejects_array_runtime_objects(tmp_path):
         compile_module(str(source_path), require_native_code=True)
 
     assert "IR 指令 alloc_array" in str(exc_info.value)
-    assert "array" in str(exc_info.value)
+    assert "STRING" in str(exc_info.value)
 
 
 def test_run_source_file_vm_ignores_native_codegen_failure_for_arrays(tmp_path):
     source_path = tmp_path / "native_unsupported_array_vm.vbc"
     source_path.write_text(
         "int main() {\n"
+        "    string names[1];\n"
         "    int values[2] = {40, 2};\n"
         "    return values[0] + values[1];\n"
         "}\n",
@@ -4726,11 +4727,11 @@ def test_run_source_file_vm_ignores_native_codegen_failure_for_arrays(tmp_path):
     assert result.compilation_output.machine_program is None
     assert result.compilation_output.machine_error is not None
     assert result.compilation_output.native_code_program is None
-    assert "native MVP 暂不支持特性 'array'" in str(result.compilation_output.machine_error)
+    assert "native MVP 暂不支持类型 'STRING'" in str(result.compilation_output.machine_error)
 
 
-def test_native_codegen_rejects_pointer_runtime_objects(tmp_path):
-    source_path = tmp_path / "native_unsupported_pointer.vbc"
+def test_native_codegen_lowers_pointer_runtime_objects(tmp_path):
+    source_path = tmp_path / "native_pointer.vbc"
     source_path.write_text(
         "int main() {\n"
         "    int value = 1;\n"
@@ -4739,18 +4740,22 @@ def test_native_codegen_rejects_pointer_runtime_objects(tmp_path):
         "}\n",
         encoding="utf-8",
     )
-    from verbose_c.compiler.native import NativeLoweringError
     from verbose_c.engine.engine import compile_module
 
-    with pytest.raises(NativeLoweringError) as exc_info:
-        compile_module(str(source_path), require_native_code=True)
+    output = compile_module(str(source_path), require_native_code=True)
 
-    assert "IR 指令 address_of" in str(exc_info.value)
-    assert "address_escape" in str(exc_info.value)
+    ops = [instruction.op for block in output.machine_program.functions["main"].blocks for instruction in block.instructions]
+    assert "slot_address" in ops
+    assert "load_mem" in ops
+    asm = [instruction.asm for instruction in output.native_code_program.functions["main"].instructions]
+    assert "shr rax, 3" in asm
+    assert "mov rax, [rax*8+0]" in asm
+    if can_run_native_memory():
+        assert run_native_program_in_memory(output.native_code_program) == 1
 
 
-def test_native_codegen_rejects_struct_runtime_objects(tmp_path):
-    source_path = tmp_path / "native_unsupported_struct.vbc"
+def test_native_codegen_lowers_struct_runtime_objects(tmp_path):
+    source_path = tmp_path / "native_struct.vbc"
     source_path.write_text(
         "struct Point {\n"
         "    int x;\n"
@@ -4762,14 +4767,16 @@ def test_native_codegen_rejects_struct_runtime_objects(tmp_path):
         "}\n",
         encoding="utf-8",
     )
-    from verbose_c.compiler.native import NativeLoweringError
     from verbose_c.engine.engine import compile_module
 
-    with pytest.raises(NativeLoweringError) as exc_info:
-        compile_module(str(source_path), require_native_code=True)
+    output = compile_module(str(source_path), require_native_code=True)
 
-    assert "IR 指令 alloc_struct" in str(exc_info.value)
-    assert "struct" in str(exc_info.value)
+    main = output.machine_program.functions["main"]
+    assert [slot.size for slot in main.frame.memory_slots] == [8]
+    ops = [instruction.op for block in main.blocks for instruction in block.instructions]
+    assert {"alloc_block", "store_mem", "load_mem"} <= set(ops)
+    if can_run_native_memory():
+        assert run_native_program_in_memory(output.native_code_program) == 1
 
 
 def test_run_source_file_can_execute_native_memory_void_main(tmp_path):
@@ -9232,8 +9239,8 @@ def test_run_source_file_rejects_native_memory_out_of_range_narrow_integer_cast(
     assert "cast 到 char 的立即数超出范围" in str(result.error)
 
 
-def test_native_lowering_rejects_float_cast_without_blocking_vm(tmp_path):
-    source_path = tmp_path / "native_float_cast_unsupported.vbc"
+def test_native_lowering_accepts_float_cast(tmp_path):
+    source_path = tmp_path / "native_float_cast.vbc"
     source_path.write_text(
         "int main() {\n"
         "    float value = (float)42;\n"
@@ -9246,7 +9253,7 @@ def test_native_lowering_rejects_float_cast_without_blocking_vm(tmp_path):
         str(source_path),
         log_modules=set(),
         dump_modules=set(),
-        output_path=str(tmp_path / "native_float_cast_unsupported.vbb"),
+        output_path=str(tmp_path / "native_float_cast.vbb"),
         execute=True,
         optimize_level=0,
     )
@@ -9254,18 +9261,16 @@ def test_native_lowering_rejects_float_cast_without_blocking_vm(tmp_path):
     assert result.success
     assert result.exit_code == 0
     assert result.compilation_output is not None
-    assert result.compilation_output.machine_program is None
-    assert result.compilation_output.native_code_program is None
-    assert result.compilation_output.machine_error is not None
-    message = str(result.compilation_output.machine_error)
-    assert "IR 指令 cast" in message
-    assert "native MVP 暂不支持类型 'FLOAT'" in message
+    assert result.compilation_output.machine_error is None
+    assert result.compilation_output.native_code_error is None
+    machine_program = result.compilation_output.machine_program
+    assert "cvt_int_float" in [instruction.op for block in machine_program.functions["main"].blocks for instruction in block.instructions]
 
 
-def test_native_codegen_rejects_float_parameter_without_blocking_vm(tmp_path):
-    source_path = tmp_path / "native_float_param_unsupported.vbc"
+def test_native_codegen_rejects_string_parameter_without_blocking_vm(tmp_path):
+    source_path = tmp_path / "native_string_param_unsupported.vbc"
     source_path.write_text(
-        "int ignore(float value) {\n"
+        "int ignore(string value) {\n"
         "    return 42;\n"
         "}\n\n"
         "int main() {\n"
@@ -9278,7 +9283,7 @@ def test_native_codegen_rejects_float_parameter_without_blocking_vm(tmp_path):
         str(source_path),
         log_modules=set(),
         dump_modules=set(),
-        output_path=str(tmp_path / "native_float_param_unsupported.vbb"),
+        output_path=str(tmp_path / "native_string_param_unsupported.vbb"),
         execute=True,
         optimize_level=0,
     )
@@ -9288,13 +9293,13 @@ def test_native_codegen_rejects_float_parameter_without_blocking_vm(tmp_path):
     assert result.compilation_output is not None
     assert result.compilation_output.native_code_program is None
     assert result.compilation_output.native_code_error is not None
-    assert "函数 ignore 第 0 个参数暂不支持类型 Float(FLOAT)" in str(result.compilation_output.native_code_error)
+    assert "函数 ignore 第 0 个参数暂不支持类型 String" in str(result.compilation_output.native_code_error)
 
 
-def test_run_source_file_rejects_native_memory_float_parameter(tmp_path):
-    source_path = tmp_path / "native_memory_float_param_unsupported.vbc"
+def test_run_source_file_rejects_native_memory_string_parameter(tmp_path):
+    source_path = tmp_path / "native_memory_string_param_unsupported.vbc"
     source_path.write_text(
-        "int ignore(float value) {\n"
+        "int ignore(string value) {\n"
         "    return 42;\n"
         "}\n\n"
         "int main() {\n"
@@ -9307,14 +9312,14 @@ def test_run_source_file_rejects_native_memory_float_parameter(tmp_path):
         str(source_path),
         log_modules=set(),
         dump_modules=set(),
-        output_path=str(tmp_path / "native_memory_float_param_unsupported.vbb"),
+        output_path=str(tmp_path / "native_memory_string_param_unsupported.vbb"),
         execute=False,
         optimize_level=0,
         run_native_memory=True,
     )
 
     assert not result.success
-    assert "函数 ignore 第 0 个参数暂不支持类型 Float(FLOAT)" in str(result.error)
+    assert "函数 ignore 第 0 个参数暂不支持类型 String" in str(result.error)
 
 
 def test_run_source_file_can_execute_native_memory_inc_dec(tmp_path):
@@ -10050,7 +10055,7 @@ def test_native_code_program_map_describes_raw_binary(tmp_path):
         "return_register": "RAX",
         "frame_pointer": "RBP",
         "stack_pointer": "RSP",
-        "supported_value_types": ["int64", "bool64", "void"],
+        "supported_value_types": ["int64", "bool64", "float64", "void"],
     }
     assert metadata["global_frame_owner"] is None
     assert metadata["code_size"] == len(program.code)
@@ -17122,8 +17127,8 @@ def test_cli_emit_asm_reports_native_codegen_failure(tmp_path, monkeypatch, caps
     asm_path = export_dir / "native_cli_emit_asm_unsupported.native.md"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -17148,7 +17153,7 @@ def test_cli_emit_asm_reports_native_codegen_failure(tmp_path, monkeypatch, caps
     output = capsys.readouterr().out
     assert exc_info.value.code == 1
     assert f"编译错误: 文件 {source_path}" in output
-    assert "native MVP 暂不支持特性 'array'" in output
+    assert "native MVP 暂不支持类型 'STRING'" in output
     assert not asm_path.exists()
 
 
@@ -17160,8 +17165,8 @@ def test_cli_emit_native_bin_reports_native_codegen_failure(tmp_path, monkeypatc
     bin_path = export_dir / "native_cli_emit_bin_unsupported.native.bin"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -17186,7 +17191,7 @@ def test_cli_emit_native_bin_reports_native_codegen_failure(tmp_path, monkeypatc
     output = capsys.readouterr().out
     assert exc_info.value.code == 1
     assert f"编译错误: 文件 {source_path}" in output
-    assert "native MVP 暂不支持特性 'array'" in output
+    assert "native MVP 暂不支持类型 'STRING'" in output
     assert not bin_path.exists()
 
 
@@ -17198,8 +17203,8 @@ def test_cli_emit_native_map_reports_native_codegen_failure(tmp_path, monkeypatc
     map_path = export_dir / "native_cli_emit_map_unsupported.native.map.json"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -17224,7 +17229,7 @@ def test_cli_emit_native_map_reports_native_codegen_failure(tmp_path, monkeypatc
     output = capsys.readouterr().out
     assert exc_info.value.code == 1
     assert f"编译错误: 文件 {source_path}" in output
-    assert "native MVP 暂不支持特性 'array'" in output
+    assert "native MVP 暂不支持类型 'STRING'" in output
     assert not map_path.exists()
 
 
@@ -17236,8 +17241,8 @@ def test_cli_emit_native_text_bin_reports_native_codegen_failure(tmp_path, monke
     text_bin_path = export_dir / "native_cli_emit_text_bin_unsupported.text.bin"
     source_path.write_text(
         "int main() {\n"
-        "    int values[2] = {1, 2};\n"
-        "    return values[0];\n"
+        "    string values[2];\n"
+        "    return 1;\n"
         "}\n",
         encoding="utf-8",
     )
@@ -17262,7 +17267,7 @@ def test_cli_emit_native_text_bin_reports_native_codegen_failure(tmp_path, monke
     output = capsys.readouterr().out
     assert exc_info.value.code == 1
     assert f"编译错误: 文件 {source_path}" in output
-    assert "native MVP 暂不支持特性 'array'" in output
+    assert "native MVP 暂不支持类型 'STRING'" in output
     assert not text_bin_path.exists()
 
 
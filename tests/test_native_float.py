@@ -0,0 +1,104 @@
+import pytest
+
+from verbose_c.compiler.native import (
+    NativeCodegenError,
+    format_native_code_program,
+    generate_native_code,
+    native_code_program_map,
+)
+from verbose_c.compiler.native.codegen import validate_native_code_map_bytes
+from verbose_c.compiler.native.encoder import (
+    encode_add_r10_r10,
+    encode_btc_rax_imm8,
+    encode_cmpsd,
+    encode_cvtsi2sd_xmm_rax,
+    encode_cvttsd2si_rax_xmm,
+    encode_movq_reg_from_xmm,
+    encode_movq_xmm_from_reg,
+    encode_scalar_double_op,
+)
+from verbose_c.compiler.native.runner import _validate_native_program, can_run_native_memory, run_native_program_in_memory
+from verbose_c.engine.engine import compile_module, run_source_file
+
+FLOAT_PROGRAM = "tests/grammar/native_codegen_float_test.vbc"
+
+
+def _asm(program, function_name):
+    return [instruction.asm for instruction in program.functions[function_name].instructions]
+
+
+def _ops(machine_program, function_name):
+    return [instruction.op for block in machine_program.functions[function_name].blocks for instruction in block.instructions]
+
+
+def test_sse2_encodings():
+    assert encode_movq_xmm_from_reg("XMM0", "RAX") == bytes.fromhex("66480f6ec0")
+    assert encode_movq_xmm_from_reg("XMM1", "R10") == bytes.fromhex("66490f6eca")
+    assert encode_movq_reg_from_xmm("RAX", "XMM3") == bytes.fromhex("66480f7ed8")
+    assert encode_scalar_double_op("addsd", "XMM0", "XMM1") == bytes.fromhex("f20f58c1")
+    assert encode_scalar_double_op("divsd", "XMM0", "XMM1") == bytes.fromhex("f20f5ec1")
+    assert encode_cmpsd("XMM0", "XMM1", "lt") == bytes.fromhex("f20fc2c101")
+    assert encode_cmpsd("XMM1", "XMM0", "neq") == bytes.fromhex("f20fc2c804")
+    assert encode_cvtsi2sd_xmm_rax("XMM0") == bytes.fromhex("f2480f2ac0")
+    assert encode_cvttsd2si_rax_xmm("XMM0") == bytes.fromhex("f2480f2cc0")
+    assert encode_btc_rax_imm8(63) == bytes.fromhex("480fbaf83f")
+    assert encode_add_r10_r10() == bytes.fromhex("4d01d2")
+
+
+def test_lowering_passes_floats_in_xmm_registers():
+    machine_program = compile_module(FLOAT_PROGRAM, require_machine=True).machine_program
+
+    mix = machine_program.functions["mix"]
+    assert mix.param_types == ["float64", "int64", "float64", "bool64", "float64", "float64"]
+    # 浮点参数按位置占用 XMM0-XMM3，整数参数占用同一位置的通用寄存器，其余走栈
+    assert [(location.kind, location.name) for location in mix.params] == [
+        ("register", "XMM0"), ("register", "RDX"), ("register", "XMM2"), ("register", "R9"), ("stack", "[rsp+32]"), ("stack", "[rsp+40]")
+    ]
+    assert mix.return_type == "float64"
+    assert {"cvt_int_float", "fmul", "fadd", "fsub", "fdiv", "fneg"} <= set(_ops(machine_program, "mix"))
+    assert {"fcmp_eq", "fcmp_lt", "fcmp_gt"} <= set(_ops(machine_program, "classify"))
+    assert {"cvt_float_int", "fcmp_ne"} <= set(_ops(machine_program, "main"))
+
+
+@pytest.mark.parametrize("optimize_level", [0, 1])
+def test_float_program_matches_vm(tmp_path, optimize_level):
+    machine_program = compile_module(FLOAT_PROGRAM, require_machine=True).machine_program
+
+    program = generate_native_code(machine_program, optimize_level=optimize_level)
+
+    validate_native_code_map_bytes(program.code, native_code_program_map(program))
+    _validate_native_program(program)
+    mix_asm = _asm(program, "mix")
+    assert "cvtsi2sd xmm0, rax" in mix_asm
+    assert "divsd xmm0, xmm1" in mix_asm
+    assert "add r10, r10 ; float divisor zero check" in mix_asm
+    assert "ud2 ; native float division by zero" in mix_asm
+    assert "movq xmm0, rax" in mix_asm
+    assert "cvttsd2si rax, xmm0" in _asm(program, "main")
+    assert "movq rax, xmm0" in _asm(program, "power")
+    assert "float64" in format_native_code_program(program)
+    expected = run_source_file(
+        FLOAT_PROGRAM, log_modules=set(), dump_modules=set(), output_path=str(tmp_path / "float.vbb"), execute=True
+    ).exit_code
+    assert expected == 31459406237
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == expected
+
+
+def test_static_zero_divisor_is_rejected(compile_machine_program):
+    machine_program = compile_machine_program("int main() {\n    double d = 0.0;\n    double x = 1.5 / d;\n    return 1;\n}\n")
+
+    with pytest.raises(NativeCodegenError) as exc_info:
+        generate_native_code(machine_program)
+
+    assert "除数为 ±0.0 的浮点除法" in str(exc_info.value)
+
+
+def test_narrowing_float_cast_stays_on_vm(tmp_path):
+    source_path = tmp_path / "float_narrow.vbc"
+    source_path.write_text("int main() {\n    double x = 7.5;\n    char c = (char)x;\n    return c;\n}\n", encoding="utf-8")
+
+    with pytest.raises(NativeCodegenError) as exc_info:
+        compile_module(str(source_path), require_native_code=True)
+
+    assert "浮点窄化 cast 到 char" in str(exc_info.value)
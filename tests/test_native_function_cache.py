@@ -0,0 +1,131 @@
+import json
+
+from verbose_c.compiler.native import format_native_code_program, generate_native_code, native_code_program_map
+from verbose_c.engine.engine import compile_module
+from verbose_c.fs.native_function_cache import NativeFunctionCache
+
+
+def _write_program(path, function_count=4, bodies=None):
+    bodies = bodies or {}
+    lines = [
+        f"int f{index}(int a) {{\n    {bodies.get(index, f'return a + {index};')}\n}}"
+        for index in range(function_count)
+    ]
+    lines.append("int main() {\n    int s = 0;\n" + "".join(f"    s = f{index}(s);\n" for index in range(function_count)) + "    return s;\n}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _machine_program(path):
+    return compile_module(str(path), require_machine=True).machine_program
+
+
+def _assert_same_program(actual, expected):
+    assert actual == expected
+    assert actual.code == expected.code
+    assert format_native_code_program(actual) == format_native_code_program(expected)
+    assert json.dumps(native_code_program_map(actual)) == json.dumps(native_code_program_map(expected))
+
+
+def test_cached_rebuild_matches_fresh_codegen(tmp_path):
+    source_path = tmp_path / "native.vbc"
+    _write_program(source_path)
+    machine_program = _machine_program(source_path)
+    expected = generate_native_code(machine_program)
+    cache = NativeFunctionCache()
+
+    first = generate_native_code(machine_program, cache)
+    function_count = len(expected.functions)
+    assert (cache.hits, cache.misses) == (0, function_count)
+    second = generate_native_code(machine_program, cache)
+    assert (cache.hits, cache.misses) == (function_count, function_count)
+
+    _assert_same_program(first, expected)
+    _assert_same_program(second, expected)
+    # 复用的函数仍要重新回填调用位移并登记 call_rel32 重定位
+    assert any(relocation.kind == "call_rel32" for relocation in second.functions["main"].relocations)
+
+
+def test_edit_regenerates_only_changed_functions(tmp_path):
+    source_path = tmp_path / "native.vbc"
+    _write_program(source_path)
+    cache = NativeFunctionCache(str(tmp_path / "cache"))
+    generate_native_code(_machine_program(source_path), cache)
+
+    _write_program(source_path, bodies={1: "return a * 3 + 1;"})
+    edited = _machine_program(source_path)
+    reloaded = NativeFunctionCache(str(tmp_path / "cache"))
+    rebuilt = generate_native_code(edited, reloaded)
+
+    # f1 变长后其后的函数整体平移，仍从磁盘缓存复用
+    assert reloaded.misses == 1
+    assert reloaded.hits == len(rebuilt.functions) - 1
+    _assert_same_program(rebuilt, generate_native_code(edited))
+
+
+def test_callee_signature_change_invalidates_caller(tmp_path):
+    source_path = tmp_path / "native.vbc"
+    source_path.write_text(
+        "int twice(int a) {\n    return a + a;\n}\nint main() {\n    return twice(4);\n}\n",
+        encoding="utf-8",
+    )
+    cache = NativeFunctionCache()
+    generate_native_code(_machine_program(source_path), cache)
+
+    source_path.write_text(
+        "bool twice(int a) {\n    return a > 0;\n}\nint main() {\n    bool b = twice(4);\n    return 0;\n}\n",
+        encoding="utf-8",
+    )
+    edited = _machine_program(source_path)
+    misses = cache.misses
+    rebuilt = generate_native_code(edited, cache)
+
+    # twice 与调用它的 main 都要重新生成，只有 <module> 入口可以复用
+    assert cache.misses - misses == 2
+    _assert_same_program(rebuilt, generate_native_code(edited))
+
+
+def test_corrupt_disk_record_is_a_miss(tmp_path):
+    source_path = tmp_path / "native.vbc"
+    _write_program(source_path, function_count=1)
+    machine_program = _machine_program(source_path)
+    cache = NativeFunctionCache.for_source(str(source_path))
+    generate_native_code(machine_program, cache)
+    cache_dir = tmp_path / "__vbccache__" / NativeFunctionCache.DIRECTORY_NAME
+    for record in cache_dir.iterdir():
+        record.write_bytes(b"1\nnot a pickle")
+
+    reloaded = NativeFunctionCache.for_source(str(source_path))
+    rebuilt = generate_native_code(machine_program, reloaded)
+
+    assert reloaded.hits == 0
+    _assert_same_program(rebuilt, generate_native_code(machine_program))
+
+
+def test_native_function_cache_hits_every_function_on_rebuild(tmp_path):
+    source_path = tmp_path / "native.vbc"
+    _write_program(source_path, function_count=150, bodies={
+        index: f"int b = a * {index};\n    if (b > 10) {{\n        b = b - a;\n    }}\n    return b + {index};"
+        for index in range(150)
+    })
+    machine_program = _machine_program(source_path)
+    cache = NativeFunctionCache()
+    # 函数表之外还有模块入口
+    generated = len(machine_program.functions) + 1
+    first = generate_native_code(machine_program, cache)
+    assert (cache.hits, cache.misses) == (0, generated)
+
+    rebuilt = generate_native_code(machine_program, cache)
+
+    assert (cache.hits, cache.misses) == (generated, generated)
+    _assert_same_program(rebuilt, first)
+
+
+def test_native_function_cache_key_follows_codegen_sources(monkeypatch):
+    import verbose_c.compiler.native.source_fingerprint as fingerprint_module
+
+    key = NativeFunctionCache.key("function", {}, "abi")
+    assert NativeFunctionCache.key("function", {}, "abi") == key
+
+    # 生成器源码变化后不再取回旧生成器产生的机器码
+    monkeypatch.setattr(fingerprint_module, "native_codegen_fingerprint", lambda: "changed")
+    assert NativeFunctionCache.key("function", {}, "abi") != key
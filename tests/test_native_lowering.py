@@ -275,14 +275,15 @@ def test_native_lowering_reports_unsupported_string_constant_with_context():
 
     message = str(exc_info.value)
     assert "函数 <module>" in message
-    assert "IR 指令 const" in message
-    assert "String" in message or "STRING" in message
-    assert "PC 0" in message
+    # 字符串常量本身会降为 str64 句柄，只有把它当作返回值时才回退
+    assert "IR 指令 return" in message
+    assert "string_value" in message
+    assert "PC 1" in message
 
 
 def test_native_lowering_reports_unsupported_builtin_call():
     program = _program([
-        (Opcode.LOAD_GLOBAL_VAR, "write"),
+        (Opcode.LOAD_GLOBAL_VAR, "read_bytes"),
         (Opcode.LOAD_CONSTANT, 0),
         (Opcode.LOAD_CONSTANT, 1),
         (Opcode.CALL_FUNCTION, 2),
@@ -292,7 +293,7 @@ def test_native_lowering_reports_unsupported_builtin_call():
     with pytest.raises(NativeLoweringError) as exc_info:
         lower_ir_program_to_machine(program)
 
-    assert "builtin_function:write" in str(exc_info.value)
+    assert "builtin_function:read_bytes" in str(exc_info.value)
 
 
 def test_machine_dump_from_source_file(tmp_path):
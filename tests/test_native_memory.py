@@ -0,0 +1,177 @@
+import pytest
+
+from verbose_c.compiler.native import (
+    NativeCodegenError,
+    NativeLoweringError,
+    format_machine_program,
+    format_native_code_program,
+    generate_native_code,
+    native_code_program_map,
+)
+from verbose_c.compiler.native.codegen import validate_native_code_map_bytes
+from verbose_c.compiler.native.encoder import (
+    ConditionCode,
+    encode_cmp_r10_imm,
+    encode_jcc_rel8,
+    encode_lea_rax_frame,
+    encode_mov_cell_from_reg,
+    encode_mov_rbp_scaled_rax_from_r10,
+    encode_mov_reg_from_cell,
+    encode_shr_rax_imm8,
+    encode_ud2,
+)
+from verbose_c.compiler.native.runner import _validate_native_program, can_run_native_memory, run_native_program_in_memory
+from verbose_c.engine.engine import compile_module, run_source_file
+
+MEMORY_PROGRAM = "tests/grammar/native_codegen_memory_test.vbc"
+
+
+def _asm(program, function_name):
+    return [instruction.asm for instruction in program.functions[function_name].instructions]
+
+
+def _ops(machine_program, function_name):
+    return [instruction.op for block in machine_program.functions[function_name].blocks for instruction in block.instructions]
+
+
+def test_memory_encodings():
+    assert encode_lea_rax_frame("RBP", 40) == bytes.fromhex("488d45d8")
+    assert encode_lea_rax_frame("R11", 200) == bytes.fromhex("498d8338ffffff")
+    assert encode_shr_rax_imm8(3) == bytes.fromhex("48c1e803")
+    assert encode_mov_reg_from_cell("RAX", 8) == bytes.fromhex("488b04c508000000")
+    assert encode_mov_reg_from_cell("R10", 0) == bytes.fromhex("4c8b14c500000000")
+    assert encode_mov_cell_from_reg(16, "R10") == bytes.fromhex("4c8914c510000000")
+    assert encode_mov_rbp_scaled_rax_from_r10(88) == bytes.fromhex("4c8994c5a8ffffff")
+    assert encode_cmp_r10_imm(5) == bytes.fromhex("4983fa05")
+    assert encode_cmp_r10_imm(1000) == bytes.fromhex("4981fae8030000")
+    assert encode_jcc_rel8(ConditionCode.AE, 2) == bytes.fromhex("7302")
+    assert encode_ud2() == bytes.fromhex("0f0b")
+
+
+def test_lowering_maps_arrays_structs_and_pointers_to_memory_ops():
+    machine_program = compile_module(MEMORY_PROGRAM, require_machine=True).machine_program
+
+    main = machine_program.functions["main"]
+    # int a[5]、struct Point pt、结构体拷贝 c、bool flags[2] 各占一块栈帧内存
+    assert [slot.size for slot in main.frame.memory_slots] == [40, 16, 16, 16, 16]
+    assert {"alloc_block", "copy_block", "load_index", "store_index", "load_mem", "store_mem", "slot_address"} <= set(_ops(machine_program, "main"))
+    assert "load_mem" in _ops(machine_program, "sum")
+    assert machine_program.functions["sum"].param_types == ["int64", "int64"]
+    # 全局数组落在 <module> 栈帧中，整个程序运行期间有效
+    assert [slot.size for slot in machine_program.module.frame.memory_slots] == [32]
+    listing = format_machine_program(machine_program)
+    assert "- 内存块数量: `5` (`104` bytes)" in listing
+    assert "| `memory` | `0` | `40` |" in listing
+
+
+@pytest.mark.parametrize("optimize_level", [0, 1])
+def test_memory_program_matches_vm(tmp_path, optimize_level):
+    machine_program = compile_module(MEMORY_PROGRAM, require_machine=True).machine_program
+
+    program = generate_native_code(machine_program, optimize_level=optimize_level)
+
+    validate_native_code_map_bytes(program.code, native_code_program_map(program))
+    _validate_native_program(program)
+    main_asm = _asm(program, "main")
+    # 静态已知的下标折叠进位移，不再生成越界检查
+    assert "mov [rax*8+32], r10" in main_asm
+    assert not any(asm.startswith("jae ") for asm in main_asm)
+    slots = {slot.name: slot for slot in program.functions["main"].stack_slots}
+    assert slots["memory[0]"].size == 40
+    assert "memory[0]" in format_native_code_program(program)
+    expected = run_source_file(
+        MEMORY_PROGRAM, log_modules=set(), dump_modules=set(), output_path=str(tmp_path / "memory.vbb"), execute=True
+    ).exit_code
+    assert expected == 1388
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == expected
+
+
+def test_dynamic_index_is_bounds_checked(compile_machine_program):
+    machine_program = compile_machine_program(
+        "int get(int i) {\n    int a[3] = {1, 2, 3};\n    return a[i];\n}\n"
+        "int main() {\n    return get(2);\n}\n",
+    )
+
+    program = generate_native_code(machine_program, optimize_level=1)
+
+    get_asm = _asm(program, "get")
+    assert "cmp r10, 3" in get_asm
+    assert any(asm.startswith("jae __bounds_trap_") for asm in get_asm)
+    assert "ud2 ; native array index out of range" in get_asm
+    assert "jae_rel8" in {relocation.kind for relocation in program.functions["get"].relocations}
+    _validate_native_program(program)
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == 3
+
+
+def test_static_out_of_range_index_is_rejected(compile_machine_program):
+    machine_program = compile_machine_program("int main() {\n    int a[3];\n    return a[3];\n}\n")
+
+    with pytest.raises(NativeCodegenError) as exc_info:
+        generate_native_code(machine_program)
+
+    assert "静态可判定越界的 load_index" in str(exc_info.value)
+
+
+def test_large_arrays_use_zero_fill_loop_and_stack_probes(compile_machine_program):
+    machine_program = compile_machine_program(
+        "int main() {\n"
+        "    int data[1000];\n"
+        "    int i = 0;\n"
+        "    while (i < 1000) {\n"
+        "        data[i] = i;\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    int s = 0;\n"
+        "    int* p = data;\n"
+        "    while (p < data + 1000) {\n"
+        "        s = s + *p;\n"
+        "        p = p + 1;\n"
+        "    }\n"
+        "    return s % 1000;\n"
+        "}\n",
+    )
+
+    program = generate_native_code(machine_program, optimize_level=1)
+
+    function = program.functions["main"]
+    main_asm = _asm(program, "main")
+    assert function.frame_size > 8000
+    assert "mov rax, [rbp-4096] ; stack probe" in main_asm
+    assert f"mov rax, [rbp-{function.frame_size}] ; stack probe" in main_asm
+    assert "mov eax, 1000" in main_asm
+    assert any(asm.startswith("mov [rbp+rax*8-") for asm in main_asm)
+    validate_native_code_map_bytes(program.code, native_code_program_map(program))
+    _validate_native_program(program)
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == 500
+
+
+def test_pointer_writes_invalidate_static_slot_values(compile_machine_program):
+    machine_program = compile_machine_program(
+        "int main() {\n    int d = 0;\n    int* p = &d;\n    *p = 2;\n    return 10 / d;\n}\n",
+    )
+
+    # d 被取地址后经 *p 改写，静态分析不能再认定除数为 0
+    program = generate_native_code(machine_program)
+
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == 5
+
+
+@pytest.mark.parametrize(
+    ("source", "type_name"),
+    [
+        ("int main() {\n    string names[2];\n    return 1;\n}\n", "STRING"),
+        ("struct P {\n    string name;\n};\nint main() {\n    struct P p;\n    return 1;\n}\n", "STRING"),
+    ],
+)
+def test_non_scalar_elements_stay_on_vm(tmp_path, source, type_name):
+    source_path = tmp_path / "memory_unsupported.vbc"
+    source_path.write_text(source, encoding="utf-8")
+
+    with pytest.raises(NativeLoweringError) as exc_info:
+        compile_module(str(source_path), require_machine=True)
+
+    assert f"native MVP 暂不支持类型 '{type_name}'" in str(exc_info.value)
@@ -0,0 +1,180 @@
+import pytest
+
+from verbose_c.compiler.native import format_native_code_program, generate_native_code, native_code_program_map
+from verbose_c.compiler.native.codegen import validate_native_code_map_bytes
+from verbose_c.compiler.native.encoder import (
+    ConditionCode,
+    encode_add_rax_imm,
+    encode_cmp_rax_imm,
+    encode_imul_rax_imm,
+    encode_jcc_rel8,
+    encode_jcc_rel32,
+    encode_jmp_rel8,
+    encode_lea_rax_scaled_rax,
+    encode_mov_eax_imm32,
+    encode_mov_frame_from_reg,
+    encode_mov_rax_imm32,
+    encode_mov_reg_from_frame,
+    encode_xor_eax_eax,
+)
+from verbose_c.compiler.native.runner import _validate_native_program, can_run_native_memory, run_native_program_in_memory
+from verbose_c.engine.engine import compile_module
+
+SOURCE = (
+    "int step(int a, int b) {\n"
+    "    int r = a % b;\n"
+    "    if (r != 0 && a < 3) {\n"
+    "        return r * 9 + a * 8 - 7;\n"
+    "    }\n"
+    "    return r - a * 1000000;\n"
+    "}\n"
+    "int main() {\n"
+    "    int s = 0;\n"
+    "    int i = -20;\n"
+    "    while (i < 20) {\n"
+    "        s = s + step(i, 7) + step(i, -3) * 3;\n"
+    "        i = i + 1;\n"
+    "    }\n"
+    "    return s;\n"
+    "}\n"
+)
+
+
+def _asm(program, function_name):
+    return [instruction.asm for instruction in program.functions[function_name].instructions]
+
+
+def test_short_encodings():
+    assert encode_mov_reg_from_frame("RAX", "RBP", 8) == bytes.fromhex("488b45f8")
+    assert encode_mov_reg_from_frame("R10", "R11", 200) == bytes.fromhex("4d8b9338ffffff")
+    assert encode_mov_frame_from_reg("RBP", 128, "R10") == bytes.fromhex("4c895580")
+    assert encode_xor_eax_eax() == bytes.fromhex("31c0")
+    assert encode_mov_eax_imm32(7) == bytes.fromhex("b807000000")
+    assert encode_mov_rax_imm32(-5) == bytes.fromhex("48c7c0fbffffff")
+    assert encode_add_rax_imm(5) == bytes.fromhex("4883c005")
+    assert encode_add_rax_imm(500) == bytes.fromhex("4805f4010000")
+    assert encode_cmp_rax_imm(-70000) == bytes.fromhex("483d90eefeff")
+    assert encode_imul_rax_imm(7) == bytes.fromhex("486bc007")
+    assert encode_lea_rax_scaled_rax(9) == bytes.fromhex("488d04c0")
+    assert encode_jcc_rel32(ConditionCode.LE, 0) == bytes.fromhex("0f8e00000000")
+    assert encode_jcc_rel8(ConditionCode.GT, -2) == bytes.fromhex("7ffe")
+    assert encode_jmp_rel8(3) == bytes.fromhex("eb03")
+
+
+def test_default_level_keeps_conservative_codegen(compile_machine_program):
+    machine_program = compile_machine_program(SOURCE)
+
+    baseline = generate_native_code(machine_program)
+
+    assert generate_native_code(machine_program, optimize_level=0) == baseline
+    assert all(relocation.kind.endswith("_rel32") for function in baseline.functions.values() for relocation in function.relocations)
+
+
+def test_o1_fuses_compares_and_uses_short_forms(compile_machine_program):
+    machine_program = compile_machine_program(SOURCE)
+    baseline = generate_native_code(machine_program)
+
+    optimized = generate_native_code(machine_program, optimize_level=1)
+
+    main_asm = _asm(optimized, "main")
+    step_asm = _asm(optimized, "step")
+    # 只被分支使用的 i < 20 直接融合为 cmp + jcc，不再经过 setcc/movzx 与栈槽
+    assert "cmp rax, 20" in main_asm
+    assert not any(asm.startswith("set") for asm in main_asm)
+    assert "lea rax, [rax+rax*8]" in step_asm
+    assert "xor edx, edx ; native normal return" in step_asm
+    kinds = {relocation.kind for function in optimized.functions.values() for relocation in function.relocations}
+    assert {"jmp_rel8", "jns_rel8"} <= kinds
+    # _exit 传播探针保持 jne rel32，调用栈窗口保持 imm32 形态
+    for function in optimized.functions.values():
+        for probe in function.exit_probes:
+            assert optimized.code[probe.jump_offset:probe.jump_offset + 2] == b"\x0F\x85"
+    assert len(optimized.code) < len(baseline.code) * 0.6
+
+    validate_native_code_map_bytes(optimized.code, native_code_program_map(optimized))
+    _validate_native_program(optimized)
+    listing = format_native_code_program(optimized)
+    assert "#### 代码统计" in listing
+    assert "| 块 | 偏移 | 大小 | 单次经过指令数 |" in listing
+
+
+def test_o1_elides_store_reload_pairs(compile_machine_program):
+    machine_program = compile_machine_program(
+        "int main() {\n    int a = 6;\n    int b = a * 7 + 1;\n    return b - a;\n}\n",
+    )
+
+    optimized = generate_native_code(machine_program, optimize_level=1)
+
+    main_asm = _asm(optimized, "main")
+    # 写回栈槽后 RAX 仍持有该值，紧接着读回同一栈槽的装载被省略
+    for store, following in zip(main_asm, main_asm[1:]):
+        if store.startswith("mov [rbp-") and store.endswith(", rax"):
+            assert following != f"mov rax, {store[4:-5]}"
+    assert main_asm.count("mov rax, [rbp-80]") == 1
+    assert "mov eax, 6" in main_asm
+    assert "imul rax, rax, 7" in main_asm
+    assert "inc rax" in main_asm
+
+
+def test_compile_module_threads_optimize_level_to_native_codegen(tmp_path):
+    source_path = tmp_path / "peephole.vbc"
+    source_path.write_text(SOURCE, encoding="utf-8")
+
+    plain = compile_module(str(source_path), require_native_code=True).native_code_program
+    optimized = compile_module(str(source_path), optimize_level=1, require_native_code=True).native_code_program
+
+    assert len(optimized.code) < len(plain.code)
+    if can_run_native_memory():
+        assert run_native_program_in_memory(optimized) == run_native_program_in_memory(plain)
+
+
+@pytest.mark.parametrize("name", [
+    "native_codegen_arithmetic_test",
+    "native_codegen_break_continue_test",
+    "native_codegen_call_test",
+    "native_codegen_compare_test",
+    "native_codegen_div_mod_test",
+    "native_codegen_enum_switch_test",
+])
+def test_o1_matches_o0_on_grammar_programs(name):
+    machine_program = compile_module(f"tests/grammar/{name}.vbc", require_machine=True).machine_program
+
+    baseline = generate_native_code(machine_program)
+    optimized = generate_native_code(machine_program, optimize_level=1)
+
+    validate_native_code_map_bytes(optimized.code, native_code_program_map(optimized))
+    _validate_native_program(optimized)
+    assert len(optimized.code) < len(baseline.code)
+    if can_run_native_memory():
+        assert run_native_program_in_memory(optimized) == run_native_program_in_memory(baseline)
+
+
+def test_native_peephole_shrinks_many_functions(compile_machine_program):
+    functions = [
+        f"int f{index}(int a) {{\n"
+        f"    int s = 0;\n"
+        f"    int i = 0;\n"
+        f"    while (i < a) {{\n"
+        f"        if (i % 3 == 0) {{\n"
+        f"            s = s + i * {index + 2};\n"
+        f"        }}\n"
+        f"        i = i + 1;\n"
+        f"    }}\n"
+        f"    return s;\n"
+        f"}}\n"
+        for index in range(100)
+    ]
+    calls = "".join(f"    t = t + f{index}(40);\n" for index in range(100))
+    machine_program = compile_machine_program("".join(functions) + "int main() {\n    int t = 0;\n" + calls + "    return t;\n}\n")
+
+    baseline = generate_native_code(machine_program)
+    optimized = generate_native_code(machine_program, optimize_level=1)
+
+    instruction_counts = [
+        sum(1 for function in program.functions.values() for instruction in function.instructions if instruction.code)
+        for program in (baseline, optimized)
+    ]
+    assert len(optimized.code) < len(baseline.code) * 0.6
+    assert instruction_counts[1] < instruction_counts[0]
+    if can_run_native_memory():
+        assert run_native_program_in_memory(optimized) == run_native_program_in_memory(baseline)
@@ -0,0 +1,205 @@
+import ctypes
+
+import pytest
+
+from verbose_c.compiler.native import (
+    NativeCodegenError,
+    NativeLoweringError,
+    build_native_pe_image,
+    format_native_code_program,
+    generate_native_code,
+    native_code_program_map,
+)
+from verbose_c.compiler.native.codegen import validate_native_code_map_bytes, validate_native_code_program_map
+from verbose_c.compiler.native.encoder import (
+    encode_call_rax,
+    encode_lea_r9_rsp_offset,
+    encode_mov_rax_r10,
+    encode_mov_reg_from_rsp_offset,
+    encode_mov_rsp_offset_from_reg,
+)
+from verbose_c.compiler.native.runner import _validate_native_program, can_run_native_memory, run_native_program_in_memory
+from verbose_c.compiler.native.runtime_calls import RUNTIME_STRING_HELPERS, NativeRuntimeHost
+from verbose_c.engine.engine import compile_module, run_source_file
+from verbose_c.error.exceptions import VBCIOError
+
+RUNTIME_IO_PROGRAM = "tests/grammar/native_codegen_runtime_io_test.vbc"
+
+
+def _instructions(machine_program, function_name, op):
+    return [
+        instruction
+        for block in machine_program.functions[function_name].blocks
+        for instruction in block.instructions
+        if instruction.op == op
+    ]
+
+
+def test_runtime_call_encodings():
+    assert encode_call_rax() == bytes.fromhex("ffd0")
+    assert encode_mov_rax_r10() == bytes.fromhex("4c89d0")
+    assert encode_mov_rsp_offset_from_reg(40, "R11") == bytes.fromhex("4c895c2428")
+    assert encode_mov_reg_from_rsp_offset("R11", 40) == bytes.fromhex("4c8b5c2428")
+    assert encode_mov_reg_from_rsp_offset("R10", 32) == bytes.fromhex("4c8b542420")
+    assert encode_lea_r9_rsp_offset(32) == bytes.fromhex("4c8d4c2420")
+
+
+def test_lowering_emits_call_runtime_with_string_handles():
+    machine_program = compile_module(RUNTIME_IO_PROGRAM, require_machine=True).machine_program
+
+    assert {"runtime io\n", "tests/grammar/native_codegen_runtime_io_test.vbc", "=", "\n"} <= set(machine_program.runtime_strings)
+    assert len(set(machine_program.runtime_strings)) == len(machine_program.runtime_strings)
+    runtime_calls = _instructions(machine_program, "main", "call_runtime")
+    calls = [call for call in runtime_calls if str(call.args[0].value) not in RUNTIME_STRING_HELPERS]
+    assert [str(call.args[0].value) for call in calls[:3]] == ["write", "open", "read"]
+    assert calls[1].attrs["arg_types"] == ["str64", "int64", "int64"]
+    assert calls[2].attrs["result_type"] == "str64"
+    assert calls[2].result.type_hint == "str64"
+    assert {call.attrs["arg_types"][1] for call in calls if str(call.args[0].value) == "write"} == {"str64", "float64", "bool64"}
+    assert [call.attrs["arg_types"] for call in _instructions(machine_program, "report", "call_runtime")] == [
+        ["int64", "int64"], ["int64", "str64"], ["int64", "int64"], ["int64", "str64"]
+    ]
+    # main 调用了返回字符串的 read：字符串局部变量赋值登记到宿主，循环头与返回前回收；report 不创建动态字符串
+    assert [(str(call.args[0].value), call.args[1].value) for call in runtime_calls if str(call.args[0].value) in RUNTIME_STRING_HELPERS] == [
+        ("__str_bind", 0), ("__str_bind", 3), ("__str_collect", 0), ("__str_collect", 1)
+    ]
+
+
+@pytest.mark.parametrize("optimize_level", [0, 1])
+def test_runtime_io_program_matches_vm(tmp_path, optimize_level, capfd):
+    machine_program = compile_module(RUNTIME_IO_PROGRAM, require_machine=True).machine_program
+
+    program = generate_native_code(machine_program, optimize_level=optimize_level)
+
+    metadata = native_code_program_map(program)
+    validate_native_code_map_bytes(program.code, metadata)
+    validate_native_code_program_map(program, metadata)
+    _validate_native_program(program)
+    assert program.runtime_strings == tuple(machine_program.runtime_strings)
+    assert {item["name"] for item in metadata["runtime_imports"]} == {"write", "open", "read", "close", "__str_bind", "__str_collect"}
+    write_imports = [item for item in metadata["runtime_imports"] if item["name"] == "write"]
+    assert sorted(item["arg_types"][1] for item in write_imports) == ["bool64", "float64", "int64", "str64"]
+    assert sum(len(item["sites"]) for item in write_imports) == 10
+    main_asm = [instruction.asm for instruction in program.functions["main"].instructions]
+    assert "mov rax, 0 ; runtime import read" in main_asm
+    assert "mov [rsp+40], r11" in main_asm
+    assert "mov edx, 1 ; native runtime error" in main_asm
+    assert "### 运行时导入表" in format_native_code_program(program)
+    expected = run_source_file(
+        RUNTIME_IO_PROGRAM, log_modules=set(), dump_modules=set(), output_path=str(tmp_path / "runtime_io.vbb"), execute=True
+    ).exit_code
+    vm_output = capfd.readouterr().out
+    assert expected == 14043
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == expected
+        assert capfd.readouterr().out == vm_output
+
+
+def test_runtime_import_map_rejects_misplaced_site():
+    machine_program = compile_module(RUNTIME_IO_PROGRAM, require_machine=True).machine_program
+    program = generate_native_code(machine_program)
+    metadata = native_code_program_map(program)
+    site = metadata["runtime_imports"][0]["sites"][0]
+    site["offset"] += 1
+    site["patch_offset"] += 1
+
+    with pytest.raises(NativeCodegenError) as exc_info:
+        validate_native_code_map_bytes(program.code, metadata)
+
+    assert "不是 mov rax, imm64 占位" in str(exc_info.value)
+    metadata = native_code_program_map(program)
+    with pytest.raises(NativeCodegenError) as exc_info:
+        build_native_pe_image(program.code, metadata)
+    assert "运行时导入" in str(exc_info.value)
+
+
+def test_runtime_host_marshals_values_and_records_errors():
+    host = NativeRuntimeHost(["x"], [{"name": "read", "arg_types": ["int64", "int64"], "result_type": "str64", "sites": []}])
+    assert host._to_object(0, "str64").value == "x"
+    assert str(host._to_object(0x4004000000000000, "float64")) == "2.5"
+    assert str(host._to_object(2, "bool64")) == "true"
+    assert host._from_object(host._to_object(0, "str64"), "str64") == 1
+    assert host.strings == ["x", "x"]
+
+    result = ctypes.c_int64(0)
+    assert host._trampolines[0](-1, 3, 0, ctypes.byref(result)) == 1
+    with pytest.raises(VBCIOError):
+        host.raise_pending_error()
+    host.raise_pending_error()
+
+
+def test_runtime_host_reclaims_dead_strings_per_frame():
+    from verbose_c.object.t_string import VBCString
+
+    host = NativeRuntimeHost(["x"], [])
+    caller, callee = 0x2000, 0x1000 # 被调函数的栈帧地址更低
+    bound = host._from_object(VBCString.from_value("a"), "str64", caller)
+    host._string_bind(caller, 0, bound)
+    pending = host._from_object(VBCString.from_value("b"), "str64", caller)
+    dead = host._from_object(VBCString.from_value("c"), "str64", callee)
+
+    host._string_collect(callee, 0)
+    assert host.strings == ["x", "a", "b", None]
+    kept = host._from_object(VBCString.from_value("d"), "str64", callee)
+    assert kept == dead
+    host._string_bind(callee, 1, kept)
+    host._string_collect(callee, 0)
+    assert host.strings[kept] == "d"
+    host._string_collect(callee, 1)
+    assert host.strings[kept] is None
+
+    host._string_collect(caller, 0)
+    assert host.strings[bound] == "a" and host.strings[pending] is None
+    pinned = host._from_object(VBCString.from_value("e"), "str64", caller)
+    host._string_pin(caller, pinned)
+    host._string_collect(caller, 1)
+    assert host.strings[bound] is None and host.strings[pinned] == "e"
+    host.release_frames()
+    assert host.strings[pinned] == "e"
+    assert host._string_eq(caller, pinned, host._from_object(VBCString.from_value("e"), "str64", caller)) == 1
+    assert host._string_eq(caller, pinned, 0) == 0
+
+
+@pytest.mark.parametrize("optimize_level", [0, 1])
+def test_readline_loop_compares_string_handles(tmp_path, optimize_level):
+    data_path = tmp_path / "lines.txt"
+    data_path.write_text("one\ntwo\nthree\n", encoding="utf-8")
+    source_path = tmp_path / "readline_loop.vbc"
+    source_path.write_text(
+        "int main() {\n"
+        f"    int fd = open(\"{data_path.as_posix()}\", O_RDONLY, 0);\n"
+        "    string line = readline(fd);\n"
+        "    int count = 0;\n"
+        "    while (line != \"\") {\n"
+        "        count = count + 1;\n"
+        "        line = readline(fd);\n"
+        "    }\n"
+        "    close(fd);\n"
+        "    return count;\n"
+        "}\n"
+        "\n"
+        "_exit(main());\n",
+        encoding="utf-8",
+    )
+    machine_program = compile_module(str(source_path), require_machine=True).machine_program
+
+    names = [str(call.args[0].value) for call in _instructions(machine_program, "main", "call_runtime")]
+    assert "__str_eq" in names
+    assert names.count("__str_collect") == 2
+    program = generate_native_code(machine_program, optimize_level=optimize_level)
+    _validate_native_program(program)
+    expected = run_source_file(
+        str(source_path), log_modules=set(), dump_modules=set(), output_path=str(tmp_path / "readline_loop.vbb"), execute=True
+    ).exit_code
+    assert expected == 3
+    if can_run_native_memory():
+        assert run_native_program_in_memory(program) == expected
+
+
+def test_string_values_outside_runtime_calls_stay_on_vm(compile_machine_program):
+    machine_program_source = "int main() {\n    string s = \"a\";\n    string t = s + \"b\";\n    return 1;\n}\n"
+
+    with pytest.raises(NativeLoweringError) as exc_info:
+        compile_machine_program(machine_program_source)
+
+    assert "string_value" in str(exc_info.value)
@@ -0,0 +1,182 @@
+from verbose_c.compiler.native import format_native_tiering_report, plan_native_tiering
+from verbose_c.compiler.native.runner import can_run_native_memory
+from verbose_c.compiler.native.tiering import NativeTierImage, _to_native_value, _to_vm_object
+from verbose_c.compiler.opcode import Opcode
+from verbose_c.engine.engine import compile_module, run_source_file
+from verbose_c.object.enum import VBCObjectType
+from verbose_c.object.function import VBCNativeFunction
+from verbose_c.object.t_float import VBCFloat
+from verbose_c.object.t_integer import VBCInteger
+from verbose_c.object.t_null import VBCNull
+from verbose_c.object.t_string import VBCString
+from verbose_c.vm.core import VBCVirtualMachine
+
+TIERING_SOURCE = (
+    "int counter = 0;\n"
+    "int add(int a, int b) {\n"
+    "    return a + b;\n"
+    "}\n"
+    "double half(double x) {\n"
+    "    return x / 2.0;\n"
+    "}\n"
+    "int twice(int x) {\n"
+    "    return add(x, x);\n"
+    "}\n"
+    "int bump() {\n"
+    "    counter = counter + 1;\n"
+    "    return counter;\n"
+    "}\n"
+    "int uses_bump(int x) {\n"
+    "    return bump() + x;\n"
+    "}\n"
+    "int quit(int code) {\n"
+    "    _exit(code);\n"
+    "    return 0;\n"
+    "}\n"
+    "int first(int* values) {\n"
+    "    return *values;\n"
+    "}\n"
+    "int main() {\n"
+    "    return twice(5) + (int)half(9.0);\n"
+    "}\n"
+    "_exit(main());\n"
+)
+
+
+def _compile(tmp_path, source):
+    source_path = tmp_path / "tiering.vbc"
+    source_path.write_text(source, encoding="utf-8")
+    return source_path, compile_module(str(source_path))
+
+
+def test_plan_keeps_unsupported_functions_on_vm(tmp_path):
+    _, output = _compile(tmp_path, TIERING_SOURCE)
+
+    plan = plan_native_tiering(output)
+
+    decisions = {decision.name: decision for decision in plan.decisions}
+    assert plan.native_functions == ["add", "half", "twice", "main"]
+    assert "访问全局变量 counter" in decisions["bump"].reason
+    assert decisions["uses_bump"].reason == "调用解释执行的函数 bump"
+    assert "_exit" in decisions["quit"].reason
+    assert "第 0 个参数类型 引用值" in decisions["first"].reason
+    assert plan.signatures["half"] == (["DOUBLE"], "DOUBLE")
+    assert set(plan.native_code_program.functions) == {"<module>", "add", "half", "twice", "main"}
+    assert plan.native_code_program.entry.name == "<module>"
+    assert (plan.unavailable_reason is None) == can_run_native_memory()
+
+    report = format_native_tiering_report(plan)
+    assert "- native 函数: `4` / `8`" in report
+    assert "| `twice` | `native` | `(INT) -> INT` | - |" in report
+    assert "| `uses_bump` | `vm` | - | 调用解释执行的函数 bump |" in report
+
+
+def test_plan_reports_lowering_and_method_reasons():
+    output = compile_module("tests/grammar/classes_and_members_test.vbc")
+
+    plan = plan_native_tiering(output)
+
+    decisions = {decision.name: decision for decision in plan.decisions}
+    assert decisions["Counter.set_value"].reason == "类方法由 VM 按实例分派"
+    assert not decisions["main"].native
+    assert "native MVP 暂不支持" in decisions["main"].reason
+    assert plan.native_code_program is None
+
+
+def test_linker_binds_native_stubs_in_place_of_top_level_functions(tmp_path):
+    _, output = _compile(tmp_path, "int add(int a, int b) {\n    return a + b;\n}\nint main() {\n    return add(1, 2);\n}\n_exit(main());\n")
+    calls = []
+
+    def fake_add(a, b):
+        calls.append((a.value, b.value))
+        return VBCInteger(40)
+
+    vm = VBCVirtualMachine(native_stubs={"add": VBCNativeFunction("add", fake_add)})
+    exit_code = vm.excute(bytecode=output.bytecode, constants=output.constant_pool)
+
+    assert exit_code == 40
+    assert calls == [(1, 2)]
+    # 编译产物保持调用原函数
+    assert any(instruction[0] is Opcode.CALL_DIRECT for instruction in output.function_compilation_results["main"]["bytecode"])
+
+
+def test_stub_value_conversion_follows_declared_types():
+    assert _to_vm_object(-1, "INT").value == -1
+    # native 保留完整的 64 位结果，超出声明类型时与 VM 运算一样提升
+    vm_square = VBCInteger(50000) * VBCInteger(50000)
+    native_square = _to_vm_object(50000 * 50000, "INT")
+    assert (native_square.value, native_square._object_type) == (vm_square.value, vm_square._object_type) == (2500000000, VBCObjectType.LONG)
+    assert _to_vm_object(300, "CHAR")._object_type is VBCObjectType.SHORT
+    assert _to_vm_object(2, "BOOL").value is True
+    assert isinstance(_to_vm_object(0, "VOID"), VBCNull)
+    assert _to_vm_object(2.5, "DOUBLE").value == 2.5
+    assert _to_native_value(VBCFloat(1.5, VBCObjectType.DOUBLE), "DOUBLE") == 1.5
+    assert _to_native_value(VBCInteger(-7, VBCObjectType.LONG), "LONG") == -7
+
+
+def test_tiered_run_matches_vm(tmp_path, capfd):
+    source_path, _ = _compile(tmp_path, TIERING_SOURCE.replace("_exit(main());", "write(STDOUT, uses_bump(2));\n_exit(main());"))
+
+    expected = run_source_file(str(source_path), log_modules=set(), dump_modules=set(), show_warnings=False)
+    vm_output = capfd.readouterr().out
+    result = run_source_file(str(source_path), log_modules=set(), dump_modules=set(), show_warnings=False, native_tiering=True)
+
+    assert result.exit_code == expected.exit_code == 14
+    assert capfd.readouterr().out == vm_output
+    # 非 Windows x64 平台只生成分层计划，不绑定 native 桩
+    assert result.compilation_output.native_tiering.native_functions == ["add", "half", "twice", "main"]
+
+
+STUB_SOURCE = (
+    "int calls = 0;\n"
+    "int square(int a) {\n"
+    "    return a * a;\n"
+    "}\n"
+    "double half(double x) {\n"
+    "    return x / 2.0;\n"
+    "}\n"
+    "int report(int a) {\n"
+    "    calls = calls + 1;\n"
+    "    write(STDOUT, square(a));\n"
+    "    write(STDOUT, \" \");\n"
+    "    write(STDOUT, half(3.0));\n"
+    "    write(STDOUT, \"\\n\");\n"
+    "    return calls;\n"
+    "}\n"
+    "report(7);\n"
+    "_exit(report(50000));\n"
+)
+
+
+def test_tier_image_stubs_run_through_injected_entries(tmp_path, capfd):
+    source_path, output = _compile(tmp_path, STUB_SOURCE)
+    expected = run_source_file(str(source_path), log_modules=set(), dump_modules=set(), show_warnings=False)
+    vm_output = capfd.readouterr().out
+    plan = plan_native_tiering(output)
+    assert plan.native_functions == ["square", "half"]
+    names = {plan.native_code_program.functions[name].offset: name for name in plan.native_functions}
+    # 代替机器码的入口：收到桩转换后的 ctypes 实参，按 native 语义返回 8 字节结果
+    implementations = {"square": lambda a: a * a, "half": lambda x: x / 2.0}
+    calls = []
+    image = None
+
+    def bind_entry(offset, prototype):
+        name = names[offset]
+
+        def entry(*args):
+            calls.append((name, args))
+            # 模拟 native 代码经运行时导入创建的动态字符串，桩返回后应被释放
+            image._host._from_object(VBCString.from_value(name), "str64", 0x1000)
+            return implementations[name](*args)
+
+        return entry
+
+    image = NativeTierImage(plan, bind_entry=bind_entry)
+    vm = VBCVirtualMachine(native_stubs=image.stubs)
+    exit_code = vm.excute(bytecode=output.bytecode, constants=output.constant_pool)
+    image.close()
+
+    assert exit_code == expected.exit_code == 2
+    assert capfd.readouterr().out == vm_output == "49 1.5\n2500000000 1.5\n"
+    assert calls == [("square", (7,)), ("half", (3.0,)), ("square", (50000,)), ("half", (3.0,))]
+    assert image._host.strings == list(plan.native_code_program.runtime_strings) + [None]
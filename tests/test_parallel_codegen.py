@@ -0,0 +1,60 @@
+import pytest
+
+from verbose_c.engine.engine import compile_module
+from verbose_c.fs.artifact_store import ArtifactStore
+
+
+def _function_source(count: int) -> str:
+    functions = "\n".join(
+        f"int f{index}(int x) {{\n"
+        f"    int y = x * {index} + (x - 1) * 2;\n"
+        f"    switch (x) {{ case 1: y = y + 1; break; default: y = y - 1; }}\n"
+        f"    while (y > 100 && x != 0) {{ y = y / 2; }}\n"
+        f"    return y + f{max(index - 1, 0)}(0) * 0;\n"
+        f"}}"
+        for index in range(count)
+    )
+    return functions + "\nint main() {\n    return f3(2);\n}\n"
+
+
+def _artifact_bytes(source_path, artifact_path, optimize_level: int, codegen_jobs: int) -> bytes:
+    output = compile_module(str(source_path), optimize_level=optimize_level, codegen_jobs=codegen_jobs)
+    ArtifactStore().save_bytecode(
+        str(artifact_path),
+        output.bytecode,
+        metadata={
+            "constant_pool": output.constant_pool,
+            "lineno_table": output.lineno_table,
+            "source_path": str(source_path),
+            "labels": output.labels,
+            "function_compilation_results": output.function_compilation_results,
+        },
+    )
+    return artifact_path.read_bytes()
+
+
+@pytest.mark.parametrize("optimize_level", [0, 1])
+def test_parallel_codegen_output_is_byte_identical(tmp_path, optimize_level):
+    source_path = tmp_path / "functions.vbc"
+    source_path.write_text(_function_source(40), encoding="utf-8")
+
+    serial = _artifact_bytes(source_path, tmp_path / "serial.vbb", optimize_level, 1)
+    parallel = _artifact_bytes(source_path, tmp_path / "parallel.vbb", optimize_level, 2)
+
+    assert parallel == serial
+
+
+def test_parallel_codegen_falls_back_to_serial_for_unpicklable_depth(tmp_path):
+    expression = " + ".join(["x"] * 3000)
+    source_path = tmp_path / "deep.vbc"
+    source_path.write_text(
+        f"int f(int x) {{\n    return {expression};\n}}\n"
+        f"int g(int x) {{\n    return x;\n}}\n"
+        f"int main() {{\n    return g(1);\n}}\n",
+        encoding="utf-8",
+    )
+
+    serial = compile_module(str(source_path), codegen_jobs=1)
+    parallel = compile_module(str(source_path), codegen_jobs=2)
+
+    assert parallel.function_compilation_results["f"]["bytecode"] == serial.function_compilation_results["f"]["bytecode"]
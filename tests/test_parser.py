@@ -0,0 +1,146 @@
+import sys
+import tracemalloc
+
+from verbose_c.engine.engine import _load_parser_module, ensure_parser
+from verbose_c.fs.source_manager import SourceManager
+from verbose_c.parser.lexer.tokenizer import Tokenizer
+from verbose_c.parser.parser.parser import Parser
+
+_FUNCTION_TEMPLATE = """int add_{0}(int a, int b) {{
+    int total = 0;
+    for (int i = 0; i < b; i = i + 1) {{
+        if (a > i && b != {0}) {{
+            total = total + a * i - (b / 2);
+        }} else {{
+            total = total - 1;
+        }}
+    }}
+    while (total > 100) {{ total = total - 3; }}
+    return total + {0};
+}}
+"""
+
+
+def _make_parser(tmp_path, source):
+    ensure_parser()
+    parser_module = _load_parser_module()
+    source_path = tmp_path / "input.vbc"
+    source_path.write_text(source, encoding="utf-8")
+    tokenizer = Tokenizer(str(source_path), SourceManager())
+    return parser_module.GeneratedParser(tokenizer)
+
+
+def test_generated_parser_memoizes_only_reentered_rules():
+    ensure_parser()
+    parser_class = _load_parser_module().GeneratedParser
+
+    memoized = set(parser_class.RULE_NAMES)
+    assert {"statement", "expr", "type_name", "member_expr"} <= memoized
+    # 只有一个调用位置的规则不做记忆化
+    assert "start" not in memoized
+    assert "module" not in memoized
+    assert "function_ret" not in memoized
+    assert len(set(parser_class.RULE_NAMES)) == len(parser_class.RULE_NAMES)
+
+
+def test_parser_releases_memo_rows_behind_cut_points(tmp_path):
+    parser = _make_parser(tmp_path, "".join(_FUNCTION_TEMPLATE.format(index) for index in range(20)))
+
+    assert parser.start() is not None
+    assert parser._memo_floor > 0
+    assert all(row is None for row in parser._memo[:parser._memo_floor])
+
+
+def test_parser_reports_rule_stack_for_syntax_errors(tmp_path):
+    parser = _make_parser(tmp_path, "int main() {\n    return 1 +\n}\n")
+
+    assert parser.start() is None
+    report = parser.get_error_report()
+    assert "错误位置: 第 3 行，第 0 列" in report
+    assert "start -> module -> _loop0_1 -> statement -> function -> func_block" in report
+    assert "function_ret -> expr -> assignment" in report
+    assert len(parser.error_collector.errors) == 1
+
+
+def test_parser_peak_memory_on_large_input(tmp_path):
+    source = "".join(_FUNCTION_TEMPLATE.format(index) for index in range(60))
+    source += "int main() { return add_1(2, 3); }\n"
+    parser = _make_parser(tmp_path, source)
+
+    tracemalloc.start()
+    try:
+        ast_node = parser.start()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert ast_node is not None
+    # 宽松上限，只用于捕获记忆化表或错误收集重新无界增长的回归
+    assert peak < 200_000_000
+
+
+def test_parser_dispatches_alternatives_by_first_set(tmp_path):
+    source = "".join(_FUNCTION_TEMPLATE.format(index) for index in range(10))
+    parser = _make_parser(tmp_path, source)
+    parser_file = sys.modules[type(parser).__module__].__file__
+    runtime_file = sys.modules[Parser.__module__].__file__
+
+    calls = 0
+
+    def count_calls(frame, event, arg):
+        nonlocal calls
+        if event == "call" and frame.f_code.co_filename in (parser_file, runtime_file):
+            calls += 1
+
+    sys.setprofile(count_calls)
+    try:
+        ast_node = parser.start()
+    finally:
+        sys.setprofile(None)
+
+    calls_per_token = calls / (parser._tokenizer.position_count - 1)
+    assert ast_node is not None
+    # 按 FIRST 集合分派前约为 40 次/token
+    assert calls_per_token < 34
+
+
+def test_tokenizer_backtracking_does_not_allocate(tmp_path):
+    parser = _make_parser(tmp_path, _FUNCTION_TEMPLATE.format(0))
+    tokenizer = parser._tokenizer
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(10000):
+            mark = tokenizer.mark()
+            tokenizer.getnext()
+            tokenizer.reset(mark)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert after - before < 1024
+    assert not hasattr(tokenizer, "_marks")
+
+
+def test_parser_statistics_count_marks_resets_and_memo_lookups(tmp_path, capsys):
+    from verbose_c.engine.recorder import PipelineRecorder
+
+    parser = _make_parser(tmp_path, "".join(_FUNCTION_TEMPLATE.format(index) for index in range(3)))
+    statistics = parser.enable_statistics()
+
+    assert parser.start() is not None
+    assert statistics.token_count == parser._tokenizer.position_count - 1
+    assert statistics.marks > statistics.token_count
+    assert 0 < statistics.resets < statistics.marks
+    assert set(statistics.memo_misses) == set(type(parser).RULE_NAMES)
+    assert statistics.memo_hits["member_expr"] > 0
+    assert statistics.memo_misses["statement"] > 0
+
+    recorder = PipelineRecorder(source_filename="input.vbc", log_modules={"parser"})
+    assert recorder.wants_parser_statistics
+    recorder.on_parser_statistics(statistics)
+    output = capsys.readouterr().out
+    assert "## 解析开销" in output
+    assert f"mark 次数: `{statistics.marks}`" in output
+    assert "| `member_expr` |" in output
@@ -0,0 +1,218 @@
+import pytest
+
+from verbose_c.fs.source_manager import SourceManager
+from verbose_c.parser.lexer.enum import TokenType
+from verbose_c.parser.lexer.lexer import Lexer
+from verbose_c.parser.lexer.tokenizer import Tokenizer
+from verbose_c.preprocessor.preprocessor import Preprocessor
+
+
+class CountingSourceManager(SourceManager):
+    def __init__(self):
+        super().__init__()
+        self.reads: dict[str, int] = {}
+
+    def read(self, path):
+        self.reads[path] = self.reads.get(path, 0) + 1
+        return super().read(path)
+
+
+def _preprocess(path, source_manager=None):
+    source_manager = source_manager or SourceManager()
+    tokens = Tokenizer(str(path), source_manager).tokens
+    return Preprocessor(source_manager, show_warnings=False).process_tokens(tokens)
+
+
+def _values(tokens):
+    return [tok.value for tok in tokens if tok.type not in (TokenType.END, TokenType.NEWLINE, TokenType.WHITESPACE)]
+
+
+@pytest.mark.parametrize("source,guard", [
+    ("#ifndef A_H\n#define A_H\nint a;\n#endif\n", "A_H"),
+    ("// header\n#if !defined(A_H)\n#define A_H\n#ifdef X\nint x;\n#else\nint y;\n#endif\n#endif\n/* tail */\n", "A_H"),
+    ("#if !defined A_H\n#endif", "A_H"),
+    ("#ifndef A_H\n#define A_H\n#endif\nint after;\n", None),
+    ("int before;\n#ifndef A_H\n#define A_H\n#endif\n", None),
+    ("#ifndef A_H\n#define A_H\n#else\nint other;\n#endif\n", None),
+    ("#ifdef A_H\n#endif\n", None),
+])
+def test_detect_include_guard(source, guard):
+    assert Preprocessor._detect_include_guard(Lexer("h.inc", source).tokenize()) == guard
+
+
+def test_guarded_and_pragma_once_headers_are_read_once(tmp_path):
+    (tmp_path / "guarded.inc").write_text("#ifndef GUARDED\n#define GUARDED\nint g = 1;\n#endif\n", encoding="utf-8")
+    (tmp_path / "once.inc").write_text("#pragma once\nint o = 2;\n", encoding="utf-8")
+    (tmp_path / "plain.inc").write_text("int p = 3;\n", encoding="utf-8")
+    main = tmp_path / "main.vbc"
+    main.write_text(
+        '#include "guarded.inc"\n#include "once.inc"\n#include "plain.inc"\n'
+        '#include "guarded.inc"\n#include "once.inc"\n#include "plain.inc"\n',
+        encoding="utf-8",
+    )
+    source_manager = CountingSourceManager()
+
+    values = _values(_preprocess(main, source_manager))
+
+    assert values.count("g") == 1
+    assert values.count("o") == 1
+    assert values.count("p") == 2
+    assert source_manager.reads[str(tmp_path / "guarded.inc")] == 1
+    assert source_manager.reads[str(tmp_path / "once.inc")] == 1
+    assert source_manager.reads[str(tmp_path / "plain.inc")] == 2
+
+
+def test_guard_that_header_never_defines_does_not_skip(tmp_path):
+    (tmp_path / "repeat.inc").write_text("#ifndef NEVER_DEFINED\nint r = 1;\n#endif\n", encoding="utf-8")
+    main = tmp_path / "main.vbc"
+    main.write_text('#include "repeat.inc"\n#include "repeat.inc"\n', encoding="utf-8")
+
+    assert _values(_preprocess(main)).count("r") == 2
+
+
+def test_shared_header_graph_reads_each_header_once(tmp_path):
+    header_count = 40
+    for index in range(header_count):
+        lines = [f"#ifndef H{index}_INC", f"#define H{index}_INC"]
+        lines += [f'#include "h{other}.inc"' for other in range(index)]
+        lines += [f"// filler {line}" for line in range(20)]
+        lines += [f"int h{index}_fn(int x) {{\n    return x + {index};\n}}", "#endif", ""]
+        (tmp_path / f"h{index}.inc").write_text("\n".join(lines), encoding="utf-8")
+    main = tmp_path / "main.vbc"
+    main.write_text("\n".join(f'#include "h{index}.inc"' for index in range(header_count)) + "\n", encoding="utf-8")
+    source_manager = CountingSourceManager()
+
+    values = _values(_preprocess(main, source_manager))
+
+    assert sum(1 for value in values if value.endswith("_fn")) == header_count
+    assert set(source_manager.reads.values()) == {1}
+
+
+def test_macro_analysis_is_precompiled_and_tokens_pass_through(tmp_path):
+    main = tmp_path / "main.vbc"
+    main.write_text(
+        "#define PAIR(a, b) a ## b + #a\n"
+        "int x = PAIR(y, 1);\n"
+        "int z = 2;\n",
+        encoding="utf-8",
+    )
+    source_manager = SourceManager()
+    raw_tokens = Tokenizer(str(main), source_manager).tokens
+    preprocessor = Preprocessor(source_manager, show_warnings=False)
+
+    output = preprocessor.process_tokens(raw_tokens)
+
+    macro = preprocessor.macro_register["PAIR"]
+    assert macro.template is not None and macro.template.has_concat
+    assert macro.parameter_usage["a"].value == "stringify"
+    assert _values(output)[:7] == ["int", "x", "=", "y1", "+", '"y"', ";"]
+    # 非宏 token 按引用转发，不再复制
+    raw_ids = {id(tok) for tok in raw_tokens}
+    assert sum(1 for tok in output if id(tok) in raw_ids) >= len(_values(output)) - 3
+
+
+def test_macro_heavy_preprocessing_reuses_tokens(tmp_path):
+    lines = [
+        "#define ADD(a, b) ((a) + (b))",
+        "#define SQ(x) ADD(x, 0) * (x)",
+        "#define STR(x) #x",
+    ]
+    lines += [f"int f{index}(int x) {{ return ADD(SQ(x), {index}) + STR(x); }}" for index in range(500)]
+    lines += [f"int g{index}(int a, int b) {{ return a * b + {index}; }}" for index in range(2000)]
+    main = tmp_path / "main.vbc"
+    main.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    source_manager = SourceManager()
+    raw_tokens = Tokenizer(str(main), source_manager).tokens
+
+    preprocessor = Preprocessor(source_manager, show_warnings=False)
+
+    output = preprocessor.process_tokens(raw_tokens)
+
+    # 输出中的 token 要么来自源码，要么来自宏体；只有字符串化结果是新分配的
+    shared_ids = {id(tok) for tok in raw_tokens}
+    shared_ids.update(id(tok) for macro in preprocessor.macro_register.values() for tok in macro.replacement)
+    new_tokens = {id(tok) for tok in output if id(tok) not in shared_ids}
+    assert len(new_tokens) == 500
+
+
+def _token_keys(tokens):
+    return [(tok.type, tok.value, tok.line, tok.column, tok.path) for tok in tokens]
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 64])
+def test_streamed_preprocessing_matches_materialized(tmp_path, batch_size):
+    (tmp_path / "ops.inc").write_text("#pragma once\n#define MUL(a, b) ((a) * (b))\nint inc_value = MUL(2, 3);\n", encoding="utf-8")
+    main = tmp_path / "main.vbc"
+    main.write_text(
+        '#include "ops.inc"\n'
+        "#define ADD(a, b) ((a) + (b))\n"
+        "#define NOT_CALLED(x) x\n"
+        "int a = ADD(\n    MUL(1, 2),\n    // comment\n    (3 + 4)\n);\n"
+        "int b = NOT_CALLED ;\n"
+        "#ifdef ADD\nint c = ADD(a, b);\n#else\nint c = 0;\n#endif\n"
+        '#include "ops.inc"\n',
+        encoding="utf-8",
+    )
+    expected = _preprocess(main)
+
+    source_manager = SourceManager()
+    raw_tokens = Tokenizer(str(main), source_manager).tokens
+    batches = list(Preprocessor(source_manager, show_warnings=False).process_stream(iter(raw_tokens), batch_size))
+
+    streamed = [tok for batch in batches for tok in batch]
+    assert _token_keys(streamed) == _token_keys(expected)
+    assert all(batches)
+
+
+def test_streamed_compile_matches_materialized_pipeline(tmp_path):
+    from verbose_c.engine.engine import compile_module
+    from verbose_c.engine.recorder import PipelineRecorder
+
+    source_path = tmp_path / "main.vbc"
+    source_path.write_text(
+        "#define SQUARE(x) ((x) * (x))\n"
+        + "".join(f"int f{index}(int x) {{ return SQUARE(x) + {index}; }}\n" for index in range(50))
+        + "int main() { return f3(2); }\n",
+        encoding="utf-8",
+    )
+    recorder = PipelineRecorder(source_filename=str(source_path), dump_modules={"tokens"}, dump_path=str(tmp_path / "dump.md"))
+
+    streamed = compile_module(str(source_path))
+    materialized = compile_module(str(source_path), recorder=recorder)
+
+    assert streamed.tokens is None and materialized.tokens is not None
+    assert repr(streamed.ast_node) == repr(materialized.ast_node)
+    assert streamed.bytecode == materialized.bytecode
+
+
+def test_streamed_pipeline_lowers_peak_memory(tmp_path):
+    import tracemalloc
+
+    from verbose_c.engine.engine import _load_parser_module
+
+    parser_module = _load_parser_module()
+    lines = ["#define ADD(a, b) ((a) + (b))"]
+    lines += [f"// function {index}\nint f{index}(int x) {{\n    return ADD(x, {index}) * 2;\n}}" for index in range(400)]
+    main = tmp_path / "main.vbc"
+    main.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def parse(streaming):
+        source_manager = SourceManager()
+        preprocessor = Preprocessor(source_manager, show_warnings=False)
+        tracemalloc.start()
+        if streaming:
+            tokenizer = Tokenizer(str(main), source_manager, lazy=True)
+            tokenizer.set_stream(preprocessor.process_stream(tokenizer.lexer.iter_tokens()))
+        else:
+            tokenizer = Tokenizer(str(main), source_manager)
+            tokenizer.tokens = preprocessor.process_tokens(tokenizer.tokens)
+        node = parser_module.GeneratedParser(tokenizer).start()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return node, peak
+
+    materialized_node, materialized_peak = parse(False)
+    streamed_node, streamed_peak = parse(True)
+
+    assert repr(streamed_node) == repr(materialized_node)
+    assert streamed_peak < materialized_peak
@@ -0,0 +1,73 @@
+import pickle
+
+from verbose_c.engine.engine import compile_module
+from verbose_c.object.t_integer import VBCInteger
+from verbose_c.object.t_string import VBCString
+from verbose_c.vm.core import VBCVirtualMachine
+
+
+def test_escapes_are_decoded_once():
+    literal = VBCString(r"a\n\"b\"\\")
+    assert literal.value == 'a\n"b"\\'
+
+    decoded = VBCString.from_value("x\\n")
+    assert decoded.value == "x\\n"
+    # 运行时结果不再重复解析转义
+    assert (decoded + VBCString.from_value("y")).value == "x\\ny"
+    assert (decoded * VBCInteger(2)).value == "x\\nx\\n"
+    assert (-decoded).value == "n\\x"
+
+
+def test_concat_shares_pieces_without_changing_earlier_results():
+    base = VBCString("a")
+    ab = base + VBCString("b")
+    abc = ab + VBCString("c")
+    # ab 不再是片段列表的最新前缀，从它拼接时必须复制
+    abd = ab + VBCString("d")
+
+    assert ab._pieces is abc._pieces
+    assert abd._pieces is not abc._pieces
+    assert [ab.value, abc.value, abd.value] == ["ab", "abc", "abd"]
+    assert abc == VBCString("abc")
+    assert hash(abc) == hash(VBCString("abc"))
+    assert len(abd) == 3
+
+    restored = pickle.loads(pickle.dumps(abc))
+    assert restored.value == "abc"
+    assert restored._pieces is None
+
+
+def test_repeated_append_defers_flattening():
+    piece = VBCString.from_value("x")
+    first = VBCString.from_value("") + piece
+    text = first
+    for _ in range(100_000 - 1):
+        text = text + piece
+
+    # 所有中间结果共享同一片段列表，读取 value 之前不合并
+    assert text._pieces is first._pieces
+    assert len(text._pieces) == 100_001
+    assert text._value is None and first._value is None
+    assert len(text) == 100_000
+    assert text._value == "x" * 100_000
+
+
+def test_string_building_loop_in_vm(tmp_path, capfd):
+    source_path = tmp_path / "append.vbc"
+    source_path.write_text(
+        "int main() {\n"
+        "    string s = \"\";\n"
+        "    int i = 0;\n"
+        "    while (i < 2000) {\n"
+        "        s = s + \"ab\";\n"
+        "        i = i + 1;\n"
+        "    }\n"
+        "    write(STDOUT, s + \"\\\\n\");\n"
+        "    return 0;\n"
+        "}\n",
+        encoding="utf-8",
+    )
+    output = compile_module(str(source_path))
+
+    assert VBCVirtualMachine().excute(output.bytecode, output.constant_pool, source_path=str(source_path), lineno_table=output.lineno_table) == 0
+    assert capfd.readouterr().out == "ab" * 2000 + "\\n"
@@ -0,0 +1,124 @@
+import pytest
+
+import verbose_c.compiler.native as native_module
+import verbose_c.compiler.native.runner as native_runner_module
+from verbose_c.compiler.native import NativeCodegenError
+from verbose_c.engine.engine import compile_module
+from verbose_c.engine.native_exporter import NativeArtifactExporter, NativeExportKind, NativeExportRequest
+from verbose_c.fs.validation_cache import NativeValidationCache
+
+_EXPORT_VALIDATORS = (
+    "validate_native_code_program_map",
+    "validate_native_code_map_bytes",
+    "validate_native_text_section_map_bytes",
+    "validate_native_pe_image_bytes",
+)
+
+
+def _native_program(tmp_path, function_count=3):
+    source_path = tmp_path / "native.vbc"
+    lines = [f"int f{index}(int a) {{\n    return a + {index};\n}}" for index in range(function_count)]
+    lines.append("int main() {\n    int s = 0;\n" + "".join(f"    s = f{index}(s);\n" for index in range(function_count)) + "    return s;\n}")
+    source_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    output = compile_module(str(source_path), require_native_code=True)
+    assert output.native_code_error is None
+    return output.native_code_program, source_path
+
+
+def _bundle_request(output_dir):
+    return NativeExportRequest(outputs={
+        kind: str(output_dir / f"native{index}")
+        for index, kind in enumerate((NativeExportKind.RAW_BINARY, NativeExportKind.TEXT_SECTION, NativeExportKind.PE_IMAGE, NativeExportKind.MAP))
+    })
+
+
+@pytest.fixture
+def export_validator_calls(monkeypatch):
+    calls = []
+    for name in _EXPORT_VALIDATORS:
+        original = getattr(native_module, name)
+
+        def spy(*args, _original=original, _name=name):
+            calls.append(_name)
+            return _original(*args)
+
+        monkeypatch.setattr(native_module, name, spy)
+    return calls
+
+
+def test_exporter_skips_validation_of_unchanged_program(tmp_path, export_validator_calls):
+    program, source_path = _native_program(tmp_path)
+    request = _bundle_request(tmp_path / "out")
+
+    NativeArtifactExporter(validation_cache=NativeValidationCache.for_source(str(source_path))).export(program, request, str(source_path))
+    assert len(export_validator_calls) == 6
+
+    export_validator_calls.clear()
+    cache = NativeValidationCache.for_source(str(source_path))
+    report = NativeArtifactExporter(validation_cache=cache).export(program, request, str(source_path))
+    assert export_validator_calls == []
+    assert cache.misses == 0 and cache.hits == 6
+    assert len(report.artifacts) == 4
+
+    NativeArtifactExporter(validation_cache=NativeValidationCache.for_source(str(source_path), revalidate=True)).export(program, request, str(source_path))
+    assert sorted(set(export_validator_calls)) == sorted(_EXPORT_VALIDATORS)
+    assert len(export_validator_calls) == 6
+
+
+def test_runner_records_only_successful_validation(tmp_path, monkeypatch):
+    program, source_path = _native_program(tmp_path)
+    validations = []
+    original = native_runner_module._validate_native_program
+
+    def validate(target):
+        validations.append(target)
+        original(target)
+
+    monkeypatch.setattr(native_runner_module, "_validate_native_program", validate)
+    monkeypatch.setattr(native_runner_module, "_run_code_in_memory", lambda code, entry_offset: 7)
+    cache = NativeValidationCache.for_source(str(source_path))
+
+    assert native_runner_module.run_native_program_in_memory(program, cache) == 7
+    assert native_runner_module.run_native_program_in_memory(program, NativeValidationCache.for_source(str(source_path))) == 7
+    assert len(validations) == 1
+    assert (tmp_path / "__vbccache__" / NativeValidationCache.DIRECTORY_NAME).is_dir()
+
+    def reject(target):
+        raise NativeCodegenError("校验失败")
+
+    monkeypatch.setattr(native_runner_module, "_validate_native_program", reject)
+    with pytest.raises(NativeCodegenError):
+        native_runner_module.run_native_program_in_memory(program, NativeValidationCache.for_source(str(source_path), revalidate=True))
+    failing = NativeValidationCache(str(tmp_path / "other"))
+    with pytest.raises(NativeCodegenError):
+        native_runner_module.run_native_program_in_memory(program, failing)
+    assert failing.misses == 1 and not (tmp_path / "other").exists()
+
+
+def test_validation_cache_skips_validators_for_large_program(tmp_path, export_validator_calls):
+    program, source_path = _native_program(tmp_path, function_count=40)
+    request = _bundle_request(tmp_path / "out")
+
+    NativeArtifactExporter().export(program, request, str(source_path))
+    NativeArtifactExporter(validation_cache=NativeValidationCache.for_source(str(source_path))).export(program, request, str(source_path))
+    assert len(export_validator_calls) == 12
+
+    export_validator_calls.clear()
+    cache = NativeValidationCache.for_source(str(source_path))
+    NativeArtifactExporter(validation_cache=cache).export(program, request, str(source_path))
+    assert export_validator_calls == []
+    assert cache.hits == 6
+
+
+def test_validation_records_are_keyed_by_validator_sources(tmp_path, monkeypatch):
+    import verbose_c.compiler.native.source_fingerprint as fingerprint_module
+
+    cache_dir = str(tmp_path / "cache")
+    validations = []
+    NativeValidationCache(cache_dir).validate("map", b"code", "program", lambda: validations.append(1))
+    assert NativeValidationCache(cache_dir).validate("map", b"code", "program", lambda: validations.append(2))
+
+    # 校验器源码变化后，旧校验器写下的记录不再命中
+    monkeypatch.setattr(fingerprint_module, "native_validator_fingerprint", lambda: "changed")
+    assert not NativeValidationCache(cache_dir).validate("map", b"code", "program", lambda: validations.append(3))
+    assert validations == [1, 3]
@@ -0,0 +1,116 @@
+import pytest
+
+from verbose_c.compiler.opcode import Opcode
+from verbose_c.engine.engine import compile_module
+from verbose_c.object.class_ import VBCClass
+from verbose_c.object.function import VBCFunction
+from verbose_c.vm.builtins_functions import BUILTIN_CONSTANTS, BUILTIN_FUNCTIONS
+from verbose_c.vm.core import VBCVirtualMachine
+from verbose_c.vm.linker import ProgramLinker
+
+
+def test_linker_rewrites_global_access_without_mutating_program():
+    callee = VBCFunction(name="f", bytecode=[(Opcode.LOAD_GLOBAL_VAR, "g"), (Opcode.RETURN,)], param_count=0)
+    method = VBCFunction(name="__init__", bytecode=[(Opcode.LOAD_GLOBAL_VAR, "f"), (Opcode.RETURN,)])
+    vbc_class = VBCClass("C")
+    vbc_class._methods["__init__"] = method
+    bytecode = [
+        (Opcode.LOAD_CONSTANT, 0),
+        (Opcode.STORE_GLOBAL_VAR, "f"),
+        (Opcode.LOAD_GLOBAL_VAR, "f"),
+        (Opcode.LOAD_ADDRESS, ("g", None)),
+    ]
+    constants = [callee, vbc_class, callee]
+
+    slot_indices = {"print": 0}
+    linker = ProgramLinker(slot_indices)
+    linked_bytecode = linker.link_bytecode(bytecode)
+    linked_constants = linker.link_constants(constants)
+
+    assert linked_bytecode[1:3] == [(Opcode.STORE_GLOBAL_SLOT, 1), (Opcode.LOAD_GLOBAL_SLOT, 1)]
+    assert linked_bytecode[3] == bytecode[3]
+    assert linked_constants[0] is linked_constants[2]
+    assert linked_constants[0].bytecode[0] == (Opcode.LOAD_GLOBAL_SLOT, 2)
+    assert linked_constants[1]._methods["__init__"].bytecode[0] == (Opcode.LOAD_GLOBAL_SLOT, 1)
+    assert slot_indices == {"print": 0, "f": 1, "g": 2}
+    # 编译产物保持按名称访问
+    assert bytecode[1] == (Opcode.STORE_GLOBAL_VAR, "f")
+    assert callee.bytecode[0] == (Opcode.LOAD_GLOBAL_VAR, "g")
+    assert method.bytecode[0] == (Opcode.LOAD_GLOBAL_VAR, "f")
+
+
+def test_builtins_take_the_first_global_slots():
+    vm = VBCVirtualMachine()
+    names = list(BUILTIN_FUNCTIONS) + list(BUILTIN_CONSTANTS)
+
+    assert list(vm._global_slot_indices) == names
+    assert all(address is not None for address in vm._global_slots)
+
+
+def test_call_heavy_program_uses_global_slots(tmp_path):
+    source_path = tmp_path / "calls.vbc"
+    source_path.write_text(
+        "int base = 1;\n"
+        "int fib(int n) {\n"
+        "    if (n < 2) {\n"
+        "        return n * base;\n"
+        "    }\n"
+        "    return fib(n - 1) + fib(n - 2);\n"
+        "}\n"
+        "int main() {\n"
+        "    base = 2;\n"
+        "    return fib(15);\n"
+        "}\n",
+        encoding="utf-8",
+    )
+    output = compile_module(str(source_path))
+    vm = VBCVirtualMachine()
+
+    exit_code = vm.excute(output.bytecode, output.constant_pool, source_path=str(source_path), lineno_table=output.lineno_table)
+
+    assert exit_code == 1220
+    assert all(instruction[0] is not Opcode.LOAD_GLOBAL_VAR for instruction in vm._bytecode)
+    assert any(instruction[0] is Opcode.LOAD_GLOBAL_VAR for instruction in output.function_compilation_results["fib"]["bytecode"])
+
+
+def test_static_calls_compile_to_call_direct_and_call_native(tmp_path):
+    source_path = tmp_path / "direct.vbc"
+    source_path.write_text(
+        "int twice(int x) {\n"
+        "    return x * 2;\n"
+        "}\n"
+        "int main() {\n"
+        "    write(STDOUT, \"ok\\n\");\n"
+        "    return twice(twice(3));\n"
+        "}\n",
+        encoding="utf-8",
+    )
+    output = compile_module(str(source_path))
+    main_bytecode = output.function_compilation_results["main"]["bytecode"]
+
+    assert (Opcode.CALL_NATIVE, ("write", 2)) in main_bytecode
+    assert main_bytecode.count((Opcode.CALL_DIRECT, ("twice", 1))) == 2
+    assert not any(instruction[0] is Opcode.CALL_FUNCTION for instruction in main_bytecode)
+
+    vm = VBCVirtualMachine()
+    assert vm.excute(output.bytecode, output.constant_pool, source_path=str(source_path), lineno_table=output.lineno_table) == 12
+
+
+def test_linker_binds_direct_calls_and_validates_arity():
+    callee = VBCFunction(name="f", bytecode=[(Opcode.RETURN,)], param_count=1)
+    bytecode = [
+        (Opcode.LOAD_CONSTANT, 0),
+        (Opcode.STORE_GLOBAL_VAR, "f"),
+        (Opcode.CALL_DIRECT, ("f", 1)),
+        (Opcode.CALL_DIRECT, ("declared_only", 0)),
+        (Opcode.CALL_NATIVE, ("write", 2)),
+    ]
+    vm = VBCVirtualMachine()
+
+    linked_bytecode, linked_constants = vm.link(bytecode, [callee])
+
+    assert linked_bytecode[2] == (Opcode.CALL_DIRECT, (linked_constants[0], 1))
+    assert linked_bytecode[3] == bytecode[3]
+    assert linked_bytecode[4] == (Opcode.CALL_NATIVE, (vm._native_functions["write"], 2))
+    with pytest.raises(RuntimeError, match="链接错误"):
+        vm.link([*bytecode[:2], (Opcode.CALL_DIRECT, ("f", 2))], [callee])
@@ -34,12 +34,153 @@ def parse_args():
     parser.add_argument("--run-native-pe-file", help="调试模式：将 filename 作为最小 PE32+ image，用指定 JSON map 校验后通过 Windows loader 运行入口")
     parser.add_argument("--run-native-bin-memory", help="调试模式：将 filename 作为 raw native bin，用指定 JSON map 校验后在 Windows x64 可执行内存中运行入口")
     parser.add_argument("--run-native-text-bin-memory", help="调试模式：将 filename 作为 PE .text raw section，用指定 JSON map 校验补零 section 后在 Windows x64 可执行内存中运行入口")
+    parser.add_argument("--native-tier", help="混合执行：VM 执行前按函数分层，可编译为 x64 机器码的函数以 native 桩执行（需 Windows x64），其余函数解释执行；结束后打印分层报告", action="store_true")
+    parser.add_argument("--revalidate", help="忽略 __vbccache__ 中的 native 校验记录，重新执行完整的机器码/map 校验", action="store_true")
     parser.add_argument("-o", "--output", help="指定 .vbb 字节码产物输出路径")
     parser.add_argument("-rp", "--refresh-parser", help="重新生成解析器", action="store_true")
     parser.add_argument("-O", dest="optimize_level", type=int, default=0, choices=[0, 1], help="优化等级：-O0 或 -O1")
+    parser.add_argument("--codegen-jobs", type=int, default=1, metavar="N", help="函数体并行代码生成的 worker 进程数，默认 1 串行；产物与串行编译逐字节一致")
+    parser.add_argument("--connect", nargs="?", const="", metavar="SOCKET", help="客户端模式：把 .vbc 编译请求转发给 verbose-c serve 编译服务，再在本进程执行产物；SOCKET 默认取 VERBOSE_C_SOCKET 或临时目录")
     return parser.parse_args()
 
 
+def parse_build_args(argv: list[str]):
+    """解析 build 子命令参数"""
+    parser = argparse.ArgumentParser(
+        prog="verbose-c build",
+        description="Verbose-C 多文件并行构建"
+    )
+    parser.add_argument("paths", nargs="+", help="需要构建的 .vbc 源文件或目录（目录递归收集 .vbc）")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="并行 worker 进程数，默认使用 CPU 数；-j 1 在当前进程串行构建")
+    parser.add_argument("--no-warn", help="静默编译告警输出", action="store_true")
+    parser.add_argument("-rp", "--refresh-parser", help="重新生成解析器并强制全部重编译", action="store_true")
+    parser.add_argument("-O", dest="optimize_level", type=int, default=0, choices=[0, 1], help="优化等级：-O0 或 -O1")
+    return parser.parse_args(argv)
+
+
+def parse_serve_args(argv: list[str]):
+    """解析 serve 子命令参数"""
+    parser = argparse.ArgumentParser(
+        prog="verbose-c serve",
+        description="Verbose-C 常驻编译服务"
+    )
+    parser.add_argument("--socket", help="Unix 域套接字路径，默认取 VERBOSE_C_SOCKET 或临时目录")
+    parser.add_argument("--stop", help="停止正在运行的编译服务", action="store_true")
+    parser.add_argument("--status", help="查询正在运行的编译服务的缓存统计", action="store_true")
+    return parser.parse_args(argv)
+
+
+def _run_serve_command(argv: list[str]) -> int:
+    """启动、停止或查询常驻编译服务。"""
+    from verbose_c.engine.server import CompileServer, CompileServerError, default_socket_path, send_server_request
+
+    args = parse_serve_args(argv)
+    socket_path = args.socket or default_socket_path()
+    try:
+        if args.stop:
+            send_server_request(socket_path, {"command": "shutdown"}, timeout=5.0)
+            print(f"编译服务已停止: {socket_path}")
+            return 0
+        if args.status:
+            response = send_server_request(socket_path, {"command": "stats"}, timeout=5.0)
+            print(json.dumps(response, ensure_ascii=False, indent=2))
+            return 0
+        server = CompileServer(socket_path)
+        print(f"编译服务监听: {server.socket_path}")
+        sys.stdout.flush()
+        server.serve_forever()
+    except CompileServerError as error:
+        print(f"错误: {error}")
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _run_client_command(args) -> int:
+    """客户端模式：由编译服务编译源码，本进程按需执行生成的字节码。"""
+    from verbose_c.engine.server import CompileServerError, send_server_request
+
+    if os.path.splitext(args.filename)[1].lower() == ".vbb":
+        print("错误: --connect 仅支持 .vbc 源码输入")
+        return 1
+    try:
+        response = send_server_request(
+            args.connect or None,
+            {
+                "command": "compile",
+                "filename": os.path.abspath(args.filename),
+                "optimize_level": args.optimize_level,
+                "output_path": os.path.abspath(args.output) if args.output else None,
+            },
+        )
+    except CompileServerError as error:
+        print(f"错误: {error}")
+        return 1
+    if response.get("output"):
+        print(response["output"], end="")
+    if not response.get("success"):
+        print(f"编译错误: 文件 {response.get('filepath') or os.path.abspath(args.filename)}")
+        for error_line in str(response.get("error", "")).split("\n"):
+            print(f"    {error_line}")
+    if not args.no_warn:
+        for warning_line in response.get("warnings", []):
+            print(f"警告: {warning_line}")
+    if not response.get("success"):
+        return 1
+    if args.compile_only:
+        return 0
+    result = run_bytecode_file(
+        filename=response["artifact_path"],
+        log_modules=set(),
+        dump_modules=set(),
+    )
+    return result.exit_code
+
+
+def _run_build_command(argv: list[str]) -> int:
+    """执行 build 子命令并输出逐文件耗时与缓存命中情况。"""
+    from verbose_c.engine.build import collect_build_sources, run_build
+
+    args = parse_build_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        print("错误: -j/--jobs 必须大于 0")
+        return 1
+    try:
+        sources = collect_build_sources(args.paths)
+    except FileNotFoundError as error:
+        print(f"错误: 文件 '{error.filename or error.args[-1]}' 不存在")
+        return 1
+    if not sources:
+        print("错误: 未找到需要构建的 .vbc 源文件")
+        return 1
+
+    report = run_build(
+        sources,
+        jobs=args.jobs,
+        optimize_level=args.optimize_level,
+        refresh_parser=args.refresh_parser,
+    )
+    for result in report.results:
+        if result.cache_hit:
+            print(f"[缓存命中] {result.source_path} ({result.duration_seconds:.3f}s)")
+        elif result.success:
+            print(f"[已编译] {result.source_path} -> {result.artifact_path} ({result.duration_seconds:.3f}s)")
+        else:
+            print(f"[失败] {result.source_path} ({result.duration_seconds:.3f}s)")
+            for error_line in (result.error or "").split("\n"):
+                print(f"    {error_line}")
+        if not args.no_warn:
+            for warning_line in result.warnings:
+                print(f"警告: {warning_line}")
+    print(
+        f"构建完成: {len(report.results)} 个文件，编译 {report.compiled_count}，"
+        f"缓存命中 {report.cache_hit_count}，失败 {report.failed_count}，"
+        f"{report.jobs} 个 worker，总耗时 {report.duration_seconds:.3f}s"
+    )
+    return 0 if report.success else 1
+
+
 def _parse_module_sets(args):
     log_modules = set()
     dump_modules = set()
@@ -221,6 +362,11 @@ def _run_native_text_bin_memory_file(text_bin_path: str, map_path: str, native_r
 
 def main():
     """根据参数组织编译流程并分发到 engine 入口。"""
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        sys.exit(_run_build_command(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        sys.exit(_run_serve_command(sys.argv[2:]))
+
     args = parse_args()
     log_modules, dump_modules = _parse_module_sets(args)
     if log_modules is None:
@@ -409,6 +555,37 @@ def main():
     if args.compile_parser and args.emit:
         print("错误: --compile-parser 不能与 --emit 同时使用")
         sys.exit(1)
+    if args.native_tier:
+        native_tier_conflicts = [
+            (args.compile_parser, "--compile-parser"),
+            (args.compile_only, "--compile-only"),
+            (args.run_native_memory, "--run-native-memory"),
+            (args.run_native_pe, "--run-native-pe"),
+        ]
+        for enabled, option_name in native_tier_conflicts:
+            if enabled:
+                print(f"错误: {option_name} 不能与 --native-tier 同时使用")
+                sys.exit(1)
+    if args.codegen_jobs < 1:
+        print("错误: --codegen-jobs 必须大于 0")
+        sys.exit(1)
+    if args.connect is not None:
+        client_conflicts = [
+            (args.compile_parser, "--compile-parser"),
+            (args.log is not None, "--log"),
+            (args.dump is not None, "--dump"),
+            (args.run_native_memory, "--run-native-memory"),
+            (args.run_native_pe, "--run-native-pe"),
+            (args.native_result, "--native-result"),
+            (args.native_zero_exit_code, "--native-zero-exit-code"),
+            (args.native_tier, "--native-tier"),
+            (args.refresh_parser, "-rp/--refresh-parser"),
+        ] + unified_emit_conflicts
+        for enabled, option_name in client_conflicts:
+            if enabled:
+                print(f"错误: {option_name} 不能与 --connect 同时使用")
+                sys.exit(1)
+        sys.exit(_run_client_command(args))
 
     if args.compile_parser:
         dump_path = create_dump_path(grammar_file) if dump_modules else None
@@ -437,6 +614,8 @@ def main():
                 run_native_pe=args.run_native_pe,
                 native_result_path=args.native_result,
                 native_export_request=native_export_request,
+                revalidate=args.revalidate,
+                native_tiering=args.native_tier,
             )
         else:
             result = run_source_file(
@@ -453,6 +632,9 @@ def main():
                 run_native_pe=args.run_native_pe,
                 native_result_path=args.native_result,
                 native_export_request=native_export_request,
+                codegen_jobs=args.codegen_jobs,
+                revalidate=args.revalidate,
+                native_tiering=args.native_tier,
             )
         if args.run_native_memory and result.success:
             print(f"native 入口返回值: {result.exit_code}")
@@ -462,6 +644,11 @@ def main():
             print(f"native PE 入口返回值: {result.exit_code}")
             if args.native_zero_exit_code:
                 sys.exit(0)
+        if args.native_tier and result.compilation_output is not None and result.compilation_output.native_tiering is not None:
+            from verbose_c.compiler.native.tiering import format_native_tiering_report
+
+            print()
+            print(format_native_tiering_report(result.compilation_output.native_tiering), end="")
         if args.emit and result.success and result.export_report is not None:
             print(f"native 产物已导出到: {emit_dir}")
             if result.export_report.manifest_path is not None:
@@ -99,6 +99,10 @@ class _OptimizationEnv:
 
 
 class _ASTConstantOptimizer:
+    # 节点类型 -> _optimize_<类型名> / _optimize_expr_<类型名>，首次遇到该类型时解析
+    _node_dispatch: dict[type, Any] = {}
+    _expr_dispatch: dict[type, Any] = {}
+
     def __init__(self, symbol_table: SymbolTable) -> None:
         self.symbol_table = symbol_table
         self.stats = ASTOptimizationStats()
@@ -113,8 +117,12 @@ class _ASTConstantOptimizer:
     def _optimize_node(self, node: ASTNode | None, env: _OptimizationEnv):
         if node is None:
             return None
-        method = getattr(self, f"_optimize_{node.__class__.__name__}", self._optimize_generic)
-        return method(node, env)
+        node_type = type(node)
+        method = self._node_dispatch.get(node_type)
+        if method is None:
+            method = getattr(_ASTConstantOptimizer, f"_optimize_{node_type.__name__}", _ASTConstantOptimizer._optimize_generic)
+            self._node_dispatch[node_type] = method
+        return method(self, node, env)
 
     def _optimize_generic(self, node: ASTNode, env: _OptimizationEnv):
         return node
@@ -380,9 +388,14 @@ class _ASTConstantOptimizer:
     def _optimize_expr(self, node: ASTNode, env: _OptimizationEnv) -> ASTNode:
         if isinstance(node, ConstantValueNode):
             return node
-        method = getattr(self, f"_optimize_expr_{node.__class__.__name__}", None)
+        node_type = type(node)
+        try:
+            method = self._expr_dispatch[node_type]
+        except KeyError:
+            method = getattr(_ASTConstantOptimizer, f"_optimize_expr_{node_type.__name__}", None)
+            self._expr_dispatch[node_type] = method
         if method is not None:
-            return method(node, env)
+            return method(self, node, env)
         return self._optimize_node(node, env) or node
 
     def _optimize_expr_NameNode(self, node: NameNode, env: _OptimizationEnv) -> ASTNode:
@@ -466,10 +479,23 @@ class _ASTConstantOptimizer:
         return self._folded_node(node, folded)
 
     def _optimize_expr_BinaryOpNode(self, node: BinaryOpNode, env: _OptimizationEnv) -> ASTNode:
-        if node.op in (Operator.LOGICAL_AND, Operator.LOGICAL_OR):
-            return self._optimize_logical_binary(node, env)
+        # 沿左操作数展开二元表达式链并自底向上迭代折叠，长表达式链不会递归过深
+        chain = [node]
+        leftmost = node.left
+        while type(leftmost) is BinaryOpNode:
+            chain.append(leftmost)
+            leftmost = leftmost.left
+        result = self._optimize_expr(leftmost, env)
+        for binary in reversed(chain):
+            binary.left = result
+            if binary.op in (Operator.LOGICAL_AND, Operator.LOGICAL_OR):
+                result = self._fold_logical_binary(binary, env)
+            else:
+                result = self._fold_binary(binary, env)
+        return result
 
-        node.left = self._optimize_expr(node.left, env)
+    def _fold_binary(self, node: BinaryOpNode, env: _OptimizationEnv) -> ASTNode:
+        """在左操作数已优化后，优化右操作数并尝试常量折叠。"""
         node.right = self._optimize_expr(node.right, env)
         left = self._constant_value(node.left)
         right = self._constant_value(node.right)
@@ -481,8 +507,8 @@ class _ASTConstantOptimizer:
             return node
         return self._folded_node(node, folded)
 
-    def _optimize_logical_binary(self, node: BinaryOpNode, env: _OptimizationEnv) -> ASTNode:
-        node.left = self._optimize_expr(node.left, env)
+    def _fold_logical_binary(self, node: BinaryOpNode, env: _OptimizationEnv) -> ASTNode:
+        """在左操作数已优化后处理短路运算：左侧可确定结果时不再优化右操作数。"""
         left = self._constant_value(node.left)
 
         if left is not None:
@@ -668,7 +694,7 @@ class _ASTConstantOptimizer:
                 self._nested_scope_indices[self.symbol_table] = current_index + 1
 
     def _copy_optimizer_attrs(self, source: ASTNode, target: ASTNode) -> None:
-        for key, value in source.__dict__.items():
+        for key, value in iter_node_items(source):
             if key.startswith("_") and key != "_type":
                 setattr(target, key, value)
 
@@ -754,18 +780,10 @@ class _ASTConstantOptimizer:
         return table.get_nested_scope(current_index)
 
     def _contains_address_of(self, node: ASTNode) -> bool:
-        if isinstance(node, UnaryOpNode) and node.op == Operator.ADDRESS_OF:
-            return True
-        for value in node.__dict__.values():
-            if isinstance(value, ASTNode) and self._contains_address_of(value):
-                return True
-            if isinstance(value, list):
-                if any(isinstance(item, ASTNode) and self._contains_address_of(item) for item in value):
-                    return True
-            if isinstance(value, dict):
-                if any(isinstance(item, ASTNode) and self._contains_address_of(item) for item in value.values()):
-                    return True
-        return False
+        return any(
+            isinstance(child, UnaryOpNode) and child.op == Operator.ADDRESS_OF
+            for child in walk(node)
+        )
 
     def _is_side_effect_free_expr(self, node: ASTNode) -> bool:
         """判断表达式能否在分支合并时安全删除。"""
@@ -805,7 +823,7 @@ class _ASTConstantOptimizer:
         ignored = {"start_line", "start_column", "end_line", "end_column"}
         return {
             key: value
-            for key, value in node.__dict__.items()
+            for key, value in iter_node_items(node)
             if key not in ignored and not key.startswith("_")
         }
 
@@ -887,7 +905,7 @@ class _ASTConstantOptimizer:
         if signature in replacements:
             return copy.deepcopy(replacements[signature])
 
-        for key, value in list(node.__dict__.items()):
+        for key, value in list(iter_node_items(node)):
             if key.startswith("_"):
                 continue
             if isinstance(value, ASTNode):
@@ -1282,7 +1300,7 @@ class _ASTConstantOptimizer:
             replacement.end_column = node.end_column
             return replacement
 
-        for key, value in list(node.__dict__.items()):
+        for key, value in list(iter_node_items(node)):
             if key.startswith("_"):
                 continue
             if isinstance(value, ASTNode):
@@ -1331,29 +1349,13 @@ class _ASTConstantOptimizer:
         return False
 
     def _contains_call_to(self, node: ASTNode, name: str) -> bool:
-        if isinstance(node, CallNode) and isinstance(node.name, NameNode) and node.name.name == name:
-            return True
-        for value in node.__dict__.values():
-            if isinstance(value, ASTNode) and self._contains_call_to(value, name):
-                return True
-            if isinstance(value, list):
-                if any(isinstance(item, ASTNode) and self._contains_call_to(item, name) for item in value):
-                    return True
-            if isinstance(value, dict):
-                if any(isinstance(item, ASTNode) and self._contains_call_to(item, name) for item in value.values()):
-                    return True
-        return False
+        return any(
+            isinstance(child, CallNode) and isinstance(child.name, NameNode) and child.name.name == name
+            for child in walk(node)
+        )
 
     def _expr_node_count(self, node: ASTNode) -> int:
-        count = 1
-        for value in node.__dict__.values():
-            if isinstance(value, ASTNode):
-                count += self._expr_node_count(value)
-            elif isinstance(value, list):
-                count += sum(self._expr_node_count(item) for item in value if isinstance(item, ASTNode))
-            elif isinstance(value, dict):
-                count += sum(self._expr_node_count(item) for item in value.values() if isinstance(item, ASTNode))
-        return count
+        return sum(1 for _ in walk(node))
 
 
 def optimize_typed_ast(ast: ASTNode, symbol_table: SymbolTable, optimize_level: int) -> ASTOptimizationResult:
@@ -15,8 +15,10 @@ from verbose_c.error import VBCCompileError
 class Compiler:
     """
     编译器
+
+    jobs 大于 1 时，模块顶层函数体在进程池中并行生成字节码，输出与串行编译逐字节一致。
     """
-    def __init__(self, target_ast: ASTNode, optimize_level: int=0, scope_type: ScopeType=ScopeType.GLOBAL, symbol_table: SymbolTable | None = None, source_path: str | None = None, passes_to_run: list[CompilerPass] | None = None, function_name: str | None = None):
+    def __init__(self, target_ast: ASTNode, optimize_level: int=0, scope_type: ScopeType=ScopeType.GLOBAL, symbol_table: SymbolTable | None = None, source_path: str | None = None, passes_to_run: list[CompilerPass] | None = None, function_name: str | None = None, jobs: int = 1):
         self._target_ast = target_ast
         self._optimize_level = optimize_level   # 编译优化等级
         self._scope_type=scope_type
@@ -38,6 +40,7 @@ class Compiler:
             source_path=self._source_path,
             function_name=function_name,
             optimize_level=optimize_level,
+            jobs=jobs,
         )
 
         self._bytecode = []
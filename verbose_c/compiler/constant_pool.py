@@ -0,0 +1,30 @@
+from typing import Any, Hashable
+
+from verbose_c.object.struct import VBCStruct
+from verbose_c.object.t_bool import VBCBool
+from verbose_c.object.t_float import VBCFloat
+from verbose_c.object.t_integer import VBCInteger
+from verbose_c.object.t_null import VBCNull
+from verbose_c.object.t_string import VBCString
+
+
+def constant_key(value: Any) -> Hashable:
+    """
+    返回常量池去重使用的哈希键，只有键相同的常量才会共享同一个槽位。
+
+    键由对象类型、VBC 数据类型和值组成：
+    - 浮点数按 float.hex 取键，-0.0 与 0.0 互不合并，所有 NaN 合并为一个；
+    - 函数、类等没有值语义的对象按对象身份取键。
+    """
+    value_type = type(value)
+    if value_type is VBCInteger:
+        return value_type, value._object_type, value.value
+    if value_type is VBCFloat:
+        return value_type, value._object_type, value.value.hex()
+    if value_type is VBCString or value_type is VBCBool:
+        return value_type, value.value
+    if value_type is VBCNull:
+        return value_type
+    if value_type is VBCStruct:
+        return value_type, value.name, tuple(value.fields)
+    return value_type, id(value)
@@ -31,8 +31,12 @@ _BINARY_OPS = {
 }
 
 
-def lower_compiler_output_to_ir(output: Any) -> IRProgram:
-    """将编译输出中的模块与函数字节码 lowering 为 IR 程序。"""
+def lower_compiler_output_to_ir(output: Any, errors: dict[str, Exception] | None = None) -> IRProgram:
+    """
+    将编译输出中的模块与函数字节码 lowering 为 IR 程序。
+
+    提供 errors 时单个函数 lowering 失败只记入其中并跳过该函数（供混合执行分层使用），模块入口失败仍直接抛出。
+    """
     module_ir = lower_bytecode_unit_to_ir(
         name="<module>",
         bytecode=output.bytecode,
@@ -44,17 +48,23 @@ def lower_compiler_output_to_ir(output: Any) -> IRProgram:
     for name, result in output.function_compilation_results.items():
         if not isinstance(result, dict):
             continue
-        function_ir = lower_bytecode_unit_to_ir(
-            name=name,
-            bytecode=result.get("bytecode", []),
-            constants=result.get("constants", []),
-            lineno_table=result.get("lineno_table", []),
-            source_path=None,
-            param_count=result.get("param_count", _function_param_count(result)),
-            param_types=result.get("param_types", _function_param_types(result)),
-            local_count=result.get("local_count", _function_local_count(result)),
-            return_type=result.get("return_type", "int64"),
-        )
+        try:
+            function_ir = lower_bytecode_unit_to_ir(
+                name=name,
+                bytecode=result.get("bytecode", []),
+                constants=result.get("constants", []),
+                lineno_table=result.get("lineno_table", []),
+                source_path=None,
+                param_count=result.get("param_count", _function_param_count(result)),
+                param_types=result.get("param_types", _function_param_types(result)),
+                local_count=result.get("local_count", _function_local_count(result)),
+                return_type=result.get("return_type", "int64"),
+            )
+        except Exception as error:
+            if errors is None:
+                raise
+            errors[name] = error
+            continue
         result["ir"] = function_ir
         functions[name] = function_ir
     return IRProgram(module=module_ir, functions=functions)
@@ -335,6 +345,23 @@ class _LoweringContext:
             )
             stack.append(result)
             return
+        if opcode in (Opcode.CALL_DIRECT, Opcode.CALL_NATIVE):
+            self._require_operand(opcode, operand, pc)
+            if not (isinstance(operand, tuple) and len(operand) == 2 and isinstance(operand[0], str) and isinstance(operand[1], int)):
+                raise self._error(pc, f"{opcode.name} 操作数必须是 (函数名, 参数数量): {operand!r}")
+            name, argc = operand
+            args = [self._pop(stack, pc, opcode.name) for _ in range(argc)]
+            args.reverse()
+            callee = self._temp()
+            block.instructions.append(
+                IRInstruction("load_global", result=callee, args=[IRValue.global_(name)], source_pc=pc, source_line=line)
+            )
+            result = self._temp()
+            block.instructions.append(
+                IRInstruction("call", result=result, args=[callee, *args], attrs={"argc": argc}, source_pc=pc, source_line=line)
+            )
+            stack.append(result)
+            return
         if opcode == Opcode.LOAD_ADDRESS:
             self._require_operand(opcode, operand, pc)
             identifier, target_type = operand
@@ -6,6 +6,7 @@ from verbose_c.compiler.native.codegen import (
     NativeExitProbe,
     NativeRelocation,
     NativeRegisterAllocation,
+    NativeRuntimeCall,
     NativeStackSlotAllocation,
     NativeSymbol,
     format_native_code_program,
@@ -17,7 +18,7 @@ from verbose_c.compiler.native.codegen import (
 )
 from verbose_c.compiler.native.errors import NativeCodegenError, NativeLoweringError
 from verbose_c.compiler.native.formatter import format_machine_program
-from verbose_c.compiler.native.lowering import lower_ir_program_to_machine
+from verbose_c.compiler.native.lowering import lower_ir_functions_to_machine, lower_ir_program_to_machine
 from verbose_c.compiler.native.machine_ir import (
     MachineBlock,
     MachineFunction,
@@ -30,6 +31,13 @@ from verbose_c.compiler.native.machine_ir import (
 )
 from verbose_c.compiler.native.pe_writer import build_native_pe_image, validate_native_pe_image_bytes
 from verbose_c.compiler.native.target import NativeTarget
+from verbose_c.compiler.native.tiering import (
+    NativeTierDecision,
+    NativeTierImage,
+    NativeTieringPlan,
+    format_native_tiering_report,
+    plan_native_tiering,
+)
 from verbose_c.compiler.native.runner import run_native_bytes_in_memory, run_native_text_section_bytes_in_memory
 
 __all__ = [
@@ -46,23 +54,30 @@ __all__ = [
     "NativeExitProbe",
     "NativeRelocation",
     "NativeRegisterAllocation",
+    "NativeRuntimeCall",
     "NativeStackSlotAllocation",
     "NativeSymbol",
     "NativeCodegenError",
     "NativeLoweringError",
     "NativeTarget",
+    "NativeTierDecision",
+    "NativeTierImage",
+    "NativeTieringPlan",
     "StackSlot",
     "VirtualRegister",
     "format_machine_program",
     "format_native_code_program",
+    "format_native_tiering_report",
     "native_code_program_map",
     "validate_native_code_map_bytes",
     "validate_native_text_section_map_bytes",
     "validate_native_code_program_map",
     "build_native_pe_image",
     "validate_native_pe_image_bytes",
+    "lower_ir_functions_to_machine",
     "lower_ir_program_to_machine",
     "generate_native_code",
+    "plan_native_tiering",
     "run_native_bytes_in_memory",
     "run_native_text_section_bytes_in_memory",
 ]
@@ -22,10 +22,12 @@ class WindowsX64ABI:
     stack_alignment: int = 16
     shadow_space_size: int = 32
     registers: RegisterSet = WINDOWS_X64_REGISTERS
-    supported_value_types: tuple[str, ...] = ("int64", "bool64", "void")
+    supported_value_types: tuple[str, ...] = ("int64", "bool64", "float64", "void")
 
-    def argument_location(self, index: int) -> ArgumentLocation:
-        """返回第 index 个参数的 ABI 位置。"""
+    def argument_location(self, index: int, value_type: str = "int64") -> ArgumentLocation:
+        """返回第 index 个参数的 ABI 位置；前 4 个参数按位置占用 RCX/RDX/R8/R9 或 XMM0-XMM3。"""
+        if value_type == "float64" and index < len(self.registers.float_argument_registers):
+            return ArgumentLocation("register", self.registers.float_argument_registers[index], index)
         if index < len(self.registers.argument_registers):
             return ArgumentLocation("register", self.registers.argument_registers[index], index)
         stack_offset = self.shadow_space_size + (index - len(self.registers.argument_registers)) * self.word_size
@@ -41,11 +43,13 @@ class StackFrameLayout:
     local_slots: list[object] = field(default_factory=list)
     temp_slots: list[object] = field(default_factory=list)
     spill_slots: list[object] = field(default_factory=list)
+    memory_slots: list[object] = field(default_factory=list)
 
     @property
     def frame_size(self) -> int:
-        """返回栈帧大小。"""
-        return (len(self.global_slots) + len(self.local_slots) + len(self.temp_slots) + len(self.spill_slots)) * self.word_size
+        """返回栈帧大小；数组与结构体内存块按各自的字节数计入。"""
+        scalar_count = len(self.global_slots) + len(self.local_slots) + len(self.temp_slots) + len(self.spill_slots)
+        return scalar_count * self.word_size + sum(slot.size for slot in self.memory_slots)
 
 
 WINDOWS_X64_ABI = WindowsX64ABI()
@@ -1,24 +1,56 @@
 import hashlib
 import json
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
 
 from verbose_c.compiler.native.abi import WINDOWS_X64_ABI, WindowsX64ABI
 from verbose_c.compiler.native.encoder import (
     ConditionCode,
+    encode_add_rax_imm,
     encode_add_rax_r10,
+    encode_add_rax_rax,
     encode_add_rdx_r10,
     encode_add_rsp_imm32,
+    encode_call_rax,
     encode_call_rel32,
+    encode_cmp_rax_imm,
     encode_cmp_rax_r10,
+    encode_cmp_r10_imm,
     encode_cqo,
+    encode_dec_rax,
+    encode_add_r10_r10,
+    encode_btc_rax_imm8,
+    encode_cmpsd,
+    encode_cvtsi2sd_xmm_rax,
+    encode_cvttsd2si_rax_xmm,
     encode_epilogue,
     encode_idiv_r10,
+    encode_imul_rax_imm,
     encode_imul_rax_r10,
+    encode_inc_rax,
+    encode_jcc_rel8,
+    encode_jcc_rel32,
     encode_je_rel32,
+    encode_jmp_rel8,
     encode_jmp_rel32,
+    encode_jns_rel8,
     encode_jns_rel32,
     encode_jne_rel32,
+    encode_lea_rax_frame,
+    encode_lea_rax_scaled_rax,
+    encode_lea_r9_rsp_offset,
+    encode_mov_eax_imm32,
+    encode_mov_edx_imm32,
+    encode_mov_cell_from_reg,
+    encode_mov_frame_from_reg,
+    encode_mov_r10_imm32,
+    encode_mov_r10_rax,
+    encode_mov_r10d_imm32,
+    encode_mov_rax_imm32,
+    encode_mov_reg_from_cell,
+    encode_mov_reg_from_frame,
     encode_mov_rax_rdx,
+    encode_mov_rax_r10,
     encode_mov_r10_from_rbp_offset,
     encode_mov_r10_imm64,
     encode_mov_rax_from_rbp_positive_offset,
@@ -27,25 +59,42 @@ from verbose_c.compiler.native.encoder import (
     encode_mov_rax_imm64,
     encode_mov_rbp_offset_from_rax,
     encode_mov_rbp_offset_from_reg,
+    encode_mov_rbp_scaled_rax_from_r10,
     encode_mov_reg_from_rax,
+    encode_mov_reg_from_rsp_offset,
     encode_mov_r10_from_r11_offset,
     encode_mov_rdx_imm64,
     encode_mov_rsp_offset_from_rax,
+    encode_mov_rsp_offset_from_reg,
     encode_mov_r11_offset_from_rax,
     encode_mov_r11_rbp,
+    encode_movq_reg_from_xmm,
+    encode_movq_xmm_from_reg,
     encode_movzx_rax_al,
     encode_neg_rax,
     encode_prologue,
+    encode_scalar_double_op,
     encode_setcc_al,
+    encode_shl_rax_imm8,
+    encode_shr_rax_imm8,
+    encode_sub_rax_imm,
     encode_sub_rsp_imm32,
     encode_sub_rax_r10,
+    encode_test_rax_rax,
     encode_test_rdx_rdx,
+    encode_ud2,
+    encode_xor_eax_eax,
+    encode_xor_edx_edx,
+    encode_xor_r10d_r10d,
     encode_xor_rax_r10,
 )
 from verbose_c.compiler.native.errors import NativeCodegenError
 from verbose_c.compiler.native.machine_ir import MachineBlock, MachineFunction, MachineInstruction, MachineOperand, MachineProgram, MachineTerminator
 from verbose_c.compiler.native.target import NativeTarget
 
+if TYPE_CHECKING:
+    from verbose_c.fs.native_function_cache import NativeFunctionCache
+
 
 @dataclass(frozen=True)
 class NativeCodeInstruction:
@@ -119,6 +168,19 @@ class NativeExitProbe:
     source_line: int | None = None
 
 
+@dataclass(frozen=True)
+class NativeRuntimeCall:
+    """native 运行时导入调用点：加载时把 patch_offset 处的 imm64 回填为宿主 trampoline 地址。"""
+
+    offset: int
+    patch_offset: int
+    name: str
+    arg_types: tuple[str, ...] = ()
+    result_type: str = "int64"
+    source_pc: int | None = None
+    source_line: int | None = None
+
+
 @dataclass(frozen=True)
 class NativeSymbol:
     """native 机器码符号表项。"""
@@ -164,6 +226,7 @@ class NativeCodeFunction:
     register_allocation: NativeRegisterAllocation = field(default_factory=NativeRegisterAllocation)
     return_type: str = "int64"
     param_types: tuple[str, ...] = ()
+    runtime_calls: list[NativeRuntimeCall] = field(default_factory=list)
 
 
 @dataclass
@@ -177,6 +240,7 @@ class NativeCodeProgram:
     entry_offset: int = 0
     abi: WindowsX64ABI = WINDOWS_X64_ABI
     symbols: list[NativeSymbol] = field(default_factory=list)
+    runtime_strings: tuple[str, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -187,6 +251,20 @@ class _PendingJump:
     instruction_index: int
     target: str
     kind: str
+    short: bool = False
+
+
+@dataclass(frozen=True)
+class _CachedNativeFunction:
+    """
+    起始偏移归零、尚未回填函数间调用的可重定位函数机器码。
+
+    清单项数量远多于其它记录，单独按字段元组保存，放置时一次构造出平移后的清单项，减少反序列化开销。
+    """
+
+    function: NativeCodeFunction
+    instructions: tuple[tuple, ...]
+    calls: tuple[_PendingJump, ...]
 
 
 _BINARY_OP_ASM = {
@@ -206,11 +284,30 @@ _COMPARE_OPS = {
     "cmp_ge": ConditionCode.GE,
 }
 
-_SUPPORTED_RETURN_TYPES = {"int64", "bool64", "void"}
-_SUPPORTED_VALUE_TYPES = {"int64", "bool64"}
+# float64 运算：操作数经 RAX/R10 按位搬入 XMM0/XMM1，结果按位搬回 RAX 后与整数一样写回 8 字节栈槽
+_FLOAT_BINARY_OPS = {
+    "fadd": "addsd",
+    "fsub": "subsd",
+    "fmul": "mulsd",
+    "fdiv": "divsd",
+}
+
+# (cmpsd 谓词, 是否交换操作数)；gt/ge 交换后用 lt/le，保持 NaN 参与的比较为假
+_FLOAT_COMPARE_OPS = {
+    "fcmp_eq": ("eq", False),
+    "fcmp_ne": ("neq", False),
+    "fcmp_lt": ("lt", False),
+    "fcmp_le": ("le", False),
+    "fcmp_gt": ("lt", True),
+    "fcmp_ge": ("le", True),
+}
+
+_SUPPORTED_RETURN_TYPES = {"int64", "bool64", "float64", "void"}
+_SUPPORTED_VALUE_TYPES = {"int64", "bool64", "float64"}
+_INTEGER_VALUE_TYPES = {"int64", "bool64"}
 _VALUE_OPERAND_KINDS = {"imm", "slot", "vreg"}
 _RESULT_OPERAND_KINDS = {"vreg"}
-_BOOL64_RESULT_OPS = {"not_bool", "cast_int_bool", *_COMPARE_OPS}
+_BOOL64_RESULT_OPS = {"not_bool", "cast_int_bool", *_COMPARE_OPS, *_FLOAT_COMPARE_OPS}
 _INTEGER_CAST_TARGET_TYPES = {
     "char",
     "short",
@@ -281,6 +378,8 @@ _MAP_TOP_LEVEL_FIELDS = {
     "code_sha256",
     "sections",
     "symbols",
+    "runtime_strings",
+    "runtime_imports",
     "functions",
 }
 _MAP_PE_FILE_LAYOUT_FIELDS = {
@@ -553,18 +652,74 @@ _REL32_JUMP_OPCODES = {
     "jmp_rel32": b"\xE9",
     "jne_rel32": b"\x0F\x85",
     "jns_rel32": b"\x0F\x89",
+    "jl_rel32": b"\x0F\x8C",
+    "jle_rel32": b"\x0F\x8E",
+    "jg_rel32": b"\x0F\x8F",
+    "jge_rel32": b"\x0F\x8D",
+    "jae_rel32": b"\x0F\x83",
+}
+_REL8_JUMP_OPCODES = {
+    "je_rel8": b"\x74",
+    "jmp_rel8": b"\xEB",
+    "jne_rel8": b"\x75",
+    "jns_rel8": b"\x79",
+    "jl_rel8": b"\x7C",
+    "jle_rel8": b"\x7E",
+    "jg_rel8": b"\x7F",
+    "jge_rel8": b"\x7D",
+    "jae_rel8": b"\x73",
+}
+_RELATIVE_JUMP_OPCODES = {**_REL32_JUMP_OPCODES, **_REL8_JUMP_OPCODES}
+_RELATIVE_JUMP_ASM_PREFIXES = {kind: f"{kind.rsplit('_', 1)[0]} " for kind in _RELATIVE_JUMP_OPCODES}
+_JUMP_CONDITION_CODES = {
+    "je": ConditionCode.EQ,
+    "jne": ConditionCode.NE,
+    "jl": ConditionCode.LT,
+    "jle": ConditionCode.LE,
+    "jg": ConditionCode.GT,
+    "jge": ConditionCode.GE,
+    "jae": ConditionCode.AE,
 }
-_REL32_JUMP_ASM_PREFIXES = {
-    "je_rel32": "je ",
-    "jmp_rel32": "jmp ",
-    "jne_rel32": "jne ",
-    "jns_rel32": "jns ",
+_CONDITION_JUMP_KINDS = {condition: kind for kind, condition in _JUMP_CONDITION_CODES.items()}
+_NEGATED_CONDITIONS = {
+    ConditionCode.EQ: ConditionCode.NE,
+    ConditionCode.NE: ConditionCode.EQ,
+    ConditionCode.LT: ConditionCode.GE,
+    ConditionCode.GE: ConditionCode.LT,
+    ConditionCode.LE: ConditionCode.GT,
+    ConditionCode.GT: ConditionCode.LE,
+}
+_SWAPPED_CONDITIONS = {
+    ConditionCode.EQ: ConditionCode.EQ,
+    ConditionCode.NE: ConditionCode.NE,
+    ConditionCode.LT: ConditionCode.GT,
+    ConditionCode.GT: ConditionCode.LT,
+    ConditionCode.LE: ConditionCode.GE,
+    ConditionCode.GE: ConditionCode.LE,
 }
 _INT64_MIN = -(2**63)
 _INT64_MAX = 2**63 - 1
 _INT32_MAX = 2**31 - 1
 _SUPPORTED_ARGUMENT_REGISTERS = {"RCX", "RDX", "R8", "R9"}
-_SUPPORTED_VREG_TYPES = {"int64", "bool64"}
+# str64 是程序字符串表句柄，只在栈槽之间搬运并作为运行时导入调用的实参/结果
+_SUPPORTED_VREG_TYPES = {"int64", "bool64", "float64", "str64"}
+_RUNTIME_RESULT_TYPES = {"int64", "bool64", "str64"}
+# 运行时导入调用窗口：[rsp+0..31] shadow space，[rsp+32] 结果槽（R9 指向），[rsp+40] 保存 R11 global frame
+_RUNTIME_CALL_MAX_ARGS = 3
+_RUNTIME_CALL_RESULT_OFFSET = 32
+_RUNTIME_CALL_R11_OFFSET = 40
+_RUNTIME_CALL_STACK_SIZE = 48
+_RUNTIME_IMPORT_PATCH_PREFIX = b"\x48\xB8"
+# 可能经单元地址改写全局槽或被取地址栈槽的 Machine IR 指令
+_MEMORY_CLOBBER_OPS = {"store_index", "store_mem", "call"}
+_UNROLLED_ZERO_FILL_WORDS = 8
+_STACK_PAGE_SIZE = 4096
+# 运行期检查失败时跳转的共用 ud2 陷阱块，按 _synthetic_label 前缀区分原因
+_TRAP_MESSAGES = {
+    "bounds_trap": "native array index out of range",
+    "float_div_trap": "native float division by zero",
+    "float_cast_trap": "native float to int conversion out of range",
+}
 
 
 def _function_param_types(function: MachineFunction) -> list[str]:
@@ -614,11 +769,85 @@ def _encode_rel32_jump(kind: str, displacement: int) -> bytes:
         return encode_jne_rel32(displacement)
     if kind == "jns":
         return encode_jns_rel32(displacement)
+    if kind in _JUMP_CONDITION_CODES:
+        return encode_jcc_rel32(_JUMP_CONDITION_CODES[kind], displacement)
     raise NativeCodegenError(f"native 机器码 MVP 暂不支持 rel32 跳转 {kind}")
 
 
-def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
-    """从 Machine IR 生成 x64 机器码 MVP。"""
+def _encode_rel8_jump(kind: str, displacement: int) -> bytes:
+    """按跳转助记符编码 rel8 短跳转。"""
+    if kind == "jmp":
+        return encode_jmp_rel8(displacement)
+    if kind == "jns":
+        return encode_jns_rel8(displacement)
+    if kind in _JUMP_CONDITION_CODES:
+        return encode_jcc_rel8(_JUMP_CONDITION_CODES[kind], displacement)
+    raise NativeCodegenError(f"native 机器码 MVP 暂不支持 rel8 跳转 {kind}")
+
+
+def _relocation_patch_size(kind: str) -> int:
+    """返回修补记录的位移字段字节数：rel8 短跳转为 1，其余为 4。"""
+    return 1 if kind in _REL8_JUMP_OPCODES else 4
+
+
+def _short_immediate_load(register: str, value: int) -> tuple[bytes, str]:
+    """为 RAX/R10 选择最短的立即数装载编码，返回机器码与伪汇编。"""
+    if register == "RAX":
+        zero, unsigned32, signed32, full = encode_xor_eax_eax, encode_mov_eax_imm32, encode_mov_rax_imm32, encode_mov_rax_imm64
+        names = ("eax", "rax")
+    else:
+        zero, unsigned32, signed32, full = encode_xor_r10d_r10d, encode_mov_r10d_imm32, encode_mov_r10_imm32, encode_mov_r10_imm64
+        names = ("r10d", "r10")
+    if value == 0:
+        return zero(), f"xor {names[0]}, {names[0]}"
+    if 0 < value <= 0xFFFFFFFF:
+        return unsigned32(value), f"mov {names[0]}, {value}"
+    if -(2**31) <= value < 0:
+        return signed32(value), f"mov {names[1]}, {value}"
+    return full(value), f"mov {names[1]}, {value}"
+
+
+def _count_vreg_uses(function: MachineFunction) -> dict[str, int]:
+    """统计每个虚拟寄存器作为操作数被读取的次数（含 phi 输入与终结指令）。"""
+    counts: dict[str, int] = {}
+    for block in function.blocks:
+        operands = [operand for instruction in block.instructions for operand in instruction.args]
+        if block.terminator is not None:
+            operands.extend(block.terminator.args)
+        for operand in operands:
+            if operand.kind == "vreg":
+                name = str(operand.value.name)
+                counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def _immediate_vreg_values(function: MachineFunction) -> dict[str, int]:
+    """收集由 load_imm 定义的虚拟寄存器；Machine IR 虚拟寄存器只定义一次，可在任意使用点重新物化。"""
+    return {
+        str(instruction.result.value.name): int(instruction.args[0].value)
+        for block in function.blocks
+        for instruction in block.instructions
+        if instruction.op == "load_imm"
+        and instruction.result is not None
+        and instruction.result.kind == "vreg"
+        and instruction.args
+        and instruction.args[0].kind == "imm"
+    }
+
+
+def generate_native_code(
+    program: MachineProgram,
+    function_cache: "NativeFunctionCache | None" = None,
+    optimize_level: int = 0,
+) -> NativeCodeProgram:
+    """
+    从 Machine IR 生成 x64 机器码 MVP。
+
+    提供 function_cache 时，生成输入未变化的函数跳过逐函数校验与代码生成，直接复用缓存的可重定位机器码，
+    最后与新生成的函数一起回填调用位移。
+    optimize_level >= 1 时启用窥孔优化：复用 RAX 中已有的值、删除只被下一条指令读取的临时值写回、
+    使用短立即数/短位移编码、把比较与条件分支融合为 cmp + jcc，并把位移落在 int8 范围内的跳转收缩为 rel8。
+    """
     if program.target != NativeTarget.WINDOWS_X64:
         raise NativeCodegenError(f"native 机器码 MVP 暂不支持目标平台 {program.target}")
     _validate_program_abi(program)
@@ -673,8 +902,9 @@ def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
             if param_type not in _SUPPORTED_VALUE_TYPES:
                 raise NativeCodegenError(f"native 机器码 MVP 函数 {function.name} 第 {index} 个参数暂不支持类型 {param_type}")
     for function in ordered_functions:
+        param_types = _function_param_types(function)
         for index, param in enumerate(function.params):
-            expected = program.abi.argument_location(index)
+            expected = program.abi.argument_location(index, param_types[index])
             if param != expected:
                 raise NativeCodegenError(
                     f"native 机器码 MVP 函数 {function.name} 第 {index} 个参数位置不符合 ABI: "
@@ -718,7 +948,27 @@ def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
         for name, function in program.functions.items()
     }
     function_param_types[entry_function.name] = _function_param_types(entry_function)
+    cache_keys: dict[str, str] = {}
+    cached_functions: dict[str, _CachedNativeFunction] = {}
+    if function_cache is not None:
+        for function in ordered_functions:
+            key = _native_function_cache_key(
+                function,
+                function_names,
+                function_return_types,
+                function_param_counts,
+                function_param_types,
+                program.abi,
+                function.name == global_frame_owner_name,
+                optimize_level,
+            )
+            cache_keys[function.name] = key
+            cached = function_cache.load(key)
+            if isinstance(cached, _CachedNativeFunction):
+                cached_functions[function.name] = cached
     for function in ordered_functions:
+        if function.name in cached_functions:
+            continue
         _validate_block_structure(function)
         _validate_operand_storage_shapes(function)
         _validate_instruction_shapes(function)
@@ -731,7 +981,12 @@ def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
         _validate_phi_sources_defined(function)
         _validate_call_argument_types(function, function_param_types)
     for function in ordered_functions:
-        generated = _NativeCodegenContext(
+        cached = cached_functions.get(function.name)
+        if cached is not None:
+            functions[function.name] = _place_cached_native_function(cached, code, function_offsets, pending_calls)
+            continue
+        first_call = len(pending_calls)
+        generated = _generate_native_function(
             function,
             code,
             function_offsets,
@@ -742,8 +997,12 @@ def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
             function_param_types,
             program.abi,
             function.name == global_frame_owner_name,
-        ).generate()
+            optimize_level,
+        )
         functions[function.name] = generated
+        if function_cache is not None:
+            # 必须在 _patch_pending_calls 改写清单与重定位之前记录
+            function_cache.store(cache_keys[function.name], _cache_native_function(generated, pending_calls[first_call:]))
     _patch_pending_calls(code, pending_calls, function_offsets, functions)
     program_code = bytes(code)
     for name, function in list(functions.items()):
@@ -764,6 +1023,7 @@ def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
             register_allocation=function.register_allocation,
             return_type=function.return_type,
             param_types=function.param_types,
+            runtime_calls=function.runtime_calls,
         )
     return NativeCodeProgram(
         target=program.target,
@@ -783,9 +1043,168 @@ def generate_native_code(program: MachineProgram) -> NativeCodeProgram:
             )
             for function in sorted(functions.values(), key=lambda item: item.offset)
         ],
+        runtime_strings=tuple(program.runtime_strings),
+    )
+
+
+def _native_function_cache_key(
+    function: MachineFunction,
+    function_names: set[str],
+    function_return_types: dict[str, str],
+    function_param_counts: dict[str, int],
+    function_param_types: dict[str, list[str]],
+    abi: WindowsX64ABI,
+    global_frame_owner: bool,
+    optimize_level: int = 0,
+) -> str:
+    """计算单个函数机器码缓存的 key：覆盖代码生成读取的全部程序级信息。"""
+    from verbose_c.fs.native_function_cache import NativeFunctionCache
+
+    callees = sorted({
+        str(instruction.args[0].value)
+        for block in function.blocks
+        for instruction in block.instructions
+        if instruction.op == "call" and instruction.args and instruction.args[0].kind == "symbol"
+    })
+    signatures = tuple(
+        (
+            name,
+            name in function_names,
+            function_return_types.get(name),
+            function_param_counts.get(name),
+            tuple(function_param_types.get(name, ())),
+        )
+        for name in [function.name, *callees]
+    )
+    return NativeFunctionCache.key(function, signatures, abi, global_frame_owner, optimize_level)
+
+
+def _generate_native_function(
+    function: MachineFunction,
+    code: bytearray,
+    function_offsets: dict[str, int],
+    pending_calls: list[_PendingJump],
+    function_names: set[str],
+    function_return_types: dict[str, str],
+    function_param_counts: dict[str, int],
+    function_param_types: dict[str, list[str]],
+    abi: WindowsX64ABI,
+    global_frame_owner: bool,
+    optimize_level: int,
+) -> NativeCodeFunction:
+    """
+    生成单个函数的机器码，-O1 起迭代收缩短跳转。
+
+    每轮把 rel32 位移已落在 int8 范围内的跳转改为 rel8 后重新生成；收缩只会缩短其它跳转的距离，
+    已收缩的跳转不会重新越界，集合单调增长直到不动点。
+    """
+    start_offset = len(code)
+    first_call = len(pending_calls)
+    short_jumps: frozenset[int] = frozenset()
+    while True:
+        context = _NativeCodegenContext(
+            function,
+            code,
+            function_offsets,
+            pending_calls,
+            function_names,
+            function_return_types,
+            function_param_counts,
+            function_param_types,
+            abi,
+            global_frame_owner,
+            optimize_level,
+            short_jumps,
+        )
+        generated = context.generate()
+        if context.relaxable_jumps <= short_jumps:
+            return generated
+        short_jumps = short_jumps | context.relaxable_jumps
+        del code[start_offset:]
+        del pending_calls[first_call:]
+
+
+def _shift_pending_jump(jump: _PendingJump, delta: int) -> _PendingJump:
+    return _PendingJump(jump.offset + delta, jump.instruction_index, jump.target, jump.kind)
+
+
+def _shift_optional_offset(offset: int | None, delta: int) -> int | None:
+    return None if offset is None else offset + delta
+
+
+def _shift_native_function(
+    function: NativeCodeFunction,
+    delta: int,
+    instructions: list[NativeCodeInstruction],
+) -> NativeCodeFunction:
+    """平移函数内所有绝对偏移；栈槽偏移相对栈帧，保持不变。"""
+    return replace(
+        function,
+        offset=function.offset + delta,
+        instructions=instructions,
+        call_frames=[
+            replace(
+                frame,
+                offset=frame.offset + delta,
+                call_offset=_shift_optional_offset(frame.call_offset, delta),
+                call_end_offset=_shift_optional_offset(frame.call_end_offset, delta),
+                add_offset=_shift_optional_offset(frame.add_offset, delta),
+                add_end_offset=_shift_optional_offset(frame.add_end_offset, delta),
+            )
+            for frame in function.call_frames
+        ],
+        relocations=[
+            replace(relocation, offset=relocation.offset + delta, patch_offset=relocation.patch_offset + delta)
+            for relocation in function.relocations
+        ],
+        exit_probes=[
+            replace(
+                probe,
+                call_offset=probe.call_offset + delta,
+                test_offset=probe.test_offset + delta,
+                jump_offset=probe.jump_offset + delta,
+            )
+            for probe in function.exit_probes
+        ],
+        runtime_calls=[
+            replace(call, offset=call.offset + delta, patch_offset=call.patch_offset + delta)
+            for call in function.runtime_calls
+        ],
     )
 
 
+def _cache_native_function(function: NativeCodeFunction, calls: list[_PendingJump]) -> _CachedNativeFunction:
+    """把刚生成、尚未回填调用的函数转换为起始偏移归零的缓存记录。"""
+    delta = -function.offset
+    return _CachedNativeFunction(
+        _shift_native_function(function, delta, []),
+        tuple(
+            (item.offset + delta, item.code, item.asm, item.source_op, item.source_pc, item.source_line, item.source_attrs)
+            for item in function.instructions
+        ),
+        tuple(_shift_pending_jump(call, delta) for call in calls),
+    )
+
+
+def _place_cached_native_function(
+    cached: _CachedNativeFunction,
+    code: bytearray,
+    function_offsets: dict[str, int],
+    pending_calls: list[_PendingJump],
+) -> NativeCodeFunction:
+    """把缓存的可重定位函数追加到程序末尾，并登记其待回填调用。"""
+    start_offset = len(code)
+    instructions = [
+        NativeCodeInstruction(offset + start_offset, item_code, asm, source_op, source_pc, source_line, source_attrs)
+        for offset, item_code, asm, source_op, source_pc, source_line, source_attrs in cached.instructions
+    ]
+    function = _shift_native_function(cached.function, start_offset, instructions)
+    code.extend(function.code)
+    function_offsets[function.name] = start_offset
+    pending_calls.extend(_shift_pending_jump(call, start_offset) for call in cached.calls)
+    return function
+
+
 def _validate_program_abi(program: MachineProgram) -> None:
     """校验 ABI 能被当前 x64 MVP 编码器支持。"""
     abi = program.abi
@@ -887,6 +1306,7 @@ def _validate_operand_storage_shapes(function: MachineFunction) -> None:
     _validate_frame_slots(function, "local", function.frame.local_slots)
     _validate_frame_slots(function, "temp", function.frame.temp_slots)
     _validate_frame_slots(function, "spill", function.frame.spill_slots)
+    _validate_frame_slots(function, "memory", function.frame.memory_slots)
     for block in function.blocks:
         for instruction in block.instructions:
             if instruction.result is not None:
@@ -959,8 +1379,8 @@ def _validate_operand_storage_shape(function: MachineFunction, node: MachineInst
 
 
 def _validate_value_operand_type(function: MachineFunction, node: MachineInstruction | MachineTerminator, operand: MachineOperand) -> None:
-    """校验值操作数类型属于当前 MVP 标量集合。"""
-    if operand.type_hint in _SUPPORTED_VALUE_TYPES:
+    """校验值操作数类型属于当前 MVP 标量集合或 str64 句柄。"""
+    if operand.type_hint in _SUPPORTED_VREG_TYPES:
         return
     raise _machine_node_error(
         function,
@@ -994,11 +1414,13 @@ def _validate_stack_slot_shape(
     kind = getattr(slot, "kind", None)
     index = getattr(slot, "index", None)
     size = getattr(slot, "size", None)
-    if kind not in {"global", "local", "temp"}:
+    if kind not in {"global", "local", "temp", "memory"}:
         message = f"native 机器码 MVP 栈槽类型暂不支持 {kind}"
     elif index is None or index == "":
         message = f"native 机器码 MVP {kind} 栈槽索引不能为空"
-    elif size != 8:
+    elif kind == "memory" and (not isinstance(size, int) or isinstance(size, bool) or size <= 0 or size % 8):
+        message = f"native 机器码 MVP memory[{index}] 内存块大小必须为 8 字节的正整数倍，实际 {size}"
+    elif kind != "memory" and size != 8:
         message = f"native 机器码 MVP {kind}[{index}] 栈槽大小必须为 8 字节，实际 {size}"
     else:
         return
@@ -1026,13 +1448,65 @@ def _validate_instruction_shapes(function: MachineFunction) -> None:
                 _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
                 _require_arg_count(function, instruction, 1)
                 _require_operand_kinds(function, instruction, 0, {"slot"})
+                _require_scalar_slot(function, instruction, 0)
                 continue
             if op == "store_stack":
                 _require_no_result(function, instruction)
                 _require_arg_count(function, instruction, 2)
                 _require_operand_kinds(function, instruction, 0, {"slot"})
+                _require_scalar_slot(function, instruction, 0)
                 _require_operand_kinds(function, instruction, 1, _VALUE_OPERAND_KINDS)
                 continue
+            if op in {"alloc_block", "copy_block"}:
+                _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                _require_result_type(function, instruction, "int64")
+                _require_arg_count(function, instruction, 2 if op == "copy_block" else 1)
+                _require_operand_kinds(function, instruction, 0, {"slot"})
+                if instruction.args[0].value.kind != "memory":
+                    raise _machine_node_error(function, instruction, f"native 机器码 MVP {op} 必须写入 memory 内存块")
+                words = instruction.attrs.get("words")
+                if not isinstance(words, int) or isinstance(words, bool) or words < 0:
+                    raise _machine_node_error(function, instruction, f"native 机器码 MVP {op} words 必须是非负整数")
+                if max(words, 1) * 8 != instruction.args[0].value.size:
+                    raise _machine_node_error(
+                        function,
+                        instruction,
+                        f"native 机器码 MVP {op} words={words} 与 memory[{instruction.args[0].value.index}] 大小 {instruction.args[0].value.size} 不一致",
+                    )
+                if op == "copy_block":
+                    _require_operand_kinds(function, instruction, 1, _VALUE_OPERAND_KINDS)
+                continue
+            if op in {"load_index", "store_index"}:
+                _require_arg_count(function, instruction, 2 if op == "load_index" else 3)
+                if op == "load_index":
+                    _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                else:
+                    _require_no_result(function, instruction)
+                for index in range(len(instruction.args)):
+                    _require_operand_kinds(function, instruction, index, _VALUE_OPERAND_KINDS)
+                length = instruction.attrs.get("length")
+                if not isinstance(length, int) or isinstance(length, bool) or not 0 <= length <= _INT32_MAX:
+                    raise _machine_node_error(function, instruction, f"native 机器码 MVP {op} length 必须是 0..{_INT32_MAX} 的整数")
+                continue
+            if op in {"load_mem", "store_mem"}:
+                _require_arg_count(function, instruction, 1 if op == "load_mem" else 2)
+                if op == "load_mem":
+                    _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                else:
+                    _require_no_result(function, instruction)
+                for index in range(len(instruction.args)):
+                    _require_operand_kinds(function, instruction, index, _VALUE_OPERAND_KINDS)
+                offset = instruction.attrs.get("offset")
+                if not isinstance(offset, int) or isinstance(offset, bool) or not 0 <= offset * 8 <= _INT32_MAX:
+                    raise _machine_node_error(function, instruction, f"native 机器码 MVP {op} offset 必须是可编码为 disp32 的非负字偏移")
+                continue
+            if op == "slot_address":
+                _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                _require_result_type(function, instruction, "int64")
+                _require_arg_count(function, instruction, 1)
+                _require_operand_kinds(function, instruction, 0, {"slot"})
+                _require_scalar_slot(function, instruction, 0)
+                continue
             if op == "phi":
                 _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
                 for index in range(len(instruction.args)):
@@ -1056,12 +1530,32 @@ def _validate_instruction_shapes(function: MachineFunction) -> None:
                 _require_arg_count(function, instruction, 2)
                 _require_operand_kinds(function, instruction, 0, _VALUE_OPERAND_KINDS)
                 _require_operand_kinds(function, instruction, 1, _VALUE_OPERAND_KINDS)
+                _require_operand_types(function, instruction, _INTEGER_VALUE_TYPES)
+                continue
+            if op in _FLOAT_BINARY_OPS or op in _FLOAT_COMPARE_OPS:
+                _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                _require_result_type(function, instruction, "bool64" if op in _FLOAT_COMPARE_OPS else "float64")
+                _require_arg_count(function, instruction, 2)
+                _require_operand_kinds(function, instruction, 0, _VALUE_OPERAND_KINDS)
+                _require_operand_kinds(function, instruction, 1, _VALUE_OPERAND_KINDS)
+                _require_operand_types(function, instruction, {"float64"})
+                continue
+            if op in {"fneg", "cvt_int_float", "cvt_float_int"}:
+                _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                _require_result_type(function, instruction, "int64" if op == "cvt_float_int" else "float64")
+                _require_arg_count(function, instruction, 1)
+                _require_operand_kinds(function, instruction, 0, _VALUE_OPERAND_KINDS)
+                _require_operand_types(function, instruction, _INTEGER_VALUE_TYPES if op == "cvt_int_float" else {"float64"})
+                target_type = instruction.attrs.get("target_type")
+                if op == "cvt_float_int" and target_type not in _INTEGER_CAST_TARGET_TYPES:
+                    raise _machine_node_error(function, instruction, f"native 机器码 MVP cvt_float_int target_type 暂不支持 {target_type}")
                 continue
             if op in {"neg", "not_bool", "cast_bool_int", "cast_int_bool"}:
                 _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
                 _require_result_type(function, instruction, "bool64" if op in _BOOL64_RESULT_OPS else "int64")
                 _require_arg_count(function, instruction, 1)
                 _require_operand_kinds(function, instruction, 0, _VALUE_OPERAND_KINDS)
+                _require_operand_types(function, instruction, _INTEGER_VALUE_TYPES)
                 if op == "cast_bool_int":
                     target_type = instruction.attrs.get("target_type")
                     if not isinstance(target_type, str) or not target_type:
@@ -1084,15 +1578,37 @@ def _validate_instruction_shapes(function: MachineFunction) -> None:
                 for index in range(1, len(instruction.args)):
                     _require_operand_kinds(function, instruction, index, _VALUE_OPERAND_KINDS)
                 continue
+            if op == "call_runtime":
+                _require_arg_at_least(function, instruction, 1)
+                _require_operand_kinds(function, instruction, 0, {"symbol"})
+                _require_result_kind(function, instruction, _RESULT_OPERAND_KINDS)
+                call_args = instruction.args[1:]
+                for index in range(1, len(instruction.args)):
+                    _require_operand_kinds(function, instruction, index, _VALUE_OPERAND_KINDS)
+                if len(call_args) > _RUNTIME_CALL_MAX_ARGS:
+                    raise _machine_node_error(
+                        function,
+                        instruction,
+                        f"native 机器码 MVP call_runtime 最多支持 {_RUNTIME_CALL_MAX_ARGS} 个参数，实际 {len(call_args)} 个",
+                    )
+                if instruction.attrs.get("arg_types") != [operand.type_hint for operand in call_args]:
+                    raise _machine_node_error(function, instruction, "native 机器码 MVP call_runtime arg_types 元数据与实参类型不一致")
+                result_type = instruction.attrs.get("result_type")
+                if result_type not in _RUNTIME_RESULT_TYPES:
+                    raise _machine_node_error(function, instruction, f"native 机器码 MVP call_runtime 暂不支持结果类型 {result_type}")
+                _require_result_type(function, instruction, result_type)
+                continue
             if op == "exit":
                 _require_no_result(function, instruction)
                 _require_arg_count(function, instruction, 1)
                 _require_operand_kinds(function, instruction, 0, _VALUE_OPERAND_KINDS)
+                _require_operand_types(function, instruction, _INTEGER_VALUE_TYPES)
                 continue
             if op == "set_exit_code":
                 _require_no_result(function, instruction)
                 _require_arg_count(function, instruction, 1)
                 _require_operand_kinds(function, instruction, 0, _VALUE_OPERAND_KINDS)
+                _require_operand_types(function, instruction, _INTEGER_VALUE_TYPES)
 
 
 def _validate_terminator_shapes(function: MachineFunction) -> None:
@@ -1106,7 +1622,7 @@ def _validate_terminator_shapes(function: MachineFunction) -> None:
                 raise _machine_node_error(function, terminator, "native 机器码 MVP ret 不应携带跳转目标")
             if function.return_type == "void" and terminator.args:
                 raise _machine_node_error(function, terminator, "native 机器码 MVP void 函数 ret 不应携带返回值")
-            if function.return_type in {"int64", "bool64"} and len(terminator.args) != 1:
+            if function.return_type in _SUPPORTED_VALUE_TYPES and len(terminator.args) != 1:
                 raise _machine_node_error(function, terminator, f"native 机器码 MVP {function.return_type} 函数 ret 必须携带 1 个返回值")
             if terminator.args:
                 _require_operand_kinds(function, terminator, 0, _VALUE_OPERAND_KINDS)
@@ -1127,6 +1643,7 @@ def _validate_terminator_shapes(function: MachineFunction) -> None:
             if len(terminator.args) != 1 or len(terminator.targets) != 2:
                 raise _machine_node_error(function, terminator, "native 机器码 MVP 需要 br 包含 1 个条件和 2 个目标")
             _require_operand_kinds(function, terminator, 0, _VALUE_OPERAND_KINDS)
+            _require_operand_types(function, terminator, _INTEGER_VALUE_TYPES)
 
 
 def _validate_call_metadata_shape(function: MachineFunction, instruction: MachineInstruction) -> None:
@@ -1168,6 +1685,17 @@ def _require_result_kind(function: MachineFunction, instruction: MachineInstruct
         )
 
 
+def _require_scalar_slot(function: MachineFunction, instruction: MachineInstruction, index: int) -> None:
+    """要求第 index 个操作数是 8 字节标量栈槽，memory 内存块只能经单元地址访问。"""
+    slot = instruction.args[index].value
+    if getattr(slot, "kind", None) == "memory":
+        raise _machine_node_error(
+            function,
+            instruction,
+            f"native 机器码 MVP {instruction.op} 不能直接访问 memory[{slot.index}] 内存块",
+        )
+
+
 def _require_result_type(function: MachineFunction, instruction: MachineInstruction, expected: str) -> None:
     """校验指令结果虚拟寄存器类型。"""
     actual = getattr(instruction.result, "type_hint", None)
@@ -1228,6 +1756,18 @@ def _require_operand_kinds(function: MachineFunction, node: MachineInstruction |
     )
 
 
+def _require_operand_types(function: MachineFunction, node: MachineInstruction | MachineTerminator, types: set[str]) -> None:
+    """校验节点全部参数的值类型；整数指令不能读取 float64 位模式，浮点指令需先显式转换整数。"""
+    for index, operand in enumerate(node.args):
+        if operand.type_hint not in types:
+            expected = " / ".join(sorted(types))
+            raise _machine_node_error(
+                function,
+                node,
+                f"native 机器码 MVP {node.op} 第 {index} 个参数值类型应为 {expected}，实际 {operand.type_hint}",
+            )
+
+
 def _validate_vreg_use_order(function: MachineFunction) -> None:
     """校验 Machine IR 虚拟寄存器不会在定义前被读取。"""
     defined: set[str] = set()
@@ -1268,6 +1808,7 @@ def _define_vreg(function: MachineFunction, instruction: MachineInstruction, ope
 def _validate_static_machine_hazards(function: MachineFunction) -> None:
     """拒绝静态可判定会触发 x64 机器语义错误的场景。"""
     in_values, in_slots, out_values, out_slots = _compute_static_known_states(function)
+    escaped_slots = _static_escaped_slot_keys(function)
     for block in function.blocks:
         _walk_static_known_block(
             function,
@@ -1277,6 +1818,7 @@ def _validate_static_machine_hazards(function: MachineFunction) -> None:
             predecessor_values=out_values,
             predecessor_slots=out_slots,
             raise_idiv_errors=True,
+            escaped_slots=escaped_slots,
         )
 
 
@@ -1294,6 +1836,7 @@ def _compute_static_known_states(
     out_values: dict[str, dict[str, int | None]] = {block.name: {} for block in function.blocks}
     out_slots: dict[str, dict[tuple[str, int | str], int | None]] = {block.name: {} for block in function.blocks}
     predecessors = _cfg_predecessors(function)
+    escaped_slots = _static_escaped_slot_keys(function)
     changed = True
     iteration = 0
     max_iterations = max(16, len(function.blocks) * len(function.blocks) * 4)
@@ -1315,6 +1858,7 @@ def _compute_static_known_states(
                 predecessor_values=out_values,
                 predecessor_slots=out_slots,
                 raise_idiv_errors=False,
+                escaped_slots=escaped_slots,
             )
             if values != in_values[block.name] or slots != in_slots[block.name]:
                 in_values[block.name] = values
@@ -1378,6 +1922,7 @@ def _walk_static_known_block(
     predecessor_values: dict[str, dict[str, int | None]],
     predecessor_slots: dict[str, dict[tuple[str, int | str], int | None]],
     raise_idiv_errors: bool,
+    escaped_slots: frozenset[tuple[str, int | str]] = frozenset(),
 ) -> tuple[dict[str, int | None], dict[tuple[str, int | str], int | None]]:
     """模拟单个基本块内的静态常量状态。"""
     known_values = dict(in_values)
@@ -1400,6 +1945,23 @@ def _walk_static_known_block(
                     instruction,
                     "native 机器码 MVP 暂不生成会触发 signed int64 溢出的 idiv/imod 机器码",
                 )
+        if raise_idiv_errors and instruction.op == "fdiv":
+            known_divisor = _static_known_value(instruction.args[1], known_values, known_slots)
+            if known_divisor is not None and known_divisor & _INT64_MAX == 0:
+                raise _machine_node_error(
+                    function,
+                    instruction,
+                    "native 机器码 MVP 暂不生成除数为 ±0.0 的浮点除法机器码",
+                )
+        if raise_idiv_errors and instruction.op in {"load_index", "store_index"}:
+            known_index = _static_known_value(instruction.args[1], known_values, known_slots)
+            length = int(instruction.attrs.get("length", 0))
+            if known_index is not None and not 0 <= known_index < length:
+                raise _machine_node_error(
+                    function,
+                    instruction,
+                    f"native 机器码 MVP 暂不生成静态可判定越界的 {instruction.op} 机器码: 下标 {known_index}，长度 {length}",
+                )
         _, overflows = _static_wrapping_arithmetic_result(instruction, known_values, known_slots)
         if raise_idiv_errors and overflows:
             raise _machine_node_error(
@@ -1407,6 +1969,8 @@ def _walk_static_known_block(
                 instruction,
                 f"native 机器码 MVP 暂不生成静态可判定会超出 signed int64 范围的 {instruction.op} 机器码",
             )
+        if instruction.op in _MEMORY_CLOBBER_OPS:
+            _static_forget_memory_slots(known_slots, escaped_slots)
         if instruction.op == "store_stack":
             known_slots[_static_stack_slot_key(instruction.args[0])] = _static_known_value(instruction.args[1], known_values, known_slots)
             continue
@@ -1543,6 +2107,26 @@ def _static_stack_slot_key(operand: MachineOperand) -> tuple[str, int | str]:
     return operand.value.kind, operand.value.index
 
 
+def _static_escaped_slot_keys(function: MachineFunction) -> frozenset[tuple[str, int | str]]:
+    """收集被 slot_address 取地址的栈槽键。"""
+    return frozenset(
+        _static_stack_slot_key(instruction.args[0])
+        for block in function.blocks
+        for instruction in block.instructions
+        if instruction.op == "slot_address" and instruction.args
+    )
+
+
+def _static_forget_memory_slots(
+    known_slots: dict[tuple[str, int | str], int | None],
+    escaped_slots: frozenset[tuple[str, int | str]],
+) -> None:
+    """经单元地址写内存或调用函数后，全局槽与被取地址的栈槽可能已被改写，清除其静态常量。"""
+    for key in list(known_slots):
+        if key[0] == "global" or key in escaped_slots:
+            known_slots[key] = None
+
+
 def _validate_exit_instructions(function: MachineFunction) -> None:
     """校验 native exit 指令形状。"""
     for block in function.blocks:
@@ -1749,6 +2333,21 @@ def format_native_code_program(program: NativeCodeProgram) -> str:
     else:
         lines.append("| `-` | `-` | `-` | `-` | `0000` | `0000` | `0x00000000` | `0x0000000000000000` | `0` | `0x00000000` | `0x0000000000000000` | `-` | `no` |\n")
     lines.append("\n")
+    runtime_imports = _native_runtime_imports(program)
+    if runtime_imports:
+        lines.extend([
+            "### 运行时导入表\n\n",
+            "| 名称 | 实参类型 | 结果类型 | 调用点 |\n",
+            "| --- | --- | --- | --- |\n",
+        ])
+        for (name, arg_types, result_type), sites in runtime_imports.items():
+            site_text = ", ".join(f"{function_name}+{call.offset - program.functions[function_name].offset:04X}" for function_name, call in sites)
+            lines.append(f"| `{name}` | `{', '.join(arg_types) if arg_types else '-'}` | `{result_type}` | `{site_text}` |\n")
+        lines.append("\n")
+    if program.runtime_strings:
+        lines.extend(["### 运行时字符串\n\n", "| 句柄 | 内容 |\n", "| --- | --- |\n"])
+        lines.extend(f"| `{handle}` | `{value!r}` |\n" for handle, value in enumerate(program.runtime_strings))
+        lines.append("\n")
     for function in program.functions.values():
         lines.extend(_format_function(function, program.functions))
     return "".join(lines)
@@ -2146,9 +2745,37 @@ def native_code_program_map(program: NativeCodeProgram) -> dict[str, object]:
             }
             for function in program.functions.values()
         ],
+        "runtime_strings": list(program.runtime_strings),
+        "runtime_imports": [
+            {
+                "name": name,
+                "arg_types": list(arg_types),
+                "result_type": result_type,
+                "sites": [
+                    {
+                        "function": function_name,
+                        "offset": call.offset,
+                        "patch_offset": call.patch_offset,
+                        "source_pc": call.source_pc,
+                        "source_line": call.source_line,
+                    }
+                    for function_name, call in sites
+                ],
+            }
+            for (name, arg_types, result_type), sites in _native_runtime_imports(program).items()
+        ],
     }
 
 
+def _native_runtime_imports(program: NativeCodeProgram) -> dict[tuple[str, tuple[str, ...], str], list[tuple[str, NativeRuntimeCall]]]:
+    """按 (名称, 实参类型, 结果类型) 汇总运行时导入表，保持首次出现顺序。"""
+    imports: dict[tuple[str, tuple[str, ...], str], list[tuple[str, NativeRuntimeCall]]] = {}
+    for function in program.functions.values():
+        for call in function.runtime_calls:
+            imports.setdefault((call.name, tuple(call.arg_types), call.result_type), []).append((function.name, call))
+    return imports
+
+
 def validate_native_code_program_map(program: NativeCodeProgram, metadata: dict[str, object]) -> None:
     """校验 native 机器码结构化 map 与程序一致。"""
     if not isinstance(metadata, dict):
@@ -2187,7 +2814,7 @@ def validate_native_code_program_map(program: NativeCodeProgram, metadata: dict[
             raise NativeCodegenError(
                 f"native 机器码 map 字段 {key} 不一致: 期望 {expected[key]!r}, 实际 {metadata.get(key)!r}"
             )
-    for key in ("sections", "symbols", "functions"):
+    for key in ("sections", "symbols", "functions", "runtime_strings", "runtime_imports"):
         if metadata.get(key) != expected[key]:
             detail = _describe_map_list_mismatch(key, expected[key], metadata.get(key))
             raise NativeCodegenError(f"native 机器码 map 字段 {key} 不一致: {detail}")
@@ -2250,6 +2877,9 @@ def _native_value_location(function_name: str, slot: NativeStackSlotAllocation)
     elif slot.name.startswith("global[") and slot.name.endswith("]"):
         kind = "global"
         index = slot.name[7:-1]
+    elif slot.name.startswith("memory[") and slot.name.endswith("]"):
+        kind = "memory"
+        index = slot.name[7:-1]
     else:
         kind = "stack"
         index = slot.name
@@ -3200,7 +3830,12 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} 栈槽 {slot_name} size 必须是整数")
             if slot_offset <= 0:
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} 栈槽 {slot_name} offset 必须为正数")
-            if slot_size != 8:
+            if slot_name.startswith("memory["):
+                if slot_size <= 0 or slot_size % 8:
+                    raise NativeCodegenError(
+                        f"native 机器码 map 函数 {name} 内存块 {slot_name} size 必须为 8 的正整数倍，实际 {slot_size}"
+                    )
+            elif slot_size != 8:
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} 栈槽 {slot_name} size 必须为 8，实际 {slot_size}")
             if slot_name.startswith("global[") and not owns_global_frame:
                 has_global_slots = True
@@ -3356,7 +3991,7 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
                 if parsed_instruction_bytes[:1] == b"\xE8":
                     expected_relocations[instruction_offset] = "call_rel32"
                 else:
-                    for relocation_kind, opcode in _REL32_JUMP_OPCODES.items():
+                    for relocation_kind, opcode in _RELATIVE_JUMP_OPCODES.items():
                         if parsed_instruction_bytes.startswith(opcode):
                             expected_relocations[instruction_offset] = relocation_kind
                             break
@@ -4087,7 +4722,7 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
                     raise NativeCodegenError(
                         f"native 机器码 map 函数 {name} rel32 {hash_field} 不是合法十六进制: {error}"
                     ) from error
-            if kind not in {*_REL32_JUMP_OPCODES, "call_rel32"}:
+            if kind not in {*_RELATIVE_JUMP_OPCODES, "call_rel32"}:
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} rel32 修补类型暂不支持: {kind!r}")
             if relocation_offset in seen_relocation_offsets:
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} rel32 修补记录重复: {relocation_offset}")
@@ -4110,8 +4745,9 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
                     f"native 机器码 map 函数 {name} _exit 传播探针 jump 修补目标不一致: "
                     f"探针 {expected_exit_probe_target}, 修补记录 {target}"
                 )
-            if size != 4:
-                raise NativeCodegenError(f"native 机器码 map 函数 {name} rel32 修补字段大小必须为 4，实际 {size}")
+            expected_size = _relocation_patch_size(kind)
+            if size != expected_size:
+                raise NativeCodegenError(f"native 机器码 map 函数 {name} rel32 修补字段大小必须为 {expected_size}，实际 {size}")
             expected_relocation_rva = text_section["rva"] + relocation_offset
             if relocation_rva != expected_relocation_rva:
                 raise NativeCodegenError(
@@ -4122,7 +4758,7 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
                 raise NativeCodegenError(
                     f"native 机器码 map 函数 {name} rel32 VA 不一致: 记录 {relocation_va}, 期望 {expected_relocation_va}"
                 )
-            expected_patch_offset = relocation_offset + (len(_REL32_JUMP_OPCODES[kind]) if kind in _REL32_JUMP_OPCODES else 1)
+            expected_patch_offset = relocation_offset + (len(_RELATIVE_JUMP_OPCODES[kind]) if kind in _RELATIVE_JUMP_OPCODES else 1)
             if patch_offset != expected_patch_offset:
                 raise NativeCodegenError(
                     f"native 机器码 map 函数 {name} rel32 修补字段偏移不一致: 记录 {patch_offset}, 期望 {expected_patch_offset}"
@@ -4168,7 +4804,7 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
             if patch_offset < function_offset or patch_offset + size > function_end:
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} rel32 修补字段越界: {patch_offset}")
             opcode = code[relocation_offset:patch_offset]
-            if kind in _REL32_JUMP_OPCODES and opcode != _REL32_JUMP_OPCODES[kind]:
+            if kind in _RELATIVE_JUMP_OPCODES and opcode != _RELATIVE_JUMP_OPCODES[kind]:
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} {kind} opcode 不一致")
             if kind == "call_rel32" and opcode != b"\xE8":
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} call_rel32 opcode 不一致")
@@ -4195,7 +4831,7 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
                     f"native 机器码 map 函数 {name} rel32 目标与位移不一致: 记录目标 {target_offset}, 位移目标 {expected_target_from_displacement}"
                 )
             relocation_asm = relocation_instruction.get("asm")
-            expected_asm_prefix = {**_REL32_JUMP_ASM_PREFIXES, "call_rel32": "call "}[kind]
+            expected_asm_prefix = {**_RELATIVE_JUMP_ASM_PREFIXES, "call_rel32": "call "}[kind]
             if not isinstance(relocation_asm, str) or not relocation_asm.startswith(expected_asm_prefix):
                 raise NativeCodegenError(f"native 机器码 map 函数 {name} rel32 修补指令清单类型不一致")
             instruction_target = relocation_asm.split(" ", 1)[1].split(";", 1)[0].strip()
@@ -4406,6 +5042,64 @@ def validate_native_code_map_bytes(code: bytes, metadata: dict[str, object]) ->
     missing_symbols = sorted(set(function_ranges) - seen_symbols)
     if missing_symbols:
         raise NativeCodegenError(f"native 机器码 map 符号表缺少函数: {', '.join(missing_symbols)}")
+    _validate_map_runtime_imports(code, metadata, function_ranges)
+
+
+def _validate_map_runtime_imports(code: bytes, metadata: dict[str, object], function_ranges: dict[str, tuple[int, int]]) -> None:
+    """校验运行时字符串表与导入表；每个调用点都必须是尚未回填的 mov rax, imm64 占位。"""
+    runtime_strings = metadata.get("runtime_strings", [])
+    if not isinstance(runtime_strings, list) or any(not isinstance(item, str) for item in runtime_strings):
+        raise NativeCodegenError("native 机器码 map 字段 runtime_strings 必须是字符串列表")
+    runtime_imports = metadata.get("runtime_imports", [])
+    if not isinstance(runtime_imports, list):
+        raise NativeCodegenError(f"native 机器码 map 字段 runtime_imports 必须是列表，实际 {type(runtime_imports).__name__}")
+    placeholder = _RUNTIME_IMPORT_PATCH_PREFIX + bytes(8)
+    seen_imports = set()
+    seen_offsets = set()
+    for index, item in enumerate(runtime_imports):
+        if not isinstance(item, dict) or set(item) != {"name", "arg_types", "result_type", "sites"}:
+            raise NativeCodegenError(f"native 机器码 map runtime_imports[{index}] 字段必须为 name, arg_types, result_type, sites")
+        name = item["name"]
+        arg_types = item["arg_types"]
+        result_type = item["result_type"]
+        if not isinstance(name, str) or not name:
+            raise NativeCodegenError(f"native 机器码 map runtime_imports[{index}].name 必须是非空字符串")
+        if (
+            not isinstance(arg_types, list)
+            or len(arg_types) > _RUNTIME_CALL_MAX_ARGS
+            or any(arg_type not in _SUPPORTED_VREG_TYPES for arg_type in arg_types)
+        ):
+            raise NativeCodegenError(f"native 机器码 map runtime_imports[{index}].arg_types 不合法: {arg_types!r}")
+        if result_type not in _RUNTIME_RESULT_TYPES:
+            raise NativeCodegenError(f"native 机器码 map runtime_imports[{index}].result_type 暂不支持 {result_type!r}")
+        key = (name, tuple(arg_types), result_type)
+        if key in seen_imports:
+            raise NativeCodegenError(f"native 机器码 map runtime_imports 重复: {name}")
+        seen_imports.add(key)
+        sites = item["sites"]
+        if not isinstance(sites, list) or not sites:
+            raise NativeCodegenError(f"native 机器码 map runtime_imports[{index}].sites 必须是非空列表")
+        for site_index, site in enumerate(sites):
+            path = f"runtime_imports[{index}].sites[{site_index}]"
+            if not isinstance(site, dict) or set(site) != {"function", "offset", "patch_offset", "source_pc", "source_line"}:
+                raise NativeCodegenError(f"native 机器码 map {path} 字段必须为 function, offset, patch_offset, source_pc, source_line")
+            function_range = function_ranges.get(site["function"])
+            if function_range is None:
+                raise NativeCodegenError(f"native 机器码 map {path} 引用未知函数 {site['function']!r}")
+            offset = site["offset"]
+            if not isinstance(offset, int) or isinstance(offset, bool) or not function_range[0] <= offset < function_range[0] + function_range[1]:
+                raise NativeCodegenError(f"native 机器码 map {path}.offset 不在函数 {site['function']} 范围内: {offset!r}")
+            if offset in seen_offsets:
+                raise NativeCodegenError(f"native 机器码 map {path}.offset 重复: {offset}")
+            seen_offsets.add(offset)
+            if site["patch_offset"] != offset + len(_RUNTIME_IMPORT_PATCH_PREFIX):
+                raise NativeCodegenError(f"native 机器码 map {path}.patch_offset 必须为 offset + {len(_RUNTIME_IMPORT_PATCH_PREFIX)}")
+            if code[offset:offset + len(placeholder)] != placeholder:
+                raise NativeCodegenError(f"native 机器码 map {path} 处不是 mov rax, imm64 占位: {code[offset:offset + len(placeholder)].hex()}")
+            for field in ("source_pc", "source_line"):
+                value = site[field]
+                if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+                    raise NativeCodegenError(f"native 机器码 map {path}.{field} 必须是整数或 null")
 
 
 def validate_native_text_section_map_bytes(text_raw: bytes, metadata: dict[str, object]) -> None:
@@ -4488,6 +5182,8 @@ class _NativeCodegenContext:
         function_param_types: dict[str, list[str]] | None = None,
         abi: WindowsX64ABI | None = None,
         global_frame_owner: bool = False,
+        optimize_level: int = 0,
+        short_jumps: frozenset[int] = frozenset(),
     ):
         self.function = function
         self.instructions: list[NativeCodeInstruction] = []
@@ -4507,10 +5203,27 @@ class _NativeCodegenContext:
         self.relocations: list[NativeRelocation] = []
         self.exit_probes: list[NativeExitProbe] = []
         self.exit_propagation_labels: list[tuple[str, int | None, int | None]] = []
+        self.runtime_calls: list[NativeRuntimeCall] = []
+        self.runtime_error_label: str | None = None
         self.phi_copies = self._build_phi_copies()
         self.synthetic_label_id = 0
+        self.optimize_level = optimize_level
+        self.short_jumps = short_jumps
+        self.relaxable_jumps: set[int] = set()
+        # 窥孔状态：RAX 当前与哪些 (基址寄存器, 偏移) 栈槽内容相同；任何改写 RAX 的发射都会清空
+        self.rax_slots: set[tuple[str, int]] = set()
+        self.next_node: MachineInstruction | MachineTerminator | None = None
+        self.next_block_name: str | None = None
+        self.fused_condition: ConditionCode | None = None
+        self.vreg_use_counts: dict[str, int] = {}
+        self.immediate_vregs: dict[str, int] = {}
+        if optimize_level >= 1:
+            self.vreg_use_counts = _count_vreg_uses(function)
+            self.immediate_vregs = _immediate_vreg_values(function)
         self.constant_vregs: dict[str, int] = {}
         self.constant_slots: dict[tuple[str, int | str], int | None] = {}
+        self.escaped_slots = _static_escaped_slot_keys(function)
+        self.trap_labels: dict[str, str] = {}
         (
             self.static_entry_values,
             self.static_entry_slots,
@@ -4533,22 +5246,29 @@ class _NativeCodegenContext:
         self._emit(encode_prologue(self.frame_size), self._prologue_asm(), "prologue", None, None)
         if self.global_frame_owner and self.function.frame.global_slots:
             self._emit(encode_mov_r11_rbp(), "mov r11, rbp ; global frame", "prologue", None, None)
+        self._emit_stack_probes()
         self._store_register_params()
-        for block in self.function.blocks:
+        blocks = self.function.blocks
+        for block_index, block in enumerate(blocks):
             self.block_offsets[block.name] = len(self.code)
             self._emit(b"", f"{block.name}:", "label", None, None)
+            self.next_block_name = blocks[block_index + 1].name if block_index + 1 < len(blocks) else None
             self.constant_vregs = {
                 name: value
                 for name, value in self.static_entry_values.get(block.name, {}).items()
                 if value is not None
             }
             self.constant_slots = dict(self.static_entry_slots.get(block.name, {}))
-            for instruction in block.instructions:
+            for index, instruction in enumerate(block.instructions):
+                if self.optimize_level >= 1:
+                    self.next_node = self._next_emitting_node(block, index)
                 self._lower_instruction(instruction)
             if block.terminator is None:
                 raise self._function_error(f"native 机器码 MVP 需要基本块 {block.name} 的终结指令")
+            self.next_node = None
             self._lower_terminator(block.terminator)
         self._emit_exit_propagation_blocks()
+        self._emit_trap_blocks()
         self._patch_pending_jumps()
         stack_slot_allocations = self._stack_slot_allocations()
         has_global_frame_slots = any(slot.name.startswith("global[") for slot in stack_slot_allocations)
@@ -4574,6 +5294,7 @@ class _NativeCodegenContext:
             ),
             return_type=self.function.return_type,
             param_types=tuple(_function_param_types(self.function)),
+            runtime_calls=self.runtime_calls,
         )
 
     def _lower_instruction(self, instruction: MachineInstruction) -> None:
@@ -4585,6 +5306,12 @@ class _NativeCodegenContext:
             value = int(instruction.args[0].value)
             if instruction.result is not None and instruction.result.kind == "vreg":
                 self.constant_vregs[str(instruction.result.value.name)] = value
+            if self.optimize_level >= 1:
+                # 立即数虚拟寄存器在每个使用点直接重新物化，不再占用栈槽
+                if self._immediate_value(instruction.result) is None:
+                    self._load_operand_to_rax(instruction.args[0], instruction)
+                    self._store_rax_to_result(instruction)
+                return
             self._emit(encode_mov_rax_imm64(value), f"mov rax, {value}", op, instruction.source_pc, instruction.source_line)
             self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", op, instruction.source_pc, instruction.source_line)
             return
@@ -4595,6 +5322,10 @@ class _NativeCodegenContext:
                     self.constant_vregs.pop(str(instruction.result.value.name), None)
                 else:
                     self.constant_vregs[str(instruction.result.value.name)] = known_value
+            if self.optimize_level >= 1:
+                self._load_operand_to_rax(instruction.args[0], instruction)
+                self._store_rax_to_result(instruction)
+                return
             result = self._result_slot_offset(instruction)
             source = self._slot_offset(instruction.args[0], instruction)
             if self._uses_global_frame(instruction.args[0]):
@@ -4611,6 +5342,18 @@ class _NativeCodegenContext:
                 self.constant_vregs,
                 self.constant_slots,
             )
+            if self.optimize_level >= 1:
+                base = self._frame_base(instruction.args[0])
+                self._emit(
+                    encode_mov_frame_from_reg(base, target, "RAX"),
+                    f"mov [{base.lower()}-{target}], rax",
+                    op,
+                    instruction.source_pc,
+                    instruction.source_line,
+                    preserves_rax=True,
+                )
+                self.rax_slots.add((base, target))
+                return
             if self._uses_global_frame(instruction.args[0]):
                 self._emit(encode_mov_r11_offset_from_rax(target), f"mov [r11-{target}], rax", op, instruction.source_pc, instruction.source_line)
             else:
@@ -4639,6 +5382,15 @@ class _NativeCodegenContext:
         if op in _COMPARE_OPS:
             self._lower_compare(instruction)
             return
+        if op in _FLOAT_BINARY_OPS:
+            self._lower_float_binary(instruction)
+            return
+        if op in _FLOAT_COMPARE_OPS:
+            self._lower_float_compare(instruction)
+            return
+        if op in {"fneg", "cvt_int_float", "cvt_float_int"}:
+            self._lower_float_unary(instruction)
+            return
         if op == "cast_bool_int":
             result = self._result_slot_offset(instruction)
             target_type = str(instruction.attrs.get("target_type", "")).lower()
@@ -4660,6 +5412,9 @@ class _NativeCodegenContext:
                     self.constant_vregs[str(instruction.result.value.name)] = cast_constant
             cast_note = f" ; cast to {target_type}" if target_type else ""
             self._load_operand_to_rax(instruction.args[0], instruction)
+            if self.optimize_level >= 1:
+                self._store_rax_to_result(instruction, cast_note, {"target_type": target_type}, may_elide=False)
+                return
             self._emit(
                 encode_mov_rbp_offset_from_rax(result),
                 f"mov [rbp-{result}], rax{cast_note}",
@@ -4673,12 +5428,18 @@ class _NativeCodegenContext:
             result = self._result_slot_offset(instruction)
             self._remember_static_result(instruction)
             self._load_operand_to_rax(instruction.args[0], instruction)
+            target_type = instruction.attrs.get("target_type")
+            cast_note = f" ; cast to {target_type}" if target_type else " ; cast to bool"
+            if self.optimize_level >= 1:
+                self._emit(encode_test_rax_rax(), "test rax, rax", op, instruction.source_pc, instruction.source_line, preserves_rax=True)
+                self._emit(encode_setcc_al(ConditionCode.NE), "setne al", op, instruction.source_pc, instruction.source_line)
+                self._emit(encode_movzx_rax_al(), "movzx rax, al", op, instruction.source_pc, instruction.source_line)
+                self._store_rax_to_result(instruction, cast_note, {"target_type": target_type or "bool"}, may_elide=False)
+                return
             self._emit(encode_mov_r10_imm64(0), "mov r10, 0", op, instruction.source_pc, instruction.source_line)
             self._emit(encode_cmp_rax_r10(), "cmp rax, r10", op, instruction.source_pc, instruction.source_line)
             self._emit(encode_setcc_al(ConditionCode.NE), "setne al", op, instruction.source_pc, instruction.source_line)
             self._emit(encode_movzx_rax_al(), "movzx rax, al", op, instruction.source_pc, instruction.source_line)
-            target_type = instruction.attrs.get("target_type")
-            cast_note = f" ; cast to {target_type}" if target_type else " ; cast to bool"
             self._emit(
                 encode_mov_rbp_offset_from_rax(result),
                 f"mov [rbp-{result}], rax{cast_note}",
@@ -4689,16 +5450,136 @@ class _NativeCodegenContext:
             )
             return
         if op == "call":
+            _static_forget_memory_slots(self.constant_slots, self.escaped_slots)
             self._lower_call(instruction)
             return
+        if op == "call_runtime":
+            self._lower_call_runtime(instruction)
+            return
         if op == "exit":
             self._lower_exit(instruction)
             return
         if op == "set_exit_code":
             return
+        if op in {"alloc_block", "copy_block"}:
+            self._lower_block_allocation(instruction)
+            return
+        if op in {"load_index", "store_index"}:
+            self._lower_indexed_access(instruction)
+            return
+        if op in {"load_mem", "store_mem"}:
+            self._lower_memory_access(instruction)
+            return
+        if op == "slot_address":
+            self.constant_vregs.pop(str(instruction.result.value.name), None)
+            base = self._frame_base(instruction.args[0])
+            offset = self._slot_offset(instruction.args[0], instruction)
+            self._emit_cell_address(base, offset, instruction)
+            self._store_rax_result(instruction)
+            return
         self._unsupported(instruction, op)
 
+    def _lower_block_allocation(self, instruction: MachineInstruction) -> None:
+        """清零或拷贝栈帧内存块，并把块首单元地址写入结果。"""
+        op = instruction.op
+        pc, line = instruction.source_pc, instruction.source_line
+        offset = self._slot_offset(instruction.args[0], instruction)
+        words = int(instruction.attrs.get("words", 0))
+        self.constant_vregs.pop(str(instruction.result.value.name), None)
+        if op == "copy_block":
+            self._load_operand_to_rax(instruction.args[1], instruction)
+            for word in range(words):
+                self._emit(encode_mov_reg_from_cell("R10", word * 8), f"mov r10, [rax*8+{word * 8}]", op, pc, line, preserves_rax=True)
+                self._emit(
+                    encode_mov_frame_from_reg("RBP", offset - word * 8, "R10"),
+                    f"mov [rbp-{offset - word * 8}], r10",
+                    op,
+                    pc,
+                    line,
+                    preserves_rax=True,
+                )
+        elif words <= _UNROLLED_ZERO_FILL_WORDS:
+            self._emit(encode_xor_r10d_r10d(), "xor r10d, r10d", op, pc, line, preserves_rax=True)
+            for word in range(words):
+                self._emit(
+                    encode_mov_frame_from_reg("RBP", offset - word * 8, "R10"),
+                    f"mov [rbp-{offset - word * 8}], r10",
+                    op,
+                    pc,
+                    line,
+                    preserves_rax=True,
+                )
+        else:
+            # RAX 从 words 递减到 1，逐字清零 [rbp-offset] 起的内存块
+            label = self._synthetic_label("zero_fill")
+            self._emit(encode_xor_r10d_r10d(), "xor r10d, r10d", op, pc, line)
+            self._emit(encode_mov_eax_imm32(words), f"mov eax, {words}", op, pc, line)
+            self.block_offsets[label] = len(self.code)
+            self._emit(b"", f"{label}:", "label", None, None)
+            self._emit(encode_mov_rbp_scaled_rax_from_r10(offset + 8), f"mov [rbp+rax*8-{offset + 8}], r10", op, pc, line)
+            self._emit(encode_dec_rax(), "dec rax", op, pc, line)
+            self._emit_pending_jump("jne", label, pc, line, op)
+        self._emit_cell_address("RBP", offset, instruction)
+        self._store_rax_result(instruction)
+
+    def _lower_indexed_access(self, instruction: MachineInstruction) -> None:
+        """生成带越界检查的数组下标读写；静态已知且在界内的下标直接折叠进位移。"""
+        op = instruction.op
+        pc, line = instruction.source_pc, instruction.source_line
+        length = int(instruction.attrs.get("length", 0))
+        known_index = _static_known_value(instruction.args[1], self.constant_vregs, self.constant_slots)
+        if known_index is None:
+            known_index = self._immediate_value(instruction.args[1])
+        self._load_operand_to_rax(instruction.args[0], instruction)
+        displacement = 0
+        if known_index is not None and 0 <= known_index < length:
+            displacement = known_index * 8
+        else:
+            self._load_operand_to_r10(instruction.args[1], instruction)
+            self._emit(encode_cmp_r10_imm(length), f"cmp r10, {length}", op, pc, line, preserves_rax=True)
+            self._emit_pending_jump("jae", self._trap_label("bounds_trap"), pc, line, op)
+            self._emit(encode_add_rax_r10(), "add rax, r10", op, pc, line)
+        if op == "load_index":
+            self._remember_static_result(instruction)
+            self._emit(encode_mov_reg_from_cell("RAX", displacement), f"mov rax, [rax*8+{displacement}]", op, pc, line)
+            self._store_rax_result(instruction)
+            return
+        _static_forget_memory_slots(self.constant_slots, self.escaped_slots)
+        self._load_operand_to_r10(instruction.args[2], instruction)
+        self._emit(encode_mov_cell_from_reg(displacement, "R10"), f"mov [rax*8+{displacement}], r10", op, pc, line)
+
+    def _lower_memory_access(self, instruction: MachineInstruction) -> None:
+        """生成单元地址加常量字偏移的内存读写，用于结构体字段与指针解引用。"""
+        op = instruction.op
+        pc, line = instruction.source_pc, instruction.source_line
+        displacement = int(instruction.attrs.get("offset", 0)) * 8
+        self._load_operand_to_rax(instruction.args[0], instruction)
+        if op == "load_mem":
+            self._remember_static_result(instruction)
+            self._emit(encode_mov_reg_from_cell("RAX", displacement), f"mov rax, [rax*8+{displacement}]", op, pc, line)
+            self._store_rax_result(instruction)
+            return
+        _static_forget_memory_slots(self.constant_slots, self.escaped_slots)
+        self._load_operand_to_r10(instruction.args[1], instruction)
+        self._emit(encode_mov_cell_from_reg(displacement, "R10"), f"mov [rax*8+{displacement}], r10", op, pc, line)
+
+    def _emit_cell_address(self, base: str, offset: int, node: MachineInstruction) -> None:
+        """把 [base-offset] 的 8 字节单元地址装入 RAX。"""
+        self._emit(encode_lea_rax_frame(base, offset), f"lea rax, [{base.lower()}-{offset}]", node.op, node.source_pc, node.source_line)
+        self._emit(encode_shr_rax_imm8(3), "shr rax, 3", node.op, node.source_pc, node.source_line)
+
+    def _store_rax_result(self, instruction: MachineInstruction) -> None:
+        """把 RAX 写回结果栈槽；-O1 交给窥孔写回逻辑决定能否省略。"""
+        if self.optimize_level >= 1:
+            self._store_rax_to_result(instruction)
+            return
+        result = self._result_slot_offset(instruction)
+        self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", instruction.op, instruction.source_pc, instruction.source_line)
+
     def _lower_binary(self, instruction: MachineInstruction) -> None:
+        if self.optimize_level >= 1:
+            self._lower_binary_optimized(instruction)
+            return
         result = self._result_slot_offset(instruction)
         self._load_operand_to_rax(instruction.args[0], instruction)
         self._load_operand_to_r10(instruction.args[1], instruction)
@@ -4722,8 +5603,75 @@ class _NativeCodegenContext:
         self._remember_static_result(instruction)
         self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", instruction.op, instruction.source_pc, instruction.source_line)
 
+    def _lower_binary_optimized(self, instruction: MachineInstruction) -> None:
+        """-O1 生成二元整数运算：交换律运算优先复用 RAX，立即数右操作数使用立即数形式。"""
+        op = instruction.op
+        if op in {"idiv", "imod"} and instruction.args[1].kind == "imm" and int(instruction.args[1].value) == 0:
+            raise self._node_error(instruction, "native 机器码 MVP 暂不生成除数为 0 的 idiv/imod 机器码")
+        first, second = instruction.args[0], instruction.args[1]
+        if op in {"add", "imul"} and self._prefers_swapped_operands(first, second):
+            first, second = second, first
+        self._load_operand_to_rax(first, instruction)
+        value = self._immediate_value(second)
+        if value is None or not self._emit_binary_immediate(instruction, value):
+            self._load_operand_to_r10(second, instruction)
+            if op in {"idiv", "imod"}:
+                self._emit(encode_cqo(), "cqo", op, instruction.source_pc, instruction.source_line)
+                self._emit(encode_idiv_r10(), "idiv r10", op, instruction.source_pc, instruction.source_line)
+                if op == "imod":
+                    self._emit_python_modulo_adjustment(instruction)
+            else:
+                code = {"add": encode_add_rax_r10, "sub": encode_sub_rax_r10, "imul": encode_imul_rax_r10}[op]()
+                self._emit(code, _BINARY_OP_ASM[op], op, instruction.source_pc, instruction.source_line)
+        self._remember_static_result(instruction)
+        self._store_rax_to_result(instruction)
+
+    def _emit_binary_immediate(self, instruction: MachineInstruction, value: int) -> bool:
+        """为 add/sub/imul 的立即数右操作数选择最短编码；无法编码时返回 False 走寄存器形式。"""
+        op = instruction.op
+        if op == "sub" and value != _INT64_MIN:
+            op, value = "add", -value
+        forms: list[tuple[bytes, str]] | None = None
+        if op == "add":
+            if value == 0:
+                forms = []
+            elif value == 1:
+                forms = [(encode_inc_rax(), "inc rax")]
+            elif value == -1:
+                forms = [(encode_dec_rax(), "dec rax")]
+            elif -(2**31) <= value <= _INT32_MAX:
+                forms = [(encode_add_rax_imm(value), f"add rax, {value}")]
+            elif -(2**31) <= -value <= _INT32_MAX:
+                forms = [(encode_sub_rax_imm(-value), f"sub rax, {-value}")]
+        elif op == "imul":
+            if value == 0:
+                forms = [(encode_xor_eax_eax(), "xor eax, eax")]
+            elif value == 1:
+                forms = []
+            elif value == -1:
+                forms = [(encode_neg_rax(), "neg rax")]
+            elif value == 2:
+                forms = [(encode_add_rax_rax(), "add rax, rax")]
+            elif value in {3, 5, 9}:
+                forms = [(encode_lea_rax_scaled_rax(value), f"lea rax, [rax+rax*{value - 1}]")]
+            elif 0 < value < 2**63 and value & (value - 1) == 0:
+                forms = [(encode_shl_rax_imm8(value.bit_length() - 1), f"shl rax, {value.bit_length() - 1}")]
+            elif -(2**31) <= value <= _INT32_MAX:
+                forms = [(encode_imul_rax_imm(value), f"imul rax, rax, {value}")]
+        if forms is None:
+            return False
+        for code, asm in forms:
+            self._emit(code, asm, instruction.op, instruction.source_pc, instruction.source_line)
+        return True
+
     def _lower_neg(self, instruction: MachineInstruction) -> None:
         """生成整数取负。"""
+        if self.optimize_level >= 1:
+            self._load_operand_to_rax(instruction.args[0], instruction)
+            self._emit(encode_neg_rax(), "neg rax", "neg", instruction.source_pc, instruction.source_line)
+            self._remember_static_result(instruction)
+            self._store_rax_to_result(instruction)
+            return
         result = self._result_slot_offset(instruction)
         self._load_operand_to_rax(instruction.args[0], instruction)
         self._emit(encode_neg_rax(), "neg rax", "neg", instruction.source_pc, instruction.source_line)
@@ -4732,6 +5680,14 @@ class _NativeCodegenContext:
 
     def _lower_not_bool(self, instruction: MachineInstruction) -> None:
         """生成 C 风格逻辑非。"""
+        if self.optimize_level >= 1:
+            self._load_operand_to_rax(instruction.args[0], instruction)
+            self._emit(encode_test_rax_rax(), "test rax, rax", "not_bool", instruction.source_pc, instruction.source_line, preserves_rax=True)
+            self._emit(encode_setcc_al(ConditionCode.EQ), "seteq al", "not_bool", instruction.source_pc, instruction.source_line)
+            self._emit(encode_movzx_rax_al(), "movzx rax, al", "not_bool", instruction.source_pc, instruction.source_line)
+            self._remember_static_result(instruction)
+            self._store_rax_to_result(instruction)
+            return
         result = self._result_slot_offset(instruction)
         self._load_operand_to_rax(instruction.args[0], instruction)
         self._emit(encode_mov_r10_imm64(0), "mov r10, 0", "not_bool", instruction.source_pc, instruction.source_line)
@@ -4742,6 +5698,9 @@ class _NativeCodegenContext:
         self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", "not_bool", instruction.source_pc, instruction.source_line)
 
     def _lower_compare(self, instruction: MachineInstruction) -> None:
+        if self.optimize_level >= 1:
+            self._lower_compare_optimized(instruction)
+            return
         result = self._result_slot_offset(instruction)
         self._load_operand_to_rax(instruction.args[0], instruction)
         self._load_operand_to_r10(instruction.args[1], instruction)
@@ -4751,6 +5710,93 @@ class _NativeCodegenContext:
         self._remember_static_result(instruction)
         self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", instruction.op, instruction.source_pc, instruction.source_line)
 
+    def _lower_compare_optimized(self, instruction: MachineInstruction) -> None:
+        """-O1 生成比较：右操作数为立即数时用 cmp/test 立即数形式，结果只被紧随的 br 使用时与分支融合。"""
+        condition = _COMPARE_OPS[instruction.op]
+        first, second = instruction.args[0], instruction.args[1]
+        if self._prefers_swapped_operands(first, second):
+            first, second = second, first
+            condition = _SWAPPED_CONDITIONS[condition]
+        self._load_operand_to_rax(first, instruction)
+        value = self._immediate_value(second)
+        if value == 0:
+            self._emit(encode_test_rax_rax(), "test rax, rax", instruction.op, instruction.source_pc, instruction.source_line, preserves_rax=True)
+        elif value is not None and -(2**31) <= value <= _INT32_MAX:
+            self._emit(encode_cmp_rax_imm(value), f"cmp rax, {value}", instruction.op, instruction.source_pc, instruction.source_line, preserves_rax=True)
+        else:
+            self._load_operand_to_r10(second, instruction)
+            self._emit(encode_cmp_rax_r10(), "cmp rax, r10", instruction.op, instruction.source_pc, instruction.source_line, preserves_rax=True)
+        self._remember_static_result(instruction)
+        next_node = self.next_node
+        if (
+            isinstance(next_node, MachineTerminator)
+            and next_node.op == "br"
+            and self._is_single_use_result(instruction, next_node.args[:1])
+        ):
+            # 比较结果只作为紧随其后的分支条件：保留标志位，由 br 直接发射 jcc
+            self.fused_condition = condition
+            return
+        self._emit(encode_setcc_al(condition), f"set{condition.value} al", instruction.op, instruction.source_pc, instruction.source_line)
+        self._emit(encode_movzx_rax_al(), "movzx rax, al", instruction.op, instruction.source_pc, instruction.source_line)
+        self._store_rax_to_result(instruction)
+
+    def _lower_float_binary(self, instruction: MachineInstruction) -> None:
+        """生成 SSE2 标量双精度四则运算；动态除数为 ±0.0 时与 VM 的 ZeroDivisionError 对应跳入陷阱块。"""
+        op = instruction.op
+        pc, line = instruction.source_pc, instruction.source_line
+        self._load_operand_to_rax(instruction.args[0], instruction)
+        self._load_operand_to_r10(instruction.args[1], instruction)
+        self._emit(encode_movq_xmm_from_reg("XMM0", "RAX"), "movq xmm0, rax", op, pc, line, preserves_rax=True)
+        self._emit(encode_movq_xmm_from_reg("XMM1", "R10"), "movq xmm1, r10", op, pc, line, preserves_rax=True)
+        if op == "fdiv":
+            self._emit(encode_add_r10_r10(), "add r10, r10 ; float divisor zero check", op, pc, line, preserves_rax=True)
+            self._emit_pending_jump("je", self._trap_label("float_div_trap"), pc, line, op)
+        mnemonic = _FLOAT_BINARY_OPS[op]
+        self._emit(encode_scalar_double_op(mnemonic, "XMM0", "XMM1"), f"{mnemonic} xmm0, xmm1", op, pc, line, preserves_rax=True)
+        self._emit(encode_movq_reg_from_xmm("RAX", "XMM0"), "movq rax, xmm0", op, pc, line)
+        self._remember_static_result(instruction)
+        self._store_rax_result(instruction)
+
+    def _lower_float_compare(self, instruction: MachineInstruction) -> None:
+        """生成 cmpsd 比较：全 1 掩码取负即为 bool64 的 1，NaN 语义与 Python float 比较一致。"""
+        op = instruction.op
+        pc, line = instruction.source_pc, instruction.source_line
+        predicate, swapped = _FLOAT_COMPARE_OPS[op]
+        first, second = instruction.args
+        if swapped:
+            first, second = second, first
+        self._load_operand_to_rax(first, instruction)
+        self._load_operand_to_r10(second, instruction)
+        self._emit(encode_movq_xmm_from_reg("XMM0", "RAX"), "movq xmm0, rax", op, pc, line, preserves_rax=True)
+        self._emit(encode_movq_xmm_from_reg("XMM1", "R10"), "movq xmm1, r10", op, pc, line, preserves_rax=True)
+        self._emit(encode_cmpsd("XMM0", "XMM1", predicate), f"cmp{predicate}sd xmm0, xmm1", op, pc, line, preserves_rax=True)
+        self._emit(encode_movq_reg_from_xmm("RAX", "XMM0"), "movq rax, xmm0", op, pc, line)
+        self._emit(encode_neg_rax(), "neg rax", op, pc, line)
+        self._remember_static_result(instruction)
+        self._store_rax_result(instruction)
+
+    def _lower_float_unary(self, instruction: MachineInstruction) -> None:
+        """生成浮点取负与 CAST 转换；浮点转整数向零截断，NaN/溢出得到的 integer indefinite 跳入陷阱块。"""
+        op = instruction.op
+        pc, line = instruction.source_pc, instruction.source_line
+        target_type = str(instruction.attrs.get("target_type", "")).lower()
+        if op == "cvt_float_int" and target_type in _NARROW_INTEGER_CAST_RANGES:
+            raise self._node_error(instruction, f"native 机器码 MVP 暂不支持浮点窄化 cast 到 {target_type}")
+        self._load_operand_to_rax(instruction.args[0], instruction)
+        if op == "fneg":
+            self._emit(encode_btc_rax_imm8(63), "btc rax, 63", op, pc, line)
+        elif op == "cvt_int_float":
+            self._emit(encode_cvtsi2sd_xmm_rax("XMM0"), "cvtsi2sd xmm0, rax", op, pc, line, preserves_rax=True)
+            self._emit(encode_movq_reg_from_xmm("RAX", "XMM0"), "movq rax, xmm0", op, pc, line)
+        else:
+            self._emit(encode_movq_xmm_from_reg("XMM0", "RAX"), "movq xmm0, rax", op, pc, line, preserves_rax=True)
+            self._emit(encode_cvttsd2si_rax_xmm("XMM0"), "cvttsd2si rax, xmm0", op, pc, line)
+            self._emit(encode_mov_r10_imm64(_INT64_MIN), f"mov r10, {_INT64_MIN}", op, pc, line, preserves_rax=True)
+            self._emit(encode_cmp_rax_r10(), "cmp rax, r10 ; integer indefinite", op, pc, line, preserves_rax=True)
+            self._emit_pending_jump("je", self._trap_label("float_cast_trap"), pc, line, op)
+        self._remember_static_result(instruction)
+        self._store_rax_result(instruction)
+
     def _remember_static_result(self, instruction: MachineInstruction) -> None:
         """记录发射阶段仍可证明的静态常量结果。"""
         if instruction.result is None or instruction.result.kind != "vreg":
@@ -4785,9 +5831,9 @@ class _NativeCodegenContext:
         callee_return_type = self.function_return_types.get(callee)
         if callee_return_type == "void" and instruction.result is not None:
             raise self._node_error(instruction, f"native 机器码 MVP void 调用 {callee} 不应携带结果")
-        if callee_return_type in {"int64", "bool64"} and instruction.result is None:
+        if callee_return_type in _SUPPORTED_VALUE_TYPES and instruction.result is None:
             raise self._node_error(instruction, f"native 机器码 MVP {callee_return_type} 调用 {callee} 必须携带结果")
-        if callee_return_type in {"int64", "bool64"} and instruction.result is not None and instruction.result.type_hint != callee_return_type:
+        if callee_return_type in _SUPPORTED_VALUE_TYPES and instruction.result is not None and instruction.result.type_hint != callee_return_type:
             raise self._node_error(
                 instruction,
                 f"native 机器码 MVP {callee_return_type} 调用 {callee} 结果类型必须是 {callee_return_type}，实际 {instruction.result.type_hint}",
@@ -4811,7 +5857,7 @@ class _NativeCodegenContext:
             raise self._node_error(instruction, f"native 机器码 MVP call arg_locations 数量不匹配: 标注 {len(arg_locations)}, 实际 {len(call_args)}")
         if arg_locations is not None and self.abi is not None:
             for index, location in enumerate(arg_locations):
-                expected_location = self.abi.argument_location(index).__dict__
+                expected_location = self.abi.argument_location(index, call_args[index].type_hint).__dict__
                 if location != expected_location:
                     raise self._node_error(
                         instruction,
@@ -4829,9 +5875,14 @@ class _NativeCodegenContext:
             raise self._node_error(instruction, f"native 机器码 MVP call 栈对齐必须为正数: {stack_alignment}")
         register_args = call_args[:len(argument_registers)]
         stack_args = call_args[len(argument_registers):]
+        float_argument_registers = list(self.abi.registers.float_argument_registers) if self.abi is not None else ["XMM0", "XMM1", "XMM2", "XMM3"]
         for index, operand in enumerate(register_args):
-            register = argument_registers[index]
             self._load_operand_to_rax(operand, instruction)
+            if operand.type_hint == "float64":
+                register = float_argument_registers[index]
+                self._emit(encode_movq_xmm_from_reg(register, "RAX"), f"movq {register.lower()}, rax", "call", instruction.source_pc, instruction.source_line)
+                continue
+            register = argument_registers[index]
             self._emit(encode_mov_reg_from_rax(register), f"mov {register.lower()}, rax", "call", instruction.source_pc, instruction.source_line)
         stack_arg_bytes = len(stack_args) * 8
         call_stack_size = shadow_space_size + stack_arg_bytes
@@ -4894,12 +5945,110 @@ class _NativeCodegenContext:
             )
         )
         if instruction.result is not None:
+            if callee_return_type == "float64":
+                # 浮点返回值在 XMM0；RAX 只在 _exit 传播路径上承载退出码
+                self._emit(encode_movq_reg_from_xmm("RAX", "XMM0"), "movq rax, xmm0", "call", instruction.source_pc, instruction.source_line)
+            if self.optimize_level >= 1:
+                self._store_rax_to_result(instruction)
+                return
             result = self._result_slot_offset(instruction)
             self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", "call", instruction.source_pc, instruction.source_line)
 
+    def _lower_call_runtime(self, instruction: MachineInstruction) -> None:
+        """
+        生成经运行时导入表的 builtin 调用。
+
+        trampoline 签名为 int64 status(int64 a0, int64 a1, int64 a2, int64* result)：实参按 8 字节原样放入 RCX/RDX/R8，
+        R9 指向调用窗口内的结果槽；call 目标是 mov rax, imm64 的占位地址，由宿主加载时回填。
+        R11 在 Win64 下是易失寄存器，调用前后保存恢复 global frame；status 非 0 时跳到共用块，
+        按 _exit 传播约定（RDX=1）逐层返回，由宿主重新抛出记录的运行时错误。
+        """
+        name = str(instruction.args[0].value)
+        call_args = instruction.args[1:]
+        argument_registers = list(self.abi.registers.argument_registers) if self.abi is not None else ["RCX", "RDX", "R8", "R9"]
+        if instruction.result is not None and instruction.result.kind == "vreg":
+            self.constant_vregs.pop(str(instruction.result.value.name), None)
+        for index, operand in enumerate(call_args):
+            self._load_operand_to_rax(operand, instruction)
+            register = argument_registers[index]
+            self._emit(encode_mov_reg_from_rax(register), f"mov {register.lower()}, rax", "call_runtime", instruction.source_pc, instruction.source_line)
+        self._emit(
+            encode_sub_rsp_imm32(_RUNTIME_CALL_STACK_SIZE),
+            f"sub rsp, {_RUNTIME_CALL_STACK_SIZE}",
+            "call_runtime",
+            instruction.source_pc,
+            instruction.source_line,
+        )
+        self._emit(
+            encode_mov_rsp_offset_from_reg(_RUNTIME_CALL_R11_OFFSET, "R11"),
+            f"mov [rsp+{_RUNTIME_CALL_R11_OFFSET}], r11",
+            "call_runtime",
+            instruction.source_pc,
+            instruction.source_line,
+        )
+        self._emit(
+            encode_lea_r9_rsp_offset(_RUNTIME_CALL_RESULT_OFFSET),
+            f"lea r9, [rsp+{_RUNTIME_CALL_RESULT_OFFSET}]",
+            "call_runtime",
+            instruction.source_pc,
+            instruction.source_line,
+        )
+        offset = len(self.code)
+        self._emit(encode_mov_rax_imm64(0), f"mov rax, 0 ; runtime import {name}", "call_runtime", instruction.source_pc, instruction.source_line)
+        self.runtime_calls.append(
+            NativeRuntimeCall(
+                offset=offset,
+                patch_offset=offset + len(_RUNTIME_IMPORT_PATCH_PREFIX),
+                name=name,
+                arg_types=tuple(operand.type_hint for operand in call_args),
+                result_type=str(instruction.attrs.get("result_type")),
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+        self._emit(encode_call_rax(), "call rax", "call_runtime", instruction.source_pc, instruction.source_line)
+        self._emit(
+            encode_mov_reg_from_rsp_offset("R11", _RUNTIME_CALL_R11_OFFSET),
+            f"mov r11, [rsp+{_RUNTIME_CALL_R11_OFFSET}]",
+            "call_runtime",
+            instruction.source_pc,
+            instruction.source_line,
+            preserves_rax=True,
+        )
+        self._emit(
+            encode_mov_reg_from_rsp_offset("R10", _RUNTIME_CALL_RESULT_OFFSET),
+            f"mov r10, [rsp+{_RUNTIME_CALL_RESULT_OFFSET}]",
+            "call_runtime",
+            instruction.source_pc,
+            instruction.source_line,
+            preserves_rax=True,
+        )
+        self._emit(
+            encode_add_rsp_imm32(_RUNTIME_CALL_STACK_SIZE),
+            f"add rsp, {_RUNTIME_CALL_STACK_SIZE}",
+            "call_runtime",
+            instruction.source_pc,
+            instruction.source_line,
+            preserves_rax=True,
+        )
+        self._emit(encode_test_rax_rax(), "test rax, rax ; native runtime status", "call_runtime", instruction.source_pc, instruction.source_line, preserves_rax=True)
+        if self.runtime_error_label is None:
+            self.runtime_error_label = self._synthetic_label("runtime_error")
+        self._emit_pending_jump("jne", self.runtime_error_label, instruction.source_pc, instruction.source_line, "call_runtime")
+        self._emit(encode_mov_rax_r10(), "mov rax, r10", "call_runtime", instruction.source_pc, instruction.source_line)
+        if self.optimize_level >= 1:
+            self._store_rax_to_result(instruction)
+            return
+        result = self._result_slot_offset(instruction)
+        self._emit(encode_mov_rbp_offset_from_rax(result), f"mov [rbp-{result}], rax", "call_runtime", instruction.source_pc, instruction.source_line)
+
     def _lower_exit(self, instruction: MachineInstruction) -> None:
         """生成受限 native _exit。"""
         self._load_operand_to_rax(instruction.args[0], instruction)
+        if self.optimize_level >= 1:
+            self._emit(encode_mov_edx_imm32(1), "mov edx, 1 ; native _exit flag", "exit", instruction.source_pc, instruction.source_line)
+            self._emit(encode_epilogue(), "mov rsp, rbp; pop rbp; ret", "exit", instruction.source_pc, instruction.source_line)
+            return
         self._emit(encode_mov_rdx_imm64(1), "mov rdx, 1 ; native _exit flag", "exit", instruction.source_pc, instruction.source_line)
         self._emit(encode_epilogue(), "mov rsp, rbp; pop rbp; ret", "exit", instruction.source_pc, instruction.source_line)
 
@@ -4907,7 +6056,7 @@ class _NativeCodegenContext:
         if terminator.op == "ret":
             if self.function.return_type == "void" and terminator.args:
                 raise self._node_error(terminator, "native 机器码 MVP void 函数 ret 不应携带返回值")
-            if self.function.return_type in {"int64", "bool64"} and len(terminator.args) != 1:
+            if self.function.return_type in _SUPPORTED_VALUE_TYPES and len(terminator.args) != 1:
                 raise self._node_error(terminator, f"native 机器码 MVP {self.function.return_type} 函数 ret 必须携带 1 个返回值")
             if terminator.args:
                 if not _is_return_type_compatible(self.function.return_type, terminator.args[0].type_hint):
@@ -4916,8 +6065,23 @@ class _NativeCodegenContext:
                         f"native 机器码 MVP {self.function.return_type} 函数 ret 返回值类型不能是 {terminator.args[0].type_hint}",
                     )
                 self._load_operand_to_rax(terminator.args[0], terminator)
+                if self.function.return_type == "float64":
+                    self._emit(
+                        encode_movq_xmm_from_reg("XMM0", "RAX"),
+                        "movq xmm0, rax",
+                        "ret",
+                        terminator.source_pc,
+                        terminator.source_line,
+                        preserves_rax=True,
+                    )
+            elif self.optimize_level >= 1:
+                self._emit(encode_xor_eax_eax(), "xor eax, eax", "ret", terminator.source_pc, terminator.source_line)
             else:
                 self._emit(encode_mov_rax_imm64(0), "mov rax, 0", "ret", terminator.source_pc, terminator.source_line)
+            if self.optimize_level >= 1:
+                self._emit(encode_xor_edx_edx(), "xor edx, edx ; native normal return", "ret", terminator.source_pc, terminator.source_line)
+                self._emit(encode_epilogue(), "mov rsp, rbp; pop rbp; ret", "ret", terminator.source_pc, terminator.source_line)
+                return
             self._emit(encode_mov_rdx_imm64(0), "mov rdx, 0 ; native normal return", "ret", terminator.source_pc, terminator.source_line)
             self._emit(encode_epilogue(), "mov rsp, rbp; pop rbp; ret", "ret", terminator.source_pc, terminator.source_line)
             return
@@ -4925,11 +6089,14 @@ class _NativeCodegenContext:
             if len(terminator.targets) != 1:
                 raise self._node_error(terminator, "native 机器码 MVP 需要 jmp 恰好包含 1 个目标")
             self._emit_phi_copies(terminator.targets[0], terminator)
-            self._emit_pending_jump("jmp", terminator.targets[0], terminator.source_pc, terminator.source_line)
+            self._emit_jump_unless_next(terminator.targets[0], terminator)
             return
         if terminator.op == "br":
             if len(terminator.args) != 1 or len(terminator.targets) != 2:
                 raise self._node_error(terminator, "native 机器码 MVP 需要 br 包含 1 个条件和 2 个目标")
+            if self.optimize_level >= 1:
+                self._lower_branch_optimized(terminator)
+                return
             self._load_operand_to_rax(terminator.args[0], terminator)
             self._emit(encode_mov_r10_imm64(0), "mov r10, 0", "br", terminator.source_pc, terminator.source_line)
             self._emit(encode_cmp_rax_r10(), "cmp rax, r10", "br", terminator.source_pc, terminator.source_line)
@@ -4951,15 +6118,95 @@ class _NativeCodegenContext:
             return
         self._unsupported(terminator, terminator.op)
 
+    def _lower_branch_optimized(self, terminator: MachineTerminator) -> None:
+        """-O1 生成条件分支：按块布局让一侧直落，必要时反转条件，只在非直落边发射 jmp。"""
+        condition = self.fused_condition
+        self.fused_condition = None
+        if condition is None:
+            self._load_operand_to_rax(terminator.args[0], terminator)
+            self._emit(encode_test_rax_rax(), "test rax, rax", "br", terminator.source_pc, terminator.source_line, preserves_rax=True)
+            condition = ConditionCode.NE
+        true_target, false_target = terminator.targets
+        current_block = self._current_block_name()
+        true_has_phi = bool(self.phi_copies.get(true_target, {}).get(current_block))
+        false_has_phi = bool(self.phi_copies.get(false_target, {}).get(current_block))
+        if not true_has_phi and (false_has_phi or true_target != self.next_block_name):
+            self._emit_pending_jump(_CONDITION_JUMP_KINDS[condition], true_target, terminator.source_pc, terminator.source_line)
+            self._emit_phi_copies(false_target, terminator)
+            self._emit_jump_unless_next(false_target, terminator)
+            return
+        if not false_has_phi:
+            self._emit_pending_jump(_CONDITION_JUMP_KINDS[_NEGATED_CONDITIONS[condition]], false_target, terminator.source_pc, terminator.source_line)
+            self._emit_phi_copies(true_target, terminator)
+            self._emit_jump_unless_next(true_target, terminator)
+            return
+        true_label = self._synthetic_label("phi_true")
+        self._emit_pending_jump(_CONDITION_JUMP_KINDS[condition], true_label, terminator.source_pc, terminator.source_line)
+        self._emit_phi_copies(false_target, terminator)
+        self._emit_pending_jump("jmp", false_target, terminator.source_pc, terminator.source_line)
+        self.block_offsets[true_label] = len(self.code)
+        self._emit(b"", f"{true_label}:", "label", None, None)
+        self._emit_phi_copies(true_target, terminator)
+        self._emit_jump_unless_next(true_target, terminator)
+
+    def _emit_jump_unless_next(self, target: str, terminator: MachineTerminator) -> None:
+        """发射到目标块的 jmp；-O1 起目标恰好是下一个块时直接落入。"""
+        if self.optimize_level >= 1 and target == self.next_block_name:
+            return
+        self._emit_pending_jump("jmp", target, terminator.source_pc, terminator.source_line)
+
     def _emit_exit_propagation_blocks(self) -> None:
         """生成 call 后 native _exit 标志向调用者传播的尾声块。"""
         for label, source_pc, source_line in self.exit_propagation_labels:
             self.block_offsets[label] = len(self.code)
             self._emit(b"", f"{label}:", "label", None, None)
             self._emit(encode_epilogue(), "mov rsp, rbp; pop rbp; ret", "exit_propagate", source_pc, source_line)
+        if self.runtime_error_label is not None:
+            # RAX 保留 trampoline 的非 0 status，按 _exit 约定置 RDX=1 后返回
+            self.block_offsets[self.runtime_error_label] = len(self.code)
+            self._emit(b"", f"{self.runtime_error_label}:", "label", None, None)
+            self._emit(encode_mov_edx_imm32(1), "mov edx, 1 ; native runtime error", "runtime_error", None, None)
+            self._emit(encode_epilogue(), "mov rsp, rbp; pop rbp; ret", "runtime_error", None, None)
+
+    def _trap_label(self, kind: str) -> str:
+        """取得 kind 类运行期检查共用的陷阱块标签，首次使用时分配。"""
+        label = self.trap_labels.get(kind)
+        if label is None:
+            label = self._synthetic_label(kind)
+            self.trap_labels[kind] = label
+        return label
+
+    def _emit_trap_blocks(self) -> None:
+        """生成数组越界、浮点除零等运行期检查共用的 ud2 陷阱块。"""
+        for kind, label in self.trap_labels.items():
+            self.block_offsets[label] = len(self.code)
+            self._emit(b"", f"{label}:", "label", None, None)
+            self._emit(encode_ud2(), f"ud2 ; {_TRAP_MESSAGES[kind]}", kind, None, None)
+
+    def _emit_stack_probes(self) -> None:
+        """栈帧超过一页时按页顺序触碰新栈空间，让 Windows guard page 逐页提交。"""
+        if self.frame_size <= _STACK_PAGE_SIZE:
+            return
+        offsets = list(range(_STACK_PAGE_SIZE, self.frame_size, _STACK_PAGE_SIZE)) + [self.frame_size]
+        for offset in offsets:
+            self._emit(encode_mov_reg_from_frame("RAX", "RBP", offset), f"mov rax, [rbp-{offset}] ; stack probe", "stack_probe", None, None)
 
     def _load_operand_to_rax(self, operand: MachineOperand, node: MachineInstruction | MachineTerminator) -> None:
         """将操作数加载到 RAX。"""
+        if self.optimize_level >= 1:
+            source_op = getattr(node, "op", "operand")
+            value = self._immediate_value(operand)
+            if value is not None:
+                code, asm = _short_immediate_load("RAX", value)
+                self._emit(code, asm, source_op, node.source_pc, node.source_line)
+                return
+            base = self._frame_base(operand)
+            offset = self._slot_offset(operand, node)
+            if (base, offset) in self.rax_slots:
+                return
+            self._emit(encode_mov_reg_from_frame("RAX", base, offset), f"mov rax, [{base.lower()}-{offset}]", source_op, node.source_pc, node.source_line)
+            self.rax_slots.add((base, offset))
+            return
         if operand.kind == "imm":
             value = int(operand.value)
             self._emit(encode_mov_rax_imm64(value), f"mov rax, {value}", getattr(node, "op", "operand"), node.source_pc, node.source_line)
@@ -4972,6 +6219,27 @@ class _NativeCodegenContext:
 
     def _load_operand_to_r10(self, operand: MachineOperand, node: MachineInstruction | MachineTerminator) -> None:
         """将操作数加载到 R10。"""
+        if self.optimize_level >= 1:
+            source_op = getattr(node, "op", "operand")
+            value = self._immediate_value(operand)
+            if value is not None:
+                code, asm = _short_immediate_load("R10", value)
+                self._emit(code, asm, source_op, node.source_pc, node.source_line, preserves_rax=True)
+                return
+            base = self._frame_base(operand)
+            offset = self._slot_offset(operand, node)
+            if (base, offset) in self.rax_slots:
+                self._emit(encode_mov_r10_rax(), "mov r10, rax", source_op, node.source_pc, node.source_line, preserves_rax=True)
+                return
+            self._emit(
+                encode_mov_reg_from_frame("R10", base, offset),
+                f"mov r10, [{base.lower()}-{offset}]",
+                source_op,
+                node.source_pc,
+                node.source_line,
+                preserves_rax=True,
+            )
+            return
         if operand.kind == "imm":
             value = int(operand.value)
             self._emit(encode_mov_r10_imm64(value), f"mov r10, {value}", getattr(node, "op", "operand"), node.source_pc, node.source_line)
@@ -4990,8 +6258,11 @@ class _NativeCodegenContext:
         source_pc: int | None,
         source_line: int | None,
         source_attrs: dict[str, object] | None = None,
+        preserves_rax: bool = False,
     ) -> None:
-        """追加一条机器码清单项。"""
+        """追加一条机器码清单项；除非声明 preserves_rax，否则视为改写了 RAX。"""
+        if not preserves_rax:
+            self.rax_slots.clear()
         self.instructions.append(
             NativeCodeInstruction(
                 offset=len(self.code),
@@ -5006,13 +6277,14 @@ class _NativeCodegenContext:
         self.code.extend(code)
 
     def _emit_pending_jump(self, kind: str, target: str, source_pc: int | None, source_line: int | None, source_op: str | None = None) -> None:
-        """追加等待回填的相对跳转。"""
-        code = _encode_rel32_jump(kind, 0)
+        """追加等待回填的相对跳转；上一轮确认可收缩的跳转直接按 rel8 发射。"""
+        short = len(self.pending_jumps) in self.short_jumps
+        code = _encode_rel8_jump(kind, 0) if short else _encode_rel32_jump(kind, 0)
         asm = f"{kind} {target}"
         instruction_index = len(self.instructions)
         offset = len(self.code)
-        self._emit(code, asm, source_op or ("br" if kind == "jne" else "jmp"), source_pc, source_line)
-        self.pending_jumps.append(_PendingJump(offset, instruction_index, target, kind))
+        self._emit(code, asm, source_op or ("jmp" if kind == "jmp" else "br"), source_pc, source_line, preserves_rax=True)
+        self.pending_jumps.append(_PendingJump(offset, instruction_index, target, kind, short))
 
     def _emit_pending_call(self, target: str, source_pc: int | None, source_line: int | None) -> None:
         """追加等待回填的函数调用。"""
@@ -5022,40 +6294,47 @@ class _NativeCodegenContext:
         self.pending_calls.append(_PendingJump(offset, instruction_index, target, "call"))
 
     def _patch_pending_jumps(self) -> None:
-        """回填所有 rel32 跳转位移。"""
-        for jump in self.pending_jumps:
+        """回填所有相对跳转位移，并记录 rel32 位移已落在 int8 范围内、可在下一轮收缩的跳转。"""
+        for index, jump in enumerate(self.pending_jumps):
             target_offset = self.block_offsets.get(jump.target)
             if target_offset is None:
                 raise self._function_error(f"native 机器码 MVP 找不到跳转目标 {jump.target}")
-            size = len(_encode_rel32_jump(jump.kind, 0))
+            encode_jump = _encode_rel8_jump if jump.short else _encode_rel32_jump
+            width = "rel8" if jump.short else "rel32"
+            size = len(encode_jump(jump.kind, 0))
             displacement = target_offset - (jump.offset + size)
             old = self.instructions[jump.instruction_index]
             try:
-                code = _encode_rel32_jump(jump.kind, displacement)
+                code = encode_jump(jump.kind, displacement)
             except OverflowError as exc:
                 raise _native_listing_error(
                     self.function.name,
                     old,
-                    f"native 机器码 MVP {jump.kind} rel32 位移超出范围: {displacement}",
+                    f"native 机器码 MVP {jump.kind} {width} 位移超出范围: {displacement}",
                 ) from exc
+            # _exit 传播探针必须保持 jne rel32 形态，供运行前校验识别
+            if self.optimize_level >= 1 and not jump.short and old.source_op != "exit_probe" and -128 <= displacement <= 127:
+                self.relaxable_jumps.add(index)
             self.code[jump.offset:jump.offset + size] = code
             self.instructions[jump.instruction_index] = NativeCodeInstruction(
                 offset=old.offset,
                 code=code,
-                asm=f"{old.asm} ; rel32={displacement:+d}",
+                asm=f"{old.asm} ; {width}={displacement:+d}",
                 source_op=old.source_op,
                 source_pc=old.source_pc,
                 source_line=old.source_line,
                 source_attrs=dict(old.source_attrs),
             )
-            patch_offset = jump.offset + (len(code) - 4)
+            kind = f"{jump.kind}_{width}"
+            patch_size = _relocation_patch_size(kind)
             self.relocations.append(
                 NativeRelocation(
                     offset=jump.offset,
-                    patch_offset=patch_offset,
-                    kind=f"{jump.kind}_rel32",
+                    patch_offset=jump.offset + (len(code) - patch_size),
+                    kind=kind,
                     target=jump.target,
                     displacement=displacement,
+                    size=patch_size,
                     source_pc=old.source_pc,
                     source_line=old.source_line,
                 )
@@ -5066,8 +6345,111 @@ class _NativeCodegenContext:
         for result, source in self.phi_copies.get(target, {}).get(self._current_block_name(), []):
             self._load_operand_to_rax(source, node)
             offset = self._slot_offset(result, node)
+            if self.optimize_level >= 1:
+                self._emit(
+                    encode_mov_frame_from_reg("RBP", offset, "RAX"),
+                    f"mov [rbp-{offset}], rax",
+                    "phi_copy",
+                    node.source_pc,
+                    node.source_line,
+                    preserves_rax=True,
+                )
+                self.rax_slots.add(("RBP", offset))
+                continue
             self._emit(encode_mov_rbp_offset_from_rax(offset), f"mov [rbp-{offset}], rax", "phi_copy", node.source_pc, node.source_line)
 
+    def _store_rax_to_result(
+        self,
+        instruction: MachineInstruction,
+        asm_suffix: str = "",
+        source_attrs: dict[str, object] | None = None,
+        may_elide: bool = True,
+    ) -> None:
+        """-O1 把 RAX 写回结果栈槽；结果只被下一条指令从 RAX 读取时省略这次写回。"""
+        result = self._result_slot_offset(instruction)
+        if not (may_elide and self._is_single_use_result(instruction, self._rax_operand_candidates(self.next_node))):
+            self._emit(
+                encode_mov_frame_from_reg("RBP", result, "RAX"),
+                f"mov [rbp-{result}], rax{asm_suffix}",
+                instruction.op,
+                instruction.source_pc,
+                instruction.source_line,
+                source_attrs=source_attrs,
+                preserves_rax=True,
+            )
+        self.rax_slots.add(("RBP", result))
+
+    def _is_single_use_result(self, instruction: MachineInstruction, operands: list[MachineOperand] | tuple[MachineOperand, ...]) -> bool:
+        """判断指令结果是否只被使用一次，且这次使用就在 operands 中。"""
+        if instruction.result is None or instruction.result.kind != "vreg":
+            return False
+        name = str(instruction.result.value.name)
+        if self.vreg_use_counts.get(name) != 1:
+            return False
+        return any(operand.kind == "vreg" and str(operand.value.name) == name for operand in operands)
+
+    def _rax_operand_candidates(self, node: MachineInstruction | MachineTerminator | None) -> list[MachineOperand]:
+        """返回下一条指令第一次装入 RAX 时可能读取的操作数；与各 lowering 的装载顺序保持一致。"""
+        if node is None:
+            return []
+        op = node.op
+        if op in {"add", "imul"} or op in _COMPARE_OPS:
+            return list(node.args[:2])
+        if op in {"sub", "idiv", "imod", "neg", "not_bool", "cast_int_bool", "cast_bool_int", "exit", "ret", "br"}:
+            return list(node.args[:1])
+        if op in _FLOAT_BINARY_OPS or op in {"fneg", "cvt_int_float", "cvt_float_int"}:
+            return list(node.args[:1])
+        if op in _FLOAT_COMPARE_OPS:
+            return list(node.args[1:2] if _FLOAT_COMPARE_OPS[op][1] else node.args[:1])
+        if op in {"store_stack", "call", "call_runtime", "copy_block"}:
+            return list(node.args[1:2])
+        if op in {"load_index", "store_index", "load_mem", "store_mem"}:
+            return list(node.args[:1])
+        return []
+
+    def _prefers_swapped_operands(self, first: MachineOperand, second: MachineOperand) -> bool:
+        """-O1 判断交换律运算/比较是否应交换操作数：优先复用 RAX 中的值，其次把立即数留给右操作数。"""
+        if self._operand_in_rax(second) and not self._operand_in_rax(first):
+            return True
+        return self._immediate_value(first) is not None and self._immediate_value(second) is None
+
+    def _operand_in_rax(self, operand: MachineOperand) -> bool:
+        """判断操作数对应栈槽的值当前是否就在 RAX 中。"""
+        if operand.kind == "slot":
+            key = (operand.value.kind, operand.value.index)
+        elif operand.kind == "vreg":
+            key = ("temp", int(_vreg_index_text(operand.value.name)))
+        else:
+            return False
+        offset = self.slot_offsets.get(key)
+        return offset is not None and (self._frame_base(operand), offset) in self.rax_slots
+
+    def _immediate_value(self, operand: MachineOperand | None) -> int | None:
+        """-O1 取得操作数的编译期立即数：字面立即数或由 load_imm 定义的虚拟寄存器。"""
+        if operand is None:
+            return None
+        if operand.kind == "imm":
+            return int(operand.value)
+        if operand.kind == "vreg":
+            return self.immediate_vregs.get(str(operand.value.name))
+        return None
+
+    def _frame_base(self, operand: MachineOperand) -> str:
+        """返回访问操作数栈槽使用的基址寄存器。"""
+        return "R11" if self._uses_global_frame(operand) else "RBP"
+
+    def _next_emitting_node(self, block: MachineBlock, index: int) -> MachineInstruction | MachineTerminator | None:
+        """返回 block.instructions[index] 之后第一条会发射机器码的指令，没有时返回终结指令。"""
+        for instruction in block.instructions[index + 1:]:
+            if instruction.op in {"phi", "set_exit_code"}:
+                continue
+            if instruction.op == "mov" and instruction.attrs.get("kind") == "register_function":
+                continue
+            if instruction.op == "load_imm" and self._immediate_value(instruction.result) is not None:
+                continue
+            return instruction
+        return block.terminator
+
     def _current_block_name(self) -> str:
         """返回当前生成位置所在基本块名。"""
         for name, offset in reversed(list(self.block_offsets.items())):
@@ -5087,6 +6469,11 @@ class _NativeCodegenContext:
             offset = self.slot_offsets.get(key)
             if offset is None:
                 raise self._function_error(f"native 机器码 MVP 找不到参数 local[{param.index}] 栈槽")
+            if param.kind == "register" and param.name.upper().startswith("XMM"):
+                register = param.name.upper()
+                self._emit(encode_movq_reg_from_xmm("RAX", register), f"movq rax, {register.lower()}", "param", None, None)
+                self._emit(encode_mov_rbp_offset_from_rax(offset), f"mov [rbp-{offset}], rax", "param", None, None)
+                continue
             if param.kind == "register":
                 register = param.name.upper()
                 self._emit(
@@ -5117,6 +6504,8 @@ class _NativeCodegenContext:
         for slot in self.function.frame.temp_slots:
             offsets[(slot.kind, slot.index)] = next_offset
             next_offset += slot.size
+        for slot in self.function.frame.memory_slots:
+            next_offset = self._collect_operand_slot(offsets, next_offset, MachineOperand.slot(slot))
         for block in self.function.blocks:
             for instruction in block.instructions:
                 for operand in [instruction.result, *instruction.args]:
@@ -5139,9 +6528,11 @@ class _NativeCodegenContext:
     def _stack_slot_allocations(self) -> list[NativeStackSlotAllocation]:
         """生成可 dump 的栈槽分配结果。"""
         items = []
+        memory_sizes = {slot.index: slot.size for slot in self.function.frame.memory_slots}
         for (kind, index), offset in sorted(self.slot_offsets.items(), key=lambda item: item[1]):
             name = f"%v{index}" if kind == "temp" else f"{kind}[{index}]"
-            items.append(NativeStackSlotAllocation(name=name, offset=offset, size=8))
+            size = memory_sizes.get(index, 8) if kind == "memory" else 8
+            items.append(NativeStackSlotAllocation(name=name, offset=offset, size=size))
         return items
 
     def _build_phi_copies(self) -> dict[str, dict[str, list[tuple[MachineOperand, MachineOperand]]]]:
@@ -5173,7 +6564,8 @@ class _NativeCodegenContext:
         else:
             return next_offset
         if key not in offsets:
-            offsets[key] = next_offset
+            # 多字内存块的偏移指向最低地址的首字，整块位于 [rbp-offset, rbp-offset+size)
+            offsets[key] = next_offset + size - 8
             next_offset += size
         return next_offset
 
@@ -5477,6 +6869,18 @@ def _format_function(function: NativeCodeFunction, functions: dict[str, NativeCo
             "| `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | "
             "`-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` | `-` |\n"
         )
+    encoded_instructions = [instruction for instruction in function.instructions if instruction.code]
+    lines.extend([
+        "\n",
+        "#### 代码统计\n\n",
+        f"- 指令数: `{len(encoded_instructions)}`\n",
+        f"- 平均指令长度: `{len(function.code) / len(encoded_instructions) if encoded_instructions else 0:.2f}` bytes\n",
+        "- 执行指令数: 下表为每经过一次基本块执行的指令数，总数为各块经过次数与块指令数乘积之和\n\n",
+        "| 块 | 偏移 | 大小 | 单次经过指令数 |\n",
+        "| --- | --- | --- | --- |\n",
+    ])
+    for block_name, block_offset, block_size, block_instruction_count in _native_block_statistics(function):
+        lines.append(f"| `{block_name}` | `{block_offset:04X}` | `{block_size}` | `{block_instruction_count}` |\n")
     lines.extend([
         "\n",
         "#### 机器码清单\n\n",
@@ -5515,6 +6919,23 @@ def _format_function(function: NativeCodeFunction, functions: dict[str, NativeCo
     return lines
 
 
+def _native_block_statistics(function: NativeCodeFunction) -> list[tuple[str, int, int, int]]:
+    """按标签切分函数机器码，返回 (块名, 偏移, 字节数, 指令数)；首个标签之前的部分记为 prologue。"""
+    statistics: list[tuple[str, int, int, int]] = []
+    name, offset, size, count = "prologue", function.offset, 0, 0
+    for instruction in function.instructions:
+        if instruction.source_op == "label" and instruction.asm.endswith(":"):
+            if size or name != "prologue":
+                statistics.append((name, offset, size, count))
+            name, offset, size, count = instruction.asm[:-1], instruction.offset, 0, 0
+            continue
+        if instruction.code:
+            size += len(instruction.code)
+            count += 1
+    statistics.append((name, offset, size, count))
+    return statistics
+
+
 def _patch_pending_calls(
     code: bytearray,
     pending_calls: list[_PendingJump],
@@ -10,6 +10,7 @@ class ConditionCode(str, Enum):
     LE = "le"
     GT = "gt"
     GE = "ge"
+    AE = "ae"
 
 
 _SETCC_OPCODE = {
@@ -19,7 +20,25 @@ _SETCC_OPCODE = {
     ConditionCode.LE: 0x9E,
     ConditionCode.GT: 0x9F,
     ConditionCode.GE: 0x9D,
+    ConditionCode.AE: 0x93,
 }
+_JCC_REL32_OPCODE = {
+    ConditionCode.EQ: 0x84,
+    ConditionCode.NE: 0x85,
+    ConditionCode.LT: 0x8C,
+    ConditionCode.LE: 0x8E,
+    ConditionCode.GT: 0x8F,
+    ConditionCode.GE: 0x8D,
+    ConditionCode.AE: 0x83,
+}
+_FRAME_BASE_REGISTERS = {"RBP": 0x5, "R11": 0x3}
+_FRAME_VALUE_REGISTERS = {"RAX": 0x0, "R10": 0x2}
+_RSP_SCRATCH_REGISTERS = {"R10": 0x2, "R11": 0x3}
+_LEA_SCALE_SIB = {3: 0x40, 5: 0x80, 9: 0xC0}
+_XMM_REGISTERS = {"XMM0": 0x0, "XMM1": 0x1, "XMM2": 0x2, "XMM3": 0x3}
+_SCALAR_DOUBLE_OPCODES = {"addsd": 0x58, "mulsd": 0x59, "subsd": 0x5C, "divsd": 0x5E}
+# cmpsd 谓词：eq/lt/le 遇到 NaN 为假，neq 遇到 NaN 为真，与 Python float 比较一致
+CMPSD_PREDICATES = {"eq": 0, "lt": 1, "le": 2, "neq": 4}
 
 
 def encode_prologue(frame_size: int) -> bytes:
@@ -51,6 +70,56 @@ def encode_mov_rdx_imm64(value: int) -> bytes:
     return bytes([0x48, 0xBA]) + _int64(value)
 
 
+def encode_mov_rax_imm32(value: int) -> bytes:
+    """编码 mov rax, imm32（符号扩展）。"""
+    return bytes([0x48, 0xC7, 0xC0]) + _int32(value)
+
+
+def encode_mov_eax_imm32(value: int) -> bytes:
+    """编码 mov eax, imm32（零扩展到 rax）。"""
+    return bytes([0xB8]) + _uint32(value)
+
+
+def encode_xor_eax_eax() -> bytes:
+    """编码 xor eax, eax（清零 rax）。"""
+    return bytes([0x31, 0xC0])
+
+
+def encode_mov_r10_imm32(value: int) -> bytes:
+    """编码 mov r10, imm32（符号扩展）。"""
+    return bytes([0x49, 0xC7, 0xC2]) + _int32(value)
+
+
+def encode_mov_r10d_imm32(value: int) -> bytes:
+    """编码 mov r10d, imm32（零扩展到 r10）。"""
+    return bytes([0x41, 0xBA]) + _uint32(value)
+
+
+def encode_xor_r10d_r10d() -> bytes:
+    """编码 xor r10d, r10d（清零 r10）。"""
+    return bytes([0x45, 0x31, 0xD2])
+
+
+def encode_mov_edx_imm32(value: int) -> bytes:
+    """编码 mov edx, imm32（零扩展到 rdx）。"""
+    return bytes([0xBA]) + _uint32(value)
+
+
+def encode_xor_edx_edx() -> bytes:
+    """编码 xor edx, edx（清零 rdx）。"""
+    return bytes([0x31, 0xD2])
+
+
+def encode_mov_r10_rax() -> bytes:
+    """编码 mov r10, rax。"""
+    return bytes([0x49, 0x89, 0xC2])
+
+
+def encode_mov_rax_r10() -> bytes:
+    """编码 mov rax, r10。"""
+    return bytes([0x4C, 0x89, 0xD0])
+
+
 def encode_mov_r11_rbp() -> bytes:
     """编码 mov r11, rbp。"""
     return bytes([0x49, 0x89, 0xEB])
@@ -96,6 +165,31 @@ def encode_mov_rsp_offset_from_rax(offset: int) -> bytes:
     return bytes([0x48, 0x89, 0x84, 0x24]) + _int32(offset)
 
 
+def encode_mov_rsp_offset_from_reg(offset: int, register: str) -> bytes:
+    """编码 mov [rsp+offset], r10/r11，offset 为 disp8。"""
+    return bytes([0x4C, 0x89, 0x44 | (_RSP_SCRATCH_REGISTERS[register.upper()] << 3), 0x24]) + _int8(offset)
+
+
+def encode_mov_reg_from_rsp_offset(register: str, offset: int) -> bytes:
+    """编码 mov r10/r11, [rsp+offset]，offset 为 disp8。"""
+    return bytes([0x4C, 0x8B, 0x44 | (_RSP_SCRATCH_REGISTERS[register.upper()] << 3), 0x24]) + _int8(offset)
+
+
+def encode_lea_r9_rsp_offset(offset: int) -> bytes:
+    """编码 lea r9, [rsp+offset]，offset 为 disp8。"""
+    return bytes([0x4C, 0x8D, 0x4C, 0x24]) + _int8(offset)
+
+
+def encode_mov_reg_from_frame(register: str, base: str, offset: int) -> bytes:
+    """编码 mov register, [base-offset]；偏移不超过 128 时使用 disp8 短格式。"""
+    return _frame_access(0x8B, register, base, offset)
+
+
+def encode_mov_frame_from_reg(base: str, offset: int, register: str) -> bytes:
+    """编码 mov [base-offset], register；偏移不超过 128 时使用 disp8 短格式。"""
+    return _frame_access(0x89, register, base, offset)
+
+
 def encode_mov_rbp_offset_from_reg(offset: int, register: str) -> bytes:
     """编码 mov [rbp-offset], register。"""
     opcodes = {
@@ -118,6 +212,26 @@ def encode_mov_reg_from_rax(register: str) -> bytes:
     return opcodes[register.upper()]
 
 
+def encode_lea_rax_frame(base: str, offset: int) -> bytes:
+    """编码 lea rax, [base-offset]；偏移不超过 128 时使用 disp8 短格式。"""
+    return _frame_access(0x8D, "RAX", base, offset)
+
+
+def encode_mov_reg_from_cell(register: str, displacement: int) -> bytes:
+    """编码 mov register, [rax*8+disp32]，RAX 持有 8 字节单元地址。"""
+    return _cell_access(0x8B, register, displacement)
+
+
+def encode_mov_cell_from_reg(displacement: int, register: str) -> bytes:
+    """编码 mov [rax*8+disp32], register，RAX 持有 8 字节单元地址。"""
+    return _cell_access(0x89, register, displacement)
+
+
+def encode_mov_rbp_scaled_rax_from_r10(offset: int) -> bytes:
+    """编码 mov [rbp+rax*8-offset], r10。"""
+    return bytes([0x4C, 0x89, 0x94, 0xC5]) + _negative_disp32(offset)
+
+
 def encode_add_rax_r10() -> bytes:
     """编码 add rax, r10。"""
     return bytes([0x4C, 0x01, 0xD0])
@@ -138,6 +252,76 @@ def encode_imul_rax_r10() -> bytes:
     return bytes([0x49, 0x0F, 0xAF, 0xC2])
 
 
+def encode_add_rax_imm(value: int) -> bytes:
+    """编码 add rax, imm8/imm32。"""
+    if _fits_int8(value):
+        return bytes([0x48, 0x83, 0xC0]) + _int8(value)
+    return bytes([0x48, 0x05]) + _int32(value)
+
+
+def encode_sub_rax_imm(value: int) -> bytes:
+    """编码 sub rax, imm8/imm32。"""
+    if _fits_int8(value):
+        return bytes([0x48, 0x83, 0xE8]) + _int8(value)
+    return bytes([0x48, 0x2D]) + _int32(value)
+
+
+def encode_cmp_rax_imm(value: int) -> bytes:
+    """编码 cmp rax, imm8/imm32。"""
+    if _fits_int8(value):
+        return bytes([0x48, 0x83, 0xF8]) + _int8(value)
+    return bytes([0x48, 0x3D]) + _int32(value)
+
+
+def encode_cmp_r10_imm(value: int) -> bytes:
+    """编码 cmp r10, imm8/imm32。"""
+    if _fits_int8(value):
+        return bytes([0x49, 0x83, 0xFA]) + _int8(value)
+    return bytes([0x49, 0x81, 0xFA]) + _int32(value)
+
+
+def encode_imul_rax_imm(value: int) -> bytes:
+    """编码 imul rax, rax, imm8/imm32。"""
+    if _fits_int8(value):
+        return bytes([0x48, 0x6B, 0xC0]) + _int8(value)
+    return bytes([0x48, 0x69, 0xC0]) + _int32(value)
+
+
+def encode_inc_rax() -> bytes:
+    """编码 inc rax。"""
+    return bytes([0x48, 0xFF, 0xC0])
+
+
+def encode_dec_rax() -> bytes:
+    """编码 dec rax。"""
+    return bytes([0x48, 0xFF, 0xC8])
+
+
+def encode_add_rax_rax() -> bytes:
+    """编码 add rax, rax。"""
+    return bytes([0x48, 0x01, 0xC0])
+
+
+def encode_shl_rax_imm8(count: int) -> bytes:
+    """编码 shl rax, imm8。"""
+    return bytes([0x48, 0xC1, 0xE0, count & 0x3F])
+
+
+def encode_shr_rax_imm8(count: int) -> bytes:
+    """编码 shr rax, imm8。"""
+    return bytes([0x48, 0xC1, 0xE8, count & 0x3F])
+
+
+def encode_lea_rax_scaled_rax(multiplier: int) -> bytes:
+    """编码 lea rax, [rax+rax*scale]，multiplier 为 3、5 或 9。"""
+    return bytes([0x48, 0x8D, 0x04, _LEA_SCALE_SIB[multiplier]])
+
+
+def encode_test_rax_rax() -> bytes:
+    """编码 test rax, rax。"""
+    return bytes([0x48, 0x85, 0xC0])
+
+
 def encode_neg_rax() -> bytes:
     """编码 neg rax。"""
     return bytes([0x48, 0xF7, 0xD8])
@@ -203,11 +387,83 @@ def encode_jns_rel32(displacement: int) -> bytes:
     return bytes([0x0F, 0x89]) + _int32(displacement)
 
 
+def encode_jcc_rel32(condition: ConditionCode, displacement: int) -> bytes:
+    """编码 jcc rel32。"""
+    return bytes([0x0F, _JCC_REL32_OPCODE[condition]]) + _int32(displacement)
+
+
+def encode_jcc_rel8(condition: ConditionCode, displacement: int) -> bytes:
+    """编码 jcc rel8。"""
+    return bytes([_JCC_REL32_OPCODE[condition] - 0x10]) + _int8(displacement)
+
+
+def encode_jns_rel8(displacement: int) -> bytes:
+    """编码 jns rel8。"""
+    return bytes([0x79]) + _int8(displacement)
+
+
+def encode_jmp_rel8(displacement: int) -> bytes:
+    """编码 jmp rel8。"""
+    return bytes([0xEB]) + _int8(displacement)
+
+
 def encode_call_rel32(displacement: int) -> bytes:
     """编码 call rel32。"""
     return bytes([0xE8]) + _int32(displacement)
 
 
+def encode_call_rax() -> bytes:
+    """编码 call rax。"""
+    return bytes([0xFF, 0xD0])
+
+
+def encode_ud2() -> bytes:
+    """编码 ud2。"""
+    return bytes([0x0F, 0x0B])
+
+
+def encode_movq_xmm_from_reg(xmm: str, register: str) -> bytes:
+    """编码 movq xmm, rax/r10：按位搬运 64 位浮点值。"""
+    rex = 0x48 | (0x01 if register.upper() == "R10" else 0)
+    return bytes([0x66, rex, 0x0F, 0x6E, 0xC0 | (_XMM_REGISTERS[xmm.upper()] << 3) | _FRAME_VALUE_REGISTERS[register.upper()]])
+
+
+def encode_movq_reg_from_xmm(register: str, xmm: str) -> bytes:
+    """编码 movq rax/r10, xmm。"""
+    rex = 0x48 | (0x01 if register.upper() == "R10" else 0)
+    return bytes([0x66, rex, 0x0F, 0x7E, 0xC0 | (_XMM_REGISTERS[xmm.upper()] << 3) | _FRAME_VALUE_REGISTERS[register.upper()]])
+
+
+def encode_scalar_double_op(mnemonic: str, destination: str, source: str) -> bytes:
+    """编码 addsd/subsd/mulsd/divsd xmm, xmm。"""
+    return bytes([0xF2, 0x0F, _SCALAR_DOUBLE_OPCODES[mnemonic], _xmm_modrm(destination, source)])
+
+
+def encode_cmpsd(destination: str, source: str, predicate: str) -> bytes:
+    """编码 cmpsd xmm, xmm, imm8；结果为全 1 或全 0 的 64 位掩码。"""
+    return bytes([0xF2, 0x0F, 0xC2, _xmm_modrm(destination, source), CMPSD_PREDICATES[predicate]])
+
+
+def encode_cvtsi2sd_xmm_rax(xmm: str) -> bytes:
+    """编码 cvtsi2sd xmm, rax。"""
+    return bytes([0xF2, 0x48, 0x0F, 0x2A, 0xC0 | (_XMM_REGISTERS[xmm.upper()] << 3)])
+
+
+def encode_cvttsd2si_rax_xmm(xmm: str) -> bytes:
+    """编码 cvttsd2si rax, xmm（向零截断）。"""
+    return bytes([0xF2, 0x48, 0x0F, 0x2C, 0xC0 | _XMM_REGISTERS[xmm.upper()]])
+
+
+def encode_btc_rax_imm8(bit: int) -> bytes:
+    """编码 btc rax, imm8；翻转 bit 63 即浮点取负。"""
+    return bytes([0x48, 0x0F, 0xBA, 0xF8, bit & 0x3F])
+
+
+def encode_add_r10_r10() -> bytes:
+    """编码 add r10, r10；移出符号位后为 0 即 ±0.0。"""
+    return bytes([0x4D, 0x01, 0xD2])
+
+
 def encode_sub_rsp_imm32(value: int) -> bytes:
     """编码 sub rsp, imm32。"""
     return bytes([0x48, 0x81, 0xEC]) + _int32(value)
@@ -218,6 +474,43 @@ def encode_add_rsp_imm32(value: int) -> bytes:
     return bytes([0x48, 0x81, 0xC4]) + _int32(value)
 
 
+def _frame_access(opcode: int, register: str, base: str, offset: int) -> bytes:
+    """编码 RAX/R10 与 [RBP/R11-offset] 之间的 mov。"""
+    reg = _FRAME_VALUE_REGISTERS[register.upper()]
+    rm = _FRAME_BASE_REGISTERS[base.upper()]
+    rex = 0x48 | (0x04 if register.upper() == "R10" else 0) | (0x01 if base.upper() == "R11" else 0)
+    if int(offset) <= 128:
+        return bytes([rex, opcode, 0x40 | (reg << 3) | rm]) + _int8(-int(offset))
+    return bytes([rex, opcode, 0x80 | (reg << 3) | rm]) + _negative_disp32(offset)
+
+
+def _cell_access(opcode: int, register: str, displacement: int) -> bytes:
+    """编码 RAX/R10 与 [rax*8+disp32] 之间的 mov；SIB 无基址形式固定携带 disp32。"""
+    reg = _FRAME_VALUE_REGISTERS[register.upper()]
+    rex = 0x48 | (0x04 if register.upper() == "R10" else 0)
+    return bytes([rex, opcode, 0x04 | (reg << 3), 0xC5]) + _int32(displacement)
+
+
+def _xmm_modrm(destination: str, source: str) -> int:
+    """编码寄存器直接寻址的 xmm, xmm ModRM。"""
+    return 0xC0 | (_XMM_REGISTERS[destination.upper()] << 3) | _XMM_REGISTERS[source.upper()]
+
+
+def _fits_int8(value: int) -> bool:
+    """判断立即数能否用符号扩展 imm8 编码。"""
+    return -128 <= int(value) <= 127
+
+
+def _int8(value: int) -> bytes:
+    """按有符号 int8 编码。"""
+    return int(value).to_bytes(1, "little", signed=True)
+
+
+def _uint32(value: int) -> bytes:
+    """按小端无符号 uint32 编码。"""
+    return int(value).to_bytes(4, "little", signed=False)
+
+
 def _int32(value: int) -> bytes:
     """按小端有符号 int32 编码。"""
     return int(value).to_bytes(4, "little", signed=True)
@@ -23,6 +23,8 @@ def format_machine_program(program: MachineProgram) -> str:
         f"- Caller-saved: `{', '.join(regs.caller_saved)}`\n",
         f"- Callee-saved: `{', '.join(regs.callee_saved)}`\n\n",
     ]
+    if program.runtime_strings:
+        lines.extend(_format_runtime_strings(program.runtime_strings))
     lines.extend(_format_function(program.module))
     for function in program.functions.values():
         lines.append("\n")
@@ -30,6 +32,19 @@ def format_machine_program(program: MachineProgram) -> str:
     return "".join(lines)
 
 
+def _format_runtime_strings(runtime_strings: list[str]) -> list[str]:
+    """生成 str64 句柄对应的程序字符串表。"""
+    lines = [
+        "#### 运行时字符串\n\n",
+        "| 句柄 | 内容 |\n",
+        "| --- | --- |\n",
+    ]
+    for handle, value in enumerate(runtime_strings):
+        lines.append(f"| `{handle}` | `{value!r}` |\n")
+    lines.append("\n")
+    return lines
+
+
 def _format_function(function: MachineFunction) -> list[str]:
     params = ", ".join(f"{item.index}:{item.kind}:{item.name}" for item in function.params) or "-"
     lines = [
@@ -42,6 +57,9 @@ def _format_function(function: MachineFunction) -> list[str]:
         f"- 临时槽数量: `{len(function.frame.temp_slots)}`\n",
         f"- 虚拟寄存器数量: `{function.virtual_register_count}`\n",
     ]
+    if function.frame.memory_slots:
+        memory_size = sum(slot.size for slot in function.frame.memory_slots)
+        lines.append(f"- 内存块数量: `{len(function.frame.memory_slots)}` (`{memory_size}` bytes)\n")
     if function.exit_code_value is not None:
         lines.append(f"- 入口退出码值: `{_format_operand(function.exit_code_value)}`\n")
     lines.append("\n")
@@ -63,6 +81,7 @@ def _format_stack_slots(function: MachineFunction) -> list[str]:
         *function.frame.local_slots,
         *function.frame.temp_slots,
         *function.frame.spill_slots,
+        *function.frame.memory_slots,
     ]
     if not slots:
         lines.append("| `-` | `-` | `0` |\n")
@@ -1,6 +1,7 @@
+import struct
 from typing import Any
 
-from verbose_c.compiler.ir.model import IRFunction, IRInstruction, IRProgram, IRTerminator, IRValue
+from verbose_c.compiler.ir.model import IRBasicBlock, IRFunction, IRInstruction, IRProgram, IRTerminator, IRValue
 from verbose_c.compiler.native.abi import StackFrameLayout, WINDOWS_X64_ABI
 from verbose_c.compiler.native.errors import NativeLoweringError
 from verbose_c.compiler.native.machine_ir import (
@@ -13,13 +14,24 @@ from verbose_c.compiler.native.machine_ir import (
     StackSlot,
     VirtualRegister,
 )
+from verbose_c.compiler.native.runtime_calls import (
+    RUNTIME_STRING_BIND,
+    RUNTIME_STRING_COLLECT,
+    RUNTIME_STRING_EQ,
+    RUNTIME_STRING_HELPERS,
+    RUNTIME_STRING_PIN,
+)
 from verbose_c.compiler.native.target import NativeTarget
 from verbose_c.compiler.native.validator import validate_machine_function
 from verbose_c.object.function import VBCFunction
+from verbose_c.object.struct import VBCStruct
 from verbose_c.object.t_bool import VBCBool
+from verbose_c.object.t_float import VBCFloat
 from verbose_c.object.t_integer import VBCInteger
 from verbose_c.object.t_null import VBCNull
-from verbose_c.vm.builtins_functions import BUILTIN_FUNCTION_SIGNATURES
+from verbose_c.object.t_string import VBCString
+from verbose_c.typing.types import AnyType, IntegerType, StringType
+from verbose_c.vm.builtins_functions import BUILTIN_CONSTANTS, BUILTIN_FUNCTION_SIGNATURES
 
 
 _BINARY_OPS = {
@@ -38,6 +50,20 @@ _BINARY_OPS = {
 
 _COMPARE_MACHINE_OPS = {"cmp_eq", "cmp_ne", "cmp_lt", "cmp_le", "cmp_gt", "cmp_ge"}
 
+# 任一操作数为 float64 时二元运算改用 SSE2 标量双精度指令；VBCFloat 不支持取模
+_FLOAT_BINARY_OPS = {
+    "binary add": "fadd",
+    "binary sub": "fsub",
+    "binary mul": "fmul",
+    "binary div": "fdiv",
+    "binary eq": "fcmp_eq",
+    "binary ne": "fcmp_ne",
+    "binary lt": "fcmp_lt",
+    "binary le": "fcmp_le",
+    "binary gt": "fcmp_gt",
+    "binary ge": "fcmp_ge",
+}
+
 _NATIVE_INTEGER_CAST_TARGETS = {
     "char",
     "short",
@@ -52,22 +78,43 @@ _NATIVE_INTEGER_CAST_TARGETS = {
 
 _NATIVE_BOOL_CAST_TARGETS = {"bool", "bool64"}
 
+# VBCFloat 的 FLOAT/DOUBLE/NLFLOAT 都以 Python float（IEEE 754 双精度）保存值，native 统一用 float64 表示
+_NATIVE_FLOAT_CAST_TARGETS = {"float", "double", "nlfloat", "float64"}
+
+_NATIVE_SCALAR_TYPES = {"int64", "bool64", "float64"}
+
+# 字符串在 native 中只是程序字符串表的 str64 句柄：可以存取变量、在 phi 中合流、传给运行时导入调用，
+# 并经宿主比较是否相等；其余运算（拼接、大小比较、真值判断等）仍留在 VM
+_STRING_HANDLE_OPS = {"const", "load_local", "store_local", "load_global", "store_global", "call", "phi", "discard"}
+
+# 经运行时导入表调用的 builtin 允许的参数值类型；read_bytes 返回的 bytes 暂无 native 表示
+_RUNTIME_ANY_VALUE_TYPES = {"int64", "bool64", "float64", "str64"}
+
+# 数组元素/结构体字段可落在 native 8 字节内存字上的运行时类型；指针按 VM 单元地址存为整数
+_NATIVE_MEMORY_WORD_TYPES = {
+    "CHAR": "int64",
+    "SHORT": "int64",
+    "INT": "int64",
+    "LONG": "int64",
+    "LONGLONG": "int64",
+    "NLINT": "int64",
+    "POINTER": "int64",
+    "BOOL": "bool64",
+    "FLOAT": "float64",
+    "DOUBLE": "float64",
+    "NLFLOAT": "float64",
+}
+
+# 单个函数栈帧内数组/结构体内存块的总上限，超出时整个函数留在 VM
+_MAX_NATIVE_MEMORY_BYTES = 256 * 1024
+
+_POINTER_ARITHMETIC_OPS = {
+    "pointer_add": "add",
+    "pointer_sub": "sub",
+    "pointer_diff": "sub",
+}
+
 _UNSUPPORTED_FEATURES = {
-    "alloc_array": "array",
-    "load_index": "array",
-    "store_index": "array",
-    "array_decay": "array_decay",
-    "alloc_struct": "struct",
-    "load_field": "struct",
-    "store_field": "struct",
-    "copy_struct": "struct",
-    "address_of": "address_escape",
-    "load_pointer": "pointer_deref",
-    "store_pointer": "pointer_deref",
-    "pointer_add": "pointer_arithmetic",
-    "pointer_sub": "pointer_arithmetic",
-    "pointer_diff": "pointer_arithmetic",
-    "pointer_address": "pointer_address",
     "get_property": "class_object",
     "set_property": "class_object",
     "new_instance": "class_object",
@@ -85,9 +132,30 @@ def lower_ir_program_to_machine(program: IRProgram) -> MachineProgram:
     function_return_types[program.module.name] = program.module.return_type
     global_slots: dict[str, StackSlot] = {}
     global_value_types: dict[str, str] = {}
-    module = _MachineLoweringContext(program.module, function_names, function_return_types, global_slots, global_value_types).lower()
+    struct_layouts = _collect_struct_layouts(program)
+    runtime_strings: list[str] = []
+    constant_globals = _collect_constant_globals(program)
+    module = _MachineLoweringContext(
+        program.module,
+        function_names,
+        function_return_types,
+        global_slots,
+        global_value_types,
+        struct_layouts,
+        runtime_strings,
+        constant_globals,
+    ).lower()
     functions = {
-        name: _MachineLoweringContext(function, function_names, function_return_types, global_slots, global_value_types).lower()
+        name: _MachineLoweringContext(
+            function,
+            function_names,
+            function_return_types,
+            global_slots,
+            global_value_types,
+            struct_layouts,
+            runtime_strings,
+            constant_globals,
+        ).lower()
         for name, function in program.functions.items()
     }
     shared_global_slots = list(global_slots.values())
@@ -99,9 +167,98 @@ def lower_ir_program_to_machine(program: IRProgram) -> MachineProgram:
         abi=WINDOWS_X64_ABI,
         module=module,
         functions=functions,
+        runtime_strings=runtime_strings,
     )
 
 
+def lower_ir_functions_to_machine(
+    program: IRProgram,
+    external_functions: dict[str, str] | None = None,
+) -> tuple[MachineProgram, dict[str, Exception]]:
+    """
+    逐函数独立 lowering 为 Machine IR，供混合执行按函数分层。
+
+    与 lower_ir_program_to_machine 不同，单个函数失败只记入返回的错误表，其余函数照常生成；
+    读写全局变量的函数同样记为失败，因为混合执行时全局变量由 VM 持有，native 侧没有 global frame。
+    模块入口替换为只 halt 的空入口，模块初始化仍由 VM 执行；调用关系是否闭合由调用方检查。
+
+    Args:
+        program (IRProgram): 待 lowering 的 IR 程序。
+        external_functions (dict[str, str] | None): 不在 program 中但可被调用的函数名 -> 返回类型，
+            例如 IR lowering 已失败、留在 VM 执行的函数。
+    """
+    function_return_types = dict(external_functions or {})
+    function_return_types.update({name: function.return_type for name, function in program.functions.items()})
+    function_names = set(function_return_types)
+    function_return_types[program.module.name] = program.module.return_type
+    struct_layouts = _collect_struct_layouts(program)
+    runtime_strings: list[str] = []
+    constant_globals = _collect_constant_globals(program)
+    functions: dict[str, MachineFunction] = {}
+    errors: dict[str, Exception] = {}
+    for name, function in program.functions.items():
+        global_slots: dict[str, StackSlot] = {}
+        string_count = len(runtime_strings)
+        try:
+            functions[name] = _MachineLoweringContext(
+                function,
+                function_names,
+                function_return_types,
+                global_slots,
+                {},
+                struct_layouts,
+                runtime_strings,
+                constant_globals,
+            ).lower()
+        except Exception as error:
+            errors[name] = error
+        else:
+            if global_slots:
+                del functions[name]
+                errors[name] = NativeLoweringError(f"函数 {name}: 混合执行暂不支持访问全局变量 {', '.join(sorted(global_slots))}")
+        if name in errors:
+            # 失败函数登记的字符串不会出现在机器码中，回退到 lowering 前的字符串表
+            del runtime_strings[string_count:]
+    entry = IRFunction(
+        name=program.module.name,
+        blocks=[IRBasicBlock("bb_0", 0, 0, terminator=IRTerminator("halt"))],
+        source_path=program.module.source_path,
+    )
+    module = _MachineLoweringContext(entry, function_names, function_return_types, {}, {}, struct_layouts, runtime_strings, constant_globals).lower()
+    return (
+        MachineProgram(
+            target=NativeTarget.WINDOWS_X64,
+            abi=WINDOWS_X64_ABI,
+            module=module,
+            functions=functions,
+            runtime_strings=runtime_strings,
+        ),
+        errors,
+    )
+
+
+def _collect_struct_layouts(program: IRProgram) -> list[VBCStruct]:
+    """收集整个程序常量池中的结构体布局；load_field 只携带槽数与偏移，需要据此推断字段类型。"""
+    layouts: list[VBCStruct] = []
+    for function in [program.module, *program.functions.values()]:
+        for constant in function.constants:
+            if isinstance(constant, VBCStruct) and constant not in layouts:
+                layouts.append(constant)
+    return layouts
+
+
+def _collect_constant_globals(program: IRProgram) -> dict[str, int]:
+    """收集程序中从未被重新赋值的内置 I/O 常量；它们在 native 中直接物化为立即数。"""
+    assigned = {
+        str(instruction.args[0].name)
+        for function in [program.module, *program.functions.values()]
+        for block in function.blocks
+        for instruction in block.instructions
+        if instruction.op == "store_global" and instruction.args
+    }
+    return {name: constant.value for name, constant in BUILTIN_CONSTANTS.items() if name not in assigned}
+
+
 class _MachineLoweringContext:
     def __init__(
         self,
@@ -110,6 +267,9 @@ class _MachineLoweringContext:
         function_return_types: dict[str, str],
         global_slots: dict[str, StackSlot] | None = None,
         global_value_types: dict[str, str] | None = None,
+        struct_layouts: list[VBCStruct] | None = None,
+        runtime_strings: list[str] | None = None,
+        constant_globals: dict[str, int] | None = None,
     ):
         self.function = function
         self.function_names = function_names
@@ -121,17 +281,30 @@ class _MachineLoweringContext:
         self.local_value_types: dict[int, str] = {
             index: value_type
             for index, value_type in enumerate(function.param_types[:function.param_count])
-            if value_type in {"int64", "bool64"}
+            if value_type in _NATIVE_SCALAR_TYPES
         }
         self.temp_slots: list[StackSlot] = []
+        self.memory_slots: list[StackSlot] = []
+        self.struct_layouts = struct_layouts if struct_layouts is not None else []
+        self.runtime_strings = runtime_strings if runtime_strings is not None else []
+        self.constant_globals = constant_globals if constant_globals is not None else {}
         self.vreg_id = 0
         self.exit_code_value: MachineOperand | None = None
         self.registered_function_symbols: set[str] = set()
+        # 调用返回字符串的 builtin 的函数会创建动态字符串句柄，需要登记字符串局部变量并插入回收点
+        self.creates_runtime_strings = any(
+            instruction.op == "load_global"
+            and str(instruction.args[0].name) not in function_names
+            and isinstance(getattr(BUILTIN_FUNCTION_SIGNATURES.get(str(instruction.args[0].name)), "return_type", None), StringType)
+            for block in function.blocks
+            for instruction in block.instructions
+        )
 
     def lower(self) -> MachineFunction:
         """执行单个函数 lowering。"""
         frame = StackFrameLayout(word_size=WINDOWS_X64_ABI.word_size)
         frame.local_slots = [self._local_slot(index) for index in range(self.function.local_count)]
+        block_starts = {block.name: block.start_pc for block in self.function.blocks}
         machine_blocks = []
         for block in self.function.blocks:
             machine_block = MachineBlock(
@@ -139,16 +312,32 @@ class _MachineLoweringContext:
                 predecessors=list(block.predecessors),
                 successors=list(block.successors),
             )
+            # 循环头的入口操作数栈上没有字符串临时值时，可以回收本栈帧不再持有的句柄
+            is_loop_header = any(block_starts.get(name, -1) >= block.start_pc for name in block.predecessors)
+            if self.creates_runtime_strings and is_loop_header and self._entry_stack_holds_no_strings(block):
+                self._emit_string_runtime_call(machine_block, RUNTIME_STRING_COLLECT, [MachineOperand.imm(0)], block.start_pc, None)
             for instruction in block.instructions:
                 self._lower_instruction(machine_block, instruction)
             if block.terminator is not None:
-                machine_block.terminator = self._lower_terminator(block.terminator)
+                machine_block.terminator = self._lower_terminator(machine_block, block.terminator)
+                if self.creates_runtime_strings and machine_block.terminator.op == "ret":
+                    self._emit_string_runtime_call(
+                        machine_block,
+                        RUNTIME_STRING_COLLECT,
+                        [MachineOperand.imm(1)],
+                        block.terminator.source_pc,
+                        block.terminator.source_line,
+                    )
             machine_blocks.append(machine_block)
         frame.global_slots = list(self.global_slots.values())
         frame.temp_slots = list(self.temp_slots)
+        frame.memory_slots = list(self.memory_slots)
         machine_function = MachineFunction(
             name=self.function.name,
-            params=[WINDOWS_X64_ABI.argument_location(index) for index in range(self.function.param_count)],
+            params=[
+                WINDOWS_X64_ABI.argument_location(index, self._param_type(index))
+                for index in range(self.function.param_count)
+            ],
             return_type=self.function.return_type,
             frame=frame,
             blocks=machine_blocks,
@@ -164,6 +353,11 @@ class _MachineLoweringContext:
         op = instruction.op
         if op in _UNSUPPORTED_FEATURES:
             self._unsupported_feature(instruction, _UNSUPPORTED_FEATURES[op])
+        if op in {"binary eq", "binary ne"} and self._has_string_operand(instruction):
+            self._lower_string_equality(block, instruction)
+            return
+        if op not in _STRING_HANDLE_OPS and self._has_string_operand(instruction):
+            self._unsupported_feature(instruction, "string_value")
         if op == "const":
             self._lower_const(block, instruction)
             return
@@ -192,11 +386,31 @@ class _MachineLoweringContext:
                     source_line=instruction.source_line,
                 )
             )
+            if value.type_hint == "str64" and self.creates_runtime_strings:
+                self._emit_string_runtime_call(
+                    block,
+                    RUNTIME_STRING_BIND,
+                    [MachineOperand.imm(int(target.name)), value],
+                    instruction.source_pc,
+                    instruction.source_line,
+                )
             return
         if op == "load_global":
             symbol = instruction.args[0]
             if symbol.kind != "global":
                 self._unsupported_feature(instruction, "non_global_symbol")
+            if str(symbol.name) in self.constant_globals and str(symbol.name) not in self.global_slots:
+                result = self._define_result(instruction, type_hint="int64")
+                block.instructions.append(
+                    MachineInstruction(
+                        "load_imm",
+                        result=result,
+                        args=[MachineOperand.imm(self.constant_globals[str(symbol.name)])],
+                        source_pc=instruction.source_pc,
+                        source_line=instruction.source_line,
+                    )
+                )
+                return
             if str(symbol.name) not in self.function_names and str(symbol.name) not in BUILTIN_FUNCTION_SIGNATURES:
                 result = self._define_result(instruction, type_hint=self.global_value_types.get(str(symbol.name)))
                 block.instructions.append(
@@ -215,20 +429,33 @@ class _MachineLoweringContext:
         if op == "store_global":
             self._lower_store_global(block, instruction)
             return
+        if op in _BINARY_OPS and self._has_float_operand(instruction):
+            self._lower_float_binary(block, instruction)
+            return
         if op in _BINARY_OPS:
             machine_op = _BINARY_OPS[op]
             result_type = "bool64" if machine_op in _COMPARE_MACHINE_OPS else "int64"
             self._lower_value_instruction(block, instruction, machine_op, type_hint=result_type)
             return
+        if op == "unary neg" and self._has_float_operand(instruction):
+            self._lower_value_instruction(block, instruction, "fneg", type_hint="float64")
+            return
         if op == "unary neg":
             self._lower_value_instruction(block, instruction, "neg")
             return
+        if op == "unary not" and self._has_float_operand(instruction):
+            # VBCFloat 的真值为 value != 0.0：NaN 为真，-0.0 为假
+            self._lower_float_compare_zero(block, instruction, "fcmp_eq")
+            return
         if op == "unary not":
             self._lower_value_instruction(block, instruction, "not_bool", type_hint="bool64")
             return
         if op == "cast":
             raw_target_type = str(instruction.attrs.get("target_type", ""))
             target_type = raw_target_type.lower()
+            if target_type in _NATIVE_FLOAT_CAST_TARGETS or self._has_float_operand(instruction):
+                self._lower_float_cast(block, instruction, raw_target_type, target_type)
+                return
             if target_type in _NATIVE_BOOL_CAST_TARGETS:
                 cast_op = "cast_int_bool"
                 result_type = "bool64"
@@ -242,7 +469,11 @@ class _MachineLoweringContext:
         if op == "phi":
             args = [self._operand(value, instruction) for value in instruction.args]
             incoming_types = {operand.type_hint for operand in args}
-            result_type = next(iter(incoming_types)) if len(incoming_types) == 1 and incoming_types <= {"int64", "bool64"} else "int64"
+            if "float64" in incoming_types and incoming_types != {"float64"}:
+                self._unsupported_feature(instruction, "phi_mixed_float")
+            if "str64" in incoming_types and incoming_types != {"str64"}:
+                self._unsupported_feature(instruction, "string_value")
+            result_type = next(iter(incoming_types)) if len(incoming_types) == 1 and incoming_types <= {*_NATIVE_SCALAR_TYPES, "str64"} else "int64"
             result = self._define_result(instruction, type_hint=result_type)
             block.instructions.append(
                 MachineInstruction(
@@ -258,6 +489,26 @@ class _MachineLoweringContext:
         if op == "call":
             self._lower_call(block, instruction)
             return
+        if op in {"alloc_array", "alloc_struct", "copy_struct"}:
+            self._lower_alloc(block, instruction)
+            return
+        if op in {"load_index", "store_index"}:
+            self._lower_indexed_access(block, instruction)
+            return
+        if op in {"load_field", "store_field", "load_pointer", "store_pointer", "pointer_address"}:
+            self._lower_memory_access(block, instruction)
+            return
+        if op == "array_decay":
+            # 数组基址与首元素指针在 native 内存模型中是同一个单元地址
+            if instruction.result is not None:
+                self.value_operands[instruction.result] = self._operand(instruction.args[0], instruction)
+            return
+        if op in _POINTER_ARITHMETIC_OPS:
+            self._lower_value_instruction(block, instruction, _POINTER_ARITHMETIC_OPS[op])
+            return
+        if op == "address_of":
+            self._lower_address_of(block, instruction)
+            return
         if op == "set_exit_code":
             value = self._operand(instruction.args[0], instruction)
             self.exit_code_value = value
@@ -305,6 +556,30 @@ class _MachineLoweringContext:
                 )
             )
             return
+        if isinstance(constant, VBCFloat):
+            result = self._define_result(instruction, type_hint="float64")
+            block.instructions.append(
+                MachineInstruction(
+                    "load_imm",
+                    result=result,
+                    args=[_float_imm(constant.value)],
+                    source_pc=instruction.source_pc,
+                    source_line=instruction.source_line,
+                )
+            )
+            return
+        if isinstance(constant, VBCString):
+            result = self._define_result(instruction, type_hint="str64")
+            block.instructions.append(
+                MachineInstruction(
+                    "load_imm",
+                    result=result,
+                    args=[MachineOperand("imm", self._runtime_string_handle(constant.value), "str64")],
+                    source_pc=instruction.source_pc,
+                    source_line=instruction.source_line,
+                )
+            )
+            return
         if isinstance(constant, VBCNull):
             result = self._define_result(instruction)
             block.instructions.append(
@@ -327,6 +602,9 @@ class _MachineLoweringContext:
     def _lower_store_global(self, block: MachineBlock, instruction: IRInstruction) -> None:
         target = instruction.args[0]
         value = self._operand(instruction.args[1], instruction)
+        if value.type_hint == "str64":
+            # 全局变量不属于任何栈帧，存入的句柄固定到本次 native 调用结束
+            self._emit_string_runtime_call(block, RUNTIME_STRING_PIN, [value], instruction.source_pc, instruction.source_line)
         if value.kind == "symbol":
             self.registered_function_symbols.add(str(target.name))
             block.instructions.append(
@@ -369,16 +647,17 @@ class _MachineLoweringContext:
             self._lower_exit(block, instruction)
             return
         if callee_name in BUILTIN_FUNCTION_SIGNATURES:
-            self._unsupported_feature(instruction, f"builtin_function:{callee_name}")
+            self._lower_runtime_call(block, instruction, callee_name)
+            return
         if callee_name not in self.function_names:
             self._unsupported_feature(instruction, f"unknown_function:{callee_name}")
         args = [self._operand(value, instruction) for value in instruction.args[1:]]
         for arg in args:
-            if arg.type_hint not in {"int64", "bool64"}:
+            if arg.type_hint not in _NATIVE_SCALAR_TYPES:
                 self._unsupported_feature(instruction, f"call_arg_type:{arg.type_hint}")
         arg_locations = [
-            WINDOWS_X64_ABI.argument_location(index).__dict__
-            for index in range(len(args))
+            WINDOWS_X64_ABI.argument_location(index, arg.type_hint).__dict__
+            for index, arg in enumerate(args)
         ]
         callee_return_type = self.function_return_types[callee_name]
         if callee_return_type == "void" and self.function.name == "<module>" and callee_name == "main" and instruction.result is not None:
@@ -400,6 +679,95 @@ class _MachineLoweringContext:
             )
         )
 
+    def _lower_runtime_call(self, block: MachineBlock, instruction: IRInstruction, name: str) -> None:
+        """
+        lowering builtin 调用为经运行时导入表的 call_runtime。
+
+        实参按 VM 签名检查：整数形参接受 int64/bool64，字符串形参只接受 str64 句柄，Any 形参接受全部 native 值类型；
+        arg_types 随指令记录，宿主据此把 8 字节实参还原为与 VM 相同的 VBCInteger/VBCBool/VBCFloat/VBCString。
+        """
+        signature = BUILTIN_FUNCTION_SIGNATURES[name]
+        if isinstance(signature.return_type, IntegerType):
+            result_type = "int64"
+        elif isinstance(signature.return_type, StringType):
+            result_type = "str64"
+        else:
+            self._unsupported_feature(instruction, f"builtin_function:{name}")
+        args = [self._operand(value, instruction) for value in instruction.args[1:]]
+        if len(args) != len(signature.param_types):
+            self._unsupported_feature(instruction, f"builtin_function:{name}_argc")
+        if len(args) > len(WINDOWS_X64_ABI.registers.argument_registers) - 1:
+            self._unsupported_feature(instruction, f"builtin_function:{name}_argc")
+        for arg, param_type in zip(args, signature.param_types):
+            if isinstance(param_type, IntegerType):
+                allowed = {"int64", "bool64"}
+            elif isinstance(param_type, StringType):
+                allowed = {"str64"}
+            elif isinstance(param_type, AnyType):
+                allowed = _RUNTIME_ANY_VALUE_TYPES
+            else:
+                allowed = set()
+            if arg.type_hint not in allowed:
+                self._unsupported_feature(instruction, f"builtin_function:{name}_arg_type:{arg.type_hint}")
+        result = self._define_result(instruction, type_hint=result_type)
+        block.instructions.append(
+            MachineInstruction(
+                "call_runtime",
+                result=result,
+                args=[MachineOperand.symbol(name), *args],
+                attrs={
+                    "argc": len(args),
+                    "arg_types": [arg.type_hint for arg in args],
+                    "result_type": result_type,
+                },
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _lower_string_equality(self, block: MachineBlock, instruction: IRInstruction) -> None:
+        """字符串相等比较经宿主按内容比较两个句柄，!= 再对结果取反。"""
+        args = [self._operand(value, instruction) for value in instruction.args]
+        if len(args) != 2 or any(arg.type_hint != "str64" for arg in args):
+            self._unsupported_feature(instruction, "string_value")
+        equal = self._emit_string_runtime_call(block, RUNTIME_STRING_EQ, args, instruction.source_pc, instruction.source_line)
+        if instruction.op == "binary eq":
+            self.value_operands[instruction.result] = equal
+            return
+        result = self._define_result(instruction, type_hint="bool64")
+        block.instructions.append(
+            MachineInstruction(
+                "not_bool",
+                result=result,
+                args=[equal],
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _emit_string_runtime_call(
+        self,
+        block: MachineBlock,
+        name: str,
+        args: list[MachineOperand],
+        source_pc: int | None,
+        source_line: int | None,
+    ) -> MachineOperand:
+        """追加一条调用宿主字符串句柄函数的 call_runtime，返回结果虚拟寄存器。"""
+        arg_types, result_type = RUNTIME_STRING_HELPERS[name]
+        result = self._new_vreg(result_type)
+        block.instructions.append(
+            MachineInstruction(
+                "call_runtime",
+                result=result,
+                args=[MachineOperand.symbol(name), *args],
+                attrs={"argc": len(args), "arg_types": list(arg_types), "result_type": result_type},
+                source_pc=source_pc,
+                source_line=source_line,
+            )
+        )
+        return result
+
     def _lower_exit(self, block: MachineBlock, instruction: IRInstruction) -> None:
         """lowering 受限 native _exit 调用。"""
         args = [self._operand(value, instruction) for value in instruction.args[1:]]
@@ -418,6 +786,213 @@ class _MachineLoweringContext:
             )
         )
 
+    def _lower_alloc(self, block: MachineBlock, instruction: IRInstruction) -> None:
+        """
+        lowering 数组/结构体分配与结构体拷贝。
+
+        每个分配点在当前栈帧中独占一块按 8 字节字排布的内存（模块入口的栈帧贯穿整个程序，即静态存储），
+        每次执行都重新清零或拷贝后返回块的单元地址。
+        """
+        if instruction.op == "alloc_array":
+            words = int(instruction.attrs.get("length", 0))
+            element_type = str(instruction.attrs.get("element_type", ""))
+            self._memory_word_type(instruction, element_type)
+            attrs: dict[str, Any] = {"words": words, "element_type": element_type}
+        elif instruction.op == "alloc_struct":
+            layout = self.function.constants[instruction.attrs.get("layout_const")]
+            if not isinstance(layout, VBCStruct):
+                self._unsupported_feature(instruction, "malformed_struct_layout")
+            for _, field_type in layout.fields:
+                self._memory_word_type(instruction, getattr(field_type, "name", str(field_type)))
+            words = layout.slot_count
+            attrs = {"words": words, "struct": layout.name}
+        else:
+            words = int(instruction.attrs.get("slot_count", 0))
+            attrs = {"words": words}
+        slot = StackSlot("memory", len(self.memory_slots), max(words, 1) * WINDOWS_X64_ABI.word_size)
+        if sum(item.size for item in self.memory_slots) + slot.size > _MAX_NATIVE_MEMORY_BYTES:
+            self._unsupported_feature(instruction, f"stack_memory_size:{_MAX_NATIVE_MEMORY_BYTES}")
+        self.memory_slots.append(slot)
+        args = [MachineOperand.slot(slot)]
+        if instruction.op == "copy_struct":
+            args.append(self._operand(instruction.args[0], instruction))
+        result = self._define_result(instruction, type_hint="int64")
+        block.instructions.append(
+            MachineInstruction(
+                "copy_block" if instruction.op == "copy_struct" else "alloc_block",
+                result=result,
+                args=args,
+                attrs=attrs,
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _lower_indexed_access(self, block: MachineBlock, instruction: IRInstruction) -> None:
+        """lowering 带越界检查的数组下标读写。"""
+        element_type = str(instruction.attrs.get("element_type", ""))
+        value_type = self._memory_word_type(instruction, element_type)
+        attrs = {"length": int(instruction.attrs.get("length", 0)), "element_type": element_type}
+        args = [self._operand(value, instruction) for value in instruction.args]
+        result = self._define_result(instruction, type_hint=value_type) if instruction.op == "load_index" else None
+        block.instructions.append(
+            MachineInstruction(
+                instruction.op,
+                result=result,
+                args=args,
+                attrs=attrs,
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _lower_memory_access(self, block: MachineBlock, instruction: IRInstruction) -> None:
+        """lowering 结构体字段与指针解引用：都是单元地址加常量字偏移的 load_mem/store_mem。"""
+        offset = 0
+        value_type = "int64"
+        if instruction.op in {"load_field", "store_field"}:
+            slot_count = int(instruction.attrs.get("slot_count", 0))
+            offset = int(instruction.attrs.get("offset", 0))
+            if not 0 <= offset < slot_count:
+                self._unsupported_feature(instruction, "struct_field_offset")
+            value_type = self._field_value_type(instruction, slot_count, offset)
+        args = [self._operand(value, instruction) for value in instruction.args]
+        is_load = instruction.op in {"load_field", "load_pointer", "pointer_address"}
+        result = self._define_result(instruction, type_hint=value_type) if is_load else None
+        block.instructions.append(
+            MachineInstruction(
+                "load_mem" if is_load else "store_mem",
+                result=result,
+                args=args,
+                attrs={"offset": offset},
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _lower_address_of(self, block: MachineBlock, instruction: IRInstruction) -> None:
+        """lowering 局部/全局标量取地址；被取地址的变量始终驻留在自己的栈槽中。"""
+        target = instruction.args[0]
+        if target.kind == "local":
+            slot = self._local_slot(int(target.name))
+        elif target.kind == "global" and str(target.name) not in self.function_names:
+            slot = self._global_slot(str(target.name))
+        else:
+            self._unsupported_feature(instruction, f"address_of:{target.kind}")
+        result = self._define_result(instruction, type_hint="int64")
+        block.instructions.append(
+            MachineInstruction(
+                "slot_address",
+                result=result,
+                args=[MachineOperand.slot(slot)],
+                attrs={"target_type": str(instruction.attrs.get("target_type", ""))},
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _memory_word_type(self, node: IRInstruction, element_type: str) -> str:
+        """返回内存字在 Machine IR 中的值类型，字符串等非标量元素暂不支持。"""
+        value_type = _NATIVE_MEMORY_WORD_TYPES.get(element_type.upper())
+        if value_type is None:
+            self._unsupported_type(node, element_type or "<missing>")
+        return value_type
+
+    def _field_value_type(self, node: IRInstruction, slot_count: int, offset: int) -> str:
+        """按槽数匹配程序中的结构体布局推断字段类型；各候选布局一致为 bool/浮点时才视为 bool64/float64。"""
+        field_types = {
+            getattr(layout.fields[offset][1], "name", str(layout.fields[offset][1]))
+            for layout in self.struct_layouts
+            if layout.slot_count == slot_count
+        }
+        value_types = {self._memory_word_type(node, field_type) for field_type in field_types}
+        if "float64" in value_types:
+            if value_types != {"float64"}:
+                self._unsupported_feature(node, "struct_field_type")
+            return "float64"
+        return "bool64" if value_types == {"bool64"} else "int64"
+
+    def _has_float_operand(self, instruction: IRInstruction) -> bool:
+        return any(self._operand(value, instruction).type_hint == "float64" for value in instruction.args)
+
+    def _lower_float_binary(self, block: MachineBlock, instruction: IRInstruction) -> None:
+        """lowering 浮点四则运算与比较；整数/布尔操作数先按 VM 语义提升为 float64。"""
+        machine_op = _FLOAT_BINARY_OPS.get(instruction.op)
+        if machine_op is None:
+            self._unsupported_feature(instruction, f"float_{instruction.op.removeprefix('binary ')}")
+        args = [self._float_operand(block, self._operand(value, instruction), instruction) for value in instruction.args]
+        result = self._define_result(instruction, type_hint="bool64" if machine_op.startswith("fcmp_") else "float64")
+        block.instructions.append(
+            MachineInstruction(
+                machine_op,
+                result=result,
+                args=args,
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _lower_float_cast(self, block: MachineBlock, instruction: IRInstruction, raw_target_type: str, target_type: str) -> None:
+        """lowering 涉及 float64 的 CAST：整数转浮点、浮点向零截断为整数、按 != 0.0 转布尔。"""
+        source = self._operand(instruction.args[0], instruction)
+        if target_type in _NATIVE_FLOAT_CAST_TARGETS:
+            if source.type_hint == "float64":
+                # FLOAT/DOUBLE 在 native 中同为 float64，转换不改变位模式
+                self.value_operands[instruction.result] = source
+                return
+            self._lower_value_instruction(block, instruction, "cvt_int_float", attrs={"target_type": target_type}, type_hint="float64")
+            return
+        if target_type in _NATIVE_BOOL_CAST_TARGETS:
+            self._lower_float_compare_zero(block, instruction, "fcmp_ne", attrs={"target_type": target_type})
+            return
+        if target_type in _NATIVE_INTEGER_CAST_TARGETS:
+            self._lower_value_instruction(block, instruction, "cvt_float_int", attrs={"target_type": target_type}, type_hint="int64")
+            return
+        self._unsupported_type(instruction, raw_target_type or "<missing>")
+
+    def _lower_float_compare_zero(
+        self,
+        block: MachineBlock,
+        instruction: IRInstruction,
+        op: str,
+        attrs: dict[str, Any] | None = None,
+    ) -> None:
+        result = self._define_result(instruction, type_hint="bool64")
+        block.instructions.append(
+            MachineInstruction(
+                op,
+                result=result,
+                args=[self._operand(instruction.args[0], instruction), _float_imm(0.0)],
+                attrs=attrs or {},
+                source_pc=instruction.source_pc,
+                source_line=instruction.source_line,
+            )
+        )
+
+    def _float_operand(self, block: MachineBlock, operand: MachineOperand, node: IRInstruction | IRTerminator) -> MachineOperand:
+        """把整数/布尔操作数提升为 float64；float64 与浮点立即数原样返回。"""
+        if operand.type_hint == "float64":
+            return operand
+        if operand.type_hint not in {"int64", "bool64"}:
+            self._unsupported_type(node, operand.type_hint)
+        if operand.kind == "imm":
+            return _float_imm(float(operand.value))
+        result = self._new_vreg("float64")
+        block.instructions.append(
+            MachineInstruction(
+                "cvt_int_float",
+                result=result,
+                args=[operand],
+                source_pc=node.source_pc,
+                source_line=node.source_line,
+            )
+        )
+        return result
+
+    def _param_type(self, index: int) -> str:
+        param_types = self.function.param_types
+        return param_types[index] if index < len(param_types) else "int64"
+
     def _lower_value_instruction(
         self,
         block: MachineBlock,
@@ -438,14 +1013,29 @@ class _MachineLoweringContext:
             )
         )
 
-    def _lower_terminator(self, terminator: IRTerminator) -> MachineTerminator:
+    def _lower_terminator(self, block: MachineBlock, terminator: IRTerminator) -> MachineTerminator:
         if terminator.op == "jump":
             return MachineTerminator("jmp", targets=list(terminator.targets), source_pc=terminator.source_pc, source_line=terminator.source_line)
         if terminator.op == "branch":
+            args = [self._operand(terminator.args[0], terminator)] if terminator.args else []
+            if args and args[0].type_hint == "str64":
+                self._unsupported_feature(terminator, "string_value")
+            if args and args[0].type_hint == "float64":
+                condition = self._new_vreg("bool64")
+                block.instructions.append(
+                    MachineInstruction(
+                        "fcmp_ne",
+                        result=condition,
+                        args=[args[0], _float_imm(0.0)],
+                        source_pc=terminator.source_pc,
+                        source_line=terminator.source_line,
+                    )
+                )
+                args = [condition]
             return MachineTerminator(
                 "br",
                 targets=list(terminator.targets),
-                args=[self._operand(terminator.args[0], terminator)] if terminator.args else [],
+                args=args,
                 source_pc=terminator.source_pc,
                 source_line=terminator.source_line,
             )
@@ -454,24 +1044,42 @@ class _MachineLoweringContext:
                 args = []
             elif terminator.args:
                 args = [self._operand(terminator.args[0], terminator)]
+                if args[0].type_hint == "str64":
+                    self._unsupported_feature(terminator, "string_value")
             else:
-                args = [MachineOperand.imm(0)]
+                args = [self._zero_return_value()]
             return MachineTerminator("ret", args=args, source_pc=terminator.source_pc, source_line=terminator.source_line)
         if terminator.op == "halt":
-            args = [] if self.function.return_type == "void" else [self.exit_code_value or MachineOperand.imm(0)]
+            args = [] if self.function.return_type == "void" else [self.exit_code_value or self._zero_return_value()]
             return MachineTerminator("ret", args=args, source_pc=terminator.source_pc, source_line=terminator.source_line)
         self._unsupported_feature(terminator, f"terminator:{terminator.op}")
 
+    def _zero_return_value(self) -> MachineOperand:
+        """缺省返回值：浮点函数返回 0.0，其余返回整数 0。"""
+        return _float_imm(0.0) if self.function.return_type == "float64" else MachineOperand.imm(0)
+
     def _define_result(self, instruction: IRInstruction, type_hint: str | None = None) -> MachineOperand:
         if instruction.result is None:
             self._unsupported_feature(instruction, "missing_result")
         if type_hint is None:
             result_type = str(instruction.result.type_hint or "").lower()
-            type_hint = "bool64" if result_type in _NATIVE_BOOL_CAST_TARGETS else "int64"
+            if result_type in _NATIVE_BOOL_CAST_TARGETS:
+                type_hint = "bool64"
+            elif result_type in _NATIVE_FLOAT_CAST_TARGETS:
+                type_hint = "float64"
+            elif result_type == "string":
+                type_hint = "str64"
+            else:
+                type_hint = "int64"
+        result = self._new_vreg(type_hint)
+        self.value_operands[instruction.result] = result
+        return result
+
+    def _new_vreg(self, type_hint: str) -> MachineOperand:
+        """分配虚拟寄存器及其 temp 栈槽。"""
         result = MachineOperand.vreg(VirtualRegister(f"v{self.vreg_id}", type_hint))
         self.vreg_id += 1
         self.temp_slots.append(StackSlot("temp", len(self.temp_slots), WINDOWS_X64_ABI.word_size))
-        self.value_operands[instruction.result] = result
         return result
 
     def _operand(self, value: IRValue, node: IRInstruction | IRTerminator) -> MachineOperand:
@@ -492,9 +1100,35 @@ class _MachineLoweringContext:
                 return MachineOperand("imm", 1 if constant.value else 0, "bool64")
             if isinstance(constant, VBCNull):
                 return MachineOperand.imm(0)
+            if isinstance(constant, VBCFloat):
+                return _float_imm(constant.value)
             self._unsupported_type(node, str(getattr(getattr(constant, "_object_type", None), "name", type(constant).__name__)))
         self._unsupported_feature(node, f"operand:{value.kind}")
 
+    def _has_string_operand(self, instruction: IRInstruction) -> bool:
+        for value in instruction.args:
+            if value.kind == "temp":
+                operand = self.value_operands.get(value)
+                if operand is not None and operand.type_hint == "str64":
+                    return True
+            if value.kind == "local" and self.local_value_types.get(int(value.name)) == "str64":
+                return True
+        return False
+
+    def _entry_stack_holds_no_strings(self, block: IRBasicBlock) -> bool:
+        """入口操作数栈上的值都已 lowering 且都不是字符串句柄；尚未定义的值按可能是字符串处理。"""
+        for value in block.entry_stack:
+            operand = self.value_operands.get(value)
+            if operand is None or operand.type_hint == "str64":
+                return False
+        return True
+
+    def _runtime_string_handle(self, value: str) -> int:
+        """返回字符串常量在程序字符串表中的句柄，相同内容共享同一句柄。"""
+        if value not in self.runtime_strings:
+            self.runtime_strings.append(value)
+        return self.runtime_strings.index(value)
+
     def _local_slot(self, index: int) -> StackSlot:
         slot = self.local_slots.get(index)
         if slot is None:
@@ -524,3 +1158,8 @@ class _MachineLoweringContext:
         if node.source_pc is not None:
             parts.append(f"PC {node.source_pc}")
         return ", ".join(parts)
+
+
+def _float_imm(value: float) -> MachineOperand:
+    """float64 立即数按 IEEE 754 位模式存为 signed int64。"""
+    return MachineOperand("imm", struct.unpack("<q", struct.pack("<d", float(value)))[0], "float64")
@@ -103,3 +103,5 @@ class MachineProgram:
     abi: WindowsX64ABI
     module: MachineFunction
     functions: dict[str, MachineFunction] = field(default_factory=dict)
+    # str64 句柄即本表下标；运行期 read 等返回的新字符串由宿主追加在表尾
+    runtime_strings: list[str] = field(default_factory=list)
@@ -24,6 +24,9 @@ _PE_LOADER_FLAGS = 0
 
 def build_native_pe_image(code: bytes, metadata: dict[str, object]) -> bytes:
     """根据 native map 写出最小 PE32+ image。"""
+    if metadata.get("runtime_imports"):
+        # 最小 image 没有 .idata 节，运行时导入只能在内存执行时由宿主回填
+        raise NativeCodegenError("native PE image 暂不支持运行时导入调用，请使用内存执行")
     text_raw = _build_text_raw(code, metadata)
     validate_native_text_section_map_bytes(text_raw, metadata)
     coff_header = _require_mapping(metadata, "pe_coff_header")
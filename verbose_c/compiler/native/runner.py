@@ -1,6 +1,7 @@
 import ctypes
 import platform
 import sys
+from typing import TYPE_CHECKING
 
 from verbose_c.compiler.native.codegen import (
     NativeCodeFunction,
@@ -8,12 +9,16 @@ from verbose_c.compiler.native.codegen import (
     NativeRegisterAllocation,
     _is_argument_type_compatible,
     _native_program_symbols,
+    native_code_program_map,
     validate_native_code_map_bytes,
     validate_native_text_section_map_bytes,
 )
 from verbose_c.compiler.native.errors import NativeCodegenError
 from verbose_c.compiler.native.target import NativeTarget
 
+if TYPE_CHECKING:
+    from verbose_c.fs.validation_cache import NativeValidationCache
+
 
 MEM_COMMIT = 0x1000
 MEM_RESERVE = 0x2000
@@ -24,13 +29,25 @@ REL32_JUMP_OPCODES = {
     "jmp_rel32": b"\xE9",
     "jne_rel32": b"\x0F\x85",
     "jns_rel32": b"\x0F\x89",
+    "jl_rel32": b"\x0F\x8C",
+    "jle_rel32": b"\x0F\x8E",
+    "jg_rel32": b"\x0F\x8F",
+    "jge_rel32": b"\x0F\x8D",
+    "jae_rel32": b"\x0F\x83",
 }
-REL32_JUMP_ASM_PREFIXES = {
-    "je_rel32": "je ",
-    "jmp_rel32": "jmp ",
-    "jne_rel32": "jne ",
-    "jns_rel32": "jns ",
+REL8_JUMP_OPCODES = {
+    "je_rel8": b"\x74",
+    "jmp_rel8": b"\xEB",
+    "jne_rel8": b"\x75",
+    "jns_rel8": b"\x79",
+    "jl_rel8": b"\x7C",
+    "jle_rel8": b"\x7E",
+    "jg_rel8": b"\x7F",
+    "jge_rel8": b"\x7D",
+    "jae_rel8": b"\x73",
 }
+RELATIVE_JUMP_OPCODES = {**REL32_JUMP_OPCODES, **REL8_JUMP_OPCODES}
+RELATIVE_JUMP_ASM_PREFIXES = {kind: f"{kind.rsplit('_', 1)[0]} " for kind in RELATIVE_JUMP_OPCODES}
 
 
 def can_run_native_memory() -> bool:
@@ -50,6 +67,8 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
         raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} param_types 必须是字符串元组")
     if function.param_types:
         raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} 必须是无参数函数")
+    if function.runtime_calls:
+        raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} 含运行时导入调用，请按程序运行")
     if not isinstance(function.code, bytes):
         raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} code 必须是 bytes")
     if not isinstance(function.offset, int) or isinstance(function.offset, bool):
@@ -133,7 +152,7 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
     seen_relocation_offsets = set()
     for relocation in function.relocations:
         _validate_source_location(f"native 单函数内存执行函数 {function.name} rel32 修补记录", relocation)
-        if relocation.kind not in {*REL32_JUMP_OPCODES, "call_rel32"}:
+        if relocation.kind not in {*RELATIVE_JUMP_OPCODES, "call_rel32"}:
             raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 修补类型暂不支持: {relocation.kind}")
         for field in ("offset", "patch_offset", "displacement", "size"):
             value = getattr(relocation, field)
@@ -141,9 +160,12 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
                 raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 {field} 必须是整数")
         if not isinstance(relocation.target, str) or not relocation.target:
             raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 target 必须是非空字符串")
-        if relocation.size != 4:
-            raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 修补字段大小必须为 4，实际 {relocation.size}")
-        opcode_size = len(REL32_JUMP_OPCODES[relocation.kind]) if relocation.kind in REL32_JUMP_OPCODES else 1
+        expected_size = 1 if relocation.kind in REL8_JUMP_OPCODES else 4
+        if relocation.size != expected_size:
+            raise NativeCodegenError(
+                f"native 单函数内存执行函数 {function.name} rel32 修补字段大小必须为 {expected_size}，实际 {relocation.size}"
+            )
+        opcode_size = len(RELATIVE_JUMP_OPCODES[relocation.kind]) if relocation.kind in RELATIVE_JUMP_OPCODES else 1
         expected_patch_offset = relocation.offset + opcode_size
         if relocation.offset in seen_relocation_offsets:
             raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 修补记录重复: {relocation.offset}")
@@ -160,7 +182,7 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
         opcode = function.code[relative_offset:relative_offset + opcode_size]
         if relocation.kind == "call_rel32" and opcode != b"\xE8":
             raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} call_rel32 opcode 不一致")
-        if relocation.kind in REL32_JUMP_OPCODES and opcode != REL32_JUMP_OPCODES[relocation.kind]:
+        if relocation.kind in RELATIVE_JUMP_OPCODES and opcode != RELATIVE_JUMP_OPCODES[relocation.kind]:
             raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} {relocation.kind} opcode 不一致")
         relocation_instruction = instructions_by_offset.get(relocation.offset)
         actual_displacement = int.from_bytes(
@@ -178,7 +200,7 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
             raise NativeCodegenError(
                 f"native 单函数内存执行函数 {function.name} call_rel32 目标不在函数切片内: {relocation.target}"
             )
-        if relocation.kind in REL32_JUMP_OPCODES:
+        if relocation.kind in RELATIVE_JUMP_OPCODES:
             label_offset = _function_label_offset(function, relocation.target)
             if label_offset is None:
                 raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 修补目标未知: {relocation.target}")
@@ -197,7 +219,7 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
         ):
             raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 来源位置与清单不一致")
         if relocation_instruction is not None:
-            expected_prefix = {**REL32_JUMP_ASM_PREFIXES, "call_rel32": "call "}[relocation.kind]
+            expected_prefix = {**RELATIVE_JUMP_ASM_PREFIXES, "call_rel32": "call "}[relocation.kind]
             if not relocation_instruction.asm.startswith(expected_prefix):
                 raise NativeCodegenError(f"native 单函数内存执行函数 {function.name} rel32 修补指令清单类型不一致")
             instruction_target = relocation_instruction.asm.split(" ", 1)[1].split(";", 1)[0].strip()
@@ -209,8 +231,15 @@ def run_native_function_in_memory(function: NativeCodeFunction) -> int:
     return _run_code_in_memory(function.code, 0)
 
 
-def run_native_program_in_memory(program: NativeCodeProgram) -> int:
-    """在 Windows x64 可执行内存中运行 native 程序入口。"""
+def run_native_program_in_memory(
+    program: NativeCodeProgram,
+    validation_cache: "NativeValidationCache | None" = None,
+) -> int:
+    """
+    在 Windows x64 可执行内存中运行 native 程序入口。
+
+    提供 validation_cache 时，机器码与 map 相同的程序只在首次运行时执行完整的清单/栈帧/重定位校验。
+    """
     if program.target != NativeTarget.WINDOWS_X64:
         raise NativeCodegenError(f"native 内存执行暂不支持目标平台 {program.target}")
     if not isinstance(program.code, bytes):
@@ -238,12 +267,12 @@ def run_native_program_in_memory(program: NativeCodeProgram) -> int:
             raise NativeCodegenError(
                 f"native 内存执行函数表 key 与函数名不一致: key {table_name}, 函数 {function.name}"
             )
-        if not isinstance(function.return_type, str) or function.return_type not in {"int64", "bool64", "void"}:
+        if not isinstance(function.return_type, str) or function.return_type not in {"int64", "bool64", "float64", "void"}:
             raise NativeCodegenError(f"native 内存执行函数 {table_name} return_type 暂不支持: {function.return_type!r}")
         if not isinstance(function.param_types, tuple) or any(not isinstance(item, str) for item in function.param_types):
             raise NativeCodegenError(f"native 内存执行函数 {table_name} param_types 必须是字符串元组")
         for index, param_type in enumerate(function.param_types):
-            if param_type not in {"int64", "bool64"}:
+            if param_type not in {"int64", "bool64", "float64"}:
                 raise NativeCodegenError(f"native 内存执行函数 {table_name} 第 {index} 个参数暂不支持类型: {param_type!r}")
     if program.entry_offset < 0:
         raise NativeCodegenError(f"native 内存执行入口偏移不能为负数: {program.entry_offset}")
@@ -280,6 +309,21 @@ def run_native_program_in_memory(program: NativeCodeProgram) -> int:
         covered_until = end
     if covered_until != len(program.code):
         raise NativeCodegenError(f"native 内存执行函数范围未覆盖完整机器码: 已覆盖到 {covered_until}, 机器码长度 {len(program.code)}")
+    if validation_cache is None:
+        _validate_native_program(program)
+    else:
+        validation_cache.validate(
+            "program",
+            program.code,
+            validation_cache.fingerprint(program),
+            lambda: _validate_native_program(program),
+        )
+    runtime_imports = native_code_program_map(program)["runtime_imports"] if any(function.runtime_calls for function in program.functions.values()) else []
+    return _run_code_with_runtime_imports(program.code, program.entry_offset, program.runtime_strings, runtime_imports)
+
+
+def _validate_native_program(program: NativeCodeProgram) -> None:
+    """执行内存运行前的完整 native 程序校验。"""
     _validate_instruction_listing(program)
     _validate_stack_frame_layout(program)
     _validate_symbols(program)
@@ -287,7 +331,7 @@ def run_native_program_in_memory(program: NativeCodeProgram) -> int:
     _validate_register_allocation(program)
     _validate_relocations(program)
     _validate_exit_propagation(program)
-    return _run_code_in_memory(program.code, program.entry_offset)
+    _validate_runtime_calls(program)
 
 
 def run_native_bytes_in_memory(code: bytes, metadata: dict[str, object]) -> int:
@@ -296,7 +340,7 @@ def run_native_bytes_in_memory(code: bytes, metadata: dict[str, object]) -> int:
     entry_offset = metadata["entry_offset"]
     if not isinstance(entry_offset, int) or isinstance(entry_offset, bool):
         raise NativeCodegenError(f"native raw bin 内存执行 entry_offset 必须是整数，实际 {type(entry_offset).__name__}")
-    return _run_code_in_memory(code, entry_offset)
+    return _run_code_with_runtime_imports(code, entry_offset, metadata.get("runtime_strings", []), metadata.get("runtime_imports", []))
 
 
 def run_native_text_section_bytes_in_memory(text_raw: bytes, metadata: dict[str, object]) -> int:
@@ -310,7 +354,12 @@ def run_native_text_section_bytes_in_memory(text_raw: bytes, metadata: dict[str,
         raise NativeCodegenError(f"native .text 内存执行 code_size 越界: {code_size}, .text 长度 {len(text_raw)}")
     if not isinstance(entry_offset, int) or isinstance(entry_offset, bool):
         raise NativeCodegenError(f"native .text 内存执行 entry_offset 必须是整数，实际 {type(entry_offset).__name__}")
-    return _run_code_in_memory(text_raw[:code_size], entry_offset)
+    return _run_code_with_runtime_imports(
+        text_raw[:code_size],
+        entry_offset,
+        metadata.get("runtime_strings", []),
+        metadata.get("runtime_imports", []),
+    )
 
 
 def _validate_symbols(program: NativeCodeProgram) -> None:
@@ -345,12 +394,12 @@ def _validate_symbols(program: NativeCodeProgram) -> None:
             raise NativeCodegenError(
                 f"native 内存执行符号 {symbol.name} 大小与函数不一致: 符号 {symbol.size}, 函数 {len(function.code)}"
             )
-        if not isinstance(symbol.return_type, str) or symbol.return_type not in {"int64", "bool64", "void"}:
+        if not isinstance(symbol.return_type, str) or symbol.return_type not in {"int64", "bool64", "float64", "void"}:
             raise NativeCodegenError(f"native 内存执行符号 {symbol.name} return_type 暂不支持: {symbol.return_type!r}")
         if not isinstance(symbol.param_types, tuple) or any(not isinstance(item, str) for item in symbol.param_types):
             raise NativeCodegenError(f"native 内存执行符号 {symbol.name} param_types 必须是字符串元组")
         for index, param_type in enumerate(symbol.param_types):
-            if param_type not in {"int64", "bool64"}:
+            if param_type not in {"int64", "bool64", "float64"}:
                 raise NativeCodegenError(f"native 内存执行符号 {symbol.name} 第 {index} 个参数暂不支持类型: {param_type!r}")
         if symbol.return_type != function.return_type:
             raise NativeCodegenError(
@@ -458,7 +507,10 @@ def _validate_stack_frame_layout(program: NativeCodeProgram) -> None:
                     raise NativeCodegenError(f"native 内存执行函数 {name} 栈槽 {slot.name} {field} 必须是整数")
             if slot.offset <= 0:
                 raise NativeCodegenError(f"native 内存执行函数 {name} 栈槽 {slot.name} offset 必须为正数")
-            if slot.size != 8:
+            if slot.name.startswith("memory["):
+                if slot.size <= 0 or slot.size % 8:
+                    raise NativeCodegenError(f"native 内存执行函数 {name} 内存块 {slot.name} size 必须为 8 的正整数倍，实际 {slot.size}")
+            elif slot.size != 8:
                 raise NativeCodegenError(f"native 内存执行函数 {name} 栈槽 {slot.name} size 必须为 8，实际 {slot.size}")
             if slot.name.startswith("global[") and not owns_global_frame:
                 if slot.offset in global_slot_offsets:
@@ -576,7 +628,7 @@ def _validate_relocations(program: NativeCodeProgram) -> None:
             if instruction.code[:1] == b"\xE8":
                 expected_relocations[instruction.offset] = "call_rel32"
             else:
-                for relocation_kind, opcode in REL32_JUMP_OPCODES.items():
+                for relocation_kind, opcode in RELATIVE_JUMP_OPCODES.items():
                     if instruction.code.startswith(opcode):
                         expected_relocations[instruction.offset] = relocation_kind
                         break
@@ -587,12 +639,13 @@ def _validate_relocations(program: NativeCodeProgram) -> None:
                 value = getattr(relocation, field)
                 if not isinstance(value, int) or isinstance(value, bool):
                     raise NativeCodegenError(f"native 内存执行函数 {name} rel32 {field} 必须是整数")
-            if relocation.kind not in {*REL32_JUMP_OPCODES, "call_rel32"}:
+            if relocation.kind not in {*RELATIVE_JUMP_OPCODES, "call_rel32"}:
                 raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补类型暂不支持: {relocation.kind}")
             if not isinstance(relocation.target, str) or not relocation.target:
                 raise NativeCodegenError(f"native 内存执行函数 {name} rel32 target 必须是非空字符串")
-            if relocation.size != 4:
-                raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补字段大小必须为 4，实际 {relocation.size}")
+            expected_size = 1 if relocation.kind in REL8_JUMP_OPCODES else 4
+            if relocation.size != expected_size:
+                raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补字段大小必须为 {expected_size}，实际 {relocation.size}")
             if relocation.target not in known_targets and not _function_contains_label(function, relocation.target):
                 raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补目标未知: {relocation.target}")
             expected_exit_probe_target = exit_probe_jump_targets.get(relocation.offset)
@@ -603,7 +656,7 @@ def _validate_relocations(program: NativeCodeProgram) -> None:
                     f"native 内存执行函数 {name} _exit 传播探针 jump 修补目标不一致: "
                     f"探针 {expected_exit_probe_target}, 修补记录 {relocation.target}"
                 )
-            expected_patch_offset = relocation.offset + (len(REL32_JUMP_OPCODES[relocation.kind]) if relocation.kind in REL32_JUMP_OPCODES else 1)
+            expected_patch_offset = relocation.offset + (len(RELATIVE_JUMP_OPCODES[relocation.kind]) if relocation.kind in RELATIVE_JUMP_OPCODES else 1)
             if relocation.offset in seen_relocation_offsets:
                 raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补记录重复: {relocation.offset}")
             seen_relocation_offsets.add(relocation.offset)
@@ -621,7 +674,7 @@ def _validate_relocations(program: NativeCodeProgram) -> None:
             if relocation.patch_offset < function.offset or relocation.patch_offset + relocation.size > function.offset + len(function.code):
                 raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补字段越界: {relocation.patch_offset}")
             opcode = program.code[relocation.offset:relocation.patch_offset]
-            if relocation.kind in REL32_JUMP_OPCODES and opcode != REL32_JUMP_OPCODES[relocation.kind]:
+            if relocation.kind in RELATIVE_JUMP_OPCODES and opcode != RELATIVE_JUMP_OPCODES[relocation.kind]:
                 raise NativeCodegenError(f"native 内存执行函数 {name} {relocation.kind} opcode 不一致")
             if relocation.kind == "call_rel32" and opcode != b"\xE8":
                 raise NativeCodegenError(f"native 内存执行函数 {name} call_rel32 opcode 不一致")
@@ -637,7 +690,7 @@ def _validate_relocations(program: NativeCodeProgram) -> None:
             if relocation_instruction is None:
                 raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补指令清单缺失: {relocation.offset}")
             if relocation_instruction is not None:
-                expected_asm_prefix = {**REL32_JUMP_ASM_PREFIXES, "call_rel32": "call "}[relocation.kind]
+                expected_asm_prefix = {**RELATIVE_JUMP_ASM_PREFIXES, "call_rel32": "call "}[relocation.kind]
                 if not relocation_instruction.asm.startswith(expected_asm_prefix):
                     raise NativeCodegenError(f"native 内存执行函数 {name} rel32 修补指令清单类型不一致")
                 instruction_target = relocation_instruction.asm.split(" ", 1)[1].split(";", 1)[0].strip()
@@ -811,7 +864,7 @@ def _validate_call_frames(program: NativeCodeProgram) -> None:
     supported_value_types = getattr(abi, "supported_value_types", None)
     if not isinstance(supported_value_types, tuple) or any(not isinstance(item, str) for item in supported_value_types):
         raise NativeCodegenError("native 内存执行 ABI supported_value_types 必须是字符串元组")
-    if set(supported_value_types) != {"int64", "bool64", "void"}:
+    if set(supported_value_types) != {"int64", "bool64", "float64", "void"}:
         raise NativeCodegenError(f"native 内存执行 ABI supported_value_types 不一致: {supported_value_types}")
     for name, function in program.functions.items():
         expected_frame_offsets = {
@@ -1019,6 +1072,51 @@ def _validate_source_location(owner: str, item: object) -> None:
             raise NativeCodegenError(f"{owner}.{field} 必须是非负整数或 None，实际 {value}")
 
 
+def _validate_runtime_calls(program: NativeCodeProgram) -> None:
+    """校验运行时导入调用点：占位指令、回填偏移与清单一致，且同一函数内存在共用的错误传播块。"""
+    for function in program.functions.values():
+        if not function.runtime_calls:
+            continue
+        instructions_by_offset = {instruction.offset: instruction for instruction in function.instructions if instruction.code}
+        for call in function.runtime_calls:
+            prefix = f"native 内存执行函数 {function.name} 运行时调用 {call.name}"
+            instruction = instructions_by_offset.get(call.offset)
+            if instruction is None or instruction.source_op != "call_runtime" or instruction.asm != f"mov rax, 0 ; runtime import {call.name}":
+                raise NativeCodegenError(f"{prefix} 在偏移 {call.offset} 处找不到占位指令")
+            if instruction.code != b"\x48\xB8" + bytes(8) or call.patch_offset != call.offset + 2:
+                raise NativeCodegenError(f"{prefix} 占位指令或回填偏移不合法: {instruction.code.hex()}, patch_offset {call.patch_offset}")
+            _validate_source_location(prefix, call)
+        if not any(instruction.source_op == "runtime_error" and instruction.asm == "mov edx, 1 ; native runtime error" for instruction in function.instructions):
+            raise NativeCodegenError(f"native 内存执行函数 {function.name} 缺少运行时错误传播块")
+
+
+def _run_code_with_runtime_imports(
+    code: bytes,
+    entry_offset: int,
+    runtime_strings: list[str] | tuple[str, ...],
+    runtime_imports: list[dict[str, object]],
+) -> int:
+    """
+    回填运行时导入后运行入口。
+
+    trampoline 需要在整个 native 调用期间存活；返回后统一 flush 缓冲输出，再重新抛出 builtin 记录的异常。
+    """
+    if not runtime_imports:
+        return _run_code_in_memory(code, entry_offset)
+    if not can_run_native_memory():
+        raise NativeCodegenError("native 内存执行仅支持 Windows x64")
+    from verbose_c.compiler.native.runtime_calls import NativeRuntimeHost
+    from verbose_c.vm.builtins_functions.system_runtime import SystemRuntime
+
+    host = NativeRuntimeHost(runtime_strings, runtime_imports)
+    try:
+        result = _run_code_in_memory(host.patch(code), entry_offset)
+    finally:
+        SystemRuntime.instance().flush_all()
+    host.raise_pending_error()
+    return result
+
+
 def _run_code_in_memory(code: bytes, entry_offset: int) -> int:
     """复制机器码到可执行内存并调用入口。"""
     if not isinstance(code, bytes):
@@ -1031,17 +1129,18 @@ def _run_code_in_memory(code: bytes, entry_offset: int) -> int:
         raise NativeCodegenError(f"native 内存执行入口偏移不能为负数: {entry_offset}")
     if entry_offset >= len(code):
         raise NativeCodegenError(f"native 内存执行入口偏移越界: {entry_offset}, 机器码长度 {len(code)}")
+    address = _map_executable_code(code)
+    try:
+        return int(ctypes.CFUNCTYPE(ctypes.c_int64)(address + entry_offset)())
+    finally:
+        _free_executable_code(address)
+
+
+def _map_executable_code(code: bytes) -> int:
+    """复制机器码到新分配的可执行内存并刷新指令缓存，返回起始地址；调用方负责 _free_executable_code。"""
     if not can_run_native_memory():
         raise NativeCodegenError("native 内存执行仅支持 Windows x64")
-    kernel32 = ctypes.windll.kernel32
-    kernel32.VirtualAlloc.restype = ctypes.c_void_p
-    kernel32.VirtualAlloc.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_ulong, ctypes.c_ulong]
-    kernel32.VirtualFree.restype = ctypes.c_bool
-    kernel32.VirtualFree.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_ulong]
-    kernel32.GetCurrentProcess.restype = ctypes.c_void_p
-    kernel32.GetCurrentProcess.argtypes = []
-    kernel32.FlushInstructionCache.restype = ctypes.c_bool
-    kernel32.FlushInstructionCache.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+    kernel32 = _kernel32()
     size = len(code)
     address = kernel32.VirtualAlloc(None, size, MEM_COMMIT | MEM_RESERVE, PAGE_EXECUTE_READWRITE)
     if not address:
@@ -1051,6 +1150,25 @@ def _run_code_in_memory(code: bytes, entry_offset: int) -> int:
         current_process = kernel32.GetCurrentProcess()
         if not kernel32.FlushInstructionCache(current_process, address, size):
             raise NativeCodegenError("FlushInstructionCache 刷新指令缓存失败")
-        return int(ctypes.CFUNCTYPE(ctypes.c_int64)(address + entry_offset)())
-    finally:
+    except BaseException:
         kernel32.VirtualFree(address, 0, MEM_RELEASE)
+        raise
+    return address
+
+
+def _free_executable_code(address: int) -> None:
+    """释放 _map_executable_code 分配的可执行内存。"""
+    _kernel32().VirtualFree(address, 0, MEM_RELEASE)
+
+
+def _kernel32():
+    kernel32 = ctypes.windll.kernel32
+    kernel32.VirtualAlloc.restype = ctypes.c_void_p
+    kernel32.VirtualAlloc.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_ulong, ctypes.c_ulong]
+    kernel32.VirtualFree.restype = ctypes.c_bool
+    kernel32.VirtualFree.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_ulong]
+    kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+    kernel32.GetCurrentProcess.argtypes = []
+    kernel32.FlushInstructionCache.restype = ctypes.c_bool
+    kernel32.FlushInstructionCache.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+    return kernel32
@@ -0,0 +1,181 @@
+import ctypes
+import struct
+import sys
+
+from verbose_c.compiler.native.errors import NativeCodegenError
+
+NATIVE_RUNTIME_TRAMPOLINE = ctypes.CFUNCTYPE(
+    ctypes.c_int64,
+    ctypes.c_int64,
+    ctypes.c_int64,
+    ctypes.c_int64,
+    ctypes.POINTER(ctypes.c_int64),
+)
+_RUNTIME_IMPORT_PATCH_PREFIX = b"\x48\xB8"
+
+# 宿主内部的字符串句柄运行时函数，与 builtin 共用导入表与 trampoline 签名：(实参类型, 结果类型)
+RUNTIME_STRING_EQ = "__str_eq"
+RUNTIME_STRING_BIND = "__str_bind"
+RUNTIME_STRING_PIN = "__str_pin"
+RUNTIME_STRING_COLLECT = "__str_collect"
+RUNTIME_STRING_HELPERS = {
+    RUNTIME_STRING_EQ: (("str64", "str64"), "bool64"),
+    RUNTIME_STRING_BIND: (("int64", "str64"), "int64"),
+    RUNTIME_STRING_PIN: (("str64",), "int64"),
+    RUNTIME_STRING_COLLECT: (("int64",), "int64"),
+}
+# 存入全局变量的句柄没有所属栈帧，直到本次 native 调用结束都不回收
+_PINNED_FRAME = sys.maxsize
+
+
+class NativeRuntimeHost:
+    """
+    native 机器码调用 builtin 的宿主侧导入表。
+
+    每个 (名称, 实参类型, 结果类型) 生成一个 ctypes trampoline，签名为
+    int64 status(int64 a0, int64 a1, int64 a2, int64* result)；trampoline 把 8 字节实参还原为 VBC 对象后
+    调用 BUILTIN_FUNCTIONS 中与 VM 相同的实现，因此缓冲与输出顺序和解释执行一致。
+    builtin 抛出的异常不能穿过 native 栈帧，先记录下来并返回非 0 status，由调用方在入口返回后重新抛出。
+
+    字符串句柄表的前缀是程序字符串常量，其后是 builtin 返回的动态字符串。动态句柄按创建它的栈帧回收：
+    调用窗口内的结果槽地址在一次函数激活中固定，且被调函数的地址更低，因此用它作为栈帧标记。
+    lowering 在字符串局部变量赋值时登记 (栈帧, 局部变量) -> 句柄，并在循环头与函数返回前插入回收点；
+    回收点只释放本栈帧及已返回的更深栈帧创建、且不再被局部变量持有的句柄，调用方持有的句柄不受影响。
+    """
+
+    def __init__(self, runtime_strings: list[str] | tuple[str, ...], runtime_imports: list[dict[str, object]]) -> None:
+        self.strings: list[str | None] = list(runtime_strings)
+        self.imports = runtime_imports
+        self.error: BaseException | None = None
+        self._free_handles: list[int] = []
+        self._owners: dict[int, int] = {} # 动态句柄 -> 创建它的栈帧标记
+        self._bindings: dict[tuple[int, int], int] = {} # (栈帧标记, 局部变量下标) -> 句柄
+        self._trampolines = [self._make_trampoline(item) for item in runtime_imports]
+
+    def patch(self, code: bytes, base_offset: int = 0) -> bytes:
+        """把各调用点 mov rax, imm64 的占位回填为 trampoline 地址，返回新机器码。"""
+        patched = bytearray(code)
+        for item, trampoline in zip(self.imports, self._trampolines):
+            address = ctypes.cast(trampoline, ctypes.c_void_p).value
+            for site in item["sites"]:
+                patch_offset = site["patch_offset"] - base_offset
+                if patched[patch_offset - len(_RUNTIME_IMPORT_PATCH_PREFIX):patch_offset] != _RUNTIME_IMPORT_PATCH_PREFIX:
+                    raise NativeCodegenError(f"native 运行时导入 {item['name']} 回填位置 {site['patch_offset']} 不是 mov rax, imm64")
+                patched[patch_offset:patch_offset + 8] = struct.pack("<Q", address)
+        return bytes(patched)
+
+    def release_frames(self) -> None:
+        """native 入口返回后释放全部未固定的动态字符串；错误传播路径上跳过的回收点在这里补齐。"""
+        self._bindings.clear()
+        for handle, owner in list(self._owners.items()):
+            if owner != _PINNED_FRAME:
+                self._free_string(handle)
+
+    def raise_pending_error(self) -> None:
+        """重新抛出 builtin 在 native 调用期间记录的异常。"""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def _make_trampoline(self, item: dict[str, object]):
+        from verbose_c.vm.builtins_functions import BUILTIN_FUNCTIONS
+
+        name = item["name"]
+        arg_types = list(item["arg_types"])
+        result_type = item["result_type"]
+        if name in RUNTIME_STRING_HELPERS:
+            helper = {
+                RUNTIME_STRING_EQ: self._string_eq,
+                RUNTIME_STRING_BIND: self._string_bind,
+                RUNTIME_STRING_PIN: self._string_pin,
+                RUNTIME_STRING_COLLECT: self._string_collect,
+            }[name]
+
+            def call(frame, args):
+                return helper(frame, *args[:len(arg_types)])
+        else:
+            function = BUILTIN_FUNCTIONS.get(name)
+            if function is None:
+                raise NativeCodegenError(f"native 运行时导入引用未知 builtin: {name}")
+
+            def call(frame, args):
+                objects = [self._to_object(value, arg_type) for value, arg_type in zip(args, arg_types)]
+                return self._from_object(function(*objects), result_type, frame)
+
+        def trampoline(a0, a1, a2, result):
+            if self.error is not None:
+                return 1
+            try:
+                result[0] = call(ctypes.addressof(result.contents), (a0, a1, a2))
+            except BaseException as error:
+                self.error = error
+                return 1
+            return 0
+
+        return NATIVE_RUNTIME_TRAMPOLINE(trampoline)
+
+    def _string_eq(self, frame: int, left: int, right: int) -> int:
+        return int(self.strings[left] == self.strings[right])
+
+    def _string_bind(self, frame: int, local_index: int, handle: int) -> int:
+        self._bindings[(frame, local_index)] = handle
+        return 0
+
+    def _string_pin(self, frame: int, handle: int) -> int:
+        if handle in self._owners:
+            self._owners[handle] = _PINNED_FRAME
+        return 0
+
+    def _string_collect(self, frame: int, leaving: int) -> int:
+        """
+        回收点：此时本栈帧没有在途的字符串临时值，更深的栈帧都已返回。
+
+        丢弃已返回栈帧（函数返回前还包括本栈帧）的局部变量登记，再释放本栈帧及更深栈帧创建、未被登记持有的句柄。
+        """
+        self._bindings = {
+            key: handle
+            for key, handle in self._bindings.items()
+            if key[0] > frame or (key[0] == frame and not leaving)
+        }
+        live = set(self._bindings.values())
+        for handle, owner in list(self._owners.items()):
+            if owner <= frame and handle not in live:
+                self._free_string(handle)
+        return 0
+
+    def _new_string(self, value: str, frame: int) -> int:
+        if self._free_handles:
+            handle = self._free_handles.pop()
+            self.strings[handle] = value
+        else:
+            handle = len(self.strings)
+            self.strings.append(value)
+        self._owners[handle] = frame
+        return handle
+
+    def _free_string(self, handle: int) -> None:
+        del self._owners[handle]
+        self.strings[handle] = None
+        self._free_handles.append(handle)
+
+    def _to_object(self, value: int, value_type: str):
+        from verbose_c.object.enum import VBCObjectType
+        from verbose_c.object.t_bool import VBCBool
+        from verbose_c.object.t_float import VBCFloat
+        from verbose_c.object.t_integer import VBCInteger
+        from verbose_c.object.t_string import VBCString
+
+        if value_type == "int64":
+            return VBCInteger(value)
+        if value_type == "bool64":
+            return VBCBool(value != 0)
+        if value_type == "float64":
+            return VBCFloat(struct.unpack("<d", struct.pack("<q", value))[0], VBCObjectType.DOUBLE)
+        if value_type == "str64":
+            return VBCString.from_value(self.strings[value])
+        raise NativeCodegenError(f"native 运行时导入暂不支持实参类型 {value_type}")
+
+    def _from_object(self, value: object, value_type: str, frame: int = _PINNED_FRAME) -> int:
+        if value_type == "str64":
+            return self._new_string(value.value, frame)
+        return int(value.value)
@@ -0,0 +1,39 @@
+import hashlib
+import importlib.util
+import marshal
+from functools import lru_cache
+
+# 函数机器码的生成逻辑所在模块：任一模块改动都可能改变同一 Machine IR 生成的机器码
+CODEGEN_MODULES = ("abi", "codegen", "encoder", "machine_ir", "target")
+# native 产物校验器所在模块：任一模块改动都可能改变 map、PE 与内存执行前校验的结论
+VALIDATOR_MODULES = ("codegen", "pe_writer", "runner", "runtime_calls", "validator")
+
+
+def native_codegen_fingerprint() -> str:
+    """native 机器码生成器的源码指纹，作为函数机器码缓存 key 的一部分。"""
+    return _modules_fingerprint(CODEGEN_MODULES)
+
+
+def native_validator_fingerprint() -> str:
+    """native 产物校验器的源码指纹，作为校验结果缓存 key 的一部分。"""
+    return _modules_fingerprint(VALIDATOR_MODULES)
+
+
+@lru_cache(maxsize=None)
+def _modules_fingerprint(module_names: tuple[str, ...]) -> str:
+    """
+    计算 native 后端模块源码的 SHA-256，每个进程只计算一次。
+
+    后端代码变化时缓存 key 随之变化，不再依赖手动递增版本号；
+    只有字节码、没有源码的安装方式退回到编译后代码对象的序列化结果。
+    """
+    digest = hashlib.sha256()
+    for name in module_names:
+        spec = importlib.util.find_spec(f"{__package__}.{name}")
+        if spec is None or spec.loader is None:
+            raise ImportError(f"找不到 native 后端模块: {name}")
+        source = spec.loader.get_source(spec.name)
+        payload = source.encode("utf-8") if source is not None else marshal.dumps(spec.loader.get_code(spec.name))
+        digest.update(f"{name}:{len(payload)}:".encode("utf-8"))
+        digest.update(payload)
+    return digest.hexdigest()
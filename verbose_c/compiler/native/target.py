@@ -18,6 +18,8 @@ class RegisterSet:
     stack_pointer: str
     caller_saved: tuple[str, ...]
     callee_saved: tuple[str, ...]
+    float_argument_registers: tuple[str, ...] = ("XMM0", "XMM1", "XMM2", "XMM3")
+    float_return_register: str = "XMM0"
 
 
 WINDOWS_X64_REGISTERS = RegisterSet(
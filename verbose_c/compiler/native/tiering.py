@@ -0,0 +1,294 @@
+import ctypes
+import struct
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
+
+from verbose_c.compiler.native.codegen import NativeCodeProgram, generate_native_code, native_code_program_map
+from verbose_c.compiler.native.lowering import lower_ir_functions_to_machine
+from verbose_c.compiler.native.machine_ir import MachineFunction, MachineProgram
+from verbose_c.compiler.native.runner import (
+    _free_executable_code,
+    _map_executable_code,
+    _validate_native_program,
+    can_run_native_memory,
+)
+from verbose_c.compiler.native.runtime_calls import NativeRuntimeHost
+
+# native 桩可以按值传递的 VM 对象类型：整数结果与 VM 运算一样按值提升类型，浮点经 XMM 传递
+_STUB_INTEGER_TYPES = {"CHAR", "SHORT", "INT", "LONG", "LONGLONG"}
+_STUB_FLOAT_TYPES = {"FLOAT", "DOUBLE"}
+_STUB_PARAM_TYPES = {*_STUB_INTEGER_TYPES, *_STUB_FLOAT_TYPES, "BOOL"}
+_STUB_RETURN_TYPES = {*_STUB_PARAM_TYPES, "VOID"}
+
+
+@dataclass
+class NativeTierDecision:
+    """单个函数的分层结果；reason 说明函数留在 VM 的原因，native 函数为空串。"""
+
+    name: str
+    native: bool
+    reason: str = ""
+
+
+@dataclass
+class NativeTieringPlan:
+    """
+    混合执行的逐函数分层计划。
+
+    native_code_program 只包含 native 层函数和一个空模块入口；signatures 记录各 native 函数
+    形参与返回值的 VM 对象类型名，供桩在 VM 对象与 8 字节 native 值之间转换。
+    unavailable_reason 非空时当前进程无法执行机器码，全部函数仍由 VM 解释执行。
+    """
+
+    decisions: list[NativeTierDecision] = field(default_factory=list)
+    native_code_program: NativeCodeProgram | None = None
+    signatures: dict[str, tuple[list[str], str]] = field(default_factory=dict)
+    unavailable_reason: str | None = None
+
+    @property
+    def native_functions(self) -> list[str]:
+        return [decision.name for decision in self.decisions if decision.native]
+
+
+def plan_native_tiering(output: Any, native_function_cache: Any | None = None) -> NativeTieringPlan:
+    """
+    按函数划分 native 层与 VM 层。
+
+    依次排除：类方法、IR/Machine IR lowering 失败或访问全局变量的函数、调用 _exit 的函数
+    （native 退出标志经 RDX 传播，无法穿过 ctypes 桩）、签名含引用值或无限精度类型的函数，
+    再按调用关系传播到调用了 VM 层函数的函数，余下函数一起生成机器码。
+    机器码生成失败时按调用闭包逐个定位失败函数，排除后重试。
+    """
+    from verbose_c.compiler.ir import lower_compiler_output_to_ir
+
+    results = {name: result for name, result in output.function_compilation_results.items() if isinstance(result, dict)}
+    reasons: dict[str, str] = {}
+    for name in results:
+        if "." in name:
+            reasons[name] = "类方法由 VM 按实例分派"
+
+    ir_errors: dict[str, Exception] = {}
+    try:
+        ir_program = lower_compiler_output_to_ir(output, ir_errors)
+    except Exception as error:
+        return NativeTieringPlan(
+            decisions=[NativeTierDecision(name, False, reasons.get(name, f"模块 IR lowering 失败: {error}")) for name in results],
+        )
+    for name, error in ir_errors.items():
+        reasons.setdefault(name, f"IR lowering 失败: {error}")
+    ir_program.functions = {name: function for name, function in ir_program.functions.items() if name not in reasons}
+
+    machine_program, machine_errors = lower_ir_functions_to_machine(
+        ir_program,
+        {name: str(results[name].get("return_type", "int64")) for name in reasons},
+    )
+    for name, error in machine_errors.items():
+        reasons.setdefault(name, str(error))
+    for name, function in machine_program.functions.items():
+        if name in reasons:
+            continue
+        if any(instruction.op == "exit" for block in function.blocks for instruction in block.instructions):
+            reasons[name] = "调用 _exit：native 退出标志无法经桩传回 VM"
+            continue
+        signature_error = _stub_signature_error(results[name])
+        if signature_error is not None:
+            reasons[name] = signature_error
+
+    native_names = _propagate_vm_callers(machine_program, reasons)
+    native_code_program = None
+    while native_names:
+        try:
+            native_code_program = _generate_subset(machine_program, native_names, native_function_cache, output.optimize_level)
+            break
+        except Exception as error:
+            failed = _isolate_codegen_failure(machine_program, native_names, native_function_cache, output.optimize_level)
+            for name, failure in (failed or {name: error for name in native_names}).items():
+                reasons[name] = f"机器码生成失败: {failure}"
+            native_names = _propagate_vm_callers(machine_program, reasons)
+
+    return NativeTieringPlan(
+        decisions=[NativeTierDecision(name, name in native_names, reasons.get(name, "")) for name in results],
+        native_code_program=native_code_program,
+        signatures={
+            name: (list(results[name]["param_object_types"]), results[name]["return_object_type"])
+            for name in native_names
+        },
+        unavailable_reason=None if can_run_native_memory() else "native 内存执行仅支持 Windows x64",
+    )
+
+
+def _stub_signature_error(result: dict[str, Any]) -> str | None:
+    """检查函数签名能否由桩按值转换，返回不能转换的原因。"""
+    if "param_object_types" not in result:
+        return "编译产物缺少签名对象类型，无法生成 native 桩"
+    for index, object_type in enumerate(result["param_object_types"]):
+        if object_type not in _STUB_PARAM_TYPES:
+            return f"第 {index} 个参数类型 {object_type or '引用值'} 无法经 native 桩按值传递"
+    return_type = result.get("return_object_type")
+    if return_type not in _STUB_RETURN_TYPES:
+        return f"返回值类型 {return_type or '引用值'} 无法经 native 桩按值传递"
+    return None
+
+
+def _callees(function: MachineFunction) -> list[str]:
+    return [
+        str(instruction.args[0].value)
+        for block in function.blocks
+        for instruction in block.instructions
+        if instruction.op == "call"
+    ]
+
+
+def _propagate_vm_callers(machine_program: MachineProgram, reasons: dict[str, str]) -> list[str]:
+    """直到不动点：调用了 VM 层函数的函数也留在 VM，返回余下的 native 层函数名。"""
+    native_names = [name for name in machine_program.functions if name not in reasons]
+    changed = True
+    while changed:
+        changed = False
+        for name in list(native_names):
+            callee = next((callee for callee in _callees(machine_program.functions[name]) if callee not in native_names), None)
+            if callee is not None:
+                reasons[name] = f"调用解释执行的函数 {callee}"
+                native_names.remove(name)
+                changed = True
+    return native_names
+
+
+def _call_closure(machine_program: MachineProgram, name: str) -> list[str]:
+    closure = [name]
+    for current in closure:
+        closure.extend(callee for callee in _callees(machine_program.functions[current]) if callee not in closure)
+    return closure
+
+
+def _generate_subset(
+    machine_program: MachineProgram,
+    names: list[str],
+    native_function_cache: Any | None,
+    optimize_level: int,
+) -> NativeCodeProgram:
+    subset = replace(machine_program, functions={name: machine_program.functions[name] for name in names})
+    return generate_native_code(subset, native_function_cache, optimize_level)
+
+
+def _isolate_codegen_failure(
+    machine_program: MachineProgram,
+    names: list[str],
+    native_function_cache: Any | None,
+    optimize_level: int,
+) -> dict[str, Exception]:
+    """逐个对函数的调用闭包生成机器码，返回第一个单独失败的函数；全部单独成功时返回空表。"""
+    for name in names:
+        try:
+            _generate_subset(machine_program, _call_closure(machine_program, name), native_function_cache, optimize_level)
+        except Exception as error:
+            return {name: error}
+    return {}
+
+
+class NativeTierImage:
+    """
+    把分层计划的机器码映射到可执行内存，并为每个 native 层函数生成 VM 可直接调用的 VBCNativeFunction 桩。
+
+    桩按 Windows x64 调用约定传参（整数与布尔为 c_int64，浮点为 c_double），按声明的返回类型把 RAX/XMM0
+    还原为 VM 对象；builtin 在 native 调用期间记录的异常在桩返回后重新抛出。
+    运行期检查失败仍是 ud2 陷阱，与 --run-native-memory 一致。使用完毕后调用 close 释放可执行内存。
+    bind_entry 接收函数偏移与 ctypes 函数原型并返回可调用的入口，缺省时把机器码映射到可执行内存后按偏移取入口。
+    """
+
+    def __init__(self, plan: NativeTieringPlan, bind_entry: Callable[[int, Any], Callable[..., Any]] | None = None) -> None:
+        from verbose_c.object.function import VBCNativeFunction
+
+        program = plan.native_code_program
+        _validate_native_program(program)
+        metadata = native_code_program_map(program)
+        self._host = NativeRuntimeHost(program.runtime_strings, metadata["runtime_imports"])
+        code = self._host.patch(program.code)
+        self._address: int | None = None
+        if bind_entry is None:
+            self._address = _map_executable_code(code)
+            bind_entry = self._bind_mapped_entry
+        self.stubs = {
+            name: VBCNativeFunction(name, self._make_stub(bind_entry, program.functions[name].offset, *plan.signatures[name]))
+            for name in plan.native_functions
+        }
+
+    def close(self) -> None:
+        if self._address is not None:
+            _free_executable_code(self._address)
+            self._address = None
+
+    def _bind_mapped_entry(self, offset: int, prototype: Any) -> Callable[..., Any]:
+        return prototype(self._address + offset)
+
+    def _make_stub(self, bind_entry: Callable[[int, Any], Callable[..., Any]], offset: int, param_types: list[str], return_type: str):
+        prototype = ctypes.CFUNCTYPE(_native_ctype(return_type), *[_native_ctype(param_type) for param_type in param_types])
+        entry = bind_entry(offset, prototype)
+        host = self._host
+
+        def stub(*args):
+            result = entry(*[_to_native_value(arg, param_type) for arg, param_type in zip(args, param_types)])
+            host.release_frames()
+            host.raise_pending_error()
+            return _to_vm_object(result, return_type)
+
+        return stub
+
+
+def _native_ctype(object_type: str):
+    return ctypes.c_double if object_type in _STUB_FLOAT_TYPES else ctypes.c_int64
+
+
+def _to_native_value(value: Any, object_type: str) -> int | float:
+    """把 VM 实参转换为 ctypes 实参；整数按 64 位回绕，与 native 算术一致。"""
+    if object_type in _STUB_FLOAT_TYPES:
+        return float(value.value)
+    return struct.unpack("<q", struct.pack("<Q", int(value.value) & 0xFFFFFFFFFFFFFFFF))[0]
+
+
+def _to_vm_object(value: int | float, object_type: str):
+    """
+    按声明的返回类型把 native 返回值还原为 VM 对象。
+
+    native 整数运算保留完整的 64 位结果，超出声明类型时与 VM 运算一样提升类型，而不是回绕到声明位宽。
+    """
+    from verbose_c.object.enum import VBCObjectType
+    from verbose_c.object.t_bool import VBCBool
+    from verbose_c.object.t_float import VBCFloat
+    from verbose_c.object.t_integer import VBCInteger
+    from verbose_c.object.t_null import VBCNull
+
+    if object_type == "VOID":
+        return VBCNull()
+    if object_type == "BOOL":
+        return VBCBool(value != 0)
+    if object_type in _STUB_FLOAT_TYPES:
+        return VBCFloat(value, VBCObjectType[object_type])
+    return VBCInteger._create_with_promotion(value, VBCObjectType[object_type])
+
+
+def format_native_tiering_report(plan: NativeTieringPlan) -> str:
+    """生成混合执行分层报告：每个函数的执行层以及留在 VM 的原因。"""
+    native_count = len(plan.native_functions)
+    lines = [
+        "## Native 分层\n\n",
+        f"- native 函数: `{native_count}` / `{len(plan.decisions)}`\n",
+    ]
+    if plan.native_code_program is not None:
+        lines.append(f"- 机器码大小: `{len(plan.native_code_program.code)}` bytes\n")
+    if plan.unavailable_reason is not None:
+        lines.append(f"- 未绑定 native 桩: {plan.unavailable_reason}，全部函数由 VM 解释执行\n")
+    lines.extend([
+        "\n| 函数 | 执行层 | 签名 | 留在 VM 的原因 |\n",
+        "| --- | --- | --- | --- |\n",
+    ])
+    for decision in plan.decisions:
+        signature = "-"
+        if decision.name in plan.signatures:
+            param_types, return_type = plan.signatures[decision.name]
+            signature = f"`({', '.join(param_types)}) -> {return_type}`"
+        tier = "native" if decision.native else "vm"
+        reason = decision.reason.replace("|", "\\|").replace("\n", " ") or "-"
+        lines.append(f"| `{decision.name}` | `{tier}` | {signature} | {reason} |\n")
+    lines.append("\n")
+    return "".join(lines)
@@ -17,6 +17,8 @@ class Opcode(Enum):
     LOAD_LOCAL_VAR      = 0x11  # 加载局部变量到栈顶
     STORE_GLOBAL_VAR    = 0x12  # 存储到全局变量
     LOAD_GLOBAL_VAR     = 0x13  # 加载全局变量
+    STORE_GLOBAL_SLOT   = 0x14  # 按链接期分配的槽位存储全局变量
+    LOAD_GLOBAL_SLOT    = 0x15  # 按链接期分配的槽位加载全局变量
     
     # === 算术运算类 (0x20-0x2F) ===
     ADD                 = 0x20  # 加法运算
@@ -47,6 +49,8 @@ class Opcode(Enum):
     LOAD_FUNCTION       = 0x61  # 加载函数对象
     ENTER_SCOPE         = 0x62  # 进入新作用域
     EXIT_SCOPE          = 0x63  # 退出当前作用域
+    CALL_DIRECT         = 0x64  # 按名称直接调用顶层函数，操作数 (函数名, 参数数量)，链接后为 (函数对象, 参数数量)
+    CALL_NATIVE         = 0x65  # 按名称直接调用内置函数，操作数 (函数名, 参数数量)，链接后为 (原生函数对象, 参数数量)
     
     # === 类型转换类 (0x70-0x7F) ===
     CAST                = 0x70  # 类型转换
@@ -1,5 +1,9 @@
+from typing import Hashable
+
+from verbose_c.compiler.constant_pool import constant_key
 from verbose_c.compiler.enum import LoopType, ScopeType, SymbolKind
 from verbose_c.compiler.opcode import Opcode
+from verbose_c.compiler.parallel_codegen import FunctionBodyResult, compile_function_bodies_parallel, compile_function_body
 from verbose_c.compiler.symbol import SymbolTable
 from verbose_c.object.class_ import VBCClass
 from verbose_c.object.function import VBCFunction
@@ -16,16 +20,29 @@ from verbose_c.typing.types import *
 
 
 def _native_type_name(type_: Type) -> str:
-    """返回 native/IR 后端使用的标量类型名。"""
+    """返回 native/IR 后端使用的标量类型名；指针在 native 后端中以 int64 单元地址表示，浮点统一为 float64。"""
     if isinstance(type_, VoidType):
         return "void"
     if isinstance(type_, BoolType):
         return "bool64"
-    if isinstance(type_, IntegerType):
+    if isinstance(type_, (IntegerType, PointerType)):
         return "int64"
+    if isinstance(type_, FloatType):
+        return "float64"
     return repr(type_)
 
 
+def _value_object_type_name(type_: Type) -> str | None:
+    """返回按值传递的标量在 VM 中的对象类型名；指针、数组、结构体、字符串等引用值返回 None。"""
+    if isinstance(type_, VoidType):
+        return "VOID"
+    if isinstance(type_, BoolType):
+        return "BOOL"
+    if isinstance(type_, (IntegerType, FloatType)):
+        return type_.kind.name
+    return None
+
+
 class LoopContext:
     """
     循环上下文类，管理循环的控制标签
@@ -60,14 +77,16 @@ class OpcodeGenerator(VisitorBase):
     """
     根据AST生成机器码的访问者类
     """
-    def __init__(self, symbol_table: SymbolTable, source_path: str | None = None, function_name: str | None = None, optimize_level: int = 0):
+    def __init__(self, symbol_table: SymbolTable, source_path: str | None = None, function_name: str | None = None, optimize_level: int = 0, jobs: int = 1):
         self.symbol_table: SymbolTable = symbol_table
         self.source_path = source_path
         self.current_function_name: str | None = function_name
         self.optimize_level = optimize_level
+        self.jobs = jobs # 函数体并行代码生成的 worker 进程数，1 表示串行
         self.bytecode: list[tuple] = []
         self.labels = {}
         self.constant_pool = []
+        self._constant_indices: dict[Hashable, int] = {} # 常量键 -> 常量池下标
         self.lineno_table: list[tuple[int, int]] = [] # (字节码偏移, 行号)
         self.optimization_result = None
         self.current_line = -1
@@ -76,6 +95,7 @@ class OpcodeGenerator(VisitorBase):
         self.switch_stack: list[str] = []  # switch 结束标签栈
         self.function_compilation_results = {} # 存储函数编译结果
         self._nested_scope_indices: dict[SymbolTable, int] = {} # 跟踪每个父作用域下嵌套作用域的访问索引
+        self._precompiled_function_bodies: dict[str, FunctionBodyResult | Exception] = {} # 并行预先生成的函数体结果
 
     def visit(self, node: ASTNode):
         if node.start_line is not None:
@@ -105,17 +125,18 @@ class OpcodeGenerator(VisitorBase):
 
     def _add_constant(self, value) -> int:
         """
-        添加常量到常量池，确保类型和值都匹配时才复用。
+        添加常量到常量池，按 constant_key 哈希去重，类型和值都相同时才复用。
 
         Args:
             value (any): 要添加的常量对象
         """
-        for i, constant in enumerate(self.constant_pool):
-            if type(constant) is type(value) and constant == value:
-                return i
-        
-        self.constant_pool.append(value)
-        return len(self.constant_pool) - 1
+        key = constant_key(value)
+        index = self._constant_indices.get(key)
+        if index is None:
+            index = len(self.constant_pool)
+            self.constant_pool.append(value)
+            self._constant_indices[key] = index
+        return index
 
     def _generate_label(self, lebel_name="unnamed"):
         """
@@ -165,6 +186,8 @@ class OpcodeGenerator(VisitorBase):
             return VBCObjectType.BOOL
         if isinstance(type_obj, StringType):
             return VBCObjectType.STRING
+        if isinstance(type_obj, BytesType):
+            return VBCObjectType.BYTES
         if isinstance(type_obj, PointerType):
             return VBCObjectType.POINTER
         if isinstance(type_obj, ClassType):
@@ -517,7 +540,9 @@ class OpcodeGenerator(VisitorBase):
         self._emit(Opcode.HALT)
 
     def visit_ModuleNode(self, node: ModuleNode):
-        
+        if self.jobs > 1:
+            self._precompile_function_bodies(node.body)
+
         # TODO 暂时遍历执行所有语句，后续进一步完善
         for statement in node.body:
             self.visit(statement)
@@ -577,83 +602,90 @@ class OpcodeGenerator(VisitorBase):
             raise ValueError(f"未知的单目运算符: {node.op}")
 
     def visit_BinaryOpNode(self, node: BinaryOpNode):
-        
-        # 优先判断短路操作
-        if node.op == Operator.LOGICAL_AND:
-            self.visit(node.left)
-            
-            end_label = self._generate_label("binary_end")
-            self._emit(Opcode.DUP)
-            self._emit(Opcode.JUMP_IF_FALSE, end_label)
-            
-            self._emit(Opcode.POP)
-            self.visit(node.right)
-            
-            self._mark_label(end_label)
-            
-        elif node.op == Operator.LOGICAL_OR:
-            self.visit(node.left)
-            
-            next_instr_label = self._generate_label("logical_or_next")
-            end_label = self._generate_label("logical_or_end")
-            
-            self._emit(Opcode.DUP)
-            # 如果左操作数为假，则跳转到下一指令，计算右操作数
-            self._emit(Opcode.JUMP_IF_FALSE, next_instr_label)
-            
-            # 如果左操作数为真，则直接跳转到结尾，结果就是左操作数
-            self._emit(Opcode.JUMP, end_label)
-            
-            self._mark_label(next_instr_label)
-            # 弹出为假的左操作数，并计算右操作数
-            self._emit(Opcode.POP)
-            self.visit(node.right)
-            
-            self._mark_label(end_label)
-        else:
-            self._emit_expr_with_array_decay(node.left)
-            self._emit_expr_with_array_decay(node.right)
-
-            pointer_arithmetic = getattr(node, "_pointer_arithmetic", None)
-            if pointer_arithmetic == "add":
-                self._emit(Opcode.POINTER_ADD)
-                return
-            if pointer_arithmetic == "add_reversed":
-                self._emit(Opcode.SWAP)
-                self._emit(Opcode.POINTER_ADD)
-                return
-            if pointer_arithmetic == "sub":
-                self._emit(Opcode.POINTER_SUB)
-                return
-            if pointer_arithmetic == "diff":
-                self._emit(Opcode.POINTER_DIFF)
-                return
-
-            match node.op:
-                case Operator.ADD:
-                    self._emit(Opcode.ADD)
-                case Operator.SUBTRACT:
-                    self._emit(Opcode.SUBTRACT)
-                case Operator.MULTIPLY:
-                    self._emit(Opcode.MULTIPLY)
-                case Operator.DIVIDE:
-                    self._emit(Opcode.DIVIDE)
-                case Operator.EQUAL:
-                    self._emit(Opcode.EQUAL)
-                case Operator.NOT_EQUAL:
-                    self._emit(Opcode.NOT_EQUAL)
-                case Operator.LESS_THAN:
-                    self._emit(Opcode.LESS_THAN)
-                case Operator.GREATER_THAN:
-                    self._emit(Opcode.GREATER_THAN)
-                case Operator.LESS_EQUAL:
-                    self._emit(Opcode.LESS_EQUAL)
-                case Operator.GREATER_EQUAL:
-                    self._emit(Opcode.GREATER_EQUAL)
-                case Operator.MODULO:
-                    self._emit(Opcode.MODULO)
-                case _:
-                    raise ValueError(f"未知的二元运算符: {node.op}")
+        # 沿左操作数展开二元表达式链并迭代生成，长表达式链不会递归过深；
+        # 行号按原递归访问的顺序更新，生成的字节码与行号表不变
+        chain = [node]
+        leftmost = node.left
+        while type(leftmost) is BinaryOpNode:
+            chain.append(leftmost)
+            if leftmost.start_line is not None:
+                self.current_line = leftmost.start_line
+            leftmost = leftmost.left
+        self.visit(leftmost)
+        for binary in reversed(chain):
+            if binary.op == Operator.LOGICAL_AND:
+                end_label = self._generate_label("binary_end")
+                self._emit(Opcode.DUP)
+                self._emit(Opcode.JUMP_IF_FALSE, end_label)
+
+                self._emit(Opcode.POP)
+                self.visit(binary.right)
+
+                self._mark_label(end_label)
+            elif binary.op == Operator.LOGICAL_OR:
+                next_instr_label = self._generate_label("logical_or_next")
+                end_label = self._generate_label("logical_or_end")
+
+                self._emit(Opcode.DUP)
+                # 如果左操作数为假，则跳转到下一指令，计算右操作数
+                self._emit(Opcode.JUMP_IF_FALSE, next_instr_label)
+
+                # 如果左操作数为真，则直接跳转到结尾，结果就是左操作数
+                self._emit(Opcode.JUMP, end_label)
+
+                self._mark_label(next_instr_label)
+                # 弹出为假的左操作数，并计算右操作数
+                self._emit(Opcode.POP)
+                self.visit(binary.right)
+
+                self._mark_label(end_label)
+            else:
+                self._emit_array_decay_if_needed(binary.left)
+                self._emit_expr_with_array_decay(binary.right)
+                self._emit_binary_operator(binary)
+
+    def _emit_binary_operator(self, node: BinaryOpNode) -> None:
+        """两个操作数已入栈后，生成非短路二元运算的指令。"""
+        pointer_arithmetic = getattr(node, "_pointer_arithmetic", None)
+        if pointer_arithmetic == "add":
+            self._emit(Opcode.POINTER_ADD)
+            return
+        if pointer_arithmetic == "add_reversed":
+            self._emit(Opcode.SWAP)
+            self._emit(Opcode.POINTER_ADD)
+            return
+        if pointer_arithmetic == "sub":
+            self._emit(Opcode.POINTER_SUB)
+            return
+        if pointer_arithmetic == "diff":
+            self._emit(Opcode.POINTER_DIFF)
+            return
+
+        match node.op:
+            case Operator.ADD:
+                self._emit(Opcode.ADD)
+            case Operator.SUBTRACT:
+                self._emit(Opcode.SUBTRACT)
+            case Operator.MULTIPLY:
+                self._emit(Opcode.MULTIPLY)
+            case Operator.DIVIDE:
+                self._emit(Opcode.DIVIDE)
+            case Operator.EQUAL:
+                self._emit(Opcode.EQUAL)
+            case Operator.NOT_EQUAL:
+                self._emit(Opcode.NOT_EQUAL)
+            case Operator.LESS_THAN:
+                self._emit(Opcode.LESS_THAN)
+            case Operator.GREATER_THAN:
+                self._emit(Opcode.GREATER_THAN)
+            case Operator.LESS_EQUAL:
+                self._emit(Opcode.LESS_EQUAL)
+            case Operator.GREATER_EQUAL:
+                self._emit(Opcode.GREATER_EQUAL)
+            case Operator.MODULO:
+                self._emit(Opcode.MODULO)
+            case _:
+                raise ValueError(f"未知的二元运算符: {node.op}")
 
 
     def visit_RangeNode(self, node: RangeNode):
@@ -1119,10 +1151,32 @@ class OpcodeGenerator(VisitorBase):
     def visit_FunctionDeclNode(self, node: FunctionDeclNode):
         pass
 
+    def _precompile_function_bodies(self, statements: list[ASTNode]) -> None:
+        """
+        在进程池中预先生成模块顶层函数体的字节码，visit_FunctionNode 按源码顺序取用。
+
+        只收集符号完整的函数定义，其余情况仍由 visit_FunctionNode 串行处理并报告内部错误。
+        """
+        tasks = []
+        for statement in statements:
+            if not isinstance(statement, FunctionNode):
+                continue
+            func_symbol = self.symbol_table.lookup_value(statement.name.name)
+            if (
+                func_symbol is None
+                or not func_symbol.is_defined
+                or not isinstance(func_symbol.type_, FunctionType)
+                or func_symbol.scope is None
+            ):
+                continue
+            tasks.append((statement.name.name, statement.body, func_symbol.scope))
+        if len(tasks) < 2:
+            return
+        results = compile_function_bodies_parallel(tasks, self.jobs, self.optimize_level, self.source_path)
+        if results is not None:
+            self._precompiled_function_bodies.update(results)
+
     def visit_FunctionNode(self, node: FunctionNode):
-        from verbose_c.compiler.compiler import Compiler
-        from verbose_c.compiler.enum import CompilerPass
-        
         func_symbol = self.symbol_table.lookup_value(node.name.name)
         if func_symbol is None:
             raise RuntimeError(f"内部错误: 未找到函数 '{node.name.name}' 的符号")
@@ -1134,66 +1188,55 @@ class OpcodeGenerator(VisitorBase):
         function_symbol_table = func_symbol.scope
         if function_symbol_table is None:
             raise RuntimeError(f"内部错误: 未找到 '{node.name.name}' 的符号表")
-            
-        function_compiler = Compiler(
-            target_ast=node.body,
-            optimize_level=self.optimize_level,
-            symbol_table=function_symbol_table,
-            scope_type=ScopeType.FUNCTION,
-            source_path=self.source_path,
-            passes_to_run=[CompilerPass.GENERATE_CODE],
-            function_name=node.name.name,
-        )
-        
-        function_compiler.compile()
-        function_op_generator = function_compiler.opcode_generator
 
-        # 检查一下编译后的操作码，如果最后没有显式的return，则添加一个return null;
-        if not function_op_generator.bytecode or function_op_generator.bytecode[-1][0] != Opcode.RETURN:
-            const_index = function_op_generator._add_constant(VBCNull())
-            function_op_generator._emit(Opcode.LOAD_CONSTANT, const_index)
-            function_op_generator._emit(Opcode.RETURN)
-
-        # 将跳转标签解析为地址
-        for i, instruction in enumerate(function_op_generator.bytecode):
-            if len(instruction) == 2:
-                opcode, operand = instruction
-                if isinstance(operand, str) and operand in function_op_generator.labels:
-                    function_op_generator.bytecode[i] = (opcode, function_op_generator.labels[operand])
-        
-        function_bytecode = function_op_generator.bytecode
-        function_constants = function_op_generator.constant_pool
+        body_result = self._precompiled_function_bodies.pop(node.name.name, None)
+        if isinstance(body_result, Exception):
+            raise body_result
+        if body_result is None:
+            body_result = compile_function_body(
+                node.name.name,
+                node.body,
+                function_symbol_table,
+                optimize_level=self.optimize_level,
+                source_path=self.source_path,
+            )
         
         param_count = len(node.args)
-        local_count = function_symbol_table._next_local_address
+        local_count = body_result.local_count
         function_return_type = "int64"
         function_param_types = ["int64"] * param_count
+        function_param_object_types: list[str | None] = [None] * param_count
+        function_return_object_type = None
         if isinstance(func_symbol.type_, FunctionType):
             function_return_type = _native_type_name(func_symbol.type_.return_type)
             function_param_types = [_native_type_name(param_type) for param_type in func_symbol.type_.param_types]
+            function_return_object_type = _value_object_type_name(func_symbol.type_.return_type)
+            function_param_object_types = [_value_object_type_name(param_type) for param_type in func_symbol.type_.param_types]
 
         # 收集函数编译结果
         self.function_compilation_results[node.name.name] = {
-            'bytecode': function_op_generator.bytecode,
-            'constants': function_op_generator.constant_pool,
-            'labels': function_op_generator.labels,
-            'lineno_table': function_op_generator.lineno_table,
+            'bytecode': body_result.bytecode,
+            'constants': body_result.constants,
+            'labels': body_result.labels,
+            'lineno_table': body_result.lineno_table,
             'param_count': param_count,
             'param_types': function_param_types,
             'local_count': local_count,
             'return_type': function_return_type,
-            'optimization_result': function_op_generator.optimization_result,
-            'ast_optimization_result': function_compiler.ast_optimization_result,
+            'param_object_types': function_param_object_types,
+            'return_object_type': function_return_object_type,
+            'optimization_result': body_result.optimization_result,
+            'ast_optimization_result': body_result.ast_optimization_result,
         }
 
         vbc_function = VBCFunction(
             name=node.name.name,
-            bytecode=function_bytecode,
-            constants=function_constants,
+            bytecode=body_result.bytecode,
+            constants=body_result.constants,
             param_count=param_count,
             local_count=local_count,
             source_path=self.source_path,
-            lineno_table=function_op_generator.lineno_table
+            lineno_table=body_result.lineno_table
         )
         
         const_index = self._add_constant(vbc_function)
@@ -1207,8 +1250,11 @@ class OpcodeGenerator(VisitorBase):
             # 高级功能，后续添加，现在不做实现
             raise NotImplementedError(f"关键字参数在函数调用中暂未实现, 在行: {node.start_line}, 列: {node.start_column}")
         
-        # 先加载函数对象，再加载参数
-        self.visit(node.name)
+        # 类型检查已确定被调用者为顶层函数或内置函数时，不加载函数对象，直接按名称调用
+        static_callee = getattr(node, "_static_callee", None)
+        if static_callee is None:
+            # 先加载函数对象，再加载参数
+            self.visit(node.name)
         
         for arg_expr in node.args:
             self.visit(arg_expr)
@@ -1216,7 +1262,12 @@ class OpcodeGenerator(VisitorBase):
             self._emit_array_decay_if_needed(arg_expr)
         
         num_args = len(node.args)
-        self._emit(Opcode.CALL_FUNCTION, num_args)
+        if static_callee == "native":
+            self._emit(Opcode.CALL_NATIVE, (node.name.name, num_args))
+        elif static_callee == "function":
+            self._emit(Opcode.CALL_DIRECT, (node.name.name, num_args))
+        else:
+            self._emit(Opcode.CALL_FUNCTION, num_args)
 
     def visit_ClassNode(self, node: ClassNode):
         from verbose_c.compiler.compiler import Compiler
@@ -1539,6 +1590,7 @@ class OpcodeGenerator(VisitorBase):
                 "double": VBCObjectType.DOUBLE,
                 "unlimited float": VBCObjectType.NLFLOAT,
                 "string": VBCObjectType.STRING,
+                "bytes": VBCObjectType.BYTES,
                 "bool": VBCObjectType.BOOL,
             }
             target_enum = RUNTIME_TYPE_MAP.get(type_name, VBCObjectType.VOID)
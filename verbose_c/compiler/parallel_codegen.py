@@ -0,0 +1,139 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from verbose_c.compiler.enum import CompilerPass, ScopeType
+from verbose_c.compiler.opcode import Opcode
+from verbose_c.compiler.symbol import SymbolTable
+from verbose_c.object.t_null import VBCNull
+from verbose_c.parser.parser.ast.node import BlockNode
+
+# worker 进程中反序列化后的函数体任务：(函数名, 函数体, 函数符号表)
+_worker_tasks: list[tuple[str, BlockNode, SymbolTable]] | None = None
+_worker_optimize_level: int = 0
+_worker_source_path: str | None = None
+
+
+@dataclass
+class FunctionBodyResult:
+    """单个函数体的代码生成结果，串行与并行路径共用。"""
+
+    bytecode: list[tuple]
+    constants: list[Any]
+    labels: dict[str, int]
+    lineno_table: list[tuple[int, int]]
+    local_count: int
+    optimization_result: Any = None
+    ast_optimization_result: Any = None
+
+
+def compile_function_body(
+    name: str,
+    body: BlockNode,
+    symbol_table: SymbolTable,
+    optimize_level: int = 0,
+    source_path: str | None = None,
+) -> FunctionBodyResult:
+    """
+    在函数作用域内为已类型检查的函数体生成（并按优化等级优化）字节码。
+
+    函数体之间互不依赖，只读取类型检查阶段填好的函数符号表及其外层作用域。
+    """
+    from verbose_c.compiler.compiler import Compiler
+
+    function_compiler = Compiler(
+        target_ast=body,
+        optimize_level=optimize_level,
+        symbol_table=symbol_table,
+        scope_type=ScopeType.FUNCTION,
+        source_path=source_path,
+        passes_to_run=[CompilerPass.GENERATE_CODE],
+        function_name=name,
+    )
+
+    function_compiler.compile()
+    function_op_generator = function_compiler.opcode_generator
+
+    # 检查一下编译后的操作码，如果最后没有显式的return，则添加一个return null;
+    if not function_op_generator.bytecode or function_op_generator.bytecode[-1][0] != Opcode.RETURN:
+        const_index = function_op_generator._add_constant(VBCNull())
+        function_op_generator._emit(Opcode.LOAD_CONSTANT, const_index)
+        function_op_generator._emit(Opcode.RETURN)
+
+    # 将跳转标签解析为地址
+    for i, instruction in enumerate(function_op_generator.bytecode):
+        if len(instruction) == 2:
+            opcode, operand = instruction
+            if isinstance(operand, str) and operand in function_op_generator.labels:
+                function_op_generator.bytecode[i] = (opcode, function_op_generator.labels[operand])
+
+    return FunctionBodyResult(
+        bytecode=function_op_generator.bytecode,
+        constants=function_op_generator.constant_pool,
+        labels=function_op_generator.labels,
+        lineno_table=function_op_generator.lineno_table,
+        local_count=symbol_table._next_local_address,
+        optimization_result=function_op_generator.optimization_result,
+        ast_optimization_result=function_compiler.ast_optimization_result,
+    )
+
+
+def _init_codegen_worker(payload: bytes, optimize_level: int, source_path: str | None) -> None:
+    """进程池 worker 初始化：每个 worker 只反序列化一次全部函数体与符号表。"""
+    global _worker_tasks, _worker_optimize_level, _worker_source_path
+    _worker_tasks = pickle.loads(payload)
+    _worker_optimize_level = optimize_level
+    _worker_source_path = source_path
+
+
+def _compile_worker_task(index: int) -> FunctionBodyResult | Exception:
+    """在 worker 中编译第 index 个函数体；编译异常作为结果返回，由父进程按源码顺序抛出。"""
+    name, body, symbol_table = _worker_tasks[index]
+    try:
+        return compile_function_body(name, body, symbol_table, _worker_optimize_level, _worker_source_path)
+    except Exception as error:
+        return error
+
+
+def compile_function_bodies_parallel(
+    tasks: list[tuple[str, BlockNode, SymbolTable]],
+    jobs: int,
+    optimize_level: int = 0,
+    source_path: str | None = None,
+) -> dict[str, FunctionBodyResult | Exception] | None:
+    """
+    在进程池中并行生成多个函数体的字节码。
+
+    所有任务共享的外层符号表只序列化一次，结果按任务顺序返回，与串行编译逐字节一致。
+    序列化失败（如表达式过深）或进程池不可用时返回 None，由调用方回退到串行编译。
+
+    Args:
+        tasks: (函数名, 函数体, 函数符号表) 列表，按源码顺序排列。
+        jobs: worker 进程数上限。
+        optimize_level: 优化等级。
+        source_path: 源文件路径。
+
+    Returns:
+        函数名 -> 编译结果或编译期间抛出的异常。
+    """
+    try:
+        payload = pickle.dumps(tasks, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, RecursionError, TypeError, AttributeError):
+        return None
+
+    workers = min(jobs, len(tasks))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_codegen_worker,
+            initargs=(payload, optimize_level, source_path),
+        ) as executor:
+            results = list(executor.map(
+                _compile_worker_task,
+                range(len(tasks)),
+                chunksize=max(1, len(tasks) // (workers * 4)),
+            ))
+    except (OSError, RuntimeError, pickle.PickleError):
+        return None
+    return {name: result for (name, _, _), result in zip(tasks, results)}
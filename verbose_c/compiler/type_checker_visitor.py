@@ -8,10 +8,11 @@ from verbose_c.utils.visitor import VisitorBase
 from verbose_c.parser.parser.ast.node import *
 from verbose_c.compiler.symbol import SymbolTable, SymbolKind, Symbol
 from verbose_c.typing.types import (
-    Type, VoidType, NullType, IntegerType, FloatType, StringType, BoolType,
+    Type, VoidType, NullType, IntegerType, FloatType, StringType, BytesType, BoolType,
     PointerType, ArrayType, FunctionType, ClassType, StructType, AnyType, ErrorType
 )
 from verbose_c.object.enum import VBCObjectType
+from verbose_c.vm.builtins_functions import BUILTIN_FUNCTION_SIGNATURES
 
 
 # 将字符串类型名映射到编译时Type对象
@@ -26,6 +27,7 @@ BUILTIN_TYPE_MAP: dict[str, Type] = {
     "double": FloatType(VBCObjectType.DOUBLE),
     "unlimited float": FloatType(VBCObjectType.NLFLOAT),
     "string": StringType(),
+    "bytes": BytesType(),
     "bool": BoolType(),
 }
 
@@ -305,6 +307,10 @@ class TypeChecker(VisitorBase):
         if is_target_numeric and isinstance(source_type, StringType):
             return True
             
+        # 规则 5.1: 字符串与字节缓冲区之间按 UTF-8 编解码转换。
+        if isinstance(target_type, (StringType, BytesType)) and isinstance(source_type, (StringType, BytesType)):
+            return True
+
         # 规则 6: 字符串和数字转换布尔值
         if isinstance(target_type, BoolType) and (isinstance(source_type, StringType) or is_source_numeric):
             return True
@@ -429,7 +435,20 @@ class TypeChecker(VisitorBase):
 
     def visit_BinaryOpNode(self, node: BinaryOpNode) -> Type:
         """检查二元表达式类型并推导结果类型。"""
-        left_type = self._decay_array_expression(node.left, self.visit(node.left))
+        # 沿左操作数展开二元表达式链并自底向上迭代检查，长表达式链不会递归过深
+        chain = [node]
+        leftmost = node.left
+        while type(leftmost) is BinaryOpNode:
+            chain.append(leftmost)
+            leftmost = leftmost.left
+        result_type = self.visit(leftmost)
+        for binary in reversed(chain):
+            result_type = self._check_binary_operation(binary, result_type)
+        return result_type
+
+    def _check_binary_operation(self, node: BinaryOpNode, left_type: Type) -> Type:
+        """在左操作数类型已知时检查单个二元运算。"""
+        left_type = self._decay_array_expression(node.left, left_type)
         right_type = self._decay_array_expression(node.right, self.visit(node.right))
 
         if isinstance(left_type, ErrorType) or isinstance(right_type, ErrorType):
@@ -487,6 +506,8 @@ class TypeChecker(VisitorBase):
             # 规则 1: 字符串拼接
             if op == Operator.ADD and isinstance(left_type, StringType) and isinstance(right_type, StringType):
                 return StringType()
+            if op == Operator.ADD and isinstance(left_type, BytesType) and isinstance(right_type, BytesType):
+                return BytesType()
 
             # 规则 2: 数字运算 (整数/浮点数)
             if isinstance(left_type, (IntegerType, FloatType)) and isinstance(right_type, (IntegerType, FloatType)):
@@ -1061,8 +1082,34 @@ class TypeChecker(VisitorBase):
                 self._warn_implicit_conversion_if_needed(expected_arg_type, actual_arg_type, arg_node.start_line, f"函数参数 {i+1}")
                 self._mark_implicit_cast_if_needed(arg_node, expected_arg_type, actual_arg_type)
 
+        self._mark_static_callee_if_known(node, callee_type)
         return callee_type.return_type
 
+    def _mark_static_callee_if_known(self, node: CallNode, callee_type: FunctionType) -> None:
+        """
+        被调用者可静态确定为顶层函数或内置函数时给调用打标记，提示代码生成阶段生成 CALL_DIRECT / CALL_NATIVE。
+
+        只处理按名称直接调用、且名称解析到全局作用域函数符号的情况；参数数量已在上面检查一致。
+        """
+        if not isinstance(node.name, NameNode):
+            return
+        name = node.name.name
+        global_table = self.symbol_table
+        while global_table._parent is not None:
+            global_table = global_table._parent
+        symbol = self.symbol_table.lookup_value(name)
+        if (
+            symbol is None
+            or symbol.kind != SymbolKind.FUNCTION
+            or symbol.type_ is not callee_type
+            or global_table.lookup_value(name, current_scope_only=True) is not symbol
+        ):
+            return
+        if BUILTIN_FUNCTION_SIGNATURES.get(name) is callee_type:
+            setattr(node, "_static_callee", "native")
+        else:
+            setattr(node, "_static_callee", "function")
+
     def visit_ClassNode(self, node: ClassNode) -> Type:
         class_name = node.name.name
         
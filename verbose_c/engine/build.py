@@ -0,0 +1,204 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from verbose_c.engine.engine import (
+    _load_parser_module,
+    compile_module,
+    ensure_parser,
+    save_compilation_artifact,
+)
+from verbose_c.error import VBCCompileError
+from verbose_c.fs.artifact_store import ArtifactStore
+from verbose_c.fs.incremental_compile import IncrementalCompiler
+
+SOURCE_SUFFIX = ".vbc"
+
+_worker_parser_module: Any | None = None
+
+
+@dataclass(frozen=True)
+class BuildTask:
+    """单个入口文件的构建任务。"""
+
+    source_path: str
+    artifact_path: str
+    optimize_level: int = 0
+    refresh_parser: bool = False
+
+
+@dataclass
+class BuildFileResult:
+    """单个入口文件的构建结果。"""
+
+    source_path: str
+    artifact_path: str
+    success: bool
+    cache_hit: bool = False
+    duration_seconds: float = 0.0
+    warnings: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+@dataclass
+class BuildReport:
+    """一次多文件构建的汇总结果。"""
+
+    results: list[BuildFileResult]
+    jobs: int
+    duration_seconds: float
+
+    @property
+    def success(self) -> bool:
+        """判断全部文件是否构建成功。"""
+        return all(result.success for result in self.results)
+
+    @property
+    def compiled_count(self) -> int:
+        return sum(1 for result in self.results if result.success and not result.cache_hit)
+
+    @property
+    def cache_hit_count(self) -> int:
+        return sum(1 for result in self.results if result.cache_hit)
+
+    @property
+    def failed_count(self) -> int:
+        return sum(1 for result in self.results if not result.success)
+
+
+def collect_build_sources(paths: list[str]) -> list[str]:
+    """展开目录与文件参数，返回去重排序后的 .vbc 入口绝对路径。"""
+    sources: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for current_root, dirs, filenames in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if name != "__vbccache__")
+                for filename in sorted(filenames):
+                    if filename.endswith(SOURCE_SUFFIX):
+                        sources.append(os.path.abspath(os.path.join(current_root, filename)))
+        elif os.path.isfile(path):
+            sources.append(os.path.abspath(path))
+        else:
+            raise FileNotFoundError(2, "No such file or directory", path)
+    return list(dict.fromkeys(sources))
+
+
+def _init_build_worker() -> None:
+    """进程池 worker 初始化：每个 worker 只加载一次解析器模块。"""
+    global _worker_parser_module
+    _worker_parser_module = _load_parser_module()
+
+
+def _compile_build_task(task: BuildTask) -> BuildFileResult:
+    """在当前进程中编译单个入口并写出 .vbb 产物。"""
+    global _worker_parser_module
+    started = time.perf_counter()
+    try:
+        if _worker_parser_module is None:
+            _worker_parser_module = _load_parser_module()
+        output = compile_module(
+            task.source_path,
+            optimize_level=task.optimize_level,
+            parser_module=_worker_parser_module,
+        )
+        save_compilation_artifact(
+            output,
+            task.source_path,
+            task.artifact_path,
+            incremental_compiler=IncrementalCompiler(ArtifactStore()),
+            optimize_level=task.optimize_level,
+            refresh_parser=task.refresh_parser,
+        )
+    except VBCCompileError as error:
+        return BuildFileResult(
+            source_path=task.source_path,
+            artifact_path=task.artifact_path,
+            success=False,
+            duration_seconds=time.perf_counter() - started,
+            warnings=list(error.warnings),
+            error=error.message,
+        )
+    except Exception as error:
+        return BuildFileResult(
+            source_path=task.source_path,
+            artifact_path=task.artifact_path,
+            success=False,
+            duration_seconds=time.perf_counter() - started,
+            error=f"{type(error).__name__}: {error}",
+        )
+    return BuildFileResult(
+        source_path=task.source_path,
+        artifact_path=task.artifact_path,
+        success=True,
+        duration_seconds=time.perf_counter() - started,
+        warnings=list(output.warnings or []),
+    )
+
+
+def run_build(
+    sources: list[str],
+    *,
+    jobs: int | None = None,
+    optimize_level: int = 0,
+    refresh_parser: bool = False,
+) -> BuildReport:
+    """
+    并行编译多个入口文件，跳过依赖未变化的产物。
+
+    Args:
+        sources: 入口源文件路径列表。
+        jobs: worker 进程数，``None`` 时使用 CPU 数，``1`` 时在当前进程串行编译。
+        optimize_level: 优化等级。
+        refresh_parser: 是否先重新生成解析器并强制全部重编译。
+
+    Returns:
+        按输入顺序排列的逐文件构建结果。
+    """
+    started = time.perf_counter()
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    # 解析器只在父进程生成一次，避免多个 worker 并发写 parser.py。
+    ensure_parser(refresh_parser)
+
+    artifact_store = ArtifactStore()
+    incremental_compiler = IncrementalCompiler(artifact_store)
+    results: list[BuildFileResult | None] = [None] * len(sources)
+    pending: list[tuple[int, BuildTask]] = []
+    for index, source in enumerate(sources):
+        source_path = os.path.abspath(source)
+        artifact_path = artifact_store.artifact_path_for_source(source_path)
+        check_started = time.perf_counter()
+        if not incremental_compiler.needs_recompile(
+            source_path,
+            artifact_path=artifact_path,
+            optimize_level=optimize_level,
+            refresh_parser=refresh_parser,
+        ):
+            results[index] = BuildFileResult(
+                source_path=source_path,
+                artifact_path=artifact_path,
+                success=True,
+                cache_hit=True,
+                duration_seconds=time.perf_counter() - check_started,
+            )
+            continue
+        pending.append((index, BuildTask(source_path, artifact_path, optimize_level, refresh_parser)))
+
+    if jobs == 1 or len(pending) <= 1:
+        for index, task in pending:
+            results[index] = _compile_build_task(task)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(pending)),
+            initializer=_init_build_worker,
+        ) as executor:
+            futures = [(index, executor.submit(_compile_build_task, task)) for index, task in pending]
+            for index, future in futures:
+                results[index] = future.result()
+
+    return BuildReport(
+        results=[result for result in results if result is not None],
+        jobs=jobs,
+        duration_seconds=time.perf_counter() - started,
+    )
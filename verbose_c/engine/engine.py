@@ -1,23 +1,21 @@
+from __future__ import annotations
+
 import os
 import importlib.util
 import subprocess
+import sys
 import tempfile
 import time
 import traceback
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from verbose_c.fs.source_manager import SourceManager
-from verbose_c.preprocessor.preprocessor import Preprocessor
-from verbose_c.parser.lexer.tokenizer import Tokenizer
-from verbose_c.parser.lexer.token import Token
-from verbose_c.parser.parser.ast.node import ASTNode
-from verbose_c.compiler.compiler import Compiler
-from verbose_c.parser.ppg.build import build_python_parser_and_generator
-from verbose_c.parser.ppg.validator import validate_grammar
 from verbose_c.error import VBCCompileError, VBCRuntimeError
 from verbose_c.fs.artifact_store import ArtifactStore
 from verbose_c.fs.incremental_compile import IncrementalCompiler
+from verbose_c.fs.validation_cache import NativeValidationCache
+from verbose_c.fs.native_function_cache import NativeFunctionCache
 from verbose_c.engine.recorder import PipelineRecorder, create_dump_path
 from verbose_c.engine.native_exporter import (
     NativeArtifactExporter,
@@ -25,8 +23,21 @@ from verbose_c.engine.native_exporter import (
     NativeExportRequest,
 )
 
+if TYPE_CHECKING:
+    from verbose_c.parser.lexer.token import Token
+    from verbose_c.parser.parser.ast.node import ASTNode
+
 default_parser_output = "parser.py"
 grammar_file = "Grammar/verbose_c.gram"
+_PARSER_MODULE_NAME = "verbose_c_generated_parser"
+_BACKEND_OUTPUT_FIELDS = frozenset({
+    "ir_program",
+    "ir_error",
+    "machine_program",
+    "machine_error",
+    "native_code_program",
+    "native_code_error",
+})
 
 
 @dataclass
@@ -50,12 +61,13 @@ class CompilerOutput:
     """用于封装单次编译结果的数据类。"""
     bytecode: list[tuple[Any, ...]]
     constant_pool: list[Any]
-    ir_program: Any | None = None
-    ir_error: Exception | None = None
-    machine_program: Any | None = None
-    machine_error: Exception | None = None
-    native_code_program: Any | None = None
-    native_code_error: Exception | None = None
+    # 后端产物按需生成：首次访问任一字段时才导入并运行 IR/native 后端。
+    ir_program: Any | None = field(init=False, repr=False, compare=False)
+    ir_error: Exception | None = field(init=False, repr=False, compare=False)
+    machine_program: Any | None = field(init=False, repr=False, compare=False)
+    machine_error: Exception | None = field(init=False, repr=False, compare=False)
+    native_code_program: Any | None = field(init=False, repr=False, compare=False)
+    native_code_error: Exception | None = field(init=False, repr=False, compare=False)
     function_compilation_results: dict[str, Any] = field(default_factory=dict)
     labels: dict[str, int] = field(default_factory=dict)
     tokens: list[Token] | None = None
@@ -64,9 +76,20 @@ class CompilerOutput:
     lineno_table: list[tuple[int, int]] | None = None
     warnings: list[str] = field(default_factory=list)
     parser_generation_report: ParserGenerationReport | None = None
+    parser_statistics: Any | None = None
     optimization_result: Any | None = None
     ast_optimization_result: Any | None = None
     dependencies: list[str] = field(default_factory=list)
+    # 生成 native 机器码时沿用的优化等级，-O1 起启用机器码窥孔优化
+    optimize_level: int = 0
+    # 混合执行的逐函数分层计划，仅 native_tiering 运行时生成
+    native_tiering: Any | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name in _BACKEND_OUTPUT_FIELDS:
+            _populate_backend_outputs(self)
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
 
 @dataclass
@@ -140,6 +163,9 @@ def _build_parser_generation_report(
 
 def generate_parser(grammar_path: str, output_path: str) -> ParserGenerationReport:
     """根据语法文件生成解析器，并返回生成报告。"""
+    from verbose_c.parser.ppg.build import build_python_parser_and_generator
+    from verbose_c.parser.ppg.validator import validate_grammar
+
     t0 = time.time()
     grammar, parser, tokenizer, gen = build_python_parser_and_generator(
         grammar_path,
@@ -160,14 +186,38 @@ def generate_parser(grammar_path: str, output_path: str) -> ParserGenerationRepo
 
 
 def ensure_parser(refresh_parser: bool = False) -> ParserGenerationReport | None:
-    """若 parser.py 不存在或需要刷新，则生成解析器并返回报告。"""
-    if refresh_parser or not os.path.exists(default_parser_output):
+    """若 parser.py 不存在、需要刷新或由旧版本生成器生成，则生成解析器并返回报告。"""
+    if refresh_parser or not _parser_matches_runtime(default_parser_output):
         return generate_parser(grammar_file, default_parser_output)
     return None
 
 
+def _parser_matches_runtime(parser_path: str) -> bool:
+    """检查已生成的 parser.py 是否与当前解析器运行时的接口版本一致。"""
+    from verbose_c.parser.parser.parser import PARSER_RUNTIME_VERSION
+
+    try:
+        with open(parser_path, "r", encoding="utf-8") as file:
+            header = file.read(4096)
+    except OSError:
+        return False
+    return f"\nPARSER_RUNTIME_VERSION = {PARSER_RUNTIME_VERSION}\n" in header
+
+
 def _load_parser_module():
-    spec = importlib.util.spec_from_file_location("parser", default_parser_output)
+    """按普通模块导入生成的解析器，并在 parser.py 未变化时复用 sys.modules 中的缓存。"""
+    parser_path = os.path.abspath(default_parser_output)
+    try:
+        stat = os.stat(parser_path)
+    except OSError as error:
+        raise ImportError(f"无法加载解析器模块: {default_parser_output}") from error
+    signature = (parser_path, stat.st_mtime_ns, stat.st_size)
+
+    cached = sys.modules.get(_PARSER_MODULE_NAME)
+    if cached is not None and getattr(cached, "__verbose_c_signature__", None) == signature:
+        return cached
+
+    spec = importlib.util.spec_from_file_location(_PARSER_MODULE_NAME, parser_path)
     if spec is None:
         raise ImportError(f"无法加载解析器模块: {default_parser_output}")
 
@@ -175,7 +225,10 @@ def _load_parser_module():
     if spec.loader is None or parser_module is None:
         raise ImportError(f"无法加载解析器模块: {default_parser_output}")
 
+    # SourceFileLoader 会读写 __pycache__ 中的字节码缓存，后续进程无需重新编译 parser.py。
     spec.loader.exec_module(parser_module)
+    parser_module.__verbose_c_signature__ = signature
+    sys.modules[_PARSER_MODULE_NAME] = parser_module
     return parser_module
 
 
@@ -187,6 +240,10 @@ def compile_module(
     require_ir: bool = False,
     require_machine: bool = False,
     require_native_code: bool = False,
+    parser_module: Any | None = None,
+    source_manager: SourceManager | None = None,
+    codegen_jobs: int = 1,
+    native_function_cache: NativeFunctionCache | None = None,
 ) -> CompilerOutput:
     """
     编译单个模块文件，分阶段执行并在每阶段完成后通知 recorder。
@@ -195,40 +252,55 @@ def compile_module(
         file_path (str): 要编译的源文件路径。
         refresh_parser (bool): 是否强制重新生成解析器。
         recorder (PipelineRecorder | None): 输出记录器。
+        parser_module (Any | None): 已加载的解析器模块，提供时跳过解析器检查与加载。
+        source_manager (SourceManager | None): 可复用的源码缓存，未提供时为本次编译新建。
+        codegen_jobs (int): 函数体并行代码生成的 worker 进程数，1 表示串行。
+        native_function_cache (NativeFunctionCache | None): 逐函数 native 机器码缓存，生成机器码时复用未变化的函数。
     """
+    from verbose_c.compiler.compiler import Compiler
+    from verbose_c.parser.lexer.tokenizer import Tokenizer
+    from verbose_c.preprocessor.preprocessor import Preprocessor
+
     context = CompileContext()
 
-    report = ensure_parser(refresh_parser)
-    if report is not None:
-        context.parser_generation_report = report
-        if recorder:
-            recorder.on_parser_generated(report)
+    if parser_module is None:
+        report = ensure_parser(refresh_parser)
+        if report is not None:
+            context.parser_generation_report = report
+            if recorder:
+                recorder.on_parser_generated(report)
 
-    parser_module = _load_parser_module()
+        parser_module = _load_parser_module()
 
     file_path = os.path.abspath(file_path)
 
-    source_manager = SourceManager()
-    
-    # 词法分析
-    tokenizer = Tokenizer(file_path, source_manager)
-    raw_tokens = tokenizer.tokens
-    context.tokens = raw_tokens
-    if recorder:
-        recorder.on_raw_tokens(raw_tokens)
+    source_manager = source_manager or SourceManager()
 
     preprocessor = Preprocessor(source_manager)
-    processed_tokens = preprocessor.process_tokens(raw_tokens)
-    tokenizer.tokens = processed_tokens
-    tokenizer._total_tokens = len(processed_tokens)
-    tokenizer._index = 0
-    context.tokens = processed_tokens
-    if recorder:
+    processed_tokens: list[Token] | None = None
+    if recorder and recorder.wants_token_dumps:
+        # 需要 dump token 序列时完整物化各阶段结果
+        tokenizer = Tokenizer(file_path, source_manager)
+        raw_tokens = tokenizer.tokens
+        context.tokens = raw_tokens
+        recorder.on_raw_tokens(raw_tokens)
+
+        processed_tokens = preprocessor.process_tokens(raw_tokens)
+        tokenizer.tokens = processed_tokens
+        context.tokens = processed_tokens
         recorder.on_preprocessed_tokens(processed_tokens)
+    else:
+        # 词法分析 → 预处理 → 语法分析按批流式衔接，不保存完整的原始/预处理 token 列表
+        tokenizer = Tokenizer(file_path, source_manager, lazy=True)
+        tokenizer.set_stream(preprocessor.process_stream(tokenizer.lexer.iter_tokens()))
 
     # 语法分析
     parser = parser_module.GeneratedParser(tokenizer)
+    if recorder and recorder.wants_parser_statistics:
+        parser.enable_statistics()
     ast_node = parser.start()
+    if recorder and parser.statistics is not None:
+        recorder.on_parser_statistics(parser.statistics)
     if ast_node is None:
         error_report = parser.get_error_report() if parser.has_errors() else "未知的解析错误"
         raise VBCCompileError(f"在文件 {file_path} 中解析失败:\n{error_report}", filepath=file_path)
@@ -237,7 +309,7 @@ def compile_module(
     if recorder:
         recorder.on_ast(ast_node)
 
-    compiler = Compiler(ast_node, source_path=file_path, optimize_level=optimize_level)
+    compiler = Compiler(ast_node, source_path=file_path, optimize_level=optimize_level, jobs=codegen_jobs)
     compiler.compile()
     opcode_gen = compiler.opcode_generator
     context.warnings = compiler.warnings
@@ -247,22 +319,26 @@ def compile_module(
         constant_pool=compiler.constant_pool,
         function_compilation_results=opcode_gen.function_compilation_results,
         labels=opcode_gen.labels,
-        tokens=tokenizer.tokens,
+        tokens=processed_tokens,
         ast_node=ast_node,
         processed_code="",
         lineno_table=opcode_gen.lineno_table,
         warnings=compiler.warnings,
         parser_generation_report=context.parser_generation_report,
+        parser_statistics=parser.statistics,
         optimization_result=opcode_gen.optimization_result,
         ast_optimization_result=compiler.ast_optimization_result,
         dependencies=sorted(preprocessor.dependencies),
+        optimize_level=optimize_level,
     )
-    _populate_backend_outputs(
-        output,
-        require_ir=require_ir,
-        require_machine=require_machine,
-        require_native_code=require_native_code,
-    )
+    if require_ir or require_machine or require_native_code:
+        _populate_backend_outputs(
+            output,
+            require_ir=require_ir,
+            require_machine=require_machine,
+            require_native_code=require_native_code,
+            native_function_cache=native_function_cache,
+        )
     if recorder:
         recorder.on_compiled(output)
     return output
@@ -274,10 +350,13 @@ def _populate_backend_outputs(
     require_ir: bool = False,
     require_machine: bool = False,
     require_native_code: bool = False,
+    native_function_cache: NativeFunctionCache | None = None,
 ) -> None:
     """为编译输出补齐 IR、Machine IR 和 native 机器码产物。"""
     from verbose_c.compiler.ir import lower_compiler_output_to_ir
 
+    for name in _BACKEND_OUTPUT_FIELDS:
+        setattr(output, name, None)
     try:
         output.ir_program = lower_compiler_output_to_ir(output)
     except Exception as error:
@@ -295,13 +374,47 @@ def _populate_backend_outputs(
             output.machine_error = error
         if output.machine_program is not None:
             try:
-                output.native_code_program = generate_native_code(output.machine_program)
+                output.native_code_program = generate_native_code(
+                    output.machine_program,
+                    native_function_cache,
+                    output.optimize_level,
+                )
             except Exception as error:
                 if require_native_code:
                     raise
                 output.native_code_error = error
 
 
+def save_compilation_artifact(
+    compilation_output: CompilerOutput,
+    filename: str,
+    artifact_path: str,
+    *,
+    incremental_compiler: IncrementalCompiler,
+    optimize_level: int = 0,
+    refresh_parser: bool = False,
+) -> None:
+    """写出 .vbb 产物及其依赖侧车清单。"""
+    incremental_compiler.artifact_store.save_bytecode(
+        artifact_path,
+        compilation_output.bytecode,
+        metadata={
+            "constant_pool": compilation_output.constant_pool,
+            "lineno_table": compilation_output.lineno_table,
+            "source_path": os.path.abspath(filename),
+            "labels": compilation_output.labels,
+            "function_compilation_results": compilation_output.function_compilation_results,
+        },
+    )
+    incremental_compiler.write_manifest(
+        filename,
+        compilation_output.dependencies,
+        artifact_path=artifact_path,
+        optimize_level=optimize_level,
+        refresh_parser=refresh_parser,
+    )
+
+
 def _load_bytecode_compilation_output(filename: str) -> tuple[CompilerOutput, str]:
     """加载 .vbb 并恢复为运行所需的编译输出结构。"""
     artifact_store = ArtifactStore()
@@ -324,17 +437,30 @@ def _execute_compilation_output(
     source_path: str,
     recorder: PipelineRecorder,
 ) -> tuple[int, Any]:
-    """执行已恢复或刚生成的字节码。"""
+    """执行已恢复或刚生成的字节码；存在可用的分层计划时，native 层函数以机器码桩的形式绑定进 VM。"""
     from verbose_c.vm.core import VBCVirtualMachine
 
-    vm = VBCVirtualMachine(debug_log_collector=recorder.create_vm_log_collector())
-    exit_code = vm.excute(
-        bytecode=compilation_output.bytecode,
-        constants=compilation_output.constant_pool,
-        source_path=source_path,
-        lineno_table=compilation_output.lineno_table,
-        source_code=_read_source_lines(source_path),
-    )
+    plan = compilation_output.native_tiering
+    image = None
+    if plan is not None and plan.native_code_program is not None and plan.unavailable_reason is None:
+        from verbose_c.compiler.native.tiering import NativeTierImage
+
+        image = NativeTierImage(plan)
+    try:
+        vm = VBCVirtualMachine(
+            debug_log_collector=recorder.create_vm_log_collector(),
+            native_stubs=image.stubs if image is not None else None,
+        )
+        exit_code = vm.excute(
+            bytecode=compilation_output.bytecode,
+            constants=compilation_output.constant_pool,
+            source_path=source_path,
+            lineno_table=compilation_output.lineno_table,
+            source_code=_read_source_lines(source_path),
+        )
+    finally:
+        if image is not None:
+            image.close()
     return exit_code, vm
 
 
@@ -342,6 +468,7 @@ def _run_native_memory_output(
     compilation_output: CompilerOutput,
     filename: str,
     native_result_path: str | None,
+    validation_cache: NativeValidationCache | None = None,
 ) -> int:
     """执行 native program 并按需写出返回值文件。"""
     if compilation_output.native_code_program is None:
@@ -350,7 +477,7 @@ def _run_native_memory_output(
     from verbose_c.compiler.native.runner import run_native_program_in_memory
 
     try:
-        exit_code = run_native_program_in_memory(compilation_output.native_code_program)
+        exit_code = run_native_program_in_memory(compilation_output.native_code_program, validation_cache)
     except NativeCodegenError as error:
         raise VBCCompileError(str(error), filepath=filename) from error
     if native_result_path is not None:
@@ -366,6 +493,7 @@ def _run_native_pe_output(
     compilation_output: CompilerOutput,
     filename: str,
     native_result_path: str | None,
+    validation_cache: NativeValidationCache | None = None,
 ) -> int:
     """写出临时 PE image 并通过 Windows loader 执行。"""
     if compilation_output.native_code_program is None:
@@ -391,7 +519,12 @@ def _run_native_pe_output(
             pe_file.write(pe_image)
         try:
             with open(pe_path, "rb") as pe_file:
-                validate_native_pe_image_bytes(pe_file.read(), metadata)
+                written = pe_file.read()
+            if validation_cache is None:
+                validate_native_pe_image_bytes(written, metadata)
+            else:
+                fingerprint = validation_cache.fingerprint(compilation_output.native_code_program)
+                validation_cache.validate("native-pe", written, fingerprint, lambda: validate_native_pe_image_bytes(written, metadata))
         except NativeCodegenError as error:
             raise VBCCompileError(f"native PE 执行 image 自检失败: {error}", filepath=filename) from error
         completed = subprocess.run([pe_path], check=False)
@@ -410,13 +543,14 @@ def _emit_native_outputs(
     filename: str,
     *,
     export_request: NativeExportRequest,
+    validation_cache: NativeValidationCache | None = None,
 ) -> NativeExportReport | None:
     """通过统一导出器写出 native 产物。"""
     if not export_request.enabled:
         return None
     if compilation_output.native_code_program is None:
         raise VBCCompileError("导出 native 产物需要成功生成机器码", filepath=filename)
-    return NativeArtifactExporter(open_file=open).export(
+    return NativeArtifactExporter(open_file=open, validation_cache=validation_cache).export(
         compilation_output.native_code_program,
         export_request,
         filename,
@@ -486,6 +620,9 @@ def _run_file_pipeline(
     run_native_pe: bool = False,
     native_result_path: str | None = None,
     native_export_request: NativeExportRequest | None = None,
+    codegen_jobs: int = 1,
+    revalidate: bool = False,
+    native_tiering: bool = False,
 ) -> RunResult:
     """
     统一执行源码或字节码文件的编译输出流水线。
@@ -505,6 +642,9 @@ def _run_file_pipeline(
         run_native_pe: 是否生成临时 PE 并运行 native 入口。
         native_result_path: 可选的 native 返回值输出路径。
         native_export_request: 可选的 native 产物导出请求。
+        codegen_jobs: 源码模式下函数体并行代码生成的 worker 进程数。
+        revalidate: 忽略 native 校验缓存，重新执行完整校验。
+        native_tiering: VM 执行前按函数分层，可编译为 native 的函数以机器码执行，其余函数解释执行。
 
     Returns:
         包含编译、执行、导出和错误信息的统一运行结果。
@@ -562,6 +702,8 @@ def _run_file_pipeline(
                     require_ir=require_ir,
                     require_machine=False,
                     require_native_code=require_native_code,
+                    codegen_jobs=codegen_jobs,
+                    native_function_cache=NativeFunctionCache.for_source(filename) if require_native_code else None,
                 )
                 recorder_notified = True
                 compile_warnings = compilation_output.warnings or []
@@ -569,29 +711,21 @@ def _run_file_pipeline(
                     for warning_line in compile_warnings:
                         print(f"警告: {warning_line}")
 
-                artifact_store.save_bytecode(
-                    artifact_path,
-                    compilation_output.bytecode,
-                    metadata={
-                        "constant_pool": compilation_output.constant_pool,
-                        "lineno_table": compilation_output.lineno_table,
-                        "source_path": os.path.abspath(filename),
-                        "labels": compilation_output.labels,
-                        "function_compilation_results": compilation_output.function_compilation_results,
-                    },
-                )
-                incremental_compiler.write_manifest(
+                save_compilation_artifact(
+                    compilation_output,
                     filename,
-                    compilation_output.dependencies,
-                    artifact_path=artifact_path,
+                    artifact_path,
+                    incremental_compiler=incremental_compiler,
                     optimize_level=optimize_level,
                     refresh_parser=refresh_parser,
                 )
                 recorder.log_compile_done()
             else:
                 compilation_output, source_path = _load_bytecode_compilation_output(artifact_path)
+                compilation_output.optimize_level = optimize_level
         else:
             compilation_output, source_path = _load_bytecode_compilation_output(filename)
+            compilation_output.optimize_level = optimize_level
             needs_backend = bool(
                 _dump_requires_fresh_compilation(dump_modules)
                 or require_native_code
@@ -602,19 +736,33 @@ def _run_file_pipeline(
                     require_ir=require_ir,
                     require_machine=False,
                     require_native_code=require_native_code,
+                    native_function_cache=NativeFunctionCache.for_source(source_path or filename) if require_native_code else None,
                 )
 
         if not recorder_notified:
             recorder.on_compiled(compilation_output)
+        if native_tiering and execute and not run_native_memory and not run_native_pe:
+            from verbose_c.compiler.native.tiering import plan_native_tiering
+
+            compilation_output.native_tiering = plan_native_tiering(
+                compilation_output,
+                NativeFunctionCache.for_source(source_path or filename),
+            )
+            recorder.on_native_tiering(compilation_output.native_tiering)
 
+        validation_cache = None
+        if require_native_code:
+            # 校验记录与字节码产物一起放在源文件旁的 __vbccache__ 中
+            validation_cache = NativeValidationCache.for_source(source_path or filename, revalidate=revalidate)
         if run_native_memory:
-            exit_code = _run_native_memory_output(compilation_output, filename, native_result_path)
+            exit_code = _run_native_memory_output(compilation_output, filename, native_result_path, validation_cache)
         if run_native_pe:
-            exit_code = _run_native_pe_output(compilation_output, filename, native_result_path)
+            exit_code = _run_native_pe_output(compilation_output, filename, native_result_path, validation_cache)
         export_report = _emit_native_outputs(
             compilation_output,
             filename,
             export_request=export_request,
+            validation_cache=validation_cache,
         )
         recorder.on_artifacts_exported(export_report)
         if not run_native_memory and not run_native_pe and execute:
@@ -681,6 +829,9 @@ def run_source_file(
     run_native_pe: bool = False,
     native_result_path: str | None = None,
     native_export_request: NativeExportRequest | None = None,
+    codegen_jobs: int = 1,
+    revalidate: bool = False,
+    native_tiering: bool = False,
 ) -> RunResult:
     """编译并可选执行单个源文件，由 recorder 负责 log 与 dump 输出。"""
     return _run_file_pipeline(
@@ -698,6 +849,9 @@ def run_source_file(
         run_native_pe=run_native_pe,
         native_result_path=native_result_path,
         native_export_request=native_export_request,
+        codegen_jobs=codegen_jobs,
+        revalidate=revalidate,
+        native_tiering=native_tiering,
     )
 
 
@@ -711,6 +865,8 @@ def run_bytecode_file(
     run_native_pe: bool = False,
     native_result_path: str | None = None,
     native_export_request: NativeExportRequest | None = None,
+    revalidate: bool = False,
+    native_tiering: bool = False,
 ) -> RunResult:
     """加载并执行字节码产物，可选生成或执行 native 产物。"""
     return _run_file_pipeline(
@@ -723,6 +879,8 @@ def run_bytecode_file(
         run_native_pe=run_native_pe,
         native_result_path=native_result_path,
         native_export_request=native_export_request,
+        revalidate=revalidate,
+        native_tiering=native_tiering,
     )
 
 
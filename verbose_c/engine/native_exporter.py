@@ -7,6 +7,7 @@ from enum import Enum
 from typing import Any, Callable
 
 from verbose_c.error import VBCCompileError
+from verbose_c.fs.validation_cache import NativeValidationCache
 
 
 class NativeExportKind(str, Enum):
@@ -124,10 +125,15 @@ class NativeExportReport:
 
 
 class NativeArtifactExporter:
-    """统一构建、写出并校验 native 产物。"""
+    """
+    统一构建、写出并校验 native 产物。
 
-    def __init__(self, open_file: Callable[..., Any] = open):
+    提供 validation_cache 时，内容与 map 都未变化的产物再次导出时跳过已通过的写后校验。
+    """
+
+    def __init__(self, open_file: Callable[..., Any] = open, validation_cache: NativeValidationCache | None = None):
         self._open = open_file
+        self._validation_cache = validation_cache
 
     def export(self, program: Any, request: NativeExportRequest, source_filename: str) -> NativeExportReport:
         """生成请求中的全部产物，完成写后校验并返回结构化报告。"""
@@ -146,12 +152,14 @@ class NativeArtifactExporter:
         )
 
         kinds = set(request.outputs)
+        # map 由 program 确定性生成，各项校验共用同一个程序指纹
+        fingerprint = self._validation_cache.fingerprint(program) if self._validation_cache is not None else ""
         metadata = None
         if kinds & {NativeExportKind.TEXT_SECTION, NativeExportKind.PE_IMAGE, NativeExportKind.MAP}:
             metadata = native_code_program_map(program)
         if NativeExportKind.MAP in kinds:
             try:
-                validate_native_code_program_map(program, metadata)
+                self._validate("program-map", program.code, fingerprint, lambda: validate_native_code_program_map(program, metadata))
             except NativeCodegenError as error:
                 raise VBCCompileError(
                     f"导出 x64 机器码 map 自检失败: {error}",
@@ -190,7 +198,7 @@ class NativeArtifactExporter:
 
         if NativeExportKind.TEXT_SECTION in written_bytes:
             try:
-                validate_native_text_section_map_bytes(written_bytes[NativeExportKind.TEXT_SECTION], metadata)
+                self._validate_payload(validate_native_text_section_map_bytes, written_bytes, NativeExportKind.TEXT_SECTION, metadata, fingerprint, "written")
             except NativeCodegenError as error:
                 raise VBCCompileError(
                     f"导出 PE .text raw section 与 map 自检失败: {error}",
@@ -198,7 +206,7 @@ class NativeArtifactExporter:
                 ) from error
         if NativeExportKind.PE_IMAGE in written_bytes:
             try:
-                validate_native_pe_image_bytes(written_bytes[NativeExportKind.PE_IMAGE], metadata)
+                self._validate_payload(validate_native_pe_image_bytes, written_bytes, NativeExportKind.PE_IMAGE, metadata, fingerprint, "written")
             except NativeCodegenError as error:
                 raise VBCCompileError(
                     f"导出最小 PE image 自检失败: {error}",
@@ -207,7 +215,7 @@ class NativeArtifactExporter:
         if NativeExportKind.MAP in written_bytes:
             if NativeExportKind.RAW_BINARY in written_bytes:
                 try:
-                    validate_native_code_map_bytes(written_bytes[NativeExportKind.RAW_BINARY], metadata)
+                    self._validate_payload(validate_native_code_map_bytes, written_bytes, NativeExportKind.RAW_BINARY, metadata, fingerprint, "map")
                 except NativeCodegenError as error:
                     raise VBCCompileError(
                         f"导出 x64 原始机器码与 map 自检失败: {error}",
@@ -215,7 +223,7 @@ class NativeArtifactExporter:
                     ) from error
             if NativeExportKind.TEXT_SECTION in written_bytes:
                 try:
-                    validate_native_text_section_map_bytes(written_bytes[NativeExportKind.TEXT_SECTION], metadata)
+                    self._validate_payload(validate_native_text_section_map_bytes, written_bytes, NativeExportKind.TEXT_SECTION, metadata, fingerprint, "map")
                 except NativeCodegenError as error:
                     raise VBCCompileError(
                         f"导出 PE .text raw section 与 map 自检失败: {error}",
@@ -223,7 +231,7 @@ class NativeArtifactExporter:
                     ) from error
             if NativeExportKind.PE_IMAGE in written_bytes:
                 try:
-                    validate_native_pe_image_bytes(written_bytes[NativeExportKind.PE_IMAGE], metadata)
+                    self._validate_payload(validate_native_pe_image_bytes, written_bytes, NativeExportKind.PE_IMAGE, metadata, fingerprint, "map")
                 except NativeCodegenError as error:
                     raise VBCCompileError(
                         f"导出最小 PE image 与 map 自检失败: {error}",
@@ -252,6 +260,26 @@ class NativeArtifactExporter:
             self._write_manifest(report)
         return report
 
+    def _validate(self, kind: str, payload: bytes, fingerprint: str, validator: Callable[[], None]) -> None:
+        """执行校验；有缓存时相同内容只校验一次。"""
+        if self._validation_cache is None:
+            validator()
+        else:
+            self._validation_cache.validate(kind, payload, fingerprint, validator)
+
+    def _validate_payload(
+        self,
+        validator: Callable[[bytes, dict], None],
+        written_bytes: dict[NativeExportKind, bytes],
+        kind: NativeExportKind,
+        metadata: dict,
+        fingerprint: str,
+        stage: str,
+    ) -> None:
+        """按写回读取的产物字节与 map 校验；stage 区分写后自检与 map 一致性自检，两者各自缓存。"""
+        payload = written_bytes[kind]
+        self._validate(f"{stage}:{kind.value}", payload, fingerprint, lambda: validator(payload, metadata))
+
     def _write_bytes(
         self,
         path: str,
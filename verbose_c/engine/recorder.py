@@ -101,6 +101,42 @@ def format_parser_generation_markdown(report, heading_level: int = 2, include_de
     return "\n".join(lines)
 
 
+def format_parser_statistics_markdown(statistics, heading_level: int = 2, top_rules: int | None = 10) -> str:
+    """格式化解析开销计数；top_rules 为 None 时列出全部记忆化规则。"""
+    heading = "#" * heading_level
+    token_count = max(statistics.token_count, 1)
+    lines = [
+        f"{heading} 解析开销",
+        "",
+        f"- Token 数: `{statistics.token_count}`",
+        f"- mark 次数: `{statistics.marks}` (`{statistics.marks / token_count:.1f}` 次/token)",
+        f"- reset 次数: `{statistics.resets}` (`{statistics.resets / token_count:.1f}` 次/token)",
+        f"- 记忆化命中: `{statistics.total_memo_hits}`",
+        f"- 记忆化未命中: `{statistics.total_memo_misses}`",
+        "",
+    ]
+    rules = sorted(
+        statistics.memo_misses,
+        key=lambda name: statistics.memo_hits[name] + statistics.memo_misses[name],
+        reverse=True,
+    )
+    if top_rules is not None:
+        rules = rules[:top_rules]
+    if rules:
+        lines.extend([
+            "| 规则 | 命中 | 未命中 | 命中率 |",
+            "| --- | --- | --- | --- |",
+        ])
+        for name in rules:
+            hits = statistics.memo_hits[name]
+            misses = statistics.memo_misses[name]
+            lookups = hits + misses
+            ratio = f"{hits / lookups:.1%}" if lookups else "-"
+            lines.append(f"| `{_escape_markdown_table_cell(name)}` | {hits} | {misses} | {ratio} |")
+        lines.append("")
+    return "\n".join(lines)
+
+
 def format_runtime_error(error: VBCRuntimeError) -> None:
     print("错误跟踪:")
     for frame in error.traceback:
@@ -199,6 +235,25 @@ class PipelineRecorder:
                 format_parser_generation_markdown(report, heading_level=2, include_details=True)
             )
 
+    @property
+    def wants_parser_statistics(self) -> bool:
+        """是否需要收集解析开销计数（--log parser 或 --dump parser）。"""
+        return self._log_parser or bool(self._dump_parser and self.dump_path)
+
+    def on_parser_statistics(self, statistics) -> None:
+        if self._log_parser:
+            print(format_parser_statistics_markdown(statistics, heading_level=2))
+        if self._dump_parser and self.dump_path:
+            self._append_section(
+                "解析开销",
+                format_parser_statistics_markdown(statistics, heading_level=2, top_rules=None)
+            )
+
+    @property
+    def wants_token_dumps(self) -> bool:
+        """是否需要完整的 token 序列（--dump tokens 或 --dump preprocess）。"""
+        return bool((self._dump_tokens or self._dump_preprocess) and self.dump_path)
+
     def on_raw_tokens(self, tokens) -> None:
         """dump 词法分析后、预处理前的 token 序列（--dump tokens）。"""
         if not self._dump_tokens or not self.dump_path:
@@ -264,6 +319,14 @@ class PipelineRecorder:
         if self._dump_opcode and output.function_compilation_results:
             self._append_section("函数编译结果", self._format_function_results_section(output.function_compilation_results))
 
+    def on_native_tiering(self, plan) -> None:
+        """把混合执行的逐函数分层结果追加到 Machine IR dump。"""
+        if not self._dump_machine or not self.dump_path:
+            return
+        from verbose_c.compiler.native.tiering import format_native_tiering_report
+
+        self._append_section("Native 分层", format_native_tiering_report(plan))
+
     def on_artifacts_exported(self, report) -> None:
         """把结构化 native 导出结果追加到流水线 dump。"""
         if report is None or not self.dump_path:
@@ -0,0 +1,260 @@
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from verbose_c.engine.engine import (
+    CompilerOutput,
+    _load_parser_module,
+    compile_module,
+    ensure_parser,
+    save_compilation_artifact,
+)
+from verbose_c.error import VBCCompileError
+from verbose_c.fs.artifact_store import ArtifactStore
+from verbose_c.fs.incremental_compile import IncrementalCompiler
+from verbose_c.fs.source_manager import SourceManager
+
+SERVER_PROTOCOL_VERSION = 1
+SOCKET_ENV_VAR = "VERBOSE_C_SOCKET"
+
+
+class CompileServerError(RuntimeError):
+    """编译服务连接或协议错误。"""
+
+
+def default_socket_path() -> str:
+    """返回编译服务默认 Unix 域套接字路径，可由 VERBOSE_C_SOCKET 覆盖。"""
+    configured = os.environ.get(SOCKET_ENV_VAR)
+    if configured:
+        return os.path.abspath(configured)
+    user_id = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"verbose-c-{user_id}.sock")
+
+
+def _require_unix_socket() -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise CompileServerError("当前平台不支持 Unix 域套接字，无法使用编译服务")
+
+
+@dataclass
+class _CachedCompilation:
+    """常驻内存的单入口编译结果。"""
+
+    output: CompilerOutput
+    files: frozenset[str]
+
+
+class CompileServer:
+    """常驻编译服务：保持解析器模块、源码缓存和编译结果在内存中复用。"""
+
+    def __init__(self, socket_path: str | None = None) -> None:
+        self.socket_path = os.path.abspath(socket_path or default_socket_path())
+        self.source_manager = SourceManager()
+        self.artifact_store = ArtifactStore()
+        self.incremental_compiler = IncrementalCompiler(self.artifact_store)
+        self._parser_module: Any | None = None
+        self._compile_cache: dict[tuple[str, int], _CachedCompilation] = {}
+        self._lock = threading.Lock()
+        self._server: socketserver.UnixStreamServer | None = None
+        self.stats = {"requests": 0, "compiled": 0, "memory_hits": 0, "artifact_hits": 0, "invalidated": 0}
+
+    def parser_module(self) -> Any:
+        """首次使用时生成并加载解析器模块，此后复用。"""
+        if self._parser_module is None:
+            ensure_parser()
+            self._parser_module = _load_parser_module()
+        return self._parser_module
+
+    def invalidate_changed_files(self) -> list[str]:
+        """丢弃磁盘上已变化文件的源码缓存及引用它们的编译结果。"""
+        changed = set(self.source_manager.invalidate_changed())
+        for key, cached in list(self._compile_cache.items()):
+            if cached.files & changed or not all(os.path.exists(path) for path in cached.files):
+                del self._compile_cache[key]
+                self.stats["invalidated"] += 1
+        return sorted(changed)
+
+    def handle_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """处理单个请求并返回可 JSON 序列化的响应。"""
+        with self._lock:
+            self.stats["requests"] += 1
+            command = request.get("command")
+            if command == "ping":
+                return {"success": True, "protocol": SERVER_PROTOCOL_VERSION, "pid": os.getpid()}
+            if command == "stats":
+                return {
+                    "success": True,
+                    "stats": dict(self.stats),
+                    "cached_files": len(self.source_manager.cached_paths()),
+                    "cached_units": len(self._compile_cache),
+                }
+            if command == "compile":
+                return self._handle_compile(request)
+            if command == "shutdown":
+                if self._server is not None:
+                    threading.Thread(target=self._server.shutdown, daemon=True).start()
+                return {"success": True}
+            return {"success": False, "error": f"未知的编译服务命令: {command!r}"}
+
+    def _handle_compile(self, request: dict[str, Any]) -> dict[str, Any]:
+        filename = request.get("filename")
+        if not isinstance(filename, str) or not filename:
+            return {"success": False, "error": "compile 请求缺少 filename"}
+        source_path = os.path.abspath(filename)
+        optimize_level = int(request.get("optimize_level", 0))
+        output_path = request.get("output_path")
+        artifact_path = os.path.abspath(output_path or self.artifact_store.artifact_path_for_source(source_path))
+
+        started = time.perf_counter()
+        captured = io.StringIO()
+        status = "compiled"
+        warnings: list[str] = []
+        try:
+            with contextlib.redirect_stdout(captured):
+                self.invalidate_changed_files()
+                key = (source_path, optimize_level)
+                cached = self._compile_cache.get(key)
+                if cached is not None:
+                    status = "memory"
+                    self.stats["memory_hits"] += 1
+                    warnings = list(cached.output.warnings or [])
+                    if self.incremental_compiler.needs_recompile(
+                        source_path,
+                        artifact_path=artifact_path,
+                        optimize_level=optimize_level,
+                    ):
+                        self._save(cached.output, source_path, artifact_path, optimize_level)
+                elif not self.incremental_compiler.needs_recompile(
+                    source_path,
+                    artifact_path=artifact_path,
+                    optimize_level=optimize_level,
+                ):
+                    status = "artifact"
+                    self.stats["artifact_hits"] += 1
+                else:
+                    output = compile_module(
+                        source_path,
+                        optimize_level=optimize_level,
+                        parser_module=self.parser_module(),
+                        source_manager=self.source_manager,
+                    )
+                    self.stats["compiled"] += 1
+                    warnings = list(output.warnings or [])
+                    self._save(output, source_path, artifact_path, optimize_level)
+                    output.tokens = None
+                    self._compile_cache[key] = _CachedCompilation(
+                        output=output,
+                        files=frozenset([source_path, *(os.path.abspath(path) for path in output.dependencies)]),
+                    )
+        except VBCCompileError as error:
+            return {
+                "success": False,
+                "filepath": error.filepath or source_path,
+                "error": error.message,
+                "warnings": list(error.warnings),
+                "output": captured.getvalue(),
+                "duration_seconds": time.perf_counter() - started,
+            }
+        except Exception as error:
+            return {
+                "success": False,
+                "filepath": source_path,
+                "error": f"{type(error).__name__}: {error}",
+                "output": captured.getvalue(),
+                "duration_seconds": time.perf_counter() - started,
+            }
+        return {
+            "success": True,
+            "status": status,
+            "artifact_path": artifact_path,
+            "warnings": warnings,
+            "output": captured.getvalue(),
+            "duration_seconds": time.perf_counter() - started,
+        }
+
+    def _save(self, output: CompilerOutput, source_path: str, artifact_path: str, optimize_level: int) -> None:
+        save_compilation_artifact(
+            output,
+            source_path,
+            artifact_path,
+            incremental_compiler=self.incremental_compiler,
+            optimize_level=optimize_level,
+        )
+
+    def serve_forever(self) -> None:
+        """绑定套接字并持续处理请求，直到收到 shutdown 命令。"""
+        _require_unix_socket()
+        if os.path.exists(self.socket_path):
+            if _socket_is_alive(self.socket_path):
+                raise CompileServerError(f"编译服务已在运行: {self.socket_path}")
+            os.remove(self.socket_path)
+        self.parser_module()
+
+        compile_server = self
+
+        class _RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("请求必须是 JSON 对象")
+                        response = compile_server.handle_request(request)
+                    except ValueError as error:
+                        response = {"success": False, "error": f"无法解析请求: {error}"}
+                    self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+        with socketserver.UnixStreamServer(self.socket_path, _RequestHandler) as server:
+            self._server = server
+            try:
+                server.serve_forever()
+            finally:
+                self._server = None
+                with contextlib.suppress(OSError):
+                    os.remove(self.socket_path)
+
+
+def _socket_is_alive(socket_path: str) -> bool:
+    try:
+        send_server_request(socket_path, {"command": "ping"}, timeout=1.0)
+    except CompileServerError:
+        return False
+    return True
+
+
+def send_server_request(
+    socket_path: str | None,
+    request: dict[str, Any],
+    *,
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    """向编译服务发送一个请求并等待响应。"""
+    _require_unix_socket()
+    socket_path = os.path.abspath(socket_path or default_socket_path())
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(socket_path)
+            client.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            with client.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError as error:
+        raise CompileServerError(f"无法连接编译服务 {socket_path}: {error}") from error
+    if not line:
+        raise CompileServerError(f"编译服务 {socket_path} 未返回响应")
+    try:
+        response = json.loads(line)
+    except ValueError as error:
+        raise CompileServerError(f"编译服务响应格式错误: {error}") from error
+    if not isinstance(response, dict):
+        raise CompileServerError("编译服务响应格式错误: 响应必须是 JSON 对象")
+    return response
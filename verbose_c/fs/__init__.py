@@ -1,5 +1,7 @@
 from verbose_c.fs.source_manager import SourceManager
 from verbose_c.fs.artifact_store import ArtifactStore
 from verbose_c.fs.incremental_compile import IncrementalCompiler
+from verbose_c.fs.validation_cache import NativeValidationCache
+from verbose_c.fs.native_function_cache import NativeFunctionCache
 
-__all__ = ["SourceManager", "ArtifactStore", "IncrementalCompiler"]
+__all__ = ["SourceManager", "ArtifactStore", "IncrementalCompiler", "NativeValidationCache", "NativeFunctionCache"]
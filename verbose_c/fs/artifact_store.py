@@ -4,13 +4,13 @@ import struct
 import zlib
 from typing import Any
 
+from verbose_c.compiler.constant_pool import constant_key
 from verbose_c.compiler.opcode import Opcode
 from verbose_c.error import VBCBytecodeError
 from verbose_c.object.class_ import VBCClass
 from verbose_c.object.enum import VBCObjectType
 from verbose_c.object.function import VBCFunction, VBCNativeFunction
 from verbose_c.object.instance import VBCInstance
-from verbose_c.object.object import VBCObject
 from verbose_c.object.struct import VBCStruct
 from verbose_c.object.t_bool import VBCBool
 from verbose_c.object.t_float import VBCFloat
@@ -146,6 +146,8 @@ class _ArtifactGraph:
         self.class_ids: dict[int, int] = {}
         self.struct_ids: dict[int, int] = {}
         self.constant_object_ids: dict[int, int] = {}
+        # 按值去重的标量常量，不同函数常量池中的相同字面量共享同一条常量记录
+        self.constant_value_ids: dict[Any, int] = {}
         self.module_bytecode_id = self.add_bytecode_block(bytecode)
         self.module_constant_pool_id = self.add_constant_pool(metadata.get("constant_pool", []))
         self.module_line_table_id = self.add_line_table(metadata.get("lineno_table", []))
@@ -213,6 +215,10 @@ class _ArtifactGraph:
             self.constant_object_ids[object_id] = constant_id
             return constant_id
 
+        key = constant_key(value)
+        constant_id = self.constant_value_ids.get(key)
+        if constant_id is not None:
+            return constant_id
         constant_id = len(self.constant_entries)
         if isinstance(value, VBCInteger):
             self.constant_entries.append((self.store.CONST_INTEGER, (self.store.object_type_id(value._object_type), value.value)))
@@ -228,6 +234,7 @@ class _ArtifactGraph:
             raise VBCBytecodeError(f"暂不支持序列化运行时对象: {type(value).__name__}")
         else:
             raise VBCBytecodeError(f"不支持的常量类型: {type(value).__name__}")
+        self.constant_value_ids[key] = constant_id
         return constant_id
 
     def add_function(self, value: VBCFunction) -> int:
@@ -312,6 +319,8 @@ class _ArtifactGraph:
                     "param_types": result.get("param_types", []),
                     "local_count": result.get("local_count", 0),
                     "return_type": result.get("return_type", "int64"),
+                    "param_object_types": result.get("param_object_types", []),
+                    "return_object_type": result.get("return_object_type"),
                     "lineno_table": result.get("lineno_table", []),
                 },
             }
@@ -396,6 +405,7 @@ class ArtifactStore:
         VBCObjectType.INSTANCE: 22,
         VBCObjectType.RANGE: 23,
         VBCObjectType.STRUCT: 24,
+        VBCObjectType.BYTES: 25,
     }
     _OBJECT_TYPES_BY_ID = {value: key for key, value in _OBJECT_TYPE_IDS.items()}
 
@@ -972,10 +982,7 @@ class ArtifactStore:
 
     def _create_string_from_value(self, value: str) -> VBCString:
         """按已解析字符串值创建 VBCString。"""
-        obj = VBCString.__new__(VBCString)
-        VBCObject.__init__(obj, VBCObjectType.STRING)
-        obj.value = value
-        return obj
+        return VBCString.from_value(value)
 
     def _error(self, filepath: str, message: str) -> VBCBytecodeError:
         """创建带文件路径的字节码错误。"""
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import pickle
+from typing import Any
+
+
+class NativeFunctionCache:
+    """
+    按函数内容寻址的 native 机器码缓存。
+
+    key 为机器码生成器源码指纹与函数生成输入（Machine IR 函数、被调函数签名、ABI 与全局帧角色）序列化结果的 SHA-256，
+    value 为起始偏移归零的可重定位函数机器码记录；程序重建时未变化的函数直接复用记录，
+    只需重新排布偏移并回填函数间调用位移。
+    生成器代码改动后 key 随之变化，不会取回旧生成器产生的机器码；SCHEMA_VERSION 只描述记录文件格式。
+    cache_dir 为 None 时只在当前进程内缓存；磁盘记录损坏或版本不符时视为未命中。
+    """
+
+    SCHEMA_VERSION = 4
+    DIRECTORY_NAME = "native-functions"
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, Any] = {}
+
+    @classmethod
+    def for_source(cls, source_path: str) -> "NativeFunctionCache":
+        """缓存目录放在源文件旁的 __vbccache__ 中，与字节码产物并列。"""
+        source_dir = os.path.dirname(os.path.abspath(source_path))
+        return cls(os.path.join(source_dir, "__vbccache__", cls.DIRECTORY_NAME))
+
+    @classmethod
+    def key(cls, *parts: Any) -> str:
+        """计算函数生成输入的内容地址；序列化结果不同只会导致未命中，不会误命中。"""
+        from verbose_c.compiler.native.source_fingerprint import native_codegen_fingerprint
+
+        digest = hashlib.sha256(f"{cls.SCHEMA_VERSION}:{native_codegen_fingerprint()}:".encode("utf-8"))
+        digest.update(pickle.dumps(parts, protocol=pickle.HIGHEST_PROTOCOL))
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Any | None:
+        """读取缓存记录，未命中时返回 None。"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load_record(key)
+        value = None
+        if entry is not None:
+            try:
+                value = pickle.loads(entry)
+            except Exception:
+                self._entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries[key] = entry
+        self.hits += 1
+        return value
+
+    def store(self, key: str, value: Any) -> None:
+        """写入缓存记录；每次 load 都从序列化结果还原，调用方可以放心修改取回的对象。"""
+        entry = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._entries[key] = entry
+        path = self._record_path(key)
+        if path is None:
+            return
+        # 缓存只是加速手段：目录不可写时仍保留进程内记录，不影响本次编译
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, "wb") as record_file:
+                record_file.write(f"{self.SCHEMA_VERSION}\n".encode("ascii"))
+                record_file.write(entry)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def _record_path(self, key: str) -> str | None:
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, key)
+
+    def _load_record(self, key: str) -> bytes | None:
+        path = self._record_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as record_file:
+                header = record_file.readline()
+                entry = record_file.read()
+        except OSError:
+            return None
+        if header != f"{self.SCHEMA_VERSION}\n".encode("ascii"):
+            return None
+        return entry
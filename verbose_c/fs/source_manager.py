@@ -6,6 +6,7 @@ class SourceManager:
 
     def __init__(self) -> None:
         self._lines: dict[str, list[str]] = {}
+        self._signatures: dict[str, tuple[int, int]] = {}
 
     def normalize_path(self, path: str) -> str:
         """将路径规范为绝对路径。"""
@@ -20,8 +21,37 @@ class SourceManager:
         with open(abs_path, "r", encoding="utf-8-sig") as f:
             content = f.read()
         self._lines[abs_path] = content.splitlines()
+        self._signatures[abs_path] = self.file_signature(abs_path)
         return content
 
+    def file_signature(self, path: str) -> tuple[int, int]:
+        """返回文件的 (mtime_ns, size) 签名，文件不存在时返回 (-1, -1)。"""
+        try:
+            stat = os.stat(self.normalize_path(path))
+        except OSError:
+            return (-1, -1)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def invalidate(self, path: str) -> None:
+        """丢弃指定文件的缓存内容。"""
+        abs_path = self.normalize_path(path)
+        self._lines.pop(abs_path, None)
+        self._signatures.pop(abs_path, None)
+
+    def invalidate_changed(self) -> list[str]:
+        """丢弃自缓存后在磁盘上发生变化的文件，返回被丢弃的路径。"""
+        changed = [
+            path for path, signature in self._signatures.items()
+            if self.file_signature(path) != signature
+        ]
+        for path in changed:
+            self.invalidate(path)
+        return changed
+
+    def cached_paths(self) -> list[str]:
+        """返回当前已缓存的文件路径。"""
+        return list(self._lines)
+
     def get_line(self, path: str, line: int) -> str:
         """获取指定文件 1-based 行内容，无则返回空字符串。"""
         abs_path = self.normalize_path(path)
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import pickle
+from typing import Any, Callable
+
+
+class NativeValidationCache:
+    """
+    按内容寻址的 native 产物校验结果缓存。
+
+    key 为校验器源码指纹、校验类别、待校验字节与产物来源指纹的 SHA-256；校验通过后在缓存目录写入以 key 命名的标记文件，
+    同一份机器码与 map 再次运行或导出时只需计算摘要即可跳过校验。
+    map 由 NativeCodeProgram 确定性生成，指纹直接取程序对象的序列化摘要，避免为算 key 重新生成并序列化 map。
+    校验器代码改动后旧记录自然失效，不会沿用旧校验器写下的"已通过"结论。
+    cache_dir 为 None 时只在当前进程内缓存；revalidate 为真时忽略磁盘上已有的记录，
+    每项内容在本次运行中重新校验一次并刷新记录。
+    """
+
+    SCHEMA_VERSION = 1
+    DIRECTORY_NAME = "native-validated"
+
+    def __init__(self, cache_dir: str | None = None, revalidate: bool = False) -> None:
+        self.cache_dir = cache_dir
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self._validated: set[str] = set()
+
+    @classmethod
+    def for_source(cls, source_path: str, revalidate: bool = False) -> "NativeValidationCache":
+        """缓存目录放在源文件旁的 __vbccache__ 中，与字节码产物并列。"""
+        source_dir = os.path.dirname(os.path.abspath(source_path))
+        return cls(os.path.join(source_dir, "__vbccache__", cls.DIRECTORY_NAME), revalidate=revalidate)
+
+    @staticmethod
+    def fingerprint(value: Any) -> str:
+        """
+        计算校验来源（NativeCodeProgram 或 map）的内容指纹。
+
+        序列化结果相同即内容相同；对象共享关系不同只会得到不同指纹（缓存未命中），不会误命中。
+        """
+        return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+    @classmethod
+    def key(cls, kind: str, payload: bytes, fingerprint: str) -> str:
+        """计算校验记录的内容地址。"""
+        from verbose_c.compiler.native.source_fingerprint import native_validator_fingerprint
+
+        digest = hashlib.sha256()
+        digest.update(f"{cls.SCHEMA_VERSION}:{native_validator_fingerprint()}:{kind}:{fingerprint}:{len(payload)}:".encode("utf-8"))
+        digest.update(payload)
+        return digest.hexdigest()
+
+    def validate(self, kind: str, payload: bytes, fingerprint: str, validator: Callable[[], None]) -> bool:
+        """
+        确保 (kind, payload, fingerprint) 已通过校验。
+
+        已有记录时直接返回 True；否则调用 validator，其抛出的异常原样传播且不会写入记录，通过后记录并返回 False。
+        """
+        key = self.key(kind, payload, fingerprint)
+        if self._is_recorded(key):
+            self.hits += 1
+            return True
+        self.misses += 1
+        validator()
+        self._record(key)
+        return False
+
+    def _record_path(self, key: str) -> str | None:
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, key)
+
+    def _is_recorded(self, key: str) -> bool:
+        if key in self._validated:
+            return True
+        if self.revalidate:
+            return False
+        path = self._record_path(key)
+        if path is not None and os.path.exists(path):
+            self._validated.add(key)
+            return True
+        return False
+
+    def _record(self, key: str) -> None:
+        self._validated.add(key)
+        path = self._record_path(key)
+        if path is None:
+            return
+        # 缓存只是加速手段：目录不可写时仍保留进程内记录，不影响本次运行
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as record_file:
+                record_file.write(f"{self.SCHEMA_VERSION}\n")
+        except OSError:
+            pass
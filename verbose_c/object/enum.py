@@ -23,6 +23,7 @@ class VBCObjectType(Enum):
     MAP = "map"
     MODULE = "module"
     STRING = "string"
+    BYTES = "bytes"
     FUNCTION = "function"
     NATIVE_FUNCTION = "native_function"
     INSTANCE = "instance"
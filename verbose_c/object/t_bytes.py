@@ -0,0 +1,42 @@
+from verbose_c.object.enum import VBCObjectType
+from verbose_c.object.object import VBCObject
+from verbose_c.utils.algorithm import hash_
+
+class VBCBytes(VBCObject):
+    """
+    字节缓冲区对象
+
+    直接持有 I/O 读到的原始字节，读写时不经过 UTF-8 编解码；
+    需要文本时通过 (string) 显式转换。
+    """
+    def __init__(self, value: bytes | bytearray = b""):
+        super().__init__(VBCObjectType.BYTES)
+        self.value: bytes = bytes(value)
+
+    def __repr__(self):
+        return super().__repr__() + f"(value={self.value!r})"
+
+    def __str__(self):
+        return self.value.decode("utf-8", errors="replace")
+
+    def __eq__(self, other):
+        from verbose_c.object.t_bool import VBCBool
+        if isinstance(other, VBCBytes):
+            return VBCBool(self.value == other.value)
+
+        return VBCBool(False)
+
+    def __hash__(self):
+        return hash_(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __add__(self, other):
+        if isinstance(other, VBCBytes):
+            return VBCBytes(self.value + other.value)
+
+        raise TypeError(f'无法对 {self.__class__.__name__} 和 {other.__class__.__name__} 使用 "+" 运算符')
+
+    def __len__(self):
+        return len(self.value)
@@ -4,9 +4,64 @@ from verbose_c.object.object import VBCObject
 from verbose_c.utils.algorithm import hash_
 
 class VBCString(VBCObject):
+    """
+    字符串对象
+
+    `VBCString(raw_value)` 用于源码字面量，构造时解析一次转义序列；
+    运行时产生的已解码字符串（拼接、类型转换、读取结果、.vbb 加载）通过 `from_value` 构造，不再重复解析。
+
+    拼接结果是惰性的：各片段追加到共享的片段列表中，首次读取 `value` 时才合并，
+    因此循环中反复 `s = s + t` 的总开销与结果长度成线性关系。
+    """
     def __init__(self, raw_value: str):
         super().__init__(VBCObjectType.STRING)
-        self.value = self._unescape(raw_value)
+        self._value = self._unescape(raw_value) if '\\' in raw_value else raw_value
+        self._pieces = None # 惰性拼接时共享的片段列表
+        self._piece_count = 0 # 本对象覆盖的片段数（片段列表的前缀）
+
+    @classmethod
+    def from_value(cls, value: str) -> "VBCString":
+        """按已解码的字符串值创建 VBCString，不解析转义序列。"""
+        obj = cls.__new__(cls)
+        obj._object_type = VBCObjectType.STRING
+        obj._value = value
+        obj._pieces = None
+        obj._piece_count = 0
+        return obj
+
+    @classmethod
+    def _from_pieces(cls, pieces: list[str], piece_count: int) -> "VBCString":
+        obj = cls.__new__(cls)
+        obj._object_type = VBCObjectType.STRING
+        obj._value = None
+        obj._pieces = pieces
+        obj._piece_count = piece_count
+        return obj
+
+    @property
+    def value(self) -> str:
+        if self._value is None:
+            self._value = "".join(self._pieces[:self._piece_count])
+        return self._value
+
+    @value.setter
+    def value(self, value: str):
+        self._value = value
+        self._pieces = None
+        self._piece_count = 0
+
+    def concat(self, other: "VBCString") -> "VBCString":
+        """
+        惰性拼接两个字符串。
+
+        左操作数是片段列表的最新前缀时直接在共享列表末尾追加，否则复制一份新列表，
+        保证已有对象看到的片段前缀不变。
+        """
+        pieces = self._pieces
+        if pieces is None or self._piece_count != len(pieces):
+            pieces = [self.value]
+        pieces.append(other.value)
+        return VBCString._from_pieces(pieces, len(pieces))
 
     def _unescape(self, s: str) -> str:
         """
@@ -59,20 +114,20 @@ class VBCString(VBCObject):
 
     def __add__(self, other):
         if isinstance(other, VBCString):
-            return VBCString(self.value + other.value)
+            return self.concat(other)
 
         raise TypeError(f'无法对 {self.__class__.__name__} 和 {other.__class__.__name__} 使用 "+" 运算符')
 
     def __sub__(self, other):
         if isinstance(other, VBCString):
-            return VBCString(self.value.replace(other.value, ""))
+            return VBCString.from_value(self.value.replace(other.value, ""))
         
         raise TypeError(f'无法对 {self.__class__.__name__} 和 {other.__class__.__name__} 使用 "-" 运算符')
 
     def __mul__(self, other):
         from verbose_c.object.t_integer import VBCInteger
         if isinstance(other, VBCInteger):
-            return VBCString(self.value * other.value)
+            return VBCString.from_value(self.value * other.value)
         
         raise TypeError(f'无法对 {self.__class__.__name__} 和 {other.__class__.__name__} 使用 "*" 运算符')
 
@@ -80,10 +135,14 @@ class VBCString(VBCObject):
         raise TypeError(f'无法对 {self.__class__.__name__} 和 {other.__class__.__name__} 使用 "/" 运算符')
 
     def __neg__(self):
-        return VBCString(self.value[::-1])
+        return VBCString.from_value(self.value[::-1])
 
     def __pos__(self):
         return self
 
     def __len__(self):
-        return len(self.value)
\ No newline at end of file
+        return len(self.value)
+
+    def __getstate__(self):
+        # 序列化时先合并片段，避免把共享片段列表整份写出
+        return {"_object_type": self._object_type, "_value": self.value, "_pieces": None, "_piece_count": 0}
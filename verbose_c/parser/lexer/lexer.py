@@ -1,9 +1,32 @@
 import re
+from bisect import bisect_right
 from verbose_c.parser.lexer.token import Token
 from verbose_c.parser.lexer.enum import TokenType
 import os
 
 
+# 按变体（普通源码 / 宏体）缓存编译后的主正则，所有 Lexer 实例共享
+_MASTER_PATTERNS: dict[bool, re.Pattern[str]] = {}
+_TOKEN_TYPES_BY_NAME: dict[str, TokenType] = dict(TokenType.__members__)
+_NEWLINE_PATTERN = re.compile("\n")
+# 高频且首字符与其他模式互不相交的词法单元前置，减少正则逐个尝试分支的次数；
+# 其余模式保持 TokenType 中的声明顺序（长操作符优先）。
+_LEADING_TOKEN_TYPES = (TokenType.NAME, TokenType.WHITESPACE, TokenType.NUMBER)
+
+
+def _master_pattern(macro_body: bool) -> re.Pattern[str]:
+    """返回指定变体的主正则，首次使用时编译。"""
+    pattern = _MASTER_PATTERNS.get(macro_body)
+    if pattern is None:
+        token_types = [*_LEADING_TOKEN_TYPES, *(t for t in TokenType if t not in _LEADING_TOKEN_TYPES)]
+        if macro_body:
+            token_types = [t for t in token_types if t != TokenType.MACRO_CODE]
+        patterns = [f"(?P<{t.name}>{t.pattern})" for t in token_types]
+        pattern = re.compile("|".join(patterns), re.UNICODE)
+        _MASTER_PATTERNS[macro_body] = pattern
+    return pattern
+
+
 class Lexer:
     """
     词法分析器，将文本转换为 Token 序列
@@ -28,62 +51,68 @@ class Lexer:
         self.line = 1
         self.column = 0
         self.tokens = []
-
-        token_types = TokenType
-        if macro_body:
-            token_types = [t for t in TokenType if t != TokenType.MACRO_CODE]
-        patterns = [f"(?P<{t.name}>{t.pattern})" for t in token_types]
-        self.master_pattern = re.compile("|".join(patterns), re.UNICODE)
+        self.master_pattern = _master_pattern(macro_body)
 
     def tokenize(self):
         self.tokens = list(self._tokenize())
         return self.tokens
 
+    def iter_tokens(self):
+        """逐个产出 Token 的生成器，不保存完整的 token 列表。"""
+        return self._tokenize()
+
     def _tokenize(self):
-        for m in self.master_pattern.finditer(self.source):
+        source = self.source
+        filename = self.filename
+        keywords = self.KEYWORDS
+        token_types = _TOKEN_TYPES_BY_NAME
+        name_type = TokenType.NAME
+        # 预先计算每行起始偏移，词法单元的行列号通过二分查找得到
+        line_starts = [0]
+        line_starts.extend(m.end() for m in _NEWLINE_PATTERN.finditer(source))
+        line_count = len(line_starts)
+        line_starts.append(len(source) + 1)  # 哨兵，保证 line_index + 1 始终有效
+
+        line_index = 0
+        line_start = 0
+        next_line_start = line_starts[1]
+        for m in self.master_pattern.finditer(source):
             kind = m.lastgroup
             if not kind:
                 continue
 
-            value = m.group(kind)
-
-            # 保存当前词法单元的起始位置
-            token_start_line = self.line
-            token_start_column = self.column
+            start = m.start()
+            # 词法单元通常与上一个位于同一行，越过下一行起点时才需要二分查找
+            if start >= next_line_start:
+                line_index = bisect_right(line_starts, start, line_index, line_count) - 1
+                line_start = line_starts[line_index]
+                next_line_start = line_starts[line_index + 1]
 
-            # 更新行列号，为下一个词法单元的起始位置做准备
-            self._update_position(value)
+            value = m.group()
 
             # 未知字符时报错，使用起始位置
             if kind == 'UNKNOWN':
                 raise SyntaxError(
-                    f"非法字符 {value!r} 在行 {token_start_line}, 列 {token_start_column}")
+                    f"非法字符 {value!r} 在行 {line_index + 1}, 列 {start - line_start}")
 
-            tok_type = TokenType[kind]
+            tok_type = token_types[kind]
 
-            # 如果是标识符，检查是否是关键字
-            if tok_type == TokenType.NAME and value in self.KEYWORDS:
-                # 将关键字作为特殊的标识符处理
-                yield Token(tok_type, value, column=token_start_column, line=token_start_line, path=self.filename, is_keyword=True)
-            else:
-                # 其他所有类型的词法单元
-                yield Token(tok_type, value, column=token_start_column, line=token_start_line, path=self.filename)
+            # 如果是标识符，检查是否是关键字，关键字作为特殊的标识符处理
+            yield Token(
+                tok_type,
+                value,
+                start - line_start,
+                line_index + 1,
+                filename,
+                tok_type is name_type and value in keywords,
+            )
 
         # 扫描结束后，附加 END token
         # END token 的起始位置是文件内容的末尾
-        # self.column += 1 # 不再需要这个调整
-        yield Token(TokenType.END, TokenType.END.literal, column=self.column, line=self.line, path=self.filename)
-
-    def _update_position(self, text):
-        """
-        根据文本内容更新行号和列号
-        """
-        lines = text.split('\n')
-        if len(lines) > 1:
-            self.line += len(lines) - 1
-            self.column = len(lines[-1])
-        else:
-            self.column += len(text)
+        self.pos = len(source)
+        self.line = line_count
+        self.column = self.pos - line_starts[line_count - 1]
+        yield Token(TokenType.END, TokenType.END.literal, column=self.column, line=self.line, path=filename)
 
     def __repr__(self) -> str:
         return f"Lexer(filename={self.filename})"
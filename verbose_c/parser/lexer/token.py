@@ -2,6 +2,8 @@ from verbose_c.parser.lexer.enum import TokenType
 
 
 class Token:
+    __slots__ = ("type", "value", "line", "column", "path", "is_keyword")
+
     def __init__(self, type: TokenType, value, column=None, line=None, path=None, is_keyword=False):
         self.type: TokenType = type
         self.value = value
@@ -1,4 +1,6 @@
-from typing import List
+import sys
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List
 
 from verbose_c.fs.source_manager import SourceManager
 from verbose_c.parser.lexer.enum import TokenType
@@ -7,45 +9,199 @@ from verbose_c.parser.lexer.lexer import Lexer
 
 Mark = int
 
+TRIVIA_TOKEN_TYPES = frozenset({TokenType.WHITESPACE, TokenType.COMMENT, TokenType.NEWLINE})
+STREAM_BATCH_SIZE = 4096
+
+
+def batched_tokens(tokens: Iterable[Token], batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[Token]]:
+    """把逐个产出的 token 按批打包，供流式 Tokenizer 使用。"""
+    iterator = iter(tokens)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
 class Tokenizer:
-    def __init__(self, filename: str, source_manager: SourceManager) -> None:
+    """
+    语法分析器使用的 token 流。
+
+    解析器只看到稠密的有效 token 数组（不含空白、注释和换行），mark 即数组下标；
+    trivia 保存在旁路数组中，第 i 个有效 token 之前的 trivia 为
+    ``trivia[trivia_starts[i]:trivia_starts[i + 1]]``，可按需还原完整 token 序列。
+
+    lazy 为真或调用 set_stream 后进入流式模式：token 按批从流中读取，读取位置到达缓冲区末尾时才继续读取，
+    整个文件的 token 列表不会预先生成。
+    """
+
+    def __init__(self, filename: str, source_manager: SourceManager, *, lazy: bool = False) -> None:
         self.source_manager = source_manager
         abs_path = source_manager.normalize_path(filename)
         source = source_manager.read(abs_path)
         self.lexer: Lexer = Lexer(abs_path, source)
-        self.tokens: List[Token] = self.lexer.tokenize()
-        self._total_tokens: int = len(self.tokens)
+        self._tokens: List[Token] = []
+        self.trivia: List[Token] = []
+        self.trivia_starts: List[int] = [0]
+        self._last_index: int = 0
         self._index: int = 0
-        self._marks: List[int] = []
+        self._stream: Iterator[List[Token]] | None = None
+        self._fill_at: int = sys.maxsize # 读取位置到达该下标时从流中补充 token
+        self._position_listeners: List[Callable[[List[Token]], None]] = []
+        if lazy:
+            self.set_stream(batched_tokens(self.lexer.iter_tokens()))
+        else:
+            self.tokens = self.lexer.tokenize()
+
+    @property
+    def tokens(self) -> List[Token]:
+        """按源码顺序还原包含 trivia 的完整 token 序列（流式模式下先读完整个流）。"""
+        self._fill_all()
+        tokens: List[Token] = []
+        trivia = self.trivia
+        starts = self.trivia_starts
+        count = self._last_index
+        for index in range(count):
+            tokens.extend(trivia[starts[index]:starts[index + 1]])
+            tokens.append(self._tokens[index])
+        tokens.extend(trivia[starts[count]:])
+        return tokens
+
+    @tokens.setter
+    def tokens(self, tokens: List[Token]) -> None:
+        """替换 token 流（例如预处理之后），拆分为有效 token 与 trivia 并重置读取位置。"""
+        significant: List[Token] = []
+        trivia: List[Token] = []
+        trivia_starts: List[int] = [0]
+        for tok in tokens:
+            if tok.type in TRIVIA_TOKEN_TYPES:
+                trivia.append(tok)
+            else:
+                significant.append(tok)
+                trivia_starts.append(len(trivia))
+        if not significant or significant[-1].type != TokenType.END:
+            # 保证数组末尾总有 END，peek/getnext 在流末尾时返回它
+            end = tokens[-1] if tokens else Token(TokenType.END, TokenType.END.literal, path=self.lexer.filename)
+            significant.append(Token(TokenType.END, TokenType.END.literal, end.column, end.line, end.path))
+            trivia_starts.append(len(trivia))
+        self._last_index = len(significant)
+        # 末尾追加同一个 END 作为哨兵：消费 END 后 peek/getnext 仍返回 END，无需边界判断
+        significant.append(significant[-1])
+        self._tokens = significant
+        self.trivia = trivia
+        self.trivia_starts = trivia_starts
+        self._index = 0
+        self._stream = None
+        self._fill_at = sys.maxsize
+
+    def set_stream(self, batches: Iterable[List[Token]]) -> None:
+        """
+        以按批产出的 token 流替换 token 来源（例如流式预处理的输出），重置读取位置。
+
+        缓冲区始终至少包含当前读取位置上的 token，解析器看到的 mark 语义与非流式模式一致。
+        """
+        self._tokens = []
+        self.trivia = []
+        self.trivia_starts = [0]
+        self._index = 0
+        self._last_index = sys.maxsize
+        self._stream = iter(batches)
+        self._fill_at = 0
+        self._fill(1)
+
+    def on_positions_added(self, listener: Callable[[List[Token]], None]) -> None:
+        """注册回调：流式模式下每次补充有效 token 后，以新增的有效 token 调用，供解析器扩展按位置索引的表。"""
+        self._position_listeners.append(listener)
+
+    def _fill(self, until: Mark) -> None:
+        """从流中按批读取，直到缓冲区包含下标 until 处的有效 token 或流结束。"""
+        significant = self._tokens
+        trivia = self.trivia
+        trivia_starts = self.trivia_starts
+        start = len(significant)
+        while len(significant) <= until:
+            batch = next(self._stream, None)
+            if batch is None:
+                self._finish_stream()
+                break
+            for tok in batch:
+                if tok.type in TRIVIA_TOKEN_TYPES:
+                    trivia.append(tok)
+                else:
+                    significant.append(tok)
+                    trivia_starts.append(len(trivia))
+            if significant and significant[-1].type == TokenType.END:
+                self._finish_stream()
+                break
+        else:
+            self._fill_at = len(significant) - 1
+        if len(significant) > start:
+            added = significant[start:]
+            for listener in self._position_listeners:
+                listener(added)
+
+    def _finish_stream(self) -> None:
+        """流结束：保证末尾有 END 并追加哨兵，之后不再补充。"""
+        significant = self._tokens
+        if not significant or significant[-1].type != TokenType.END:
+            last = significant[-1] if significant else (self.trivia[-1] if self.trivia else None)
+            if last is None:
+                end = Token(TokenType.END, TokenType.END.literal, path=self.lexer.filename)
+            else:
+                end = Token(TokenType.END, TokenType.END.literal, last.column, last.line, last.path)
+            significant.append(end)
+            self.trivia_starts.append(len(self.trivia))
+        self._last_index = len(significant)
+        significant.append(significant[-1])
+        self._stream = None
+        self._fill_at = sys.maxsize
+
+    def _fill_all(self) -> None:
+        if self._stream is not None:
+            self._fill(sys.maxsize)
+
+    @property
+    def significant_tokens(self) -> List[Token]:
+        """解析器使用的稠密有效 token 数组。"""
+        self._fill_all()
+        return self._tokens[:self._last_index]
+
+    @property
+    def position_count(self) -> int:
+        """可能出现的 mark 数量（有效 token 数加末尾哨兵）；流式模式下为目前已读入的位置数。"""
+        return len(self._tokens)
+
+    def leading_trivia(self, index: Mark) -> List[Token]:
+        """返回第 index 个有效 token 之前的空白、注释和换行。"""
+        return self.trivia[self.trivia_starts[index]:self.trivia_starts[index + 1]]
+
+    def token_at(self, index: Mark) -> Token:
+        """返回指定 mark 处的有效 token，越界时返回 END。"""
+        if self._stream is not None and index >= len(self._tokens):
+            self._fill(index)
+        if 0 <= index <= self._last_index:
+            return self._tokens[index]
+        return self._tokens[-1]
 
     def getnext(self) -> Token:
         """
         获取下一个有效token，并推进索引
         """
-        while self._index < self._total_tokens:
-            tok = self.tokens[self._index]
-            self._index += 1
-            if tok.type in (TokenType.NEWLINE, TokenType.COMMENT, TokenType.WHITESPACE):
-                continue
-            return tok
-        return self.tokens[-1]
-            
+        index = self._index
+        if index < self._last_index:
+            self._index = index + 1
+            if index >= self._fill_at:
+                self._fill(index + 2)
+        return self._tokens[index]
 
     def peek(self) -> Token:
         """
         预览下一个有效token，不推进索引
         """
-        peek_index = self._index
-        while peek_index < self._total_tokens:
-            tok = self.tokens[peek_index]
-            if tok.type in (TokenType.NEWLINE, TokenType.COMMENT, TokenType.WHITESPACE):
-                peek_index += 1
-                continue
-            return tok
-        return self.tokens[-1]
+        return self._tokens[self._index]
 
     def mark(self) -> Mark:
-        self._marks.append(self._index)
+        """返回当前读取位置；回溯只需把该值传给 reset，不产生任何分配。"""
         return self._index
 
     def reset(self, index: int) -> None:
@@ -56,12 +212,12 @@ class Tokenizer:
 
     def get_last_non_whitespace_token(self) -> Token:
         """
-        返回当前索引之前最后一个非WHITESPACE、非COMMENT、非NEWLINE的token
+        返回当前索引之前最后一个有效 token
         """
-        for tok in reversed(self.tokens[:self._index]):
-            if tok.type not in (TokenType.WHITESPACE, TokenType.COMMENT, TokenType.NEWLINE):
-                return tok
-        return self.tokens[-1]
+        if self._index > 0:
+            return self._tokens[self._index - 1]
+        self._fill_all()
+        return self._tokens[-1]
 
     def get_line_source(self, path: str, line: int) -> str:
         resolved_path = path or self.lexer.filename
@@ -1,3 +1,5 @@
+from typing import Any, ClassVar, Iterator
+
 from verbose_c.object.enum import VBCObjectType
 from verbose_c.parser.parser.ast.enum import AttributeType
 from verbose_c.parser.lexer.enum import Operator
@@ -7,22 +9,75 @@ from verbose_c.utils.visitor import VisitorBase
 class ASTNode:
     """
     抽象语法树节点基类
+
+    节点字段通过 __slots__ 声明；各编译阶段附加在节点上的内部标注（如 _pointer_arithmetic）
+    仍写入按需创建的 __dict__。
     """
-    
+    __slots__ = ("start_line", "start_column", "end_line", "end_column", "__dict__")
+
+    _type: ClassVar[str] = "ASTNode"
+    # 按赋值顺序排列的字段名（含位置信息），由 __init_subclass__ 根据 __slots__ 计算
+    _fields: ClassVar[tuple[str, ...]] = ("start_line", "start_column", "end_line", "end_column")
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._type = cls.__name__
+        fields = list(ASTNode._fields)
+        for klass in reversed(cls.__mro__[:-2]):
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in fields:
+                    fields.append(name)
+        cls._fields = tuple(fields)
+
     def __init__(self, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
-        self._type: str = self.__class__.__name__
         self.start_line: int | None = start_line
         self.start_column: int | None = start_column
         self.end_line: int | None = end_line
         self.end_column: int | None = end_column
 
     def __repr__(self) -> str:
-        return f"{self._type}({self.__dict__})"
+        return f"{self._type}({dict(_type=self._type, **dict(iter_node_items(self)))})"
     
     def accept(self, visitor: VisitorBase):
-        method_name = f"visit_{self._type}"
-        visitor_method = getattr(visitor, method_name, visitor.generic_visit)
-        return visitor_method(self)
+        return visitor.dispatch(self)
+
+
+def iter_node_items(node: ASTNode) -> Iterator[tuple[str, Any]]:
+    """按赋值顺序遍历节点已设置的字段及内部标注，替代对 node.__dict__ 的遍历。"""
+    for name in node._fields:
+        try:
+            yield name, getattr(node, name)
+        except AttributeError:
+            pass
+    extra = getattr(node, "__dict__", None)
+    if extra:
+        yield from extra.items()
+
+
+def iter_child_nodes(node: ASTNode) -> Iterator[ASTNode]:
+    """遍历节点字段中直接引用的子节点（包括列表和字典中的节点）。"""
+    for _, value in iter_node_items(node):
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, ASTNode):
+                    yield item
+        elif isinstance(value, dict):
+            for item in value.values():
+                if isinstance(item, ASTNode):
+                    yield item
+
+
+def walk(node: ASTNode) -> Iterator[ASTNode]:
+    """以显式栈前序遍历整棵子树，深层表达式也不会触发 Python 递归上限。"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        children = list(iter_child_nodes(current))
+        children.reverse()
+        stack.extend(children)
 
     
 # 基本类型
@@ -34,6 +89,8 @@ class NameNode(ASTNode):
     Args:
         name (str): 标识符名称
     """
+    __slots__ = ('name',)
+
     def __init__(self, name: str, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: str = name
@@ -45,6 +102,8 @@ class NumberNode(ASTNode):
     Args:
         value (str | int): 数字值，可以是整数或浮点数字符串或整数类型。如果字符串包含小数点或科学计数法，则解析为浮点数，否则解析为整数。
     """
+    __slots__ = ('value', 'inferred_type')
+
     def __init__(self, value: str | int, inferred_type: VBCObjectType | None = None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.value: int | float = float(value) if '.' in str(value) or 'e' in str(value).lower() else int(value)
@@ -57,6 +116,8 @@ class BoolNode(ASTNode):
     Args:
         value (bool): 布尔值
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: str, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.value: bool = False
@@ -71,6 +132,8 @@ class StringNode(ASTNode):
     Args:
         value (str): 字符串值
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: str, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.value: str = value
@@ -79,12 +142,16 @@ class NullNode(ASTNode):
     """
     空值节点
     """
+    __slots__ = ()
+
     def __init__(self, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
 
 
 class ConstantValueNode(ASTNode):
     """优化器内部使用的已求值常量节点。"""
+    __slots__ = ('value',)
+
     def __init__(self, value, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.value = value
@@ -97,6 +164,8 @@ class TypeNode(ASTNode):
         type_name (NameNode): 类型名称节点
         pointer_level (int): 指针级别，0为非指针
     """
+    __slots__ = ('type_name', 'pointer_level')
+
     def __init__(self, type_name: NameNode, pointer_level: int = 0, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.type_name: NameNode = type_name
@@ -110,6 +179,8 @@ class CastNode(ASTNode):
         target_type (TypeNode): 目标类型节点
         expression (ASTNode): 要转换的表达
     """
+    __slots__ = ('target_type', 'expression')
+
     def __init__(self, target_type: TypeNode, expression: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.target_type: TypeNode = target_type
@@ -125,6 +196,8 @@ class ParenOrCastNode(ASTNode):
     
     例: (a) + b 其中a可能为类型(对b的强制转换)或普通表达式(对a的括号运算)
     """
+    __slots__ = ('target_type', 'expression', 'resolved_node')
+
     def __init__(self, target_type: TypeNode, expression: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.target_type: TypeNode = target_type
@@ -139,6 +212,8 @@ class RootNode(ASTNode):
     Args:
         modules (list[ModuleNode]): 模块列表
     """
+    __slots__ = ('modules',)
+
     def __init__(self, modules: list["ModuleNode"], start_line = None, start_column = None, end_line = None, end_column = None):
         super().__init__(start_line, start_column, end_line, end_column)
         self.modules: list[ModuleNode] = modules
@@ -150,6 +225,8 @@ class ModuleNode(ASTNode):
     Args:
         body (list[ASTNode]): 模块内容节点列表
     """
+    __slots__ = ('body',)
+
     def __init__(self, body: list[ASTNode], start_line = None, start_column = None, end_line = None, end_column = None):
         super().__init__(start_line, start_column, end_line, end_column)
         self.body: list[ASTNode] = body
@@ -161,6 +238,8 @@ class LabelNode(ASTNode):
     Args:
         name (NameNode): 标签名
     """
+    __slots__ = ('name',)
+
     def __init__(self, name: NameNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None):
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: NameNode = name
@@ -173,6 +252,8 @@ class UnaryOpNode(ASTNode):
         op (Operator): 运算符
         expr (ASTNode): 表达式
     """
+    __slots__ = ('op', 'expr')
+
     def __init__(self, op: Operator, expr: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.op: Operator = op
@@ -187,6 +268,8 @@ class BinaryOpNode(ASTNode):
         op (Operator): 运算符
         right (ASTNode): 右操作数
     """
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left: ASTNode, op: Operator, right: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.left: ASTNode = left
@@ -202,6 +285,8 @@ class RangeNode(ASTNode):
         end (NumberNode): 结束值
         step (NumberNode): 步长值
     """
+    __slots__ = ('start', 'end', 'step')
+
     def __init__(self, start: NumberNode | None, end: NumberNode | None, step: NumberNode | None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.start: NumberNode | None = start
@@ -215,6 +300,8 @@ class BlockNode(ASTNode):
     Args:
         statements (list[ASTNode]): 语句列表
     """
+    __slots__ = ('statements',)
+
     def __init__(self, statements: list[ASTNode], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.statements: list[ASTNode] = statements or []
@@ -229,6 +316,8 @@ class VarDeclNode(ASTNode):
         init_exp (ASTNode| None): 初始化表达式，默认为None
         array_dims (list[ASTNode | None]): 数组维度，None 表示 []
     """
+    __slots__ = ('var_type', 'name', 'init_exp', 'array_dims')
+
     def __init__(self, var_type: TypeNode, name: NameNode, init_exp: ASTNode| None = None, array_dims: list[ASTNode | None] | None = None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.var_type: TypeNode = var_type
@@ -238,12 +327,16 @@ class VarDeclNode(ASTNode):
 
 class InitListNode(ASTNode):
     """聚合初始化列表节点 { e1, e2, ... }"""
+    __slots__ = ('elements',)
+
     def __init__(self, elements: list[ASTNode], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.elements: list[ASTNode] = elements
 
 class SubscriptNode(ASTNode):
     """下标访问节点 base[index]"""
+    __slots__ = ('base', 'index')
+
     def __init__(self, base: ASTNode, index: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.base: ASTNode = base
@@ -257,6 +350,8 @@ class AssignmentNode(ASTNode):
         target (ASTNode): 赋值的目标，可以是 NameNode 或 GetPropertyNode
         value (ASTNode): 赋值表达式节点
     """
+    __slots__ = ('target', 'value')
+
     def __init__(self, target: ASTNode, value: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.target: ASTNode = target
@@ -272,6 +367,8 @@ class CompoundAssignmentNode(ASTNode):
         op (Operator): 运算符
         right (ASTNode): 右操作数
     """
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left: ASTNode, op: Operator, right: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.left: ASTNode = left
@@ -288,6 +385,8 @@ class UpdateExprNode(ASTNode):
         op (Operator): 运算符
         is_prefix (bool): 是否为前缀
     """
+    __slots__ = ('base', 'op', 'is_prefix')
+
     def __init__(self, base: ASTNode, op: Operator, is_prefix: bool, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.base: ASTNode = base
@@ -301,6 +400,8 @@ class ExprStmtNode(ASTNode):
     Args:
         expr (ASTNode): 表达式节点
     """
+    __slots__ = ('expr',)
+
     def __init__(self, expr: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.expr: ASTNode = expr
@@ -317,6 +418,8 @@ class IfNode(ASTNode):
         then_branch (ASTNode): 条件为真时执行的分支
         else_branch (ASTNode| None, optional): 条件为假时执行的分支。默认为 None。
     """
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+
     def __init__(self, condition: ASTNode, then_branch: ASTNode| None, else_branch: ASTNode| None = None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.condition: ASTNode = condition
@@ -331,6 +434,8 @@ class SwitchNode(ASTNode):
         condition (ASTNode): 控制表达式
         body (BlockNode): 含 SwitchLabelNode 与普通语句的分支体
     """
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition: ASTNode, body: BlockNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.condition: ASTNode = condition
@@ -343,6 +448,8 @@ class SwitchLabelNode(ASTNode):
     Args:
         value (ASTNode | None): case 常量表达式；None 表示 default
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: ASTNode | None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.value: ASTNode | None = value
@@ -355,6 +462,8 @@ class WhileNode(ASTNode):
         condition (ASTNode): 循环条件
         body (BlockNode): 循环体
     """
+    __slots__ = ('condition', 'body')
+
     def __init__(self, condition: ASTNode, body: BlockNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.condition: ASTNode = condition
@@ -368,6 +477,8 @@ class DoWhileNode(ASTNode):
         body (BlockNode): 循环体
         condition (ASTNode): 循环条件
     """
+    __slots__ = ('body', 'condition')
+
     def __init__(self, body: BlockNode, condition: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.body: BlockNode = body
@@ -383,6 +494,8 @@ class ForNode(ASTNode):
         update (ASTNode): 更新表达式
         body (BlockNode): 循环体
     """
+    __slots__ = ('init', 'condition', 'update', 'body')
+
     def __init__(self, init: ASTNode, condition: ASTNode, update: ASTNode, body: BlockNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.init: ASTNode = init
@@ -397,6 +510,8 @@ class ReturnNode(ASTNode):
     Args:
         value (ASTNode| None): 返回的值节点，可以为空。默认为 None。
     """
+    __slots__ = ('value',)
+
     def __init__(self, value: ASTNode| None = None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.value: ASTNode| None = value
@@ -406,6 +521,8 @@ class ContinueNode(ASTNode):
     """
     继续语句节点
     """
+    __slots__ = ()
+
     def __init__(self, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
 
@@ -413,6 +530,8 @@ class BreakNode(ASTNode):
     """
     跳出循环或 switch 语句节点
     """
+    __slots__ = ()
+
     def __init__(self, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
 
@@ -426,6 +545,8 @@ class ParamNode(ASTNode):
         var_type (ASTNode): 参数类型节点
         name (ASTNode | None): 参数名节点，默认为 None(原型函数声明)
     """
+    __slots__ = ('var_type', 'name')
+
     def __init__(self, var_type: TypeNode, name: NameNode | None = None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.var_type: TypeNode = var_type
@@ -445,6 +566,8 @@ class FunctionNode(ASTNode):
         kwargs (Optional[dict[str, ASTNode]]): 关键字参数字典节点
         body (BlockNode): 函数体节点
     """
+    __slots__ = ('return_type', 'name', 'args', 'kwargs', 'body')
+
     def __init__(self, return_type: TypeNode, name: NameNode, args: list[ParamNode], kwargs: dict[str, ParamNode], body: BlockNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.return_type: TypeNode = return_type
@@ -464,6 +587,8 @@ class FunctionDeclNode(ASTNode):
         args (list[ParamNode]): 参数列表节点
         kwargs (Optional[dict[str, ASTNode]]): 关键字参数字典节点
     """
+    __slots__ = ('return_type', 'name', 'args', 'kwargs')
+
     def __init__(self, return_type: TypeNode, name: NameNode, args: list[ParamNode], kwargs: dict[str, ParamNode], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.return_type: TypeNode = return_type
@@ -480,6 +605,8 @@ class CallNode(ASTNode):
         args (list[ASTNode]): 位置参数列表
         kwargs (dict[str, ASTNode], optional): 关键字参数字典。默认为 None。
     """
+    __slots__ = ('name', 'args', 'kwargs')
+
     def __init__(self, name: ASTNode, args: list[ASTNode], kwargs: dict[str, ASTNode], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: ASTNode = name
@@ -496,6 +623,8 @@ class ClassNode(ASTNode):
         base_classes (NameNode): 父类名称，多继承
         body (BlockNode): 类主体，包括类属性和类方法
     """
+    __slots__ = ('name', 'base_classes', 'body')
+
     def __init__(self, name: NameNode, body: BlockNode, base_classes: list[NameNode], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None):
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: NameNode = name
@@ -511,6 +640,8 @@ class TypedefNode(ASTNode):
         target_type (TypeNode): 被起别名的源类型
         alias_name (NameNode): 新的类型别名
     """
+    __slots__ = ('target_type', 'alias_name')
+
     def __init__(self, target_type: TypeNode, alias_name: NameNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.target_type: TypeNode = target_type
@@ -524,6 +655,8 @@ class EnumeratorNode(ASTNode):
         name (NameNode): 枚举成员名称
         value (ASTNode | None): 显式赋值的常量表达式，未显式赋值为 None
     """
+    __slots__ = ('name', 'value')
+
     def __init__(self, name: NameNode, value: ASTNode | None = None, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: NameNode = name
@@ -537,6 +670,8 @@ class EnumNode(ASTNode):
         name (NameNode): 枚举标签名称
         enumerators (list[EnumeratorNode]): 枚举成员列表
     """
+    __slots__ = ('name', 'enumerators')
+
     def __init__(self, name: NameNode, enumerators: list[EnumeratorNode], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: NameNode = name
@@ -550,6 +685,8 @@ class StructNode(ASTNode):
         name (NameNode): 结构体标签名称
         fields (list[VarDeclNode]): 字段列表，按声明顺序排列
     """
+    __slots__ = ('name', 'fields')
+
     def __init__(self, name: NameNode, fields: list['VarDeclNode'], start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.name: NameNode = name
@@ -575,6 +712,8 @@ class NewInstanceNode(ASTNode):
     Args:
         class_call (CallNode): 对类构造函数的调用节点
     """
+    __slots__ = ('class_call',)
+
     def __init__(self, class_call: CallNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None):
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.class_call: CallNode = class_call
@@ -588,6 +727,8 @@ class GetPropertyNode(ASTNode):
         property_name (NameNode): 要获取的属性的名称
         via_pointer (bool): 是否通过 '->' 访问（obj 应为指针类型），False 表示 '.' 访问
     """
+    __slots__ = ('obj', 'property_name', 'via_pointer')
+
     def __init__(self, obj: ASTNode, property_name: NameNode, via_pointer: bool = False, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.obj: ASTNode = obj
@@ -603,6 +744,8 @@ class SetPropertyNode(ASTNode):
         property_name (NameNode): 要设置的属性的名称
         value (ASTNode): 要赋给属性的值表达式
     """
+    __slots__ = ('obj', 'property_name', 'value')
+
     def __init__(self, obj: ASTNode, property_name: NameNode, value: ASTNode, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
         self.obj: ASTNode = obj
@@ -613,5 +756,7 @@ class SuperNode(ASTNode):
     """
     super 关键字的节点。
     """
+    __slots__ = ()
+
     def __init__(self, start_line: int | None = None, start_column: int | None = None, end_line: int | None = None, end_column: int | None = None) -> None:
         super().__init__(start_line=start_line, start_column=start_column, end_line=end_line, end_column=end_column)
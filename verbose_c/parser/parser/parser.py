@@ -4,9 +4,10 @@ import sys
 import time
 import traceback
 from abc import abstractmethod
+from dataclasses import dataclass, field
 from typing import Any, Callable, ClassVar, Dict, Optional, Tuple, Type, TypeVar, cast
 
-from verbose_c.parser.parser.ast.node import ASTNode
+from verbose_c.parser.parser.ast.node import ASTNode, iter_node_items
 from verbose_c.parser.lexer.enum import TokenType
 from verbose_c.parser.lexer.tokenizer import Mark, Tokenizer
 from verbose_c.parser.lexer.token import Token
@@ -38,54 +39,90 @@ def logger(method: F) -> F:
     return cast(F, logger_wrapper)
 
 
-def memoize(method: F) -> F:
-    """Memoize a symbol method."""
-    method_name = method.__name__
+# 生成的 parser.py 与本运行时之间的接口版本；不一致时引擎会重新生成解析器。
+PARSER_RUNTIME_VERSION = 3
 
-    def memoize_wrapper(self: P, *args: object) -> F:
-        self.error_collector.enter_rule(method_name)
-        
-        mark = self._mark()
-        key = mark, method_name, args
-        
-        if key in self._cache:
-            # 命中缓存
-            tree, endmark = self._cache[key]
-            self._reset(endmark)
-            self.error_collector.exit_rule(method_name)
-            return tree
-        
-        if key not in self._cache:
+
+def _lookahead_key(tok: Token) -> Tuple[str, str]:
+    """返回 token 的字面文本与种类，种类的写法与生成器中 FIRST 集合的 "$" 元素一致。"""
+    if tok.type == TokenType.NAME:
+        return tok.string, "$SOFT_KEYWORD" if tok.is_keyword else "$NAME"
+    return tok.string, f"${tok.type.name}"
+
+
+@dataclass
+class ParserStatistics:
+    """解析过程的开销计数，由 Parser.enable_statistics 开启后收集。"""
+    token_count: int = 0
+    marks: int = 0
+    resets: int = 0
+    memo_hits: dict[str, int] = field(default_factory=dict)
+    memo_misses: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_memo_hits(self) -> int:
+        return sum(self.memo_hits.values())
+
+    @property
+    def total_memo_misses(self) -> int:
+        return sum(self.memo_misses.values())
+
+
+def memoize(rule_id: int) -> Callable[[F], F]:
+    """按规则编号记忆化规则方法，结果保存在按 token 位置索引的数组中。"""
+
+    def decorator(method: F) -> F:
+        method_name = method.__name__
+
+        def memoize_wrapper(self: P) -> Any:
+            mark = self._mark()
+            row = self._memo[mark]
+            if row is not None:
+                entry = row.get(rule_id)
+                if entry is not None:
+                    # 命中缓存
+                    tree, endmark = entry
+                    self._reset(endmark)
+                    return tree
+
+            rule_stack = self._rule_stack
+            rule_stack.append(method_name)
             self._level += 1
-            tree = method(self, *args)
+            tree = method(self)
             self._level -= 1
+            rule_stack.pop()
             endmark = self._mark()
-            self._cache[key] = tree, endmark
-        else:
-            tree, endmark = self._cache[key]
-            self._reset(endmark)
-        self.error_collector.exit_rule(method_name)
-        return tree
+            # 已被 cut 释放的位置不再回填，避免重新占用内存
+            if mark >= self._memo_floor:
+                row = self._memo[mark]
+                if row is None:
+                    row = self._memo[mark] = {}
+                row[rule_id] = tree, endmark
+            return tree
+
+        memoize_wrapper.__wrapped__ = method  # type: ignore
+        memoize_wrapper.rule_id = rule_id  # type: ignore
+        return cast(F, memoize_wrapper)
 
-    memoize_wrapper.__wrapped__ = method  # type: ignore
-    return cast(F, memoize_wrapper)
+    return decorator
 
 
-def memoize_left_rec(method: Callable[[P], Optional[T]]) -> Callable[[P], Optional[T]]:
+def memoize_left_rec(rule_id: int) -> Callable[[Callable[[P], Optional[T]]], Callable[[P], Optional[T]]]:
     """Memoize a left-recursive symbol method."""
-    method_name = method.__name__
 
-    def memoize_left_rec_wrapper(self: P) -> Optional[T]:
-        mark = self._mark()
-        key = mark, method_name, ()
-        
-        if key in self._cache:
-            # 命中缓存
-            tree, endmark = self._cache[key]
-            self._reset(endmark)
-            return tree
+    def decorator(method: Callable[[P], Optional[T]]) -> Callable[[P], Optional[T]]:
+        def memoize_left_rec_wrapper(self: P) -> Optional[T]:
+            mark = self._mark()
+            row = self._memo[mark]
+            if row is None:
+                row = self._memo[mark] = {}
+            entry = row.get(rule_id)
+            if entry is not None:
+                # 命中缓存
+                tree, endmark = entry
+                self._reset(endmark)
+                return tree
 
-        if key not in self._cache:
             self._level += 1
 
             # For left-recursive rules we manipulate the cache and
@@ -97,24 +134,29 @@ def memoize_left_rec(method: Callable[[P], Optional[T]]) -> Callable[[P], Option
             # (http://web.cs.ucla.edu/~todd/research/pub.php?id=pepm08).
 
             # Prime the cache with a failure.
-            self._cache[key] = None, mark
+            row[rule_id] = None, mark
             lastresult, lastmark = None, mark
             depth = 0
 
-            while True:
-                self._reset(mark)
-                self.in_recursive_rule += 1
-                try:
-                    result = method(self)
-                finally:
-                    self.in_recursive_rule -= 1
-                endmark = self._mark()
-                depth += 1
-                if not result:
-                    break
-                if endmark <= lastmark:
-                    break
-                self._cache[key] = lastresult, lastmark = result, endmark
+            # 种子增长期间该位置的缓存不能被 cut 释放
+            self._left_rec_marks.append(mark)
+            try:
+                while True:
+                    self._reset(mark)
+                    self.in_recursive_rule += 1
+                    try:
+                        result = method(self)
+                    finally:
+                        self.in_recursive_rule -= 1
+                    endmark = self._mark()
+                    depth += 1
+                    if not result:
+                        break
+                    if endmark <= lastmark:
+                        break
+                    row[rule_id] = lastresult, lastmark = result, endmark
+            finally:
+                self._left_rec_marks.pop()
 
             self._reset(lastmark)
             tree = lastresult
@@ -125,15 +167,14 @@ def memoize_left_rec(method: Callable[[P], Optional[T]]) -> Callable[[P], Option
             else:
                 endmark = mark
                 self._reset(endmark)
-            self._cache[key] = tree, endmark
-        else:
-            tree, endmark = self._cache[key]
-            if tree:
-                self._reset(endmark)
-        return tree
+            row[rule_id] = tree, endmark
+            return tree
+
+        memoize_left_rec_wrapper.__wrapped__ = method  # type: ignore
+        memoize_left_rec_wrapper.rule_id = rule_id  # type: ignore
+        return memoize_left_rec_wrapper
 
-    memoize_left_rec_wrapper.__wrapped__ = method  # type: ignore
-    return memoize_left_rec_wrapper
+    return decorator
 
 def ast_dump(node, annotate_fields=True, indent=None, level=0):
     """
@@ -146,13 +187,13 @@ def ast_dump(node, annotate_fields=True, indent=None, level=0):
         level: 当前节点层级
     """
     def is_ast_node(obj):
-        return hasattr(obj, '__class__') and hasattr(obj, '__dict__') and isinstance(obj, ASTNode)
+        return isinstance(obj, ASTNode)
 
     def format_node(node, level):
         pad = ' ' * (indent * level) if indent else ''
         next_pad = ' ' * (indent * (level + 1)) if indent else ''
         cls_name = node.__class__.__name__
-        fields = [(k, v) for k, v in node.__dict__.items() if not k.startswith('_')]
+        fields = [(k, v) for k, v in iter_node_items(node) if not k.startswith('_')]
         if not fields:
             return f"{cls_name}()"
         
@@ -211,14 +252,28 @@ class Parser:
     def __init__(self, tokenizer: Tokenizer):
         self._tokenizer = tokenizer
         self._level = 0
-        self._cache: Dict[Tuple[Mark, str, Tuple[Any, ...]], Tuple[Any, Mark]] = {}
+        # 记忆化表：下标为 token 位置，每个位置按需创建 {规则编号: (结果, 结束位置)}
+        self._memo: list[Optional[Dict[int, Tuple[Any, Mark]]]] = [None] * tokenizer.position_count
+        # 低于该位置的缓存已被 cut 释放
+        self._memo_floor: Mark = 0
+        self._left_rec_marks: list[Mark] = []
 
         self.error_collector = ErrorCollector(tokenizer)
+        self._rule_stack = self.error_collector.rule_stack
+        # 每个位置上 token 的 (字面文本, 种类)，供生成代码按 FIRST 集合分派分支
+        self._lookahead_keys: list[Tuple[str, str]] = [
+            _lookahead_key(tokenizer.token_at(position)) for position in range(tokenizer.position_count)
+        ]
+        # 流式 tokenizer 读入新 token 时同步扩展按位置索引的表（原地扩展，已捕获的引用保持有效）
+        tokenizer.on_positions_added(self._extend_position_tables)
 
         # Integer tracking wether we are in a left recursive rule or not. Can be useful
         # for error reporting.
         self.in_recursive_rule = 0
 
+        # 调用 enable_statistics 后才收集解析开销计数
+        self.statistics: Optional[ParserStatistics] = None
+
         # Pass through common tokenizer methods.
         self._mark = self._tokenizer.mark
         self._reset = self._tokenizer.reset
@@ -226,6 +281,12 @@ class Parser:
         # Are we looking for syntax error ? When true enable matching on invalid rules
         self.call_invalid_rules = False
 
+    def _extend_position_tables(self, tokens: list[Token]) -> None:
+        self._memo.extend([None] * len(tokens))
+        self._lookahead_keys.extend(_lookahead_key(tok) for tok in tokens)
+        if self.statistics is not None:
+            self.statistics.token_count = self._tokenizer.position_count - 1
+
     @abstractmethod
     def start(self) -> Any:
         """Expected grammar entry point.
@@ -240,35 +301,30 @@ class Parser:
         tok = self._tokenizer.peek()
         return tok.__repr__()
 
-    @memoize
     def name(self) -> Token | None:
         tok = self._tokenizer.peek()
         if tok.type == TokenType.NAME and not tok.is_keyword:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def number(self) -> Token | None:
         tok = self._tokenizer.peek()
         if tok.type == TokenType.NUMBER:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def string(self) -> Token | None:
         tok = self._tokenizer.peek()
         if tok.type == TokenType.STRING:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def macro_code(self) -> Token | None:
         tok = self._tokenizer.peek()
         if tok.type == TokenType.MACRO_CODE:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def op(self) -> Token | None:
         # TODO 需要考虑实现方式
         tok = self._tokenizer.peek()
@@ -284,21 +340,18 @@ class Parser:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def type_comment(self) -> Token | None:
         tok = self._tokenizer.peek()
         if tok.type == TokenType.COMMENT:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def soft_keyword(self) -> Token | None:
         tok = self._tokenizer.peek()
         if tok.type == TokenType.NAME and tok.is_keyword:
             return self._tokenizer.getnext()
         return None
 
-    @memoize
     def expect(self, type: str) -> Token | None:
         # TODO 此处逻辑需要进一步检查
         tok = self._tokenizer.peek()
@@ -309,14 +362,31 @@ class Parser:
             return self._tokenizer.getnext()
         
         if mark >= self.error_collector.furthest_position:
+            # expect 不经过 memoize 包装，只在记录错误时临时压入调用栈
+            self._rule_stack.append("expect")
             self.error_collector.add_error(
                 mark, 
                 f"期望 '{type}'，但遇到了 '{tok.string if tok else 'EOF'}'",
                 {type}
             )
+            self._rule_stack.pop()
         
         return None
 
+    def _cut(self, mark: Mark) -> bool:
+        """
+        在 cut 处提交当前规则，释放 mark 之前位置的记忆化结果。
+
+        记忆化表只是缓存，释放后即使回溯也只会重新计算；正在进行左递归种子增长的位置除外。
+        """
+        floor = min(mark, *self._left_rec_marks) if self._left_rec_marks else mark
+        memo = self._memo
+        for position in range(self._memo_floor, floor):
+            memo[position] = None
+        if floor > self._memo_floor:
+            self._memo_floor = floor
+        return True
+
     def expect_forced(self, res: Any, expectation: str) -> Token:
         if res is None:
             raise self.make_syntax_error(f"expected {expectation}")
@@ -339,6 +409,57 @@ class Parser:
         return SyntaxError(f"{message} at {filename}:col {tok.column} line {tok.line}")
 
     # 错误处理相关
+    def enable_statistics(self) -> ParserStatistics:
+        """
+        开启解析开销计数（mark/reset 次数与各规则的记忆化命中/未命中）。
+
+        计数通过在实例上替换 _mark、_reset 和记忆化规则方法实现，未开启时解析路径没有额外开销。
+        """
+        if self.statistics is not None:
+            return self.statistics
+        statistics = ParserStatistics(token_count=self._tokenizer.position_count - 1)
+        self.statistics = statistics
+        tokenizer = self._tokenizer
+        mark = tokenizer.mark
+        reset = tokenizer.reset
+
+        def counting_mark() -> Mark:
+            statistics.marks += 1
+            return mark()
+
+        def counting_reset(index: Mark) -> None:
+            statistics.resets += 1
+            reset(index)
+
+        self._mark = counting_mark
+        self._reset = counting_reset
+
+        rule_names = getattr(type(self), "RULE_NAMES", ())
+        for rule_id, rule_name in enumerate(rule_names):
+            method = getattr(type(self), rule_name, None)
+            if getattr(method, "rule_id", None) != rule_id:
+                continue
+            statistics.memo_hits[rule_name] = 0
+            statistics.memo_misses[rule_name] = 0
+            setattr(self, rule_name, self._count_memo_lookups(method.__get__(self), rule_id, rule_name))
+        return statistics
+
+    def _count_memo_lookups(self, bound_rule: Callable[[], Any], rule_id: int, rule_name: str) -> Callable[[], Any]:
+        """包装记忆化规则，按调用前该位置是否已有缓存记录命中或未命中。"""
+        statistics = self.statistics
+        tokenizer = self._tokenizer
+        memo = self._memo
+
+        def counting_rule() -> Any:
+            row = memo[tokenizer._index]
+            if row is not None and row.get(rule_id) is not None:
+                statistics.memo_hits[rule_name] += 1
+            else:
+                statistics.memo_misses[rule_name] += 1
+            return bound_rule()
+
+        return counting_rule
+
     def get_error_report(self) -> str:
         return self.error_collector.format_error_report()
 
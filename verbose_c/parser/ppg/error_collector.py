@@ -21,6 +21,8 @@ class ErrorCollector:
     def __init__(self, tokenizer):
         self.tokenizer: Tokenizer = tokenizer
         self.errors: List[ParseError] = []
+        # 已记录错误所在的位置，尚无错误时为 -1
+        self.error_position: Mark = -1
         self.furthest_position: Mark = 0
         self.furthest_expected: Set[str] = set()
         self.rule_stack: List[str] = []
@@ -42,8 +44,19 @@ class ErrorCollector:
         elif position == self.furthest_position:
             self.furthest_expected.add(expected)
     
+    def record_expectations(self, position: Mark, expected: Set[str]):
+        """批量记录同一位置期望的 token"""
+        if position > self.furthest_position:
+            self.furthest_position = position
+            self.furthest_expected = set(expected)
+        elif position == self.furthest_position:
+            self.furthest_expected.update(expected)
+    
     def add_error(self, position: Mark, message: str, expected_tokens: Set[str] = None):
         """添加错误"""
+        # 错误报告只使用最远位置上的第一个错误，更近或同位置的后续错误无需保留规则栈快照
+        if position <= self.error_position:
+            return
         if expected_tokens is None:
             expected_tokens = set()
             
@@ -59,7 +72,8 @@ class ErrorCollector:
             rule_stack=self.rule_stack.copy()
         )
         
-        self.errors.append(error)
+        self.errors = [error]
+        self.error_position = position
     
     def _get_context(self, path: str, line: int, column: int) -> List[Tuple[int, str]]:
         """获取错误位置的上下文"""
@@ -82,19 +96,8 @@ class ErrorCollector:
         if not self.errors:
             return "没有发现解析错误"
         
-        # 从最远的位置开始，查找第一个有效token作为错误报告的目标
-        peek_index = self.furthest_position
-        actual_token_at_furthest = None
-        while peek_index < len(self.tokenizer.tokens):
-            tok = self.tokenizer.tokens[peek_index]
-            if tok.type not in (TokenType.NEWLINE, TokenType.COMMENT, TokenType.WHITESPACE):
-                actual_token_at_furthest = tok
-                break
-            peek_index += 1
-        
-        if actual_token_at_furthest is None:
-            # 如果找不到有效token，就用peek的结果
-            actual_token_at_furthest = self.tokenizer.peek()
+        # 最远位置即有效 token 数组下标，直接取该处的 token 作为错误报告的目标
+        actual_token_at_furthest = self.tokenizer.token_at(self.furthest_position)
 
         line = actual_token_at_furthest.line or 0
         column = actual_token_at_furthest.column or 0
@@ -1,3 +1,4 @@
+import ast
 import contextlib
 from abc import abstractmethod
 from typing import Any, IO, AbstractSet, Iterator, Optional, Text
@@ -58,6 +59,7 @@ class ParserGenerator:
         self.level = 0
         compute_nullables(self.rules)
         self.first_graph, self.first_sccs = compute_left_recursives(self.rules)
+        self.first_sets = compute_first_sets(self.rules)
         self.todo = self.rules.copy()  # 需要生成的规则
         self.counter = 0  # 用于 name_rule()/name_loop() 的计数器
         self.all_rules: dict[str, Rule] = {}  # 规则 + 临时规则
@@ -234,6 +236,110 @@ def compute_nullables(rules: dict[str, Rule]) -> None:
         nullable_visitor.visit(rule)
 
 
+# FIRST 集合中的特殊元素：表示无法仅凭下一个 token 排除该分支
+FIRST_ANY = "*"
+# 按 token 种类匹配的 FIRST 元素以 "$" 开头，其余元素为 token 的字面文本
+TOKEN_KIND_FIRST_KEYS = {
+    "NAME": "$NAME",
+    "SOFT_KEYWORD": "$SOFT_KEYWORD",
+    "NUMBER": "$NUMBER",
+    "STRING": "$STRING",
+    "MACRO_CODE": "$MACRO_CODE",
+}
+# 通过 expect(名称) 按字面文本匹配的 token
+LITERAL_NAME_TOKENS = frozenset({"NEWLINE", "DEDENT", "INDENT", "END", "ASYNC", "AWAIT"})
+
+
+class FirstSetVisitor(GrammarVisitor):
+    """计算语法元素的 (FIRST 集合, 是否可空)。lookahead、forced 等无法静态判断的元素记为 FIRST_ANY。"""
+
+    def __init__(self, rules: dict[str, Rule], first_sets: dict[str, frozenset[str]]) -> None:
+        self.rules = rules
+        self.first_sets = first_sets
+
+    def visit_Rule(self, rule: Rule) -> tuple[frozenset[str], bool]:
+        return self.visit(rule.rhs)
+
+    def visit_Rhs(self, rhs: Rhs) -> tuple[frozenset[str], bool]:
+        first: set[str] = set()
+        nullable = False
+        for alt in rhs.alts:
+            alt_first, alt_nullable = self.visit(alt)
+            first |= alt_first
+            nullable = nullable or alt_nullable
+        return frozenset(first), nullable
+
+    def visit_Alt(self, alt: Alt) -> tuple[frozenset[str], bool]:
+        first: set[str] = set()
+        for item in alt.items:
+            item_first, item_nullable = self.visit(item)
+            first |= item_first
+            if not item_nullable:
+                return frozenset(first), False
+        return frozenset(first), True
+
+    def visit_NamedItem(self, item: NamedItem) -> tuple[frozenset[str], bool]:
+        return self.visit(item.item)
+
+    def visit_NameLeaf(self, node: NameLeaf) -> tuple[frozenset[str], bool]:
+        name = node.value
+        if name in self.rules:
+            return self.first_sets.get(name, frozenset()), self.rules[name].nullable
+        if name in TOKEN_KIND_FIRST_KEYS:
+            return frozenset({TOKEN_KIND_FIRST_KEYS[name]}), False
+        if name in LITERAL_NAME_TOKENS:
+            return frozenset({name}), False
+        return frozenset({FIRST_ANY}), False
+
+    def visit_StringLeaf(self, node: StringLeaf) -> tuple[frozenset[str], bool]:
+        value = ast.literal_eval(node.value)
+        if not value:
+            return frozenset(), True
+        return frozenset({value}), False
+
+    def visit_Group(self, group: Group) -> tuple[frozenset[str], bool]:
+        return self.visit(group.rhs)
+
+    def visit_Opt(self, opt: Opt) -> tuple[frozenset[str], bool]:
+        return self.visit(opt.node)[0], True
+
+    def visit_Repeat0(self, repeat: Repeat0) -> tuple[frozenset[str], bool]:
+        return self.visit(repeat.node)[0], True
+
+    def visit_Repeat1(self, repeat: Repeat1) -> tuple[frozenset[str], bool]:
+        return self.visit(repeat.node)
+
+    def visit_Gather(self, gather: Gather) -> tuple[frozenset[str], bool]:
+        return self.visit(gather.node)[0], False
+
+    def visit_PositiveLookahead(self, node: Lookahead) -> tuple[frozenset[str], bool]:
+        return frozenset({FIRST_ANY}), True
+
+    def visit_NegativeLookahead(self, node: Lookahead) -> tuple[frozenset[str], bool]:
+        return frozenset({FIRST_ANY}), True
+
+    def visit_Forced(self, node: Forced) -> tuple[frozenset[str], bool]:
+        return frozenset({FIRST_ANY}), False
+
+    def visit_Cut(self, node: Cut) -> tuple[frozenset[str], bool]:
+        return frozenset(), True
+
+
+def compute_first_sets(rules: dict[str, Rule]) -> dict[str, frozenset[str]]:
+    """迭代到不动点，计算每条规则的 FIRST 集合（需要先计算可空标志）。"""
+    first_sets: dict[str, frozenset[str]] = {name: frozenset() for name in rules}
+    visitor = FirstSetVisitor(rules, first_sets)
+    changed = True
+    while changed:
+        changed = False
+        for name, rule in rules.items():
+            first, _ = visitor.visit(rule)
+            if first != first_sets[name]:
+                first_sets[name] = first
+                changed = True
+    return first_sets
+
+
 def compute_left_recursives(
     rules: dict[str, Rule]
 ) -> tuple[dict[str, AbstractSet[str]], list[AbstractSet[str]]]:
@@ -1,4 +1,5 @@
 import ast
+import contextlib
 from datetime import datetime
 import re
 import token
@@ -24,8 +25,9 @@ from verbose_c.parser.ppg.grammar import (
     Rule,
     StringLeaf,
 )
-from verbose_c.parser.ppg.parser_generator import ParserGenerator
+from verbose_c.parser.ppg.parser_generator import FIRST_ANY, FirstSetVisitor, ParserGenerator
 from verbose_c.parser.lexer.enum import TokenType
+from verbose_c.parser.parser.parser import PARSER_RUNTIME_VERSION
 
 MODULE_PREFIX = """\
 #!/usr/bin/env python3.8
@@ -42,6 +44,8 @@ from verbose_c.parser.parser.parser import memoize, memoize_left_rec, logger, Pa
 from verbose_c.parser.lexer.enum import Operator
 """
 
+RULE_CALL_PATTERN = re.compile(r"self\.(\w+)\b")
+
 MODULE_SUFFIX = """
 if __name__ == '__main__':
     print("通过实例化 {class_name} 使用")
@@ -194,7 +198,7 @@ class PythonCallMakerVisitor(GrammarVisitor):
         return self.visit(node.rhs)
 
     def visit_Cut(self, node: Cut) -> Tuple[str, str]:
-        return "cut", "True"
+        return "cut", "self._cut(mark)"
 
     def visit_Forced(self, node: Forced) -> Tuple[str, str]:
         if isinstance(node.node, Group):
@@ -244,6 +248,56 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
             "end_line=end_line, end_column=end_column"
         )
         self.cleanup_statements: List[str] = []
+        self.rule_ids: Dict[str, int] = {}
+        self.memoized_rules: Set[str] = set()
+        self.firstsetvisitor: FirstSetVisitor = FirstSetVisitor(self.rules, self.first_sets)
+        self.alt_guards: Dict[int, frozenset[str]] = {}
+
+    def compute_alt_guards(self, rhs: Rhs) -> Dict[int, frozenset[str]]:
+        """
+        计算可以按下一个 token 直接跳过的分支及其 FIRST 集合。
+
+        可空、以 lookahead 开头或包含 invalid 规则的分支无法静态排除，总是尝试。
+        """
+        guards: Dict[int, frozenset[str]] = {}
+        for alt in rhs.alts:
+            if self.invalidvisitor.visit(alt):
+                continue
+            first, nullable = self.firstsetvisitor.visit(alt)
+            if nullable or not first or FIRST_ANY in first:
+                continue
+            guards[id(alt)] = first
+        return guards
+
+    def rule_reference_counts(self) -> Dict[str, int]:
+        """统计每条规则被调用的位置数，lookahead 中的调用随后还会被真正解析，按两次计。"""
+        counts: Dict[str, int] = {name: 0 for name in self.all_rules}
+        for rule in self.all_rules.values():
+            for alt in rule.flatten().alts:
+                for item in alt.items:
+                    _, call = self.callmakervisitor.visit(item)
+                    weight = 2 if isinstance(item.item, Lookahead) else 1
+                    for name in RULE_CALL_PATTERN.findall(call):
+                        if name in counts:
+                            counts[name] += weight
+        return counts
+
+    def compute_memoized_rules(self) -> Set[str]:
+        """
+        选择需要记忆化的规则：显式标记 (memo) 的规则，以及可能在同一位置被重复进入的规则。
+
+        只有一个调用位置的规则在同一 token 位置最多被其调用者进入一次，记忆化只会白白占用内存；
+        左递归规则由 memoize_left_rec 单独处理。
+        """
+        counts = self.rule_reference_counts()
+        return {
+            name
+            for name, rule in self.all_rules.items()
+            if not rule.left_recursive and (rule.memo or counts[name] > 1)
+        }
+
+    def rule_id(self, name: str) -> int:
+        return self.rule_ids.setdefault(name, len(self.rule_ids))
 
     def generate(self, filename: str) -> None:
         header = self.grammar.metas.get("header", MODULE_PREFIX)
@@ -252,6 +306,9 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
         subheader = self.grammar.metas.get("subheader", "")
         if subheader:
             self.print(subheader)
+        self.print(f"PARSER_RUNTIME_VERSION = {PARSER_RUNTIME_VERSION}")
+        self.collect_todo()
+        self.memoized_rules = self.compute_memoized_rules()
         cls_name = self.grammar.metas.get("class", "GeneratedParser")
         self.print("# Keywords and soft keywords are listed at the end of the parser definition.")
         self.print(f"class {cls_name}(Parser):")
@@ -266,6 +323,8 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
         with self.indent():
             self.print(f"KEYWORDS = {tuple(sorted(self.callmakervisitor.keywords))}")
             self.print(f"SOFT_KEYWORDS = {tuple(sorted(self.callmakervisitor.soft_keywords))}")
+            rule_names = sorted(self.rule_ids, key=self.rule_ids.__getitem__)
+            self.print(f"RULE_NAMES = {tuple(rule_names)}")
 
         trailer = self.grammar.metas.get("trailer", MODULE_SUFFIX.format(class_name=cls_name))
         if trailer is not None:
@@ -291,13 +350,15 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
         rhs = node.flatten()
         if node.left_recursive:
             if node.leader:
-                self.print("@memoize_left_rec")
+                self.print(f"@memoize_left_rec({self.rule_id(node.name)})")
             else:
                 # Non-leader rules in a cycle are not memoized,
                 # but they must still be logged.
                 self.print("@logger")
-        else:
-            self.print("@memoize")
+        elif node.name in self.memoized_rules:
+            self.print(f"@memoize({self.rule_id(node.name)})")
+        # 未经 memoize 包装的普通规则自行维护错误报告使用的规则调用栈
+        tracks_rule_stack = not node.left_recursive and node.name not in self.memoized_rules
         node_type = node.type or "Any"
         self.print(f"def {node.name}(self) -> {node_type} | None:")
         with self.indent():
@@ -310,7 +371,15 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
                 self.print("self.call_invalid_rules = False")
                 self.cleanup_statements.append("self.call_invalid_rules = _prev_call_invalid")
 
+            if tracks_rule_stack:
+                self.print(f"self._rule_stack.append({node.name!r})")
+                self.cleanup_statements.append("self._rule_stack.pop()")
+
             self.print("mark = self._mark()")
+            self.alt_guards = {} if is_loop or is_gather else self.compute_alt_guards(rhs)
+            if self.alt_guards:
+                # 按下一个 token 的字面文本和种类分派，只尝试 FIRST 集合包含它的分支
+                self.print("_la_string, _la_kind = self._lookahead_keys[mark]")
             if self.alts_uses_locations(node.rhs.alts):
                 self.print("tok = self._tokenizer.peek()")
                 self.print("start_line = tok.line")
@@ -323,6 +392,8 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
             else:
                 self.add_return("None")
 
+        if tracks_rule_stack:
+            self.cleanup_statements.pop()
         if node.name.endswith("without_invalid"):
             self.cleanup_statements.pop()
 
@@ -412,30 +483,48 @@ class PythonParserGenerator(ParserGenerator, GrammarVisitor):
         with self.local_variable_context():
             if has_cut:
                 self.print("cut = False")
-            if is_loop:
-                self.print("while (")
-            else:
-                self.print("if (")
-            with self.indent():
-                first = True
-                if has_invalid:
-                    self.print("self.call_invalid_rules")
-                    first = False
-                for item in node.items:
-                    if first:
+            guard = None if is_loop else self.alt_guards.get(id(node))
+            literals = sorted(key for key in guard or () if not key.startswith("$"))
+            if guard:
+                kinds = sorted(key for key in guard if key.startswith("$"))
+                conditions = []
+                if literals:
+                    conditions.append(f"_la_string in {{{', '.join(map(repr, literals))}}}")
+                if kinds:
+                    conditions.append(f"_la_kind in {{{', '.join(map(repr, kinds))}}}")
+                # 当前位置尚无错误记录时仍逐个尝试，保证首个错误的规则调用栈不变
+                conditions.append("mark > self.error_collector.error_position")
+                self.print(f"if {' or '.join(conditions)}:")
+            with self.indent() if guard else contextlib.nullcontext():
+                if is_loop:
+                    self.print("while (")
+                else:
+                    self.print("if (")
+                with self.indent():
+                    first = True
+                    if has_invalid:
+                        self.print("self.call_invalid_rules")
                         first = False
-                    else:
-                        self.print("and")
-                    self.visit(item, used=used, unreachable=unreachable)
-                    if is_gather:
-                        self.print("is not None")
-
-            self.print("):")
-            with self.indent():
-                # flake8 complains that visit_Alt is too complicated, so here we are :P
-                self.print_action(action, locations, unreachable, is_gather, is_loop, has_invalid)
+                    for item in node.items:
+                        if first:
+                            first = False
+                        else:
+                            self.print("and")
+                        self.visit(item, used=used, unreachable=unreachable)
+                        if is_gather:
+                            self.print("is not None")
+
+                self.print("):")
+                with self.indent():
+                    # flake8 complains that visit_Alt is too complicated, so here we are :P
+                    self.print_action(action, locations, unreachable, is_gather, is_loop, has_invalid)
 
-            self.print("self._reset(mark)")
+                self.print("self._reset(mark)")
+            if literals:
+                # 被跳过的分支本会在 mark 处期望这些 token，照常记录以保持错误报告一致
+                self.print("elif mark >= self.error_collector.furthest_position:")
+                with self.indent():
+                    self.print(f"self.error_collector.record_expectations(mark, {{{', '.join(map(repr, literals))}}})")
             
             if not is_loop:
                 self.print("# 记录解析失败信息")
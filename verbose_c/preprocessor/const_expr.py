@@ -114,7 +114,7 @@ def eval_preprocessor_expr(preprocessor, expr_text: str, site: Token) -> bool:
             if tok.type != TokenType.END
         ]
         defined_tokens = _substitute_defined(raw_tokens, preprocessor.macro_register, site)
-        expanded = preprocessor._rescan(defined_tokens, set())
+        expanded = preprocessor._rescan(defined_tokens, frozenset())
         return _evaluate_expr_tokens(expanded)
     except ValueError as exc:
         preprocessor._error(f"预处理错误：#if 表达式求值失败: {exc}", site)
@@ -26,6 +26,9 @@ class MacroDefinition:
         self.source_file = source_file
         self.line = line
         self.column = column
+        # 函数宏在 #define 时预编译的形参用法与替换模板，展开时直接复用
+        self.parameter_usage = None
+        self.template = None
 
     def __eq__(self, other: "MacroDefinition"):
         if not isinstance(other, MacroDefinition):
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 
 from verbose_c.error import VBCCompileError
@@ -16,12 +17,22 @@ class ParamUsage(Enum):
     CONCAT = "concat"
 
 
-def _clone_token(token: Token) -> Token:
-    return Token(
-        token.type, token.value,
-        column=token.column, line=token.line, path=token.path,
-        is_keyword=token.is_keyword,
-    )
+class TemplateItem(Enum):
+    """函数宏替换模板的条目类别。"""
+    TOKEN = "token"          # 原样输出的宏体 token
+    PARAM = "param"          # 替换为（预展开后的）实参
+    STRINGIFY = "stringify"  # # 形参：替换为实参的字符串化结果
+
+
+@dataclass
+class MacroTemplate:
+    """
+    #define 时预编译的函数宏替换模板。
+
+    宏体中的 token 只读共享，展开时不再逐个复制；has_concat 为假时跳过 ## 粘贴阶段。
+    """
+    items: list[tuple[TemplateItem, Token | str]]
+    has_concat: bool
 
 
 def _strip_insignificant(tokens: list[Token]) -> list[Token]:
@@ -31,7 +42,7 @@ def _strip_insignificant(tokens: list[Token]) -> list[Token]:
         start += 1
     while end > start and tokens[end - 1].type in _INSIGNIFICANT:
         end -= 1
-    return [_clone_token(t) for t in tokens[start:end]]
+    return tokens[start:end]
 
 
 def _significant_indices(tokens: list[Token]) -> list[int]:
@@ -167,15 +178,14 @@ def _collect_concat_operand(
     return operand, consumed
 
 
-def substitute_function_macro(
+def compile_replacement_template(
     replacement: list[Token],
     parameters: list[str],
-    prepared_args: dict[str, list[Token]],
-    site: Token,
-) -> list[Token]:
-    """替换函数宏体中的形参并处理 # / ##。"""
+) -> MacroTemplate:
+    """把函数宏体编译为替换模板，只在 #define 时执行一次。"""
     param_set = set(parameters)
-    out: list[Token] = []
+    items: list[tuple[TemplateItem, Token | str]] = []
+    has_concat = False
     index = 0
     while index < len(replacement):
         tok = replacement[index]
@@ -188,15 +198,34 @@ def substitute_function_macro(
             param_tok = replacement[next_index]
             if param_tok.type != TokenType.NAME or param_tok.value not in param_set:
                 _raise_define_error("预处理错误：# 后必须是宏形参名", tok)
-            out.append(stringify_tokens(prepared_args[param_tok.value], site))
+            items.append((TemplateItem.STRINGIFY, param_tok.value))
             index = next_index + 1
             continue
         if tok.type == TokenType.NAME and tok.value in param_set:
-            out.extend(_clone_token(t) for t in prepared_args[tok.value])
-            index += 1
-            continue
-        out.append(_clone_token(tok))
+            items.append((TemplateItem.PARAM, tok.value))
+        else:
+            has_concat = has_concat or tok.type == TokenType.PP_CONCAT
+            items.append((TemplateItem.TOKEN, tok))
         index += 1
+    return MacroTemplate(items, has_concat)
+
+
+def substitute_function_macro(
+    template: MacroTemplate,
+    prepared_args: dict[str, list[Token]],
+    site: Token,
+) -> list[Token]:
+    """按预编译模板替换函数宏体中的形参并处理 # / ##。"""
+    out: list[Token] = []
+    for kind, payload in template.items:
+        if kind is TemplateItem.TOKEN:
+            out.append(payload)
+        elif kind is TemplateItem.PARAM:
+            out.extend(prepared_args[payload])
+        else:
+            out.append(stringify_tokens(prepared_args[payload], site))
+    if not template.has_concat:
+        return out
 
     current = out
     while True:
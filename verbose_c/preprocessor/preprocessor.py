@@ -2,12 +2,15 @@ import os
 import re
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator
 
 from verbose_c.error import VBCCompileError
 from verbose_c.fs.source_manager import SourceManager
 from verbose_c.parser.lexer.enum import TokenType
 from verbose_c.parser.lexer.lexer import Lexer
 from verbose_c.parser.lexer.token import Token
+from verbose_c.parser.lexer.tokenizer import STREAM_BATCH_SIZE
 from verbose_c.preprocessor.builtin_macros import (
     DYNAMIC_PREDEFINED,
     RESERVED_PREDEFINED,
@@ -18,6 +21,7 @@ from verbose_c.preprocessor.const_expr import eval_preprocessor_expr
 from verbose_c.preprocessor.macro_definition import MacroDefinition, MacroDefinitionType
 from verbose_c.preprocessor.macro_operators import (
     classify_parameter_usage,
+    compile_replacement_template,
     prepare_macro_arguments,
     substitute_function_macro,
     validate_macro_body,
@@ -35,8 +39,15 @@ IFDEF_PATTERN = re.compile(r'^\s*#ifdef\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*$')
 IFNDEF_PATTERN = re.compile(r'^\s*#ifndef\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*$')
 ELSE_PATTERN = re.compile(r'^\s*#else\s*$')
 ENDIF_PATTERN = re.compile(r'^\s*#endif\s*$')
+PRAGMA_ONCE_PATTERN = re.compile(r'^\s*#pragma\s+once\s*$')
+# 头文件保护宏的开头：#ifndef X 或 #if !defined X / #if !defined(X)
+GUARD_OPEN_PATTERN = re.compile(
+    r'^\s*#(?:ifndef\s+([a-zA-Z_][a-zA-Z0-9_]*)|if\s+!\s*defined\s*(?:\(\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\)|\s([a-zA-Z_][a-zA-Z0-9_]*)))\s*$'
+)
+COND_OPEN_PATTERN = re.compile(r'^\s*#if(?:n?def)?\b')
 
 _INSIGNIFICANT = frozenset({TokenType.WHITESPACE, TokenType.COMMENT, TokenType.NEWLINE})
+_EMPTY_HIDE_SET: frozenset[str] = frozenset()
 
 
 @dataclass
@@ -63,9 +74,13 @@ class Preprocessor:
         self.show_warnings = show_warnings
         self.macro_register: dict[str, MacroDefinition] = {}
         self._included_files = set()
+        self._include_guards: dict[str, str] = {} # 头文件绝对路径 -> 整个文件外层的保护宏名
+        self._pragma_once_files: set[str] = set()
         self.dependencies: set[str] = set()
         self._compile_time = compile_time or datetime.now()
         self._cond_stack: list[_CondFrame] = []
+        self._normalized_paths: dict[str | None, str | None] = {}
+        self._hide_sets: dict[tuple[frozenset[str], str], frozenset[str]] = {}
         self._register_static_predefined_macros()
 
     def _register_static_predefined_macros(self) -> None:
@@ -202,15 +217,60 @@ class Preprocessor:
         else:
             print(f"警告: {message}")
 
+    def _normalized_path(self, path: str | None) -> str | None:
+        """返回 token 路径的绝对路径形式，按路径缓存。"""
+        normalized = self._normalized_paths.get(path)
+        if normalized is None:
+            normalized = os.path.abspath(path) if path else path
+            self._normalized_paths[path] = normalized
+        return normalized
+
     def _clone_token(self, token: Token) -> Token:
-        """浅拷贝单个 Token。"""
-        path = os.path.abspath(token.path) if token.path else token.path
+        """
+        输出单个 Token：路径已是绝对路径时直接按引用转发，否则复制一份并规范化路径。
+
+        预处理前后的 token 都只读，输出序列可与输入序列、宏体共享同一 Token 对象。
+        """
+        path = self._normalized_path(token.path)
+        if path == token.path:
+            return token
         return Token(
             token.type, token.value,
             column=token.column, line=token.line, path=path,
             is_keyword=token.is_keyword,
         )
 
+    def _hide_set_with(self, hiding: frozenset[str], name: str) -> frozenset[str]:
+        """返回 hiding ∪ {name}；隐藏集不可变，相同组合在各次展开之间共享同一个对象。"""
+        key = (hiding, name)
+        combined = self._hide_sets.get(key)
+        if combined is None:
+            combined = hiding | {name}
+            self._hide_sets[key] = combined
+        return combined
+
+    def _pass_through_end(self, tokens: list[Token], index: int) -> int:
+        """
+        返回从 index 起可整段按引用转发的 token 区间终点。
+
+        区间内的 token 来自同一路径（且已是绝对路径），并且不是预处理指令、END 或可能展开的宏名。
+        """
+        path = tokens[index].path
+        if self._normalized_path(path) != path:
+            return index
+        macros = self.macro_register
+        end = index
+        count = len(tokens)
+        while end < count:
+            tok = tokens[end]
+            tok_type = tok.type
+            if tok_type is TokenType.MACRO_CODE or tok_type is TokenType.END or tok.path is not path:
+                break
+            if tok_type is TokenType.NAME and (tok.value in macros or tok.value in DYNAMIC_PREDEFINED):
+                break
+            end += 1
+        return end
+
     def _parse_function_args(self, tokens: list[Token], lparen_index: int) -> tuple[list[list[Token]], int]:
         """从 LPAREN 起解析函数宏实参，返回实参 token 列表及消费长度。"""
         args: list[list[Token]] = []
@@ -242,7 +302,7 @@ class Preprocessor:
         self,
         tokens: list[Token],
         index: int,
-        hiding: set[str],
+        hiding: frozenset[str],
         depth: int = 0,
         site: Token | None = None,
     ) -> tuple[list[Token], int]:
@@ -254,7 +314,7 @@ class Preprocessor:
         invocation_site = site or tokens[index]
         name = tokens[index].value
         macro = self.macro_register[name]
-        new_hiding = hiding | {name}
+        new_hiding = self._hide_set_with(hiding, name)
 
         if macro.type == MacroDefinitionType.FUNCTION:
             next_index = index + 1
@@ -268,28 +328,23 @@ class Preprocessor:
                 return [self._clone_token(tokens[index])], 1
 
             param_map = dict(zip(macro.parameters, args))
-            usage = classify_parameter_usage(macro.replacement, macro.parameters)
+            if macro.template is None:
+                self._compile_macro(macro)
             prepared = prepare_macro_arguments(
-                param_map, usage, self, hiding, depth,
-            )
-            substituted = substitute_function_macro(
-                macro.replacement,
-                macro.parameters,
-                prepared,
-                invocation_site,
+                param_map, macro.parameter_usage, self, hiding, depth,
             )
+            substituted = substitute_function_macro(macro.template, prepared, invocation_site)
 
             consumed = next_index - index + arg_span
             return self._rescan(substituted, new_hiding, depth + 1, site=invocation_site), consumed
 
-        replacement = [self._clone_token(t) for t in macro.replacement]
-        return self._rescan(replacement, new_hiding, depth + 1, site=invocation_site), 1
+        return self._rescan(macro.replacement, new_hiding, depth + 1, site=invocation_site), 1
 
     def _consume_token(
         self,
         tokens: list[Token],
         index: int,
-        hiding: set[str],
+        hiding: frozenset[str],
         depth: int = 0,
         site: Token | None = None,
     ) -> tuple[list[Token], int]:
@@ -313,7 +368,7 @@ class Preprocessor:
     def _rescan(
         self,
         tokens: list[Token],
-        hiding: set[str],
+        hiding: frozenset[str],
         depth: int = 0,
         site: Token | None = None,
     ) -> list[Token]:
@@ -366,7 +421,7 @@ class Preprocessor:
             if tok.type != TokenType.END
         ]
         validate_macro_body(macro_type, params, body_tokens, token)
-        self.macro_register[name] = MacroDefinition(
+        macro = MacroDefinition(
             macro_type,
             params,
             body_tokens,
@@ -374,43 +429,134 @@ class Preprocessor:
             line=token.line,
             column=token.column,
         )
+        if macro_type == MacroDefinitionType.FUNCTION:
+            self._compile_macro(macro)
+        self.macro_register[name] = macro
+
+    @staticmethod
+    def _compile_macro(macro: MacroDefinition) -> None:
+        """预编译函数宏的形参用法与替换模板。"""
+        macro.parameter_usage = classify_parameter_usage(macro.replacement, macro.parameters)
+        macro.template = compile_replacement_template(macro.replacement, macro.parameters)
 
-    def _handle_include(self, token: Token) -> list[Token]:
-        """处理 #include "..." 并返回展开后的 token 列表。"""
+    def _handle_include(self, token: Token, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[Token]]:
+        """处理 #include "..."，按批产出展开后的 token。"""
         quoted_match = INCLUDE_QUOTED_PATTERN.match(token.value)
         if not quoted_match:
             if INCLUDE_ANGLE_PATTERN.match(token.value):
                 self._warn("暂不支持 #include <...> 形式", token)
-            return []
+            return
 
         filename = quoted_match.group(1)
         abs_path = self.source_manager.resolve_include(filename, token.path or "")
 
+        # 多次包含优化：#pragma once 或保护宏已定义的头文件再次包含时不产生任何 token，无需重新读取与词法分析
+        if abs_path in self._pragma_once_files or self._include_guards.get(abs_path) in self.macro_register:
+            return
+
         if abs_path in self._included_files:
             self._warn(f"检测到循环包含 '{abs_path}'，已跳过", token)
-            return []
+            return
 
         if not self.source_manager.exists(abs_path):
             self._warn(f"#include 文件未找到 '{abs_path}'", token)
-            return []
+            return
 
         self.dependencies.add(os.path.abspath(abs_path))
         self._included_files.add(abs_path)
         try:
             content = self.source_manager.read(abs_path)
+            # 保护宏识别需要看到整个头文件，这里仍完整词法分析；展开结果按批产出
             included_tokens = Lexer(abs_path, content).tokenize()
-            processed = self.process_tokens(included_tokens)
-            return [t for t in processed if t.type != TokenType.END]
+            guard = self._detect_include_guard(included_tokens)
+            if guard is not None:
+                self._include_guards[abs_path] = guard
+            for batch in self.process_stream(included_tokens, batch_size):
+                if batch[-1].type == TokenType.END:
+                    batch.pop()
+                if batch:
+                    yield batch
         finally:
             self._included_files.discard(abs_path)
 
-    def process_tokens(self, tokens: list[Token]) -> list[Token]:
-        """处理 token 序列：注册 define、展开 include 与宏。"""
+    @staticmethod
+    def _detect_include_guard(tokens: list[Token]) -> str | None:
+        """
+        识别整个文件被 `#ifndef X ... #endif` 包裹的头文件保护宏。
+
+        要求保护条件之前与匹配的 #endif 之后只有空白和注释，且外层条件没有 #elif/#else 分支；
+        满足时 X 已定义即意味着再次包含不会产生任何内容。
+        """
+        significant = [(index, tok) for index, tok in enumerate(tokens) if tok.type not in _INSIGNIFICANT and tok.type != TokenType.END]
+        if not significant or significant[0][1].type != TokenType.MACRO_CODE:
+            return None
+        guard_match = GUARD_OPEN_PATTERN.match(significant[0][1].value)
+        if not guard_match:
+            return None
+
+        depth = 0
+        for position, (_, tok) in enumerate(significant):
+            if tok.type != TokenType.MACRO_CODE:
+                continue
+            if COND_OPEN_PATTERN.match(tok.value):
+                depth += 1
+            elif ENDIF_PATTERN.match(tok.value):
+                depth -= 1
+                if depth == 0:
+                    if position != len(significant) - 1:
+                        return None
+                    return guard_match.group(1) or guard_match.group(2) or guard_match.group(3)
+            elif depth == 1 and (ELSE_PATTERN.match(tok.value) or ELIF_PATTERN.match(tok.value)):
+                return None
+        return None
+
+    def _complete_macro_call(self, window: list[Token], index: int, source: Iterator[Token]) -> None:
+        """
+        函数宏名之后的实参可能还没读进窗口：向后补读到匹配的右括号为止。
+
+        名字后第一个有意义的 token 不是 LPAREN 时说明不是调用，立即停止。
+        """
+        position = index + 1
+        paren_level = 0
+        while True:
+            if position >= len(window):
+                tok = next(source, None)
+                if tok is None:
+                    return
+                window.append(tok)
+            tok = window[position]
+            if tok.type is TokenType.END:
+                return
+            if tok.type is TokenType.LPAREN:
+                paren_level += 1
+            elif paren_level == 0:
+                if tok.type not in _INSIGNIFICANT:
+                    return
+            elif tok.type is TokenType.RPAREN:
+                paren_level -= 1
+                if paren_level == 0:
+                    return
+            position += 1
+
+    def process_stream(self, tokens: Iterable[Token], batch_size: int = STREAM_BATCH_SIZE) -> Iterator[list[Token]]:
+        """
+        流式处理 token 序列：按批读入源 token，按批产出预处理结果。
+
+        窗口只保留当前一批源 token，函数宏调用跨越批次边界时才向后补读；
+        遇到 END 时检查条件编译是否闭合，并以含 END 的一批结束。
+        """
+        source = iter(tokens)
         cond_depth_at_start = len(self._cond_stack)
+        window: list[Token] = []
         output: list[Token] = []
         index = 0
-        while index < len(tokens):
-            token = tokens[index]
+        while True:
+            if index >= len(window):
+                window = list(islice(source, batch_size))
+                index = 0
+                if not window:
+                    break
+            token = window[index]
 
             if token.type == TokenType.END:
                 if len(self._cond_stack) > cond_depth_at_start:
@@ -419,24 +565,50 @@ class Preprocessor:
                         self._cond_stack[cond_depth_at_start].opening_token,
                     )
                 output.append(token)
-                break
+                yield output
+                return
 
             if token.type == TokenType.MACRO_CODE:
                 if not self._handle_conditional_directive(token) and self._is_active():
                     if DEFINE_PATTERN.match(token.value):
                         self._handle_define(token)
                     elif INCLUDE_QUOTED_PATTERN.match(token.value) or INCLUDE_ANGLE_PATTERN.match(token.value):
-                        output.extend(self._handle_include(token))
+                        if output:
+                            yield output
+                            output = []
+                        yield from self._handle_include(token, batch_size)
+                    elif PRAGMA_ONCE_PATTERN.match(token.value):
+                        if token.path:
+                            self._pragma_once_files.add(os.path.abspath(token.path))
                     elif self.show_warnings:
                         self._warn(f"未识别的预处理指令: {token.value}", token)
                 index += 1
                 continue
 
             if self._is_active():
-                expanded, consumed = self._consume_token(tokens, index, set())
-                output.extend(expanded)
-                index += consumed
+                end = self._pass_through_end(window, index)
+                if end > index:
+                    output.extend(window[index:end])
+                    index = end
+                else:
+                    macro = self.macro_register.get(token.value) if token.type is TokenType.NAME else None
+                    if macro is not None and macro.type == MacroDefinitionType.FUNCTION:
+                        self._complete_macro_call(window, index, source)
+                    expanded, consumed = self._consume_token(window, index, _EMPTY_HIDE_SET)
+                    output.extend(expanded)
+                    index += consumed
+                if len(output) >= batch_size:
+                    yield output
+                    output = []
             else:
                 index += 1
 
+        if output:
+            yield output
+
+    def process_tokens(self, tokens: list[Token]) -> list[Token]:
+        """处理 token 序列：注册 define、展开 include 与宏。"""
+        output: list[Token] = []
+        for batch in self.process_stream(tokens, batch_size=max(len(tokens), 1)):
+            output.extend(batch)
         return output
@@ -64,6 +64,11 @@ class StringType(Type):
     def __repr__(self) -> str:
         return "String"
 
+class BytesType(Type):
+    """代表字节缓冲区类型。"""
+    def __repr__(self) -> str:
+        return "Bytes"
+
 class BoolType(Type):
     """代表布尔类型。"""
     def __repr__(self) -> str:
@@ -21,6 +21,18 @@ class Stack:
         else:
             raise IndexError("pop from empty stack")
 
+    def pop_many(self, count: int) -> list:
+        """
+        按入栈顺序弹出栈顶 count 个元素
+        """
+        if count > len(self._items):
+            raise IndexError("pop_many count out of range")
+        if not count:
+            return []
+        items = self._items[-count:]
+        del self._items[-count:]
+        return items
+
     def is_empty(self):
         """
         判断栈是否为空
@@ -1,13 +1,36 @@
+from typing import Any, Callable, ClassVar
+
+
 class VisitorBase:
     """
     访问者基类
+
+    每个访问者子类维护一张 节点类型 -> 访问方法 的分派表，首次遇到某种节点类型时解析 visit_<类型名>，
+    之后的访问只需一次字典查找，不再为每个节点拼接方法名和 getattr。
     """
+    _dispatch_table: ClassVar[dict[type, Callable[[Any, Any], Any]]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_table = {}
+
     def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        return self.dispatch(node)
+
+    def dispatch(self, node):
+        """按节点类型调用对应的访问方法，不经过子类对 visit 的重写。"""
+        node_type = type(node)
+        method = self._dispatch_table.get(node_type)
+        if method is None:
+            method = self._resolve_visit_method(node_type)
+        return method(self, node)
+
+    @classmethod
+    def _resolve_visit_method(cls, node_type: type) -> Callable[[Any, Any], Any]:
+        method = getattr(cls, f'visit_{node_type.__name__}', cls.generic_visit)
+        cls._dispatch_table[node_type] = method
+        return method
 
     def generic_visit(self, node):
         """默认访问方法"""
         raise NotImplementedError(f"未实现节点类型 {node.__class__.__name__} 的访问方法")
-                
\ No newline at end of file
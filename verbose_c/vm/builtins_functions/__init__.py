@@ -3,12 +3,17 @@ from verbose_c.vm.builtins_functions.exit import native__exit
 from verbose_c.vm.builtins_functions.io import (
     native_open,
     native_read,
+    native_read_bytes,
+    native_readline,
+    native_read_all,
     native_write,
+    native_write_all,
+    native_flush,
     native_close,
     native_lseek,
     IO_CONSTANTS
 )
-from verbose_c.typing.types import FunctionType, IntegerType, StringType, VoidType, AnyType
+from verbose_c.typing.types import FunctionType, IntegerType, StringType, BytesType, VoidType, AnyType
 
 # 将所有内置函数收集到一个字典中，方便注册
 BUILTIN_FUNCTIONS = {
@@ -21,6 +26,11 @@ BUILTIN_FUNCTIONS = {
     'write': native_write,
     'close': native_close,
     'lseek': native_lseek,
+    'read_bytes': native_read_bytes,
+    'readline': native_readline,
+    'read_all': native_read_all,
+    'write_all': native_write_all,
+    'flush': native_flush,
 }
 
 # 内置函数的类型签名，用于编译时类型检查
@@ -50,6 +60,26 @@ BUILTIN_FUNCTION_SIGNATURES = {
         param_types=[IntegerType(VBCObjectType.INT), IntegerType(VBCObjectType.INT), IntegerType(VBCObjectType.INT)],
         return_type=IntegerType(VBCObjectType.INT)
     ),
+    'read_bytes': FunctionType(
+        param_types=[IntegerType(VBCObjectType.INT), IntegerType(VBCObjectType.INT)],
+        return_type=BytesType()
+    ),
+    'readline': FunctionType(
+        param_types=[IntegerType(VBCObjectType.INT)],
+        return_type=StringType()
+    ),
+    'read_all': FunctionType(
+        param_types=[IntegerType(VBCObjectType.INT)],
+        return_type=StringType()
+    ),
+    'write_all': FunctionType(
+        param_types=[IntegerType(VBCObjectType.INT), AnyType()],
+        return_type=IntegerType(VBCObjectType.INT)
+    ),
+    'flush': FunctionType(
+        param_types=[IntegerType(VBCObjectType.INT)],
+        return_type=IntegerType(VBCObjectType.INT)
+    ),
 }
 
 BUILTIN_CONSTANTS = IO_CONSTANTS
@@ -1,3 +1,4 @@
+from verbose_c.object.t_bytes import VBCBytes
 from verbose_c.object.t_integer import VBCInteger
 from verbose_c.object.t_string import VBCString
 from verbose_c.error.exceptions import VBCIOError
@@ -10,32 +11,70 @@ def native_open(path_obj: VBCString, flags_obj: VBCInteger, mode_obj: VBCInteger
     except SystemRuntimeError as e:
         raise VBCIOError(f"无法打开文件 '{path_obj.value}': {e}")
 
+def _encode(data_obj) -> bytes:
+    """字节缓冲区直接写出，其余对象按其字符串形式 UTF-8 编码。"""
+    if isinstance(data_obj, VBCBytes):
+        return data_obj.value
+    return str(data_obj).encode('utf-8')
+
 def native_read(fd_obj: VBCInteger, count_obj: VBCInteger):
     try:
-        read_bytes = SystemRuntime.instance().read(fd_obj.value, count_obj.value)
-        return VBCString(read_bytes.decode('utf-8', errors='replace'))
+        read_bytes = SystemRuntime.instance().buffered_read(fd_obj.value, count_obj.value)
+        return VBCString.from_value(read_bytes.decode('utf-8', errors='replace'))
+    except SystemRuntimeError as e:
+        raise VBCIOError(f"读取文件描述符 {fd_obj.value} 失败: {e}")
+
+def native_read_bytes(fd_obj: VBCInteger, count_obj: VBCInteger):
+    try:
+        return VBCBytes(SystemRuntime.instance().buffered_read(fd_obj.value, count_obj.value))
+    except SystemRuntimeError as e:
+        raise VBCIOError(f"读取文件描述符 {fd_obj.value} 失败: {e}")
+
+def native_readline(fd_obj: VBCInteger):
+    try:
+        line = SystemRuntime.instance().readline(fd_obj.value)
+        return VBCString.from_value(line.decode('utf-8', errors='replace'))
+    except SystemRuntimeError as e:
+        raise VBCIOError(f"读取文件描述符 {fd_obj.value} 失败: {e}")
+
+def native_read_all(fd_obj: VBCInteger):
+    try:
+        data = SystemRuntime.instance().read_all(fd_obj.value)
+        return VBCString.from_value(data.decode('utf-8', errors='replace'))
     except SystemRuntimeError as e:
         raise VBCIOError(f"读取文件描述符 {fd_obj.value} 失败: {e}")
 
 def native_write(fd_obj: VBCInteger, data_obj: VBCString):
     try:
-        string_to_write = str(data_obj)
-        write_bytes = string_to_write.encode('utf-8')
-        bytes_written = SystemRuntime.instance().write(fd_obj.value, write_bytes)
+        bytes_written = SystemRuntime.instance().buffered_write(fd_obj.value, _encode(data_obj))
+        return VBCInteger(bytes_written)
+    except SystemRuntimeError as e:
+        raise VBCIOError(f"写入文件描述符 {fd_obj.value} 失败: {e}")
+
+def native_write_all(fd_obj: VBCInteger, data_obj: VBCString):
+    try:
+        bytes_written = SystemRuntime.instance().write_all(fd_obj.value, _encode(data_obj))
         return VBCInteger(bytes_written)
     except SystemRuntimeError as e:
         raise VBCIOError(f"写入文件描述符 {fd_obj.value} 失败: {e}")
 
+def native_flush(fd_obj: VBCInteger):
+    try:
+        SystemRuntime.instance().flush(fd_obj.value)
+        return VBCInteger(0)
+    except SystemRuntimeError as e:
+        raise VBCIOError(f"刷新文件描述符 {fd_obj.value} 失败: {e}")
+
 def native_close(fd_obj: VBCInteger):
     try:
-        SystemRuntime.instance().close(fd_obj.value)
+        SystemRuntime.instance().buffered_close(fd_obj.value)
         return VBCInteger(0) # C语言中，成功返回0
     except SystemRuntimeError as e:
         raise VBCIOError(f"关闭文件描述符 {fd_obj.value} 失败: {e}")
 
 def native_lseek(fd_obj: VBCInteger, offset_obj: VBCInteger, whence_obj: VBCInteger):
     try:
-        new_offset = SystemRuntime.instance().lseek(fd_obj.value, offset_obj.value, whence_obj.value)
+        new_offset = SystemRuntime.instance().buffered_lseek(fd_obj.value, offset_obj.value, whence_obj.value)
         return VBCInteger(new_offset)
     except SystemRuntimeError as e:
         raise VBCIOError(f"移动文件描述符 {fd_obj.value} 指针失败: {e}")
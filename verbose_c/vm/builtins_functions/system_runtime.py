@@ -1,13 +1,54 @@
 import ctypes
 import ctypes.util
 import errno
+import os
 import platform
+from dataclasses import dataclass, field
+
+# 缓冲区大小，与常见 libc 的 BUFSIZ 一致
+BUFFER_SIZE = 8192
+
+STDIN_FD = 0
+STDOUT_FD = 1
+STDERR_FD = 2
+SEEK_CUR = 1
 
 
 class SystemRuntimeError(RuntimeError):
     """底层平台适配层错误。"""
 
 
+@dataclass
+class FileBuffer:
+    """
+    单个文件描述符的读写缓冲区
+
+    - read_buffer[read_pos:] 是已从内核预读、尚未交给程序的字节；
+    - write_buffer 是程序已写出、尚未提交给内核的字节；
+    - line_buffered 为真时遇到换行立即刷新（终端上的标准输出）。
+    """
+
+    read_buffer: bytearray = field(default_factory=bytearray)
+    read_pos: int = 0
+    write_buffer: bytearray = field(default_factory=bytearray)
+    line_buffered: bool = False
+    unbuffered: bool = False
+
+    @property
+    def unread(self) -> int:
+        return len(self.read_buffer) - self.read_pos
+
+    def take(self, count: int) -> bytes:
+        """取出最多 count 个预读字节。"""
+        end = min(self.read_pos + count, len(self.read_buffer))
+        data = bytes(self.read_buffer[self.read_pos:end])
+        self.read_pos = end
+        if self.read_pos == len(self.read_buffer):
+            self.read_buffer.clear()
+            self.read_pos = 0
+        return data
+
+
 class SystemRuntime:
     """加载并封装当前平台的 libc/CRT 底层运行时入口。"""
 
@@ -25,6 +66,7 @@ class SystemRuntime:
         self._libc = self._load_library()
         self._symbols = self._register_symbols()
         self._constants = self._build_constants()
+        self._buffers: dict[int, FileBuffer] = {}
 
     def constants(self) -> dict[str, int]:
         """返回当前平台的底层 I/O 常量表。"""
@@ -99,6 +141,177 @@ class SystemRuntime:
             operation="移动文件描述符指针",
         )
 
+    # --- 缓冲文件层 ---
+    # 内置 I/O 函数经由以下方法访问文件：读取按 BUFFER_SIZE 预读，写入先进入缓冲区，
+    # 在缓冲区写满、遇到换行（终端）、close、lseek、读取标准输入以及程序结束时提交给内核。
+    # 上面的 read/write/close/lseek 仍是不带缓冲的底层原语。
+
+    def _buffer(self, fd: int) -> FileBuffer:
+        buffer = self._buffers.get(fd)
+        if buffer is None:
+            self._validate_fd(fd)
+            buffer = FileBuffer(
+                line_buffered=fd == STDOUT_FD and self._isatty(fd),
+                unbuffered=fd == STDERR_FD,
+            )
+            self._buffers[fd] = buffer
+        return buffer
+
+    def _isatty(self, fd: int) -> bool:
+        try:
+            return os.isatty(fd)
+        except OSError:
+            return False
+
+    def _prepare_read(self, fd: int, buffer: FileBuffer):
+        """读取前提交本描述符的待写数据；读标准输入前还要提交标准输出，保证提示先于输入出现。"""
+        if buffer.write_buffer:
+            self._flush_buffer(fd, buffer)
+        if fd == STDIN_FD:
+            stdout_buffer = self._buffers.get(STDOUT_FD)
+            if stdout_buffer is not None and stdout_buffer.write_buffer:
+                self._flush_buffer(STDOUT_FD, stdout_buffer)
+
+    def _fill(self, fd: int, buffer: FileBuffer) -> bool:
+        """从内核预读一块数据追加到读缓冲区，到达文件末尾时返回 False。"""
+        data = self.read(fd, BUFFER_SIZE)
+        if not data:
+            return False
+        if buffer.read_pos:
+            del buffer.read_buffer[:buffer.read_pos]
+            buffer.read_pos = 0
+        buffer.read_buffer += data
+        return True
+
+    def buffered_read(self, fd: int, count: int) -> bytes:
+        """
+        带缓冲地读取最多 count 个字节。
+
+        与 read(2) 一样可能返回少于 count 的字节：预读缓冲区中有数据时只返回缓冲区中的部分，
+        否则最多发起一次系统调用；大块读取绕过缓冲区直接读入。
+        """
+        if count < 0:
+            raise SystemRuntimeError("read 的读取长度不能为负数")
+        buffer = self._buffer(fd)
+        self._prepare_read(fd, buffer)
+        if count == 0:
+            return b""
+        if buffer.unread:
+            return buffer.take(count)
+        if count >= BUFFER_SIZE:
+            return self.read(fd, count)
+        self._fill(fd, buffer)
+        return buffer.take(count)
+
+    def readline(self, fd: int) -> bytes:
+        """读取一行（含换行符）；到达文件末尾时返回剩余字节，没有剩余字节时返回空字节串。"""
+        buffer = self._buffer(fd)
+        self._prepare_read(fd, buffer)
+        scanned = 0 # 已确认不含换行的预读字节数
+        while True:
+            newline = buffer.read_buffer.find(b"\n", buffer.read_pos + scanned)
+            if newline != -1:
+                return buffer.take(newline + 1 - buffer.read_pos)
+            scanned = buffer.unread
+            if not self._fill(fd, buffer):
+                return buffer.take(buffer.unread)
+
+    def read_all(self, fd: int) -> bytes:
+        """读取直到文件末尾的全部字节。"""
+        buffer = self._buffer(fd)
+        self._prepare_read(fd, buffer)
+        chunks = [buffer.take(buffer.unread)]
+        while True:
+            data = self.read(fd, BUFFER_SIZE)
+            if not data:
+                return b"".join(chunks)
+            chunks.append(data)
+
+    def buffered_write(self, fd: int, data: bytes) -> int:
+        """带缓冲地写入字节，返回接受的字节数（总是 len(data)）。"""
+        if not isinstance(data, (bytes, bytearray)):
+            raise SystemRuntimeError("write 的数据参数必须是字节")
+        buffer = self._buffer(fd)
+        if buffer.unread:
+            self._discard_readahead(fd, buffer)
+        if buffer.unbuffered:
+            self._write_fully(fd, data)
+            return len(data)
+
+        buffer.write_buffer += data
+        if len(buffer.write_buffer) >= BUFFER_SIZE or (buffer.line_buffered and b"\n" in data):
+            self._flush_buffer(fd, buffer)
+        return len(data)
+
+    def write_all(self, fd: int, data: bytes) -> int:
+        """写入全部字节并立即提交给内核，返回写入的字节数。"""
+        written = self.buffered_write(fd, data)
+        self.flush(fd)
+        return written
+
+    def flush(self, fd: int):
+        """把 fd 的待写数据提交给内核。"""
+        buffer = self._buffers.get(fd)
+        if buffer is not None and buffer.write_buffer:
+            self._flush_buffer(fd, buffer)
+
+    def flush_all(self):
+        """提交所有描述符的待写数据，程序结束（含 _exit）时调用。"""
+        for fd, buffer in list(self._buffers.items()):
+            if buffer.write_buffer:
+                self._flush_buffer(fd, buffer)
+
+    def buffered_close(self, fd: int) -> int:
+        """提交待写数据、丢弃缓冲区后关闭描述符。"""
+        buffer = self._buffers.pop(fd, None)
+        if buffer is not None and buffer.write_buffer:
+            try:
+                self._flush_buffer(fd, buffer)
+            except SystemRuntimeError:
+                self.close(fd)
+                raise
+        return self.close(fd)
+
+    def buffered_lseek(self, fd: int, offset: int, whence: int) -> int:
+        """
+        移动文件偏移，并保持与缓冲区一致。
+
+        先提交待写数据；按 SEEK_CUR 移动时扣除尚未交给程序的预读字节，使偏移相对于程序看到的位置；
+        随后丢弃预读缓冲区。
+        """
+        buffer = self._buffers.get(fd)
+        if buffer is not None:
+            if buffer.write_buffer:
+                self._flush_buffer(fd, buffer)
+            if whence == SEEK_CUR:
+                offset -= buffer.unread
+            buffer.read_buffer.clear()
+            buffer.read_pos = 0
+        return self.lseek(fd, offset, whence)
+
+    def _discard_readahead(self, fd: int, buffer: FileBuffer):
+        """读写切换时把内核偏移退回到程序实际读到的位置；不可定位的描述符（管道、终端）直接丢弃预读。"""
+        try:
+            self.lseek(fd, -buffer.unread, SEEK_CUR)
+        except SystemRuntimeError:
+            pass
+        buffer.read_buffer.clear()
+        buffer.read_pos = 0
+
+    def _flush_buffer(self, fd: int, buffer: FileBuffer):
+        data = bytes(buffer.write_buffer)
+        buffer.write_buffer.clear()
+        self._write_fully(fd, data)
+
+    def _write_fully(self, fd: int, data: bytes):
+        """循环写入直到全部字节提交给内核，处理部分写入。"""
+        view = memoryview(data)
+        while view:
+            written = self.write(fd, bytes(view))
+            if written == 0:
+                raise SystemRuntimeError("写入文件描述符失败: 内核未接受任何字节")
+            view = view[written:]
+
     def exit_status(self, status: int) -> int:
         """按 C int 语义归一化退出码。"""
         return ctypes.c_int(int(status)).value
@@ -5,6 +5,7 @@ from verbose_c.object.class_ import VBCClass
 from verbose_c.object.enum import VBCObjectType
 from verbose_c.object.instance import VBCInstance
 from verbose_c.object.object import VBCObject, VBCObjectWithGC
+from verbose_c.object.t_bytes import VBCBytes
 from verbose_c.object.t_float import VBCFloat
 from verbose_c.object.t_integer import VBCInteger
 from verbose_c.object.t_null import VBCNull
@@ -15,8 +16,10 @@ from verbose_c.utils.stack import Stack
 from verbose_c.object.function import VBCBoundMethod, VBCFunction, CallFrame, VBCNativeFunction
 from verbose_c.object.t_bool import VBCBool
 from verbose_c.vm.gc import GarbageCollector
+from verbose_c.vm.linker import ProgramLinker
 from verbose_c.vm.builtins_functions import BUILTIN_FUNCTIONS, BUILTIN_CONSTANTS
 from verbose_c.vm.builtins_functions.exit import NativeExitSignal
+from verbose_c.vm.builtins_functions.system_runtime import SystemRuntime
 from verbose_c.vm.memory import MemoryManager
 
 # 全局的指令处理器映射
@@ -34,11 +37,14 @@ class VBCVirtualMachine:
     verbose-c 虚拟机核心功能
     """
     
-    def __init__(self, debug_log_collector: list | None = None):
+    def __init__(self, debug_log_collector: list | None = None, native_stubs: dict[str, VBCNativeFunction] | None = None):
         self._stack: Stack = Stack()            # 栈
         self._pc = 0                            # 程序计数器
         self._local_variables: list[VBCObject | int | None] = []              # 局部变量（使用列表按索引访问）
-        self._global_variables = {}             # 全局变量
+        self._global_slot_indices: dict[str, int] = {}  # 全局名称 -> 槽位下标
+        self._global_slots: list[int | None] = []       # 槽位下标 -> 全局变量的内存地址
+        self._native_functions: dict[str, VBCNativeFunction] = {} # 已注册的内置函数，供链接 CALL_NATIVE
+        self._native_stubs = native_stubs or {} # 混合执行时代替顶层函数执行的 native 桩
         self._call_stack: list[CallFrame] = []  # 调用栈
         self._scope_stack = []                  # 作用域栈，用于嵌套作用域管理
         self._running = False                   # 是否正在运行
@@ -70,14 +76,46 @@ class VBCVirtualMachine:
         # 注册内置函数
         for name, py_func in BUILTIN_FUNCTIONS.items():
             native_func = self._allocate(VBCNativeFunction(name, py_func))
+            self._native_functions[name] = native_func
             address = self.memory.allocate(native_func)
-            self._global_variables[name] = address
+            self._bind_global(name, address)
         
         # 注册内置常量
         for name, vbc_obj in BUILTIN_CONSTANTS.items():
             allocated_obj = self._allocate(vbc_obj)
             address = self.memory.allocate(allocated_obj)
-            self._global_variables[name] = address
+            self._bind_global(name, address)
+
+    def _global_slot(self, name: str) -> int:
+        """返回全局名称对应的槽位下标，首次出现时分配新槽位。"""
+        slot = self._global_slot_indices.get(name)
+        if slot is None:
+            slot = len(self._global_slot_indices)
+            self._global_slot_indices[name] = slot
+        while len(self._global_slots) <= slot:
+            self._global_slots.append(None)
+        return slot
+
+    def _bind_global(self, name: str, address: int) -> None:
+        self._global_slots[self._global_slot(name)] = address
+
+    def _global_address(self, name: str) -> int | None:
+        """按名称查找全局变量地址，供未经链接的指令回退使用。"""
+        slot = self._global_slot_indices.get(name)
+        if slot is None or slot >= len(self._global_slots):
+            return None
+        return self._global_slots[slot]
+
+    def link(self, bytecode: list, constants: list) -> tuple[list, list]:
+        """
+        加载期链接：为程序中出现的全局名称分配槽位，并把直接调用解析为函数对象，返回链接后的字节码与常量池副本。
+
+        内置函数与常量已在 _register_builtins 中占据最前面的槽位。
+        """
+        linker = ProgramLinker(self._global_slot_indices, self._native_functions, self._native_stubs)
+        linked_bytecode, linked_constants = linker.link(bytecode, constants)
+        self._global_slots.extend([None] * (len(self._global_slot_indices) - len(self._global_slots)))
+        return linked_bytecode, linked_constants
     
     def _fetch_instruction(self) -> Instruction:
         """
@@ -179,7 +217,7 @@ class VBCVirtualMachine:
         roots = []
         
         # 1. 全局变量
-        roots.extend(self._global_variables.values())
+        roots.extend(address for address in self._global_slots if address is not None)
         
         # 2. 当前常量池
         roots.extend(self._constants)
@@ -212,7 +250,10 @@ class VBCVirtualMachine:
         ) -> int:
         """
         虚拟机指令执行循环
+
+        执行前先链接全局名称，按名称访问全局变量的指令改写为按槽位访问。
         """
+        bytecode, constants = self.link(bytecode, constants)
         self._bytecode = bytecode
         self._constants = constants
         self._pc = 0
@@ -230,24 +271,28 @@ class VBCVirtualMachine:
         )
         self._current_function = module_func
         
-        while self._running and self._pc < len(self._bytecode):
-            # 取码、译码、执行
-            instruction = self._fetch_instruction()
-
-            if self._debug_log_collector is not None:
-                # 记录执行日志
-                stack_str = " -> ".join(repr(item) for item in self._stack._items)
-                log_entry = f"PC: {self._pc:04d} | OP: {instruction[0].name:<15}"
-                if len(instruction) > 1:
-                    operand_str = repr(instruction[1])
-                    log_entry += f" {operand_str:<20}"
-                else:
-                    log_entry += " " * 21 # 保持对齐
-                log_entry += f"| STACK: [{stack_str}]"
-                self._debug_log_collector.append(log_entry)
-
-            self._execute_instruction(instruction)
-            self._pc += 1
+        try:
+            while self._running and self._pc < len(self._bytecode):
+                # 取码、译码、执行
+                instruction = self._fetch_instruction()
+
+                if self._debug_log_collector is not None:
+                    # 记录执行日志
+                    stack_str = " -> ".join(repr(item) for item in self._stack._items)
+                    log_entry = f"PC: {self._pc:04d} | OP: {instruction[0].name:<15}"
+                    if len(instruction) > 1:
+                        operand_str = repr(instruction[1])
+                        log_entry += f" {operand_str:<20}"
+                    else:
+                        log_entry += " " * 21 # 保持对齐
+                    log_entry += f"| STACK: [{stack_str}]"
+                    self._debug_log_collector.append(log_entry)
+
+                self._execute_instruction(instruction)
+                self._pc += 1
+        finally:
+            # 程序结束（包括 _exit 和运行时错误）时提交内置 I/O 缓冲的输出
+            SystemRuntime.instance().flush_all()
 
         return self._exit_code
 
@@ -317,10 +362,10 @@ class VBCVirtualMachine:
         if operand is None:
             raise RuntimeError("LOAD_GLOBAL_VAR 指令缺少变量名操作数")
         
-        if operand not in self._global_variables:
+        address = self._global_address(operand)
+        if address is None:
             raise RuntimeError(f"未定义的全局变量: {operand}")
         
-        address = self._global_variables[operand]
         value = self.memory.read(address)
         self._stack.push(value)
 
@@ -335,7 +380,24 @@ class VBCVirtualMachine:
         
         value = self._stack.pop()
         address = self.memory.allocate(value)
-        self._global_variables[operand] = address
+        self._bind_global(operand, address)
+
+    @register_instruction(Opcode.LOAD_GLOBAL_SLOT)
+    def __handle_load_global_slot(self, operand):
+        """根据链接期分配的槽位加载全局变量，并从内存中读取其值压入栈顶"""
+        address = self._global_slots[operand]
+        if address is None:
+            name = next(name for name, slot in self._global_slot_indices.items() if slot == operand)
+            raise RuntimeError(f"未定义的全局变量: {name}")
+        self._stack.push(self.memory.read(address))
+
+    @register_instruction(Opcode.STORE_GLOBAL_SLOT)
+    def __handle_store_global_slot(self, operand):
+        """将栈顶值存入内存，并将其地址存储到链接期分配的全局槽位"""
+        if self._stack.is_empty():
+            raise RuntimeError("栈为空，无法存储到全局变量")
+        
+        self._global_slots[operand] = self.memory.allocate(self._stack.pop())
 
 
     ## 算术运算类指令
@@ -563,6 +625,69 @@ class VBCVirtualMachine:
         else:
             raise RuntimeError(f"调用的对象不是一个函数或方法: {type(callable_obj)}")
 
+    def _load_direct_callee(self, name: str, num_args: int, expected_type: type):
+        """未经链接的 CALL_DIRECT / CALL_NATIVE 回退：按名称查找全局函数并校验。"""
+        address = self._global_address(name)
+        if address is None:
+            raise RuntimeError(f"未定义的全局变量: {name}")
+        function = self.memory.read(address)
+        if not isinstance(function, expected_type):
+            raise RuntimeError(f"调用的对象不是一个函数或方法: {type(function)}")
+        if expected_type is VBCFunction and num_args != function.param_count:
+            raise RuntimeError(f"函数 '{function.name}' 期望 {function.param_count} 个参数，但提供了 {num_args} 个")
+        return function
+
+    def _pop_call_args(self, num_args: int) -> list:
+        """按原顺序切出栈顶 num_args 个实参。"""
+        if self._stack.size() < num_args:
+            raise RuntimeError(f"栈层数错误, 需要 {num_args} 个元素, 实际只有 {self._stack.size()}")
+        return self._stack.pop_many(num_args)
+
+    @register_instruction(Opcode.CALL_DIRECT)
+    def __handle_call_direct(self, operand):
+        """直接调用链接期解析出的顶层函数，参数数量已在类型检查与链接时校验。"""
+        function, num_args = operand
+        if type(function) is str:
+            function = self._load_direct_callee(function, num_args, VBCFunction)
+        args = self._pop_call_args(num_args)
+
+        self._call_stack.append(CallFrame(
+            function=self._current_function,
+            return_pc=self._pc,
+            local_vars=self._local_variables,
+            bytecode=self._bytecode,
+            constants=self._constants
+        ))
+
+        # 切换到新函数的上下文
+        self._current_function = function
+        self._bytecode = function.bytecode
+        self._constants = function.constants
+        local_variables = [None] * function.local_count
+        allocate = self.memory.allocate
+        for i, arg in enumerate(args):
+            local_variables[i] = allocate(arg)
+        self._local_variables = local_variables
+
+        # 将PC设置为-1，因为循环会自动+1，从而从0开始执行新函数
+        self._pc = -1
+
+    @register_instruction(Opcode.CALL_NATIVE)
+    def __handle_call_native(self, operand):
+        """直接调用链接期解析出的内置函数，实参按原顺序切片传入。"""
+        function, num_args = operand
+        if type(function) is str:
+            function = self._load_direct_callee(function, num_args, VBCNativeFunction)
+        args = self._pop_call_args(num_args)
+
+        try:
+            result = function(*args)
+        except NativeExitSignal as e:
+            self._exit_code = e.exit_code
+            self._running = False
+            return
+        self._stack.push(result)
+
     @register_instruction(Opcode.LOAD_FUNCTION)
     def __handle_load_function(self):
         pass
@@ -605,7 +730,14 @@ class VBCVirtualMachine:
         
         # 规则 2: 转换为字符串类型
         elif target_type_enum == VBCObjectType.STRING:
-            new_obj = self._allocate(VBCString(str(source_obj)))
+            new_obj = self._allocate(VBCString.from_value(str(source_obj)))
+
+        # 规则 2.1: 字符串按 UTF-8 编码为字节缓冲区
+        elif target_type_enum == VBCObjectType.BYTES:
+            if isinstance(source_obj, VBCBytes):
+                new_obj = source_obj
+            elif isinstance(source_obj, VBCString):
+                new_obj = self._allocate(VBCBytes(source_obj.value.encode("utf-8")))
 
         # 规则 3: 转换为布尔类型
         elif target_type_enum == VBCObjectType.BOOL:
@@ -642,7 +774,7 @@ class VBCVirtualMachine:
         if isinstance(identifier, int): # 局部变量，标识符是地址索引
             address = self._local_variables[identifier]
         else: # 全局变量，标识符是名称
-            address = self._global_variables[identifier]
+            address = self._global_address(identifier)
         
         if address is None:
             raise RuntimeError(f"试图获取未初始化变量 '{identifier}' 的地址")
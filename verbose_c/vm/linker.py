@@ -0,0 +1,124 @@
+import copy
+
+from verbose_c.compiler.opcode import Opcode
+from verbose_c.object.class_ import VBCClass
+from verbose_c.object.function import VBCFunction, VBCNativeFunction
+
+# 按名称访问全局变量的指令 -> 按槽位下标访问的等价指令
+_GLOBAL_SLOT_OPCODES = {
+    Opcode.LOAD_GLOBAL_VAR: Opcode.LOAD_GLOBAL_SLOT,
+    Opcode.STORE_GLOBAL_VAR: Opcode.STORE_GLOBAL_SLOT,
+}
+
+
+class ProgramLinker:
+    """
+    加载期链接器
+
+    - 为全局名称分配稠密的整数槽位，把按名称访问全局变量的指令改写为按槽位访问；
+    - 把 CALL_DIRECT / CALL_NATIVE 的函数名解析为函数对象本身，并在链接时校验参数数量；
+    - 混合执行时把已编译为 native 的顶层函数替换为桩：定义处的函数常量换成桩对象，CALL_DIRECT 改写为 CALL_NATIVE。
+
+    链接不修改编译产物本身，函数与类对象在改写时复制一份，.vbb、IR 降级和 dump 仍看到按名称的原始字节码。
+
+    Args:
+        slot_indices (dict[str, int]): 名称 -> 槽位下标，链接过程中为新名称追加槽位。
+        native_functions (dict[str, VBCNativeFunction]): 虚拟机已注册的内置函数。
+        native_stubs (dict[str, VBCNativeFunction]): 顶层函数名 -> 代替该函数执行的 native 桩。
+    """
+    def __init__(
+        self,
+        slot_indices: dict[str, int],
+        native_functions: dict[str, VBCNativeFunction] | None = None,
+        native_stubs: dict[str, VBCNativeFunction] | None = None,
+    ):
+        self.slot_indices = slot_indices
+        self.native_functions = native_functions or {}
+        self.native_stubs = native_stubs or {}
+        self._top_level_functions: dict[str, VBCFunction] = {} # 模块顶层定义的函数（链接前的原对象）
+        self._linked_objects: dict[int, object] = {} # id(原对象) -> 链接后的副本
+
+    def link(self, bytecode: list, constants: list) -> tuple[list, list]:
+        """链接模块入口字节码与常量池，返回链接后的副本。"""
+        self._top_level_functions = self._collect_top_level_functions(bytecode, constants)
+        for name, function in self._top_level_functions.items():
+            stub = self.native_stubs.get(name)
+            if stub is not None:
+                # 按对象身份替换，同名的类方法不受影响
+                self._linked_objects[id(function)] = stub
+        return self.link_bytecode(bytecode), self.link_constants(constants)
+
+    def _collect_top_level_functions(self, bytecode: list, constants: list) -> dict[str, VBCFunction]:
+        """按模块入口中 LOAD_CONSTANT 函数对象 + STORE_GLOBAL_VAR 名称 的定义序列收集顶层函数。"""
+        functions: dict[str, VBCFunction] = {}
+        for previous, instruction in zip(bytecode, bytecode[1:]):
+            if previous[0] is not Opcode.LOAD_CONSTANT or instruction[0] is not Opcode.STORE_GLOBAL_VAR:
+                continue
+            value = constants[previous[1]]
+            if isinstance(value, VBCFunction):
+                functions[instruction[1]] = value
+        return functions
+
+    def slot_for(self, name: str) -> int:
+        """返回全局名称的槽位下标，首次出现时分配新槽位。"""
+        slot = self.slot_indices.get(name)
+        if slot is None:
+            slot = len(self.slot_indices)
+            self.slot_indices[name] = slot
+        return slot
+
+    def link_bytecode(self, bytecode: list) -> list:
+        """返回改写后的字节码副本，指令条数与偏移不变，行号表和跳转目标无需调整。"""
+        linked = []
+        for instruction in bytecode:
+            opcode = instruction[0]
+            slot_opcode = _GLOBAL_SLOT_OPCODES.get(opcode)
+            if slot_opcode is not None and len(instruction) == 2 and isinstance(instruction[1], str):
+                instruction = (slot_opcode, self.slot_for(instruction[1]))
+            elif opcode is Opcode.CALL_DIRECT or opcode is Opcode.CALL_NATIVE:
+                instruction = self._link_call(instruction)
+            linked.append(instruction)
+        return linked
+
+    def _link_call(self, instruction: tuple) -> tuple:
+        """把按名称直接调用解析为函数对象；找不到定义时保留名称，由虚拟机在运行时按名称查找。"""
+        opcode, (name, num_args) = instruction
+        if not isinstance(name, str):
+            return instruction
+        if opcode is Opcode.CALL_NATIVE:
+            function = self.native_functions.get(name)
+            if function is None:
+                return instruction
+            return opcode, (function, num_args)
+
+        function = self._top_level_functions.get(name)
+        if function is None:
+            return instruction
+        if function.param_count != num_args:
+            raise RuntimeError(f"链接错误: 函数 '{name}' 期望 {function.param_count} 个参数，但调用处提供了 {num_args} 个")
+        linked = self.link_object(function)
+        if isinstance(linked, VBCNativeFunction):
+            return Opcode.CALL_NATIVE, (linked, num_args)
+        return opcode, (linked, num_args)
+
+    def link_constants(self, constants: list) -> list:
+        """返回常量池副本，其中的函数和类替换为已链接的副本。"""
+        return [self.link_object(value) for value in constants]
+
+    def link_object(self, value):
+        if not isinstance(value, (VBCFunction, VBCClass)):
+            return value
+        linked = self._linked_objects.get(id(value))
+        if linked is not None:
+            return linked
+
+        linked = copy.copy(value)
+        self._linked_objects[id(value)] = linked
+        if isinstance(value, VBCFunction):
+            linked.bytecode = self.link_bytecode(value.bytecode)
+            linked.constants = self.link_constants(value.constants)
+        else:
+            linked._super_class = [self.link_object(super_class) for super_class in value._super_class]
+            linked._methods = {name: self.link_object(method) for name, method in value._methods.items()}
+            linked._fields = dict(value._fields)
+        return linked